@@ -38,6 +38,10 @@ BINANCE_API_KEY = os.getenv("BINANCE_API_KEY", "")
 BINANCE_API_SECRET = os.getenv("BINANCE_API_SECRET", "")
 BINANCE_BASE_URL = "https://api.binance.com"
 
+# Local Prometheus endpoint for job metrics (0 disables).
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9108") or 0)
+
 CRYPTOCOMPARE_API_KEY = os.getenv("CRYPTOCOMPARE_API_KEY", "").strip()
 CRYPTOCOMPARE_BASE_URL = os.getenv("CRYPTOCOMPARE_BASE_URL", "https://min-api.cryptocompare.com").strip()
 CRYPTOCOMPARE_EXTRA_PARAMS = os.getenv("CRYPTOCOMPARE_EXTRA_PARAMS", "ZTbot").strip()
@@ -50,6 +54,11 @@ SOLANA_RPC_URL = (
     if HELIUS_API_KEY
     else "https://api.mainnet-beta.solana.com"
 )
+# signatureSubscribe endpoint for transaction confirmations; empty polls only.
+SOLANA_WS_URL = os.getenv(
+    "SOLANA_WS_URL",
+    f"wss://mainnet.helius-rpc.com/?api-key={HELIUS_API_KEY}" if HELIUS_API_KEY else "",
+).strip()
 POLYMARKET_CLOB = "https://clob.polymarket.com"
 POLYMARKET_GAMMA = "https://gamma-api.polymarket.com"
 ETHERSCAN_KEY = os.getenv("ETHERSCAN_KEY", "")
@@ -183,6 +192,13 @@ BIASES = ["Bullish", "Bearish"]
 SCANNER_INTERVAL = 300
 CRYPTOPANIC_API_TOKEN = os.getenv("CRYPTOPANIC_API_TOKEN", "")
 CRYPTOPANIC_TOKEN = os.getenv("CRYPTOPANIC_TOKEN", "")
+# Local JSON feed served instead of the CryptoPanic API (offline runs).
+CRYPTOPANIC_FIXTURE = os.getenv("CRYPTOPANIC_FIXTURE", "")
+# pump.fun launch listing; point at a local fixture server for offline runs.
+PUMPFUN_API_URL = os.getenv("PUMPFUN_API_URL", "https://frontend-api.pump.fun").rstrip("/")
+TRENCHES_INTERVAL = 60
+# Process-pool workers for degen risk/moon scoring; 0 scores inline on the event loop.
+RISK_SCORING_WORKERS = int(os.getenv("RISK_SCORING_WORKERS", "0"))
 SUPPORTED_PAIRS = ALL_PAIRS
 SUPPORTED_TIMEFRAMES = TIMEFRAMES
 SUPPORTED_SESSIONS = SESSIONS_LIST
@@ -207,5 +223,12 @@ CORRELATED_PAIRS = {
     "SOLUSDT": ["BTCUSDT"],
 }
 
+# ── Rolling return correlation (engine/correlation_guard) ──
+CORRELATION_TIMEFRAME = "1h"
+CORRELATION_WINDOWS = (24, 168)    # bars; the shortest drives alerts
+CORRELATION_THRESHOLD = 0.7
+CORRELATION_HIGH = 0.85
+CORRELATION_INTERVAL = 900
+
 ENCRYPTION_KEY = os.getenv("ENCRYPTION_KEY", "")
 ALLOWED_USER_IDS = os.getenv("ALLOWED_USER_IDS", "")
@@ -13,6 +13,9 @@ _CACHE_TTL = {
     "active_degen_models": 30,
     "tracked_wallets": 60,
     "demo_accounts": 10,
+    "dashboard": 15,
+    "pair_regimes": 300,
+    "open_demo_trades": 60,
 }
 
 _PENDING_SETUP_UPDATABLE_FIELDS = {
@@ -100,6 +103,180 @@ def _cache_clear(key: str):
     _cache.pop(key, None)
 
 
+# ── Settings cache ────────────────────────────────────
+# Write-through cache for the settings readers. Every writer invalidates its
+# entry in-process and sends pg_notify on SETTINGS_CHANNEL inside the same
+# transaction; other processes drain those notifications before each job tick
+# (see listen_settings_changes), so a change is live by the next tick
+# anywhere. SETTINGS_TTL only bounds staleness for edits made outside the bot.
+SETTINGS_KINDS = ("risk", "scanner", "degen_risk", "user_settings", "user_prefs")
+SETTINGS_CHANNEL = "settings_changed"
+SETTINGS_TTL = 300
+SETTINGS_RECONNECT_SECONDS = 30
+
+_settings_cache = {kind: {} for kind in SETTINGS_KINDS}
+_settings_stats = {kind: {"hits": 0, "misses": 0, "invalidations": 0} for kind in SETTINGS_KINDS}
+_settings_listener = {"conn": None, "fd": None, "loop": None, "wanted": False, "connecting": False, "retry_at": 0.0}
+
+
+def _settings_copy(data: dict) -> dict:
+    return {k: list(v) if isinstance(v, list) else v for k, v in data.items()}
+
+
+def _settings_get(kind: str, key):
+    entry = _settings_cache[kind].get(key)
+    if entry and time.time() - entry["ts"] < SETTINGS_TTL:
+        _settings_stats[kind]["hits"] += 1
+        return _settings_copy(entry["data"])
+    _settings_stats[kind]["misses"] += 1
+    return None
+
+
+def _settings_set(kind: str, key, data: dict) -> dict:
+    _settings_cache[kind][key] = {"data": _settings_copy(data), "ts": time.time()}
+    return data
+
+
+def invalidate_settings(kind: str | None = None, key=None) -> None:
+    """Drop cached settings: one entry, one kind (``key`` None) or everything."""
+    for k in (kind,) if kind else SETTINGS_KINDS:
+        if k not in _settings_cache:
+            continue
+        if key is None:
+            _settings_cache[k].clear()
+        else:
+            _settings_cache[k].pop(key, None)
+        _settings_stats[k]["invalidations"] += 1
+
+
+def _notify_settings(cur, kind: str, key=None) -> None:
+    """Queue a change notification; Postgres delivers it when the transaction commits."""
+    cur.execute("SELECT pg_notify(%s, %s)", (SETTINGS_CHANNEL, f"{kind}:{'' if key is None else key}"))
+
+
+def _settings_key(payload: str):
+    kind, _, key = payload.partition(":")
+    if not key:
+        return kind, None
+    return kind, int(key) if key.lstrip("-").isdigit() else key
+
+
+def _settings_connect():
+    conn = psycopg2.connect(DB_URL, connect_timeout=5)
+    conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+    with conn.cursor() as cur:
+        cur.execute(f"LISTEN {SETTINGS_CHANNEL}")
+    return conn
+
+
+def _settings_attach(conn) -> int:
+    fd = conn.fileno()
+    _settings_listener.update(conn=conn, fd=fd)
+    loop = _settings_listener["loop"]
+    if loop is not None:
+        loop.add_reader(fd, drain_settings_notifications)
+    return fd
+
+
+def _settings_detach() -> None:
+    """Unregister and close the listener connection, if any."""
+    conn, fd, loop = _settings_listener["conn"], _settings_listener["fd"], _settings_listener["loop"]
+    _settings_listener.update(conn=None, fd=None)
+    if loop is not None and fd is not None:
+        try:
+            loop.remove_reader(fd)
+        except Exception:
+            pass
+    if conn is not None:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+def listen_settings_changes(loop=None) -> int:
+    """Open a dedicated LISTEN connection and return its socket fd.
+
+    With ``loop`` the socket is watched there and notifications are drained
+    as they arrive; reconnects move the reader to the new socket.
+    """
+    _settings_listener.update(wanted=True, loop=loop)
+    _settings_detach()
+    return _settings_attach(_settings_connect())
+
+
+def _reconnect_settings_listener() -> None:
+    """Retry the listener at most every ``SETTINGS_RECONNECT_SECONDS``, off the event loop when there is one."""
+    now = time.monotonic()
+    if _settings_listener["connecting"] or now < _settings_listener["retry_at"]:
+        return
+    _settings_listener["retry_at"] = now + SETTINGS_RECONNECT_SECONDS
+    loop = _settings_listener["loop"]
+    if loop is None:
+        try:
+            _settings_attach(_settings_connect())
+        except psycopg2.Error as e:
+            log.debug("Settings listener reconnect failed: %s", e)
+        return
+
+    def _done(future):
+        _settings_listener["connecting"] = False
+        try:
+            conn = future.result()
+        except Exception as e:
+            log.debug("Settings listener reconnect failed: %s", e)
+            return
+        if _settings_listener["conn"] is not None or not _settings_listener["wanted"]:
+            conn.close()
+            return
+        _settings_attach(conn)
+        # Anything sent while disconnected was missed.
+        invalidate_settings()
+        log.info("Settings listener reconnected")
+
+    _settings_listener["connecting"] = True
+    loop.run_in_executor(None, _settings_connect).add_done_callback(_done)
+
+
+def drain_settings_notifications() -> int:
+    """Apply pending settings notifications; returns how many were processed.
+
+    If the listener connection is lost the whole settings cache is dropped
+    on every call until it reconnects, so readers never serve a value another
+    process may have changed.
+    """
+    conn = _settings_listener["conn"]
+    if conn is None:
+        if _settings_listener["wanted"]:
+            invalidate_settings()
+            _reconnect_settings_listener()
+        return 0
+    try:
+        conn.poll()
+    except psycopg2.Error as e:
+        log.warning("Settings listener lost: %s", e)
+        _settings_detach()
+        invalidate_settings()
+        _reconnect_settings_listener()
+        return 0
+    processed = 0
+    while conn.notifies:
+        note = conn.notifies.pop(0)
+        kind, key = _settings_key(note.payload)
+        invalidate_settings(kind, key)
+        processed += 1
+    return processed
+
+
+def get_settings_cache_stats() -> dict:
+    out = {}
+    for kind in SETTINGS_KINDS:
+        st = _settings_stats[kind]
+        reads = st["hits"] + st["misses"]
+        out[kind] = {**st, "entries": len(_settings_cache[kind]), "hit_rate": st["hits"] / reads if reads else 0.0}
+    return out
+
+
 def _ensure_pool():
     global _pool
     if _pool is None:
@@ -522,6 +699,40 @@ def setup_db():
         updated_at      TIMESTAMP DEFAULT NOW()
     );
 
+    ALTER TABLE alert_lifecycle ADD COLUMN IF NOT EXISTS quality_grade VARCHAR(5);
+    CREATE INDEX IF NOT EXISTS idx_trade_log_open ON trade_log (logged_at) WHERE result IS NULL;
+    CREATE INDEX IF NOT EXISTS idx_alert_lifecycle_open ON alert_lifecycle (model_id) WHERE outcome IS NULL;
+
+    -- Closed trade_log / demo_trades / alert_lifecycle rows summed per hour they
+    -- were opened; see _ROLLUP_ROWS. Open rows are read live.
+    CREATE TABLE IF NOT EXISTS perf_rollup_hourly (
+        source          VARCHAR(10)  NOT NULL,
+        bucket          TIMESTAMP    NOT NULL,
+        section         VARCHAR(20)  NOT NULL DEFAULT '',
+        model_id        VARCHAR(100) NOT NULL DEFAULT '',
+        tier            VARCHAR(10)  NOT NULL DEFAULT '',
+        pair            VARCHAR(50)  NOT NULL DEFAULT '',
+        session         VARCHAR(20)  NOT NULL DEFAULT '',
+        total           INT DEFAULT 0,
+        wins            INT DEFAULT 0,
+        losses          INT DEFAULT 0,
+        r_count         INT DEFAULT 0,
+        total_r         FLOAT DEFAULT 0,
+        pnl_usd         FLOAT DEFAULT 0,
+        entries_touched INT DEFAULT 0,
+        phase4_confirms INT DEFAULT 0,
+        phase4_fails    INT DEFAULT 0,
+        PRIMARY KEY (source, bucket, section, model_id, tier, pair, session)
+    );
+    CREATE INDEX IF NOT EXISTS idx_perf_rollup_model ON perf_rollup_hourly (source, model_id);
+    CREATE OR REPLACE VIEW perf_rollup_daily AS
+        SELECT source, bucket::date AS day, section, model_id, tier, pair, session,
+               SUM(total) AS total, SUM(wins) AS wins, SUM(losses) AS losses,
+               SUM(r_count) AS r_count, SUM(total_r) AS total_r, SUM(pnl_usd) AS pnl_usd,
+               SUM(entries_touched) AS entries_touched, SUM(phase4_confirms) AS phase4_confirms, SUM(phase4_fails) AS phase4_fails
+        FROM perf_rollup_hourly
+        GROUP BY source, bucket::date, section, model_id, tier, pair, session;
+
     """
     degen_sql = """
     CREATE TABLE IF NOT EXISTS degen_tokens (
@@ -803,6 +1014,11 @@ def setup_db():
             ALTER TABLE degen_tokens ADD COLUMN IF NOT EXISTS holders_last_checked_at TIMESTAMP;
             ALTER TABLE degen_tokens ADD COLUMN IF NOT EXISTS holder_check_progress INT DEFAULT 0;
             ALTER TABLE degen_tokens ADD COLUMN IF NOT EXISTS rugged BOOLEAN DEFAULT FALSE;
+            CREATE TABLE IF NOT EXISTS rescore_queue (
+                address VARCHAR(100) PRIMARY KEY,
+                chain VARCHAR(20),
+                due_at DOUBLE PRECISION NOT NULL
+            );
             CREATE TABLE IF NOT EXISTS rug_postmortems (
                 id SERIAL PRIMARY KEY,
                 token_id INT REFERENCES degen_tokens(id),
@@ -1021,6 +1237,13 @@ def setup_db():
                 notes TEXT,
                 added_at TIMESTAMP DEFAULT NOW()
             );
+            CREATE TABLE IF NOT EXISTS poly_price_history (
+                token_id VARCHAR(100) NOT NULL,
+                ts BIGINT NOT NULL,
+                price DOUBLE PRECISION NOT NULL,
+                market_id VARCHAR(100),
+                PRIMARY KEY (token_id, ts)
+            );
             CREATE TABLE IF NOT EXISTS poly_alerts_sent (
                 id SERIAL PRIMARY KEY,
                 market_id VARCHAR(100) NOT NULL,
@@ -1076,6 +1299,20 @@ def setup_db():
                 status VARCHAR(20) DEFAULT 'pending',
                 created_at TIMESTAMP DEFAULT NOW()
             );
+            ALTER TABLE pending_signals ADD COLUMN IF NOT EXISTS pair VARCHAR(100);
+            ALTER TABLE pending_signals ADD COLUMN IF NOT EXISTS direction VARCHAR(20);
+            ALTER TABLE pending_signals ADD COLUMN IF NOT EXISTS phase INT DEFAULT 1;
+            ALTER TABLE pending_signals ADD COLUMN IF NOT EXISTS timeframe VARCHAR(10);
+            ALTER TABLE pending_signals ADD COLUMN IF NOT EXISTS quality_grade VARCHAR(5);
+            ALTER TABLE pending_signals ADD COLUMN IF NOT EXISTS quality_score FLOAT;
+            ALTER TABLE pending_signals ADD COLUMN IF NOT EXISTS signal_data JSONB DEFAULT '{}';
+            ALTER TABLE pending_signals ADD COLUMN IF NOT EXISTS hl_plan JSONB DEFAULT '{}';
+            ALTER TABLE pending_signals ADD COLUMN IF NOT EXISTS expires_at TIMESTAMP;
+            ALTER TABLE pending_signals ADD COLUMN IF NOT EXISTS dismissed_at TIMESTAMP;
+            -- Prediction signals carry the market question as their pair.
+            ALTER TABLE pending_signals ALTER COLUMN pair TYPE VARCHAR(100);
+            ALTER TABLE pending_signals ADD COLUMN IF NOT EXISTS signal_key VARCHAR(120);
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_pending_signals_key ON pending_signals (section, signal_key);
             CREATE TABLE IF NOT EXISTS audit_log (
                 id SERIAL PRIMARY KEY,
                 timestamp TIMESTAMP DEFAULT NOW(),
@@ -1183,6 +1420,45 @@ def setup_db():
                 timestamp TIMESTAMP DEFAULT NOW(),
                 hl_order_id VARCHAR(100) UNIQUE
             );
+            -- Partial fills share an order id; the fill's trade id is the key.
+            ALTER TABLE hl_trade_history DROP CONSTRAINT IF EXISTS hl_trade_history_hl_order_id_key;
+            ALTER TABLE hl_trade_history ADD COLUMN IF NOT EXISTS tid BIGINT;
+            ALTER TABLE hl_trade_history ADD COLUMN IF NOT EXISTS time_ms BIGINT;
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_hl_trade_history_tid ON hl_trade_history (address, tid);
+            CREATE TABLE IF NOT EXISTS hl_funding_history (
+                id SERIAL PRIMARY KEY,
+                address VARCHAR(100),
+                coin VARCHAR(20),
+                payment FLOAT,
+                rate FLOAT,
+                timestamp TIMESTAMP,
+                created_at TIMESTAMP DEFAULT NOW()
+            );
+            ALTER TABLE hl_funding_history ADD COLUMN IF NOT EXISTS time_ms BIGINT;
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_hl_funding_history_event ON hl_funding_history (address, coin, time_ms);
+            CREATE TABLE IF NOT EXISTS hl_ingest_cursors (
+                address VARCHAR(100) PRIMARY KEY,
+                fills_ms BIGINT DEFAULT 0,
+                funding_ms BIGINT DEFAULT 0,
+                updated_at TIMESTAMP DEFAULT NOW()
+            );
+            CREATE TABLE IF NOT EXISTS hl_perf_daily (
+                address VARCHAR(100) NOT NULL,
+                day DATE NOT NULL,
+                coin VARCHAR(20) NOT NULL,
+                fills INT DEFAULT 0,
+                closes INT DEFAULT 0,
+                wins INT DEFAULT 0,
+                losses INT DEFAULT 0,
+                net_pnl FLOAT DEFAULT 0,
+                gross_profit FLOAT DEFAULT 0,
+                gross_loss FLOAT DEFAULT 0,
+                fees FLOAT DEFAULT 0,
+                funding FLOAT DEFAULT 0,
+                best_pnl FLOAT,
+                worst_pnl FLOAT,
+                PRIMARY KEY (address, day, coin)
+            );
             CREATE TABLE IF NOT EXISTS solana_trade_plans (
                 id SERIAL PRIMARY KEY,
                 token_address VARCHAR(100) NOT NULL,
@@ -1226,6 +1502,7 @@ def setup_db():
             """)
         conn.commit()
     validate_schema()
+    _seed_perf_rollups()
 
 
 # ── Models ────────────────────────────────────────────
@@ -1435,7 +1712,9 @@ def log_trade(trade):
 def update_trade_result(trade_id: int, result: str):
     with get_conn() as conn:
         with conn.cursor() as cur:
+            _rollup_retract(cur, "trade", trade_id)
             cur.execute("UPDATE trade_log SET result=%s, closed_at=NOW() WHERE id=%s", (result, trade_id))
+            _rollup_apply(cur, "trade", [trade_id])
         conn.commit()
 
 
@@ -1519,41 +1798,55 @@ def get_losing_streak() -> int:
         break
     return streak
 
+
+# Closed trades from the rollup plus open ones read live, over the last N days.
+# Rollup buckets are hourly, so the window's first hour is counted whole.
+_TRADE_WINDOW_ROWS = """
+    SELECT tier, session, total, wins, losses, r_count, total_r
+    FROM perf_rollup_hourly
+    WHERE source='trade' AND bucket >= date_trunc('hour', NOW() - make_interval(days => %(days)s))
+    UNION ALL
+    SELECT COALESCE(tier, ''), COALESCE(session, ''), 1, 0, 0, (rr IS NOT NULL)::int, COALESCE(rr, 0)
+    FROM trade_log
+    WHERE result IS NULL AND logged_at > NOW() - make_interval(days => %(days)s)
+"""
+
+
 def get_stats_30d():
     with get_conn() as conn:
         with conn.cursor() as cur:
-            cur.execute("""
-                SELECT COUNT(*) AS total,
-                       SUM(CASE WHEN result='TP' THEN 1 ELSE 0 END) AS wins,
-                       SUM(CASE WHEN result='SL' THEN 1 ELSE 0 END) AS losses,
-                       ROUND(SUM(rr)::numeric, 2) AS total_r,
-                       ROUND(AVG(rr)::numeric, 2) AS avg_rr
-                FROM trade_log WHERE logged_at > NOW() - INTERVAL '30 days'
-            """)
+            cur.execute(f"""
+                SELECT COALESCE(SUM(total), 0) AS total,
+                       SUM(wins) AS wins,
+                       SUM(losses) AS losses,
+                       ROUND(SUM(total_r)::numeric, 2) AS total_r,
+                       ROUND((SUM(total_r) / NULLIF(SUM(r_count), 0))::numeric, 2) AS avg_rr
+                FROM ({_TRADE_WINDOW_ROWS}) w
+            """, {"days": 30})
             return dict(cur.fetchone())
 
 def get_tier_breakdown():
     with get_conn() as conn:
         with conn.cursor() as cur:
-            cur.execute("""
-                SELECT tier,
-                       COUNT(*) AS total,
-                       SUM(CASE WHEN result='TP' THEN 1 ELSE 0 END) AS wins,
-                       ROUND(SUM(rr)::numeric,2) AS total_r
-                FROM trade_log WHERE logged_at > NOW() - INTERVAL '30 days'
-                GROUP BY tier ORDER BY tier
-            """)
+            cur.execute(f"""
+                SELECT NULLIF(tier, '') AS tier,
+                       SUM(total) AS total,
+                       SUM(wins) AS wins,
+                       ROUND(SUM(total_r)::numeric,2) AS total_r
+                FROM ({_TRADE_WINDOW_ROWS}) w
+                GROUP BY tier HAVING SUM(total) > 0 ORDER BY tier
+            """, {"days": 30})
             return [dict(r) for r in cur.fetchall()]
 
 def get_session_breakdown():
     with get_conn() as conn:
         with conn.cursor() as cur:
-            cur.execute("""
-                SELECT session, COUNT(*) AS total,
-                       SUM(CASE WHEN result='TP' THEN 1 ELSE 0 END) AS wins
-                FROM trade_log WHERE logged_at > NOW() - INTERVAL '30 days'
-                GROUP BY session ORDER BY session
-            """)
+            cur.execute(f"""
+                SELECT NULLIF(session, '') AS session, SUM(total) AS total,
+                       SUM(wins) AS wins
+                FROM ({_TRADE_WINDOW_ROWS}) w
+                GROUP BY session HAVING SUM(total) > 0 ORDER BY session
+            """, {"days": 30})
             return [dict(r) for r in cur.fetchall()]
 
 
@@ -1652,6 +1945,9 @@ def get_violations_30d():
 
 
 def get_user_preferences(chat_id: int):
+    cached = _settings_get("user_prefs", int(chat_id))
+    if cached is not None:
+        return cached
     with get_conn() as conn:
         with conn.cursor() as cur:
             cur.execute(
@@ -1667,7 +1963,7 @@ def get_user_preferences(chat_id: int):
         conn.commit()
     if not isinstance(row.get("preferred_pairs"), list):
         row["preferred_pairs"] = json.loads(row.get("preferred_pairs") or "[]")
-    return row
+    return _settings_set("user_prefs", int(chat_id), row)
 
 
 def update_user_preferences(chat_id: int, **fields):
@@ -1690,7 +1986,9 @@ def update_user_preferences(chat_id: int, **fields):
                 f"UPDATE user_preferences SET {assignments}, updated_at=NOW() WHERE chat_id=%s",
                 (*values, chat_id),
             )
+            _notify_settings(cur, "user_prefs", int(chat_id))
         conn.commit()
+    invalidate_settings("user_prefs", int(chat_id))
 
 
 # ── Alerts ────────────────────────────────────────────
@@ -1800,7 +2098,7 @@ def get_hourly_breakdown():
     try:
         with get_conn() as conn:
             with conn.cursor() as cur:
-                cur.execute("SELECT EXTRACT(HOUR FROM logged_at)::int AS hour, COUNT(*) AS total, SUM(CASE WHEN result='TP' THEN 1 ELSE 0 END) AS wins, COALESCE(SUM(rr),0) AS total_r FROM trade_log WHERE result IS NOT NULL GROUP BY 1 ORDER BY 1")
+                cur.execute("SELECT EXTRACT(HOUR FROM bucket)::int AS hour, SUM(total) AS total, SUM(wins) AS wins, COALESCE(SUM(total_r),0) AS total_r FROM perf_rollup_hourly WHERE source='trade' GROUP BY 1 HAVING SUM(total) > 0 ORDER BY 1")
                 return [dict(r) for r in cur.fetchall()]
     except Exception as e:
         log.error(f"get_hourly_breakdown error: {e}")
@@ -1880,7 +2178,9 @@ def update_trade_flags(trade_id, **kwargs):
         sets = ", ".join(f"{c}=%s" for c in cols)
         with get_conn() as conn:
             with conn.cursor() as cur:
+                _rollup_retract(cur, "trade", trade_id)
                 cur.execute(f"UPDATE trade_log SET {sets} WHERE id=%s", (*vals, trade_id))
+                _rollup_apply(cur, "trade", [trade_id])
             conn.commit()
     except Exception as e:
         log.error(f"update_trade_flags error: {e}")
@@ -2881,6 +3181,68 @@ def update_degen_token_rescore(address: str, chain: str, payload: dict) -> None:
         conn.commit()
 
 
+def update_degen_token_rescores(payloads: list) -> None:
+    """Batch form of ``update_degen_token_rescore``; payloads carry address and chain."""
+    if not payloads:
+        return
+    # Payloads start from a SELECT * row, so timestamps ride along.
+    rows = [(p.get("risk_score"), p.get("trajectory"), json.dumps(p, default=str), p.get("address"), p.get("chain")) for p in payloads]
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            psycopg2.extras.execute_values(
+                cur,
+                """
+                UPDATE degen_tokens AS t
+                SET latest_risk_score=v.risk_score::int,last_rescored_at=NOW(),trajectory=v.trajectory,token_data=v.token_data::jsonb
+                FROM (VALUES %s) AS v(risk_score, trajectory, token_data, address, chain)
+                WHERE t.address=v.address AND t.chain=v.chain
+                """,
+                rows,
+            )
+        conn.commit()
+
+
+def get_degen_tokens_by_address(addresses: list) -> dict:
+    """address -> token row (token_data merged in) for every address found."""
+    if not addresses:
+        return {}
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT * FROM degen_tokens WHERE address = ANY(%s)", (list(addresses),))
+            out = {}
+            for r in cur.fetchall():
+                d = dict(r)
+                d.update(_decode_json_field(d.get("token_data"), {}))
+                out[r["address"]] = d
+            return out
+
+
+def save_rescore_queue(upserts: list, deletes: list) -> None:
+    """Apply (address, chain, due_at) upserts and address deletes to the rescore queue."""
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            if deletes:
+                cur.execute("DELETE FROM rescore_queue WHERE address = ANY(%s)", (list(deletes),))
+            if upserts:
+                psycopg2.extras.execute_values(
+                    cur,
+                    """
+                    INSERT INTO rescore_queue (address, chain, due_at)
+                    VALUES %s
+                    ON CONFLICT (address) DO UPDATE SET chain=EXCLUDED.chain, due_at=EXCLUDED.due_at
+                    """,
+                    upserts,
+                )
+        conn.commit()
+
+
+def get_rescore_queue() -> list:
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT address, chain, due_at FROM rescore_queue ORDER BY due_at")
+            return [dict(r) for r in cur.fetchall()]
+
+
 def get_degen_token_by_address(address: str) -> dict | None:
     with get_conn() as conn:
         with conn.cursor() as cur:
@@ -3103,6 +3465,7 @@ def open_demo_trade(trade: dict) -> int:
             cur.execute("UPDATE demo_accounts SET balance=GREATEST(balance-%s,0) WHERE section=%s", (margin_reserved, section))
         conn.commit()
     _cache_clear("demo_accounts")
+    _cache_clear("open_demo_trades")
     log_demo_transaction(section, "trade_open", -margin_reserved, f"Open demo trade #{tid}")
     return tid
 
@@ -3153,6 +3516,7 @@ def close_demo_trade(trade_id: int, exit_price: float | None = None, result: str
                         """,
                         (float(pnl), float(pnl), reason, int(trade_id)),
                     )
+                    _rollup_apply(cur, "demo", [int(trade_id)])
                     cur.execute(
                         """
                         UPDATE demo_accounts
@@ -3167,6 +3531,7 @@ def close_demo_trade(trade_id: int, exit_price: float | None = None, result: str
                     )
                 conn.commit()
             _cache_clear("demo_accounts")
+            _cache_clear("open_demo_trades")
             return True
         except Exception:
             return False
@@ -3196,6 +3561,7 @@ def close_demo_trade(trade_id: int, exit_price: float | None = None, result: str
                 """,
                 (result, exit_price, pnl_usd, pnl_pct, final_x, exit_price, pnl_usd, pnl_pct, trade_id),
             )
+            _rollup_apply(cur, "demo", [trade_id])
             cur.execute(
                 """
                 UPDATE demo_accounts
@@ -3215,6 +3581,7 @@ def close_demo_trade(trade_id: int, exit_price: float | None = None, result: str
             acct = dict(cur.fetchone() or {})
         conn.commit()
     _cache_clear("demo_accounts")
+    _cache_clear("open_demo_trades")
     log_demo_transaction(tr["section"], "trade_close", pnl_usd, f"Close demo trade #{trade_id} ({result})")
     return {**tr, "exit_price": exit_price, "final_pnl_usd": pnl_usd, "final_pnl_pct": pnl_pct, "final_x": final_x, "balance": acct.get("balance")}
 
@@ -3252,6 +3619,9 @@ def get_open_demo_trades(section: str = None) -> list:
 
 
 def get_open_demo_trades_all() -> list:
+    cached = _cache_get("open_demo_trades")
+    if cached is not None:
+        return cached
     with get_conn() as conn:
         with conn.cursor() as cur:
             cur.execute(
@@ -3268,7 +3638,9 @@ def get_open_demo_trades_all() -> list:
                 ORDER BY opened_at DESC
                 """
             )
-            return [dict(r) for r in cur.fetchall()]
+            result = [dict(r) for r in cur.fetchall()]
+    _cache_set("open_demo_trades", result)
+    return result
 
 
 def get_demo_trade_history(section: str, limit: int = 50) -> list:
@@ -3543,6 +3915,7 @@ def partial_close_demo_trade(trade_id: int, fraction: float = 0.5) -> dict | Non
             )
         conn.commit()
     _cache_clear("demo_accounts")
+    _cache_clear("open_demo_trades")
     return get_demo_trade_by_id(trade_id)
 
 
@@ -3613,65 +3986,156 @@ def get_setup_phase(model_id, pair, direction):
             return cur.fetchone()
 
 
+def get_setup_phases_for_models(model_ids: list) -> dict:
+    """All setup_phases rows for the given models keyed by (model_id, pair, direction)."""
+    if not model_ids:
+        return {}
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT * FROM setup_phases WHERE model_id = ANY(%s)", ([str(m) for m in model_ids],))
+            return {(r["model_id"], r["pair"], r["direction"]): dict(r) for r in cur.fetchall()}
+
+
+def create_setup_phases(phases: list) -> dict:
+    """Insert missing setup_phases rows in one statement; returns them keyed like get_setup_phases_for_models."""
+    if not phases:
+        return {}
+    rows = [
+        (p["model_id"], p.get("model_name"), p["pair"], p.get("direction"), p.get("overall_status") or "phase1", p.get("check_count", 0) or 0)
+        for p in phases
+    ]
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            created = psycopg2.extras.execute_values(
+                cur,
+                """
+                INSERT INTO setup_phases (model_id, model_name, pair, direction, overall_status, check_count)
+                VALUES %s
+                ON CONFLICT (model_id,pair,direction) DO UPDATE SET model_name=EXCLUDED.model_name,last_updated_at=NOW()
+                RETURNING *
+                """,
+                rows,
+                fetch=True,
+            )
+        conn.commit()
+    return {(r["model_id"], r["pair"], r["direction"]): dict(r) for r in created}
+
+
+def _save_setup_phase(cur, phase: dict) -> int:
+    if phase.get("id"):
+        safe_updates = {
+            k: v
+            for k, v in phase.items()
+            if k != "id" and k in _SETUP_PHASE_UPDATABLE_FIELDS
+        }
+        if not safe_updates:
+            return int(phase["id"])
+        sets = ", ".join(f"{k}=%s" for k in safe_updates)
+        vals = [safe_updates[k] for k in safe_updates]
+        cur.execute(f"UPDATE setup_phases SET {sets}, last_updated_at=NOW() WHERE id=%s RETURNING id", (*vals, phase["id"]))
+    else:
+        cur.execute(
+            """
+            INSERT INTO setup_phases (model_id, model_name, pair, direction, overall_status, check_count, last_updated_at)
+            VALUES (%s,%s,%s,%s,COALESCE(%s,'phase1'),COALESCE(%s,0),NOW())
+            ON CONFLICT (model_id,pair,direction) DO UPDATE SET model_name=EXCLUDED.model_name,last_updated_at=NOW()
+            RETURNING id
+            """,
+            (phase["model_id"], phase.get("model_name"), phase["pair"], phase.get("direction"), phase.get("overall_status"), phase.get("check_count", 0)),
+        )
+    row = cur.fetchone()
+    return int(row["id"]) if row else 0
+
+
 def save_setup_phase(phase: dict) -> int:
     with get_conn() as conn:
         with conn.cursor() as cur:
-            if phase.get("id"):
-                safe_updates = {
-                    k: v
-                    for k, v in phase.items()
-                    if k != "id" and k in _SETUP_PHASE_UPDATABLE_FIELDS
-                }
-                if not safe_updates:
-                    return int(phase["id"])
-                sets = ", ".join(f"{k}=%s" for k in safe_updates)
-                vals = [safe_updates[k] for k in safe_updates]
-                cur.execute(f"UPDATE setup_phases SET {sets}, last_updated_at=NOW() WHERE id=%s RETURNING id", (*vals, phase["id"]))
-            else:
-                cur.execute(
-                    """
-                    INSERT INTO setup_phases (model_id, model_name, pair, direction, overall_status, check_count, last_updated_at)
-                    VALUES (%s,%s,%s,%s,COALESCE(%s,'phase1'),COALESCE(%s,0),NOW())
-                    ON CONFLICT (model_id,pair,direction) DO UPDATE SET model_name=EXCLUDED.model_name,last_updated_at=NOW()
-                    RETURNING id
-                    """,
-                    (phase["model_id"], phase.get("model_name"), phase["pair"], phase.get("direction"), phase.get("overall_status"), phase.get("check_count", 0)),
-                )
-            row = cur.fetchone()
+            sid = _save_setup_phase(cur, phase)
         conn.commit()
-    return row[0] if row else 0
+    return sid
 
 
-def update_phase_status(id, phase_num, status, data):
+def phase_status_write(id, phase_num, status, data) -> dict:
+    """Build the setup_phases update for a phase transition without executing it."""
     if phase_num not in (1, 2, 3, 4):
         raise ValueError("phase_num must be between 1 and 4")
 
     now = datetime.utcnow()
     expires = now + timedelta(seconds={1: 14400, 2: 3600, 3: 0, 4: 2700}.get(phase_num, 0)) if phase_num in (1, 2, 4) else None
-    next_status = {1: "phase2", 2: "phase3", 3: "phase4", 4: "phase1"}.get(phase_num, "phase1")
+    return {
+        "id": id,
+        "phase_num": phase_num,
+        "status": status,
+        "score": data.get("score", 0),
+        "max_score": data.get("max_score", 0),
+        "passed_rules": json.dumps(data.get("passed_rules", [])),
+        "failed_rules": json.dumps(data.get("failed_rules", [])),
+        "phase_data": json.dumps(data.get("phase_data", {})),
+        "completed_at": now,
+        "expires_at": expires,
+        "next_status": {1: "phase2", 2: "phase3", 3: "phase4", 4: "phase1"}.get(phase_num, "phase1"),
+    }
+
+
+def _update_phase_status(cur, w: dict) -> None:
+    n = w["phase_num"]
+    cur.execute(
+        f"""
+        UPDATE setup_phases
+        SET phase{n}_status=%s,
+            phase{n}_score=%s,
+            phase{n}_max_score=%s,
+            phase{n}_passed_rules=%s,
+            phase{n}_failed_rules=%s,
+            phase{n}_data=%s,
+            phase{n}_completed_at=%s,
+            phase{n}_expires_at=COALESCE(%s, phase{n}_expires_at),
+            overall_status=%s,
+            last_updated_at=NOW(),
+            check_count=COALESCE(check_count,0)+1
+        WHERE id=%s
+        """,
+        (w["status"], w["score"], w["max_score"], w["passed_rules"], w["failed_rules"], w["phase_data"], w["completed_at"], w["expires_at"], w["next_status"], w["id"]),
+    )
+
+
+def update_phase_status(id, phase_num, status, data):
+    write = phase_status_write(id, phase_num, status, data)
     with get_conn() as conn:
         with conn.cursor() as cur:
-            cur.execute(
-                f"""
-                UPDATE setup_phases
-                SET phase{phase_num}_status=%s,
-                    phase{phase_num}_score=%s,
-                    phase{phase_num}_max_score=%s,
-                    phase{phase_num}_passed_rules=%s,
-                    phase{phase_num}_failed_rules=%s,
-                    phase{phase_num}_data=%s,
-                    phase{phase_num}_completed_at=%s,
-                    phase{phase_num}_expires_at=COALESCE(%s, phase{phase_num}_expires_at),
-                    overall_status=%s,
-                    last_updated_at=NOW(),
-                    check_count=COALESCE(check_count,0)+1
-                WHERE id=%s
-                """,
-                (status, data.get("score", 0), data.get("max_score", 0), json.dumps(data.get("passed_rules", [])), json.dumps(data.get("failed_rules", [])), json.dumps(data.get("phase_data", {})), now, expires, next_status, id),
-            )
+            _update_phase_status(cur, write)
         conn.commit()
 
 
+def apply_setup_phase_writes(writes: list) -> list:
+    """
+    Apply queued phase-engine writes in order inside one transaction.
+    Each item is ("status", phase_status_write(...)) or ("save", phase dict).
+    Every write runs under its own savepoint, so one bad write is rolled back
+    alone; returns [(item, error)] for the writes that failed.
+    """
+    if not writes:
+        return []
+    failed = []
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            for item in writes:
+                kind, payload = item
+                cur.execute("SAVEPOINT phase_write")
+                try:
+                    if kind == "status":
+                        _update_phase_status(cur, payload)
+                    else:
+                        _save_setup_phase(cur, payload)
+                except Exception as e:
+                    cur.execute("ROLLBACK TO SAVEPOINT phase_write")
+                    failed.append((item, e))
+                else:
+                    cur.execute("RELEASE SAVEPOINT phase_write")
+        conn.commit()
+    return failed
+
+
 def get_active_setup_phases() -> list:
     with get_conn() as conn:
         with conn.cursor() as cur:
@@ -3730,7 +4194,9 @@ def update_alert_lifecycle(id, fields: dict) -> None:
     with get_conn() as conn:
         with conn.cursor() as cur:
             sets = ", ".join(f"{k}=%s" for k in fields)
+            _rollup_retract(cur, "alert", id)
             cur.execute(f"UPDATE alert_lifecycle SET {sets} WHERE id=%s", (*fields.values(), id))
+            _rollup_apply(cur, "alert", [id])
         conn.commit()
 
 
@@ -3762,46 +4228,207 @@ def get_model_performance(model_id: str) -> dict:
 
 
 def update_model_performance(model_id: str) -> None:
+    refresh_model_performance([model_id])
+
+
+def refresh_model_performance(model_ids: list | None = None) -> int:
+    """Recompute ``model_performance`` for ``model_ids`` (every row when None) in one UPDATE.
+
+    Closed lifecycles come from the ``alert`` rollup; open ones (outcome still
+    NULL) are few and read live. Returns the number of rows updated.
+    """
+    ids = [str(m) for m in model_ids or []]
+    if model_ids is not None and not ids:
+        return 0
     with get_conn() as conn:
         with conn.cursor() as cur:
+            if ids:
+                psycopg2.extras.execute_values(
+                    cur, "INSERT INTO model_performance (model_id) VALUES %s ON CONFLICT (model_id) DO NOTHING", [(m,) for m in ids]
+                )
             cur.execute(
                 """
-                INSERT INTO model_performance (model_id,total_alerts,entries_touched,phase4_confirms,phase4_fails,demo_trades,demo_wins,demo_losses,demo_win_rate,avg_r,updated_at)
-                SELECT %s,
-                    COUNT(*),
-                    COUNT(*) FILTER (WHERE entry_touched),
-                    COUNT(*) FILTER (WHERE phase4_result='confirmed'),
-                    COUNT(*) FILTER (WHERE phase4_result='failed'),
-                    COUNT(*) FILTER (WHERE outcome IN ('win','loss')),
-                    COUNT(*) FILTER (WHERE outcome='win'),
-                    COUNT(*) FILTER (WHERE outcome='loss'),
-                    COALESCE(COUNT(*) FILTER (WHERE outcome='win')::float / NULLIF(COUNT(*) FILTER (WHERE outcome IN ('win','loss')),0),0),
-                    0,
-                    NOW()
-                FROM alert_lifecycle WHERE model_id=%s
-                ON CONFLICT (model_id) DO UPDATE SET
-                    total_alerts=EXCLUDED.total_alerts,
-                    entries_touched=EXCLUDED.entries_touched,
-                    phase4_confirms=EXCLUDED.phase4_confirms,
-                    phase4_fails=EXCLUDED.phase4_fails,
-                    demo_trades=EXCLUDED.demo_trades,
-                    demo_wins=EXCLUDED.demo_wins,
-                    demo_losses=EXCLUDED.demo_losses,
-                    demo_win_rate=EXCLUDED.demo_win_rate,
+                UPDATE model_performance mp SET
+                    total_alerts=s.total_alerts,
+                    entries_touched=s.entries_touched,
+                    phase4_confirms=s.phase4_confirms,
+                    phase4_fails=s.phase4_fails,
+                    demo_trades=s.demo_wins + s.demo_losses,
+                    demo_wins=s.demo_wins,
+                    demo_losses=s.demo_losses,
+                    demo_win_rate=COALESCE(s.demo_wins::float / NULLIF(s.demo_wins + s.demo_losses, 0), 0),
                     updated_at=NOW()
+                FROM (
+                    SELECT p.model_id,
+                           COALESCE(a.total_alerts, 0) AS total_alerts,
+                           COALESCE(a.entries_touched, 0) AS entries_touched,
+                           COALESCE(a.phase4_confirms, 0) AS phase4_confirms,
+                           COALESCE(a.phase4_fails, 0) AS phase4_fails,
+                           COALESCE(a.demo_wins, 0) AS demo_wins,
+                           COALESCE(a.demo_losses, 0) AS demo_losses
+                    FROM model_performance p
+                    LEFT JOIN (
+                        SELECT model_id,
+                               SUM(total) AS total_alerts, SUM(entries_touched) AS entries_touched,
+                               SUM(phase4_confirms) AS phase4_confirms, SUM(phase4_fails) AS phase4_fails,
+                               SUM(wins) AS demo_wins, SUM(losses) AS demo_losses
+                        FROM (
+                            SELECT model_id, total, entries_touched, phase4_confirms, phase4_fails, wins, losses
+                            FROM perf_rollup_hourly
+                            WHERE source='alert' AND (%(all)s OR model_id = ANY(%(ids)s))
+                            UNION ALL
+                            SELECT model_id, 1, COALESCE(entry_touched, FALSE)::int,
+                                   COALESCE(phase4_result = 'confirmed', FALSE)::int, COALESCE(phase4_result = 'failed', FALSE)::int, 0, 0
+                            FROM alert_lifecycle
+                            WHERE outcome IS NULL AND (%(all)s OR model_id = ANY(%(ids)s))
+                        ) rows
+                        GROUP BY model_id
+                    ) a ON a.model_id = p.model_id
+                    WHERE %(all)s OR p.model_id = ANY(%(ids)s)
+                ) s
+                WHERE mp.model_id = s.model_id
                 """,
-                (model_id, model_id),
+                {"all": model_ids is None, "ids": ids},
             )
+            updated = cur.rowcount
         conn.commit()
+    return updated
 
 
-def save_session_journal(data: dict) -> None:
+def get_model_performances(model_ids: list) -> dict:
+    """``model_performance`` rows keyed by model id, in one query."""
+    ids = [str(m) for m in model_ids or []]
+    if not ids:
+        return {}
     with get_conn() as conn:
         with conn.cursor() as cur:
+            cur.execute("SELECT * FROM model_performance WHERE model_id = ANY(%s)", (ids,))
+            return {r["model_id"]: dict(r) for r in cur.fetchall()}
+
+
+# ── Performance rollups ─────────────────────────────
+# One row per closed trade_log / demo_trades / alert_lifecycle row, bucketed by
+# the hour it was opened. perf_rollup_hourly holds these summed; a row's
+# contribution is retracted before it changes and re-added after, in the same
+# transaction, so the rollup follows closes and later edits alike.
+_ROLLUP_TABLES = {"trade": "trade_log", "demo": "demo_trades", "alert": "alert_lifecycle"}
+_ROLLUP_KEYS = "source, bucket, section, model_id, tier, pair, session"
+_ROLLUP_MEASURES = ("total", "wins", "losses", "r_count", "total_r", "pnl_usd", "entries_touched", "phase4_confirms", "phase4_fails")
+_ROLLUP_ROWS = {
+    "trade": """
+        SELECT id, 'trade' AS source, date_trunc('hour', COALESCE(logged_at, 'epoch')) AS bucket, '' AS section,
+               COALESCE(model_id, '') AS model_id, COALESCE(tier, '') AS tier, COALESCE(pair, '') AS pair, COALESCE(session, '') AS session,
+               1 AS total, (result = 'TP')::int AS wins, (result = 'SL')::int AS losses,
+               (rr IS NOT NULL)::int AS r_count, COALESCE(rr, 0) AS total_r, 0.0 AS pnl_usd,
+               0 AS entries_touched, 0 AS phase4_confirms, 0 AS phase4_fails
+        FROM trade_log WHERE result IS NOT NULL
+    """,
+    "demo": """
+        SELECT id, 'demo' AS source, date_trunc('hour', COALESCE(opened_at, 'epoch')) AS bucket, COALESCE(section, '') AS section,
+               COALESCE(model_id::text, '') AS model_id, COALESCE(tier, '') AS tier, COALESCE(pair, '') AS pair, '' AS session,
+               1 AS total, (COALESCE(final_pnl_usd, 0) > 0)::int AS wins, (COALESCE(final_pnl_usd, 0) <= 0)::int AS losses,
+               0 AS r_count, 0.0 AS total_r, COALESCE(final_pnl_usd, 0) AS pnl_usd,
+               0 AS entries_touched, 0 AS phase4_confirms, 0 AS phase4_fails
+        FROM demo_trades WHERE result IS NOT NULL
+    """,
+    # Alerts use the quality grade as their tier.
+    "alert": """
+        SELECT id, 'alert' AS source, date_trunc('hour', COALESCE(alert_sent_at, 'epoch')) AS bucket, '' AS section,
+               COALESCE(model_id, '') AS model_id, COALESCE(quality_grade, '') AS tier, COALESCE(pair, '') AS pair, '' AS session,
+               1 AS total, (outcome = 'win')::int AS wins, (outcome = 'loss')::int AS losses,
+               0 AS r_count, 0.0 AS total_r, 0.0 AS pnl_usd,
+               COALESCE(entry_touched, FALSE)::int AS entries_touched,
+               COALESCE(phase4_result = 'confirmed', FALSE)::int AS phase4_confirms, COALESCE(phase4_result = 'failed', FALSE)::int AS phase4_fails
+        FROM alert_lifecycle WHERE outcome IS NOT NULL
+    """,
+}
+
+
+def _rollup_apply(cur, source: str, ids: list, sign: int = 1) -> None:
+    """Add (``sign=1``) or retract (``sign=-1``) the closed rows ``ids`` of ``source``."""
+    sums = ", ".join(f"%(sign)s * SUM({m})" for m in _ROLLUP_MEASURES)
+    updates = ", ".join(f"{m}=r.{m} + EXCLUDED.{m}" for m in _ROLLUP_MEASURES)
+    cur.execute(
+        f"""
+        INSERT INTO perf_rollup_hourly AS r ({_ROLLUP_KEYS}, {", ".join(_ROLLUP_MEASURES)})
+        SELECT {_ROLLUP_KEYS}, {sums}
+        FROM ({_ROLLUP_ROWS[source]} AND id = ANY(%(ids)s)) x
+        GROUP BY {_ROLLUP_KEYS}
+        ON CONFLICT ({_ROLLUP_KEYS}) DO UPDATE SET {updates}
+        """,
+        {"sign": sign, "ids": [int(i) for i in ids]},
+    )
+
+
+def _rollup_retract(cur, source: str, row_id: int) -> None:
+    """Lock ``row_id`` and take its current contribution out of the rollup."""
+    cur.execute(f"SELECT id FROM {_ROLLUP_TABLES[source]} WHERE id=%s FOR UPDATE", (int(row_id),))
+    _rollup_apply(cur, source, [row_id], -1)
+
+
+def reconcile_perf_rollups() -> int:
+    """Rebuild ``perf_rollup_hourly`` from the source tables; returns how many rows had drifted."""
+    measures = ", ".join(_ROLLUP_MEASURES)
+    rows = " UNION ALL ".join(_ROLLUP_ROWS[s] for s in _ROLLUP_TABLES)
+    compare = ", ".join(f"ROUND({{t}}.{m}::numeric, 6)" if m in ("total_r", "pnl_usd") else f"{{t}}.{m}" for m in _ROLLUP_MEASURES)
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            # Incremental writers wait behind this until the rebuild commits.
+            cur.execute("LOCK TABLE perf_rollup_hourly IN EXCLUSIVE MODE")
             cur.execute(
+                f"""
+                CREATE TEMP TABLE perf_rollup_fresh ON COMMIT DROP AS
+                SELECT {_ROLLUP_KEYS}, {", ".join(f"SUM({m}) AS {m}" for m in _ROLLUP_MEASURES)}
+                FROM ({rows}) x
+                GROUP BY {_ROLLUP_KEYS}
+                """
+            )
+            cur.execute(
+                f"""
+                SELECT COUNT(*) AS drift
+                FROM perf_rollup_fresh f
+                FULL JOIN (SELECT * FROM perf_rollup_hourly WHERE total <> 0) h USING ({_ROLLUP_KEYS})
+                WHERE ({compare.format(t="f")}) IS DISTINCT FROM ({compare.format(t="h")})
+                """
+            )
+            drift = int(cur.fetchone()["drift"] or 0)
+            cur.execute("DELETE FROM perf_rollup_hourly")
+            cur.execute(f"INSERT INTO perf_rollup_hourly ({_ROLLUP_KEYS}, {measures}) SELECT {_ROLLUP_KEYS}, {measures} FROM perf_rollup_fresh")
+        conn.commit()
+    return drift
+
+
+def _seed_perf_rollups() -> None:
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT 1 FROM perf_rollup_hourly LIMIT 1")
+            seeded = cur.fetchone() is not None
+    if not seeded:
+        reconcile_perf_rollups()
+
+
+def save_session_journal(data: dict) -> None:
+    save_session_journals([data])
+
+
+def save_session_journals(rows: list) -> None:
+    """Upsert journal rows in one statement (one row per session_date/pair)."""
+    if not rows:
+        return
+    values = {
+        (data.get("session_date"), data.get("pair")): (
+            data.get("session_date"), data.get("session_name"), data.get("pair"), data.get("asian_high"), data.get("asian_low"), data.get("asian_range_pts"),
+            data.get("london_swept"), data.get("london_swept_at"), data.get("ny_direction"), data.get("ny_reversed", False), json.dumps(data.get("key_levels", [])), data.get("notes"),
+        )
+        for data in rows
+    }
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            psycopg2.extras.execute_values(
+                cur,
                 """
                 INSERT INTO session_journal (session_date,session_name,pair,asian_high,asian_low,asian_range_pts,london_swept,london_swept_at,ny_direction,ny_reversed,key_levels,notes)
-                VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
+                VALUES %s
                 ON CONFLICT (session_date,pair) DO UPDATE SET
                     session_name=EXCLUDED.session_name,
                     asian_high=EXCLUDED.asian_high,
@@ -3811,7 +4438,7 @@ def save_session_journal(data: dict) -> None:
                     key_levels=EXCLUDED.key_levels,
                     notes=EXCLUDED.notes
                 """,
-                (data.get("session_date"), data.get("session_name"), data.get("pair"), data.get("asian_high"), data.get("asian_low"), data.get("asian_range_pts"), data.get("london_swept"), data.get("london_swept_at"), data.get("ny_direction"), data.get("ny_reversed", False), json.dumps(data.get("key_levels", [])), data.get("notes")),
+                list(values.values()),
             )
         conn.commit()
 
@@ -3845,6 +4472,13 @@ def _ensure_risk_tables() -> None:
                 UPDATE risk_settings
                 SET risk_reward_min = 1.0
                 WHERE id = 1 AND (risk_reward_min IS NULL OR risk_reward_min = 1.5);
+                CREATE TABLE IF NOT EXISTS limit_buckets (
+                    limit_key    VARCHAR(160) NOT NULL,
+                    bucket_start BIGINT NOT NULL,
+                    amount       FLOAT NOT NULL DEFAULT 0,
+                    updated_at   TIMESTAMP DEFAULT NOW(),
+                    PRIMARY KEY (limit_key, bucket_start)
+                );
                 CREATE TABLE IF NOT EXISTS daily_risk_tracker (
                     id               SERIAL PRIMARY KEY,
                     track_date       DATE NOT NULL UNIQUE,
@@ -3862,6 +4496,9 @@ def _ensure_risk_tables() -> None:
 
 
 def get_risk_settings() -> dict:
+    cached = _settings_get("risk", "global")
+    if cached is not None:
+        return cached
     _ensure_risk_tables()
     _ensure_degen_intel_tables()
     defaults = {
@@ -3881,12 +4518,11 @@ def get_risk_settings() -> dict:
             cur.execute("SELECT * FROM risk_settings WHERE id=1")
             row = cur.fetchone()
             if row:
-                data = dict(row)
-                return {**defaults, **data}
+                return _settings_set("risk", "global", {**defaults, **dict(row)})
             cur.execute("INSERT INTO risk_settings (id) VALUES (1) RETURNING *")
             row = cur.fetchone()
         conn.commit()
-    return {**defaults, **dict(row or {})}
+    return _settings_set("risk", "global", {**defaults, **dict(row or {})})
 
 
 def update_risk_settings(fields: dict) -> None:
@@ -3900,9 +4536,41 @@ def update_risk_settings(fields: dict) -> None:
     with get_conn() as conn:
         with conn.cursor() as cur:
             cur.execute(f"UPDATE risk_settings SET {sets} WHERE id=1", tuple(payload.values()))
+            _notify_settings(cur, "risk")
+        conn.commit()
+    invalidate_settings("risk")
+
+
+def save_limit_buckets(rows: list, horizon_seconds: int) -> None:
+    """Upsert (limit_key, bucket_start, amount) rows and drop buckets past the horizon."""
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            if rows:
+                psycopg2.extras.execute_values(
+                    cur,
+                    """
+                    INSERT INTO limit_buckets (limit_key, bucket_start, amount)
+                    VALUES %s
+                    ON CONFLICT (limit_key, bucket_start) DO UPDATE SET
+                        amount=EXCLUDED.amount,
+                        updated_at=NOW()
+                    """,
+                    rows,
+                )
+            cur.execute("DELETE FROM limit_buckets WHERE bucket_start < %s", (int(time.time()) - int(horizon_seconds),))
         conn.commit()
 
 
+def get_limit_buckets(since_ts: int) -> list:
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                "SELECT limit_key, bucket_start, amount FROM limit_buckets WHERE bucket_start >= %s AND amount <> 0 ORDER BY limit_key, bucket_start",
+                (int(since_ts),),
+            )
+            return [dict(r) for r in cur.fetchall()]
+
+
 def get_daily_tracker() -> dict:
     _ensure_risk_tables()
     _ensure_degen_intel_tables()
@@ -4055,6 +4723,99 @@ def get_latest_regime() -> dict:
             return dict(row) if row else None
 
 
+def save_pair_regimes(regime_date, regimes: dict) -> None:
+    """Upsert one row per pair for ``regime_date`` in a single statement."""
+    if not regimes:
+        return
+    rows = [
+        (
+            regime_date,
+            pair,
+            r["regime"],
+            r.get("confidence", 0),
+            r.get("atr_pct", 0),
+            r.get("range_pct", 0),
+            r.get("trend"),
+            json.dumps(r.get("details", {})),
+        )
+        for pair, r in regimes.items()
+    ]
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            psycopg2.extras.execute_values(
+                cur,
+                """
+                INSERT INTO pair_regimes (regime_date, pair, regime, confidence, atr_pct, range_pct, trend, details)
+                VALUES %s
+                ON CONFLICT (regime_date, pair) DO UPDATE SET
+                    regime=EXCLUDED.regime,
+                    confidence=EXCLUDED.confidence,
+                    atr_pct=EXCLUDED.atr_pct,
+                    range_pct=EXCLUDED.range_pct,
+                    trend=EXCLUDED.trend,
+                    details=EXCLUDED.details,
+                    detected_at=NOW()
+                """,
+                rows,
+            )
+        conn.commit()
+    _cache_clear("pair_regimes")
+
+
+def get_latest_pair_regimes() -> dict:
+    """Most recent regime row per pair, keyed by pair."""
+    cached = _cache_get("pair_regimes")
+    if cached is not None:
+        return cached
+    try:
+        with get_conn() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    SELECT DISTINCT ON (pair) *
+                    FROM pair_regimes
+                    ORDER BY pair, regime_date DESC
+                    """
+                )
+                result = {r["pair"]: dict(r) for r in cur.fetchall()}
+    except Exception:
+        return {}
+    _cache_set("pair_regimes", result)
+    return result
+
+
+def get_regime_performance_for_models(model_ids) -> dict:
+    """All regime-performance rows for ``model_ids``, keyed by (model_id, regime)."""
+    ids = [str(m) for m in model_ids]
+    if not ids:
+        return {}
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT * FROM model_regime_performance WHERE model_id = ANY(%s)", (ids,))
+            return {(r["model_id"], r["regime"]): dict(r) for r in cur.fetchall()}
+
+
+def set_models_active(changes: list) -> None:
+    """Apply (model_id, active, regime_managed) activations in one transaction."""
+    if not changes:
+        return
+    rows = [("active" if active else "inactive", bool(managed), str(model_id)) for model_id, active, managed in changes]
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            psycopg2.extras.execute_values(
+                cur,
+                """
+                UPDATE models AS m
+                SET status=v.status, regime_managed=v.regime_managed, updated_at=NOW()
+                FROM (VALUES %s) AS v(status, regime_managed, id)
+                WHERE m.id = v.id
+                """,
+                rows,
+            )
+        conn.commit()
+    _cache_clear("active_models")
+
+
 def get_model_regime_performance(model_id, regime) -> dict:
     with get_conn() as conn:
         with conn.cursor() as cur:
@@ -4145,6 +4906,19 @@ def ensure_intelligence_tables() -> None:
                     details      JSONB DEFAULT '{}',
                     detected_at  TIMESTAMP DEFAULT NOW()
                 );
+                CREATE TABLE IF NOT EXISTS pair_regimes (
+                    regime_date  DATE NOT NULL,
+                    pair         VARCHAR(20) NOT NULL,
+                    regime       VARCHAR(30) NOT NULL,
+                    confidence   FLOAT DEFAULT 0,
+                    atr_pct      FLOAT,
+                    range_pct    FLOAT,
+                    trend        VARCHAR(20),
+                    details      JSONB DEFAULT '{}',
+                    detected_at  TIMESTAMP DEFAULT NOW(),
+                    PRIMARY KEY (regime_date, pair)
+                );
+                CREATE INDEX IF NOT EXISTS idx_pair_regimes_pair_date ON pair_regimes (pair, regime_date DESC);
                 CREATE TABLE IF NOT EXISTS model_regime_performance (
                     id           SERIAL PRIMARY KEY,
                     model_id     VARCHAR(100) NOT NULL,
@@ -4395,6 +5169,20 @@ def _ensure_degen_intel_tables() -> None:
                     created_at       TIMESTAMP DEFAULT NOW(),
                     UNIQUE(journal_id, reminder_type)
                 );
+                CREATE TABLE IF NOT EXISTS ingest_cursors (
+                    source          VARCHAR(40) PRIMARY KEY,
+                    watermark       DOUBLE PRECISION NOT NULL DEFAULT 0,
+                    head_ts         DOUBLE PRECISION NOT NULL DEFAULT 0,
+                    backfill_offset INT,
+                    updated_at      TIMESTAMP DEFAULT NOW()
+                );
+                CREATE TABLE IF NOT EXISTS recent_mints (
+                    mint       VARCHAR(100) PRIMARY KEY,
+                    source     VARCHAR(40) NOT NULL,
+                    created_ts DOUBLE PRECISION,
+                    seen_at    DOUBLE PRECISION NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_recent_mints_seen ON recent_mints(source, seen_at);
                 INSERT INTO narrative_tracking (narrative)
                 VALUES
                   ('AI'), ('DeFi'), ('Gaming'), ('Meme'),
@@ -4406,6 +5194,58 @@ def _ensure_degen_intel_tables() -> None:
         conn.commit()
 
 
+def get_ingest_cursor(source: str) -> dict | None:
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT watermark, head_ts, backfill_offset FROM ingest_cursors WHERE source=%s", (source,))
+            row = cur.fetchone()
+            return dict(row) if row else None
+
+
+def save_ingest_cursor(source: str, watermark: float, head_ts: float, backfill_offset: int | None) -> None:
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                INSERT INTO ingest_cursors (source, watermark, head_ts, backfill_offset)
+                VALUES (%s, %s, %s, %s)
+                ON CONFLICT (source) DO UPDATE SET
+                    watermark=EXCLUDED.watermark,
+                    head_ts=EXCLUDED.head_ts,
+                    backfill_offset=EXCLUDED.backfill_offset,
+                    updated_at=NOW()
+                """,
+                (source, watermark, head_ts, backfill_offset),
+            )
+        conn.commit()
+
+
+def save_recent_mints(source: str, mints: list, horizon_seconds: int) -> None:
+    """Record (mint, created_ts) pairs as processed and drop ones past the horizon."""
+    now = time.time()
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            if mints:
+                psycopg2.extras.execute_values(
+                    cur,
+                    """
+                    INSERT INTO recent_mints (mint, source, created_ts, seen_at)
+                    VALUES %s
+                    ON CONFLICT (mint) DO UPDATE SET seen_at=EXCLUDED.seen_at
+                    """,
+                    [(mint, source, created_ts, now) for mint, created_ts in mints],
+                )
+            cur.execute("DELETE FROM recent_mints WHERE source=%s AND seen_at < %s", (source, now - horizon_seconds))
+        conn.commit()
+
+
+def get_recent_mints(source: str, since_ts: float) -> list:
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT mint FROM recent_mints WHERE source=%s AND seen_at >= %s", (source, since_ts))
+            return [r["mint"] for r in cur.fetchall()]
+
+
 def save_contract_scan(scan: dict) -> None:
     payload = {
         **scan,
@@ -4578,11 +5418,14 @@ def get_degen_risk_settings() -> dict:
         "block_honeypots": True,
         "block_no_lp_lock": False,
     }
+    cached = _settings_get("degen_risk", 1)
+    if cached is not None:
+        return cached
     with get_conn() as conn:
         with conn.cursor() as cur:
             cur.execute("SELECT * FROM degen_risk_settings WHERE id=1")
             row = cur.fetchone()
-            return {**defaults, **(dict(row) if row else {})}
+            return _settings_set("degen_risk", 1, {**defaults, **(dict(row) if row else {})})
 
 
 def create_degen_journal(entry: dict) -> int:
@@ -4758,6 +5601,9 @@ def get_scanner_settings() -> dict:
         "require_lp_locked": True,
         "max_top_holder_pct": 15.0,
     }
+    cached = _settings_get("scanner", 1)
+    if cached is not None:
+        return cached
     with get_conn() as conn:
         with conn.cursor() as cur:
             cur.execute("SELECT * FROM scanner_settings WHERE id=1")
@@ -4765,10 +5611,10 @@ def get_scanner_settings() -> dict:
             if not row:
                 cur.execute("INSERT INTO scanner_settings (id) VALUES (1) ON CONFLICT (id) DO NOTHING")
                 conn.commit()
-                return defaults
+                return _settings_set("scanner", 1, defaults)
             data = dict(row)
             data["chains"] = _decode_json_field(data.get("chains"), ["solana"])
-            return {**defaults, **data}
+            return _settings_set("scanner", 1, {**defaults, **data})
 
 
 def update_scanner_settings(fields: dict) -> None:
@@ -4791,7 +5637,9 @@ def update_scanner_settings(fields: dict) -> None:
         with conn.cursor() as cur:
             cur.execute("INSERT INTO scanner_settings (id) VALUES (1) ON CONFLICT (id) DO NOTHING")
             cur.execute(f"UPDATE scanner_settings SET {', '.join(sets)}, updated_at=NOW() WHERE id=%s", tuple(values))
+            _notify_settings(cur, "scanner", 1)
         conn.commit()
+    invalidate_settings("scanner", 1)
 
 
 def save_auto_scan_result(data: dict) -> None:
@@ -5060,10 +5908,12 @@ def update_user_settings(chat_id: int, fields: dict) -> None:
         with conn.cursor() as cur:
             cur.execute("INSERT INTO user_settings (chat_id) VALUES (%s) ON CONFLICT (chat_id) DO NOTHING", (int(chat_id),))
             cur.execute(f"UPDATE user_settings SET {', '.join(cols)}, updated_at=NOW() WHERE chat_id=%s", vals + [int(chat_id)])
+            _notify_settings(cur, "user_settings", int(chat_id))
         conn.commit()
+    invalidate_settings("user_settings", int(chat_id))
 
 
-def save_pending_signal(data: dict) -> int:
+def _pending_signal_expiry(data: dict) -> datetime:
     phase = int(data.get("phase") or 1)
     expiry_minutes = 240 if phase <= 1 else 60 if phase == 2 else 30 if phase == 3 else 360
     expires_at = data.get("expires_at")
@@ -5072,8 +5922,12 @@ def save_pending_signal(data: dict) -> int:
             expires_at = datetime.fromisoformat(str(expires_at).replace("Z", "+00:00"))
         except Exception:
             expires_at = None
-    if not expires_at:
-        expires_at = datetime.utcnow() + timedelta(minutes=expiry_minutes)
+    return expires_at or datetime.utcnow() + timedelta(minutes=expiry_minutes)
+
+
+def save_pending_signal(data: dict) -> int:
+    phase = int(data.get("phase") or 1)
+    expires_at = _pending_signal_expiry(data)
     with get_conn() as conn:
         with conn.cursor() as cur:
             cur.execute(
@@ -5100,9 +5954,75 @@ def save_pending_signal(data: dict) -> int:
             )
             row = cur.fetchone() or {}
         conn.commit()
+        _cache_clear("dashboard")
         return int(row.get("id") or 0)
 
 
+def save_pending_signals(rows: list) -> int:
+    """Upsert keyed signals in one statement; returns rows written.
+
+    Each row is a ``save_pending_signal`` payload plus ``signal_key``. A key
+    already pending is refreshed in place; dismissed ones stay dismissed.
+    """
+    if not rows:
+        return 0
+    values = [
+        (
+            r.get("section", "perps"), r["signal_key"], r.get("pair"), r.get("direction"),
+            int(r.get("phase") or 1), r.get("timeframe"), r.get("quality_grade"),
+            float(r.get("quality_score") or 0), json.dumps(r.get("signal_data") or {}),
+            json.dumps(r.get("hl_plan") or {}), r.get("status", "pending"), _pending_signal_expiry(r),
+        )
+        for r in rows
+    ]
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            written = psycopg2.extras.execute_values(
+                cur,
+                """
+                INSERT INTO pending_signals (
+                    section, signal_key, pair, direction, phase, timeframe, quality_grade,
+                    quality_score, signal_data, hl_plan, status, expires_at
+                ) VALUES %s
+                ON CONFLICT (section, signal_key) DO UPDATE SET
+                    pair=EXCLUDED.pair, direction=EXCLUDED.direction, quality_grade=EXCLUDED.quality_grade,
+                    quality_score=EXCLUDED.quality_score, signal_data=EXCLUDED.signal_data,
+                    expires_at=EXCLUDED.expires_at
+                WHERE pending_signals.status='pending'
+                RETURNING id
+                """,
+                values,
+                fetch=True,
+            )
+        conn.commit()
+        _cache_clear("dashboard")
+        return len(written)
+
+
+def touch_pending_signals(section: str, keys: list, phase: int = 4) -> set:
+    """Push back ``expires_at`` of still-pending keyed signals; returns the keys that still exist.
+
+    Keys missing from the result were expired or deleted and need a fresh save.
+    """
+    if not keys:
+        return set()
+    expires_at = _pending_signal_expiry({"phase": phase})
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                UPDATE pending_signals
+                SET expires_at = CASE WHEN status='pending' THEN %s ELSE expires_at END
+                WHERE section=%s AND signal_key = ANY(%s)
+                RETURNING signal_key
+                """,
+                (expires_at, section, [str(k) for k in keys]),
+            )
+            found = {r["signal_key"] for r in cur.fetchall()}
+        conn.commit()
+    return found
+
+
 def get_pending_signals(section: str = None, active_only: bool = True) -> list:
     where = []
     params = []
@@ -5128,6 +6048,7 @@ def dismiss_pending_signal(id: int) -> None:
         with conn.cursor() as cur:
             cur.execute("UPDATE pending_signals SET status='dismissed', dismissed_at=NOW() WHERE id=%s", (int(id),))
         conn.commit()
+        _cache_clear("dashboard")
 
 
 def expire_old_pending_signals() -> None:
@@ -5135,6 +6056,7 @@ def expire_old_pending_signals() -> None:
         with conn.cursor() as cur:
             cur.execute("DELETE FROM pending_signals WHERE expires_at IS NOT NULL AND expires_at < NOW()")
         conn.commit()
+        _cache_clear("dashboard")
 
 
 def get_active_prediction_models() -> list:
@@ -5384,6 +6306,40 @@ def save_poly_alert_sent(data: dict) -> None:
         conn.commit()
 
 
+def save_poly_prices(token_id: str, market_id: str | None, points: list) -> None:
+    """Append (ts, price) points for a CLOB token; points already stored are skipped."""
+    if not points:
+        return
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            psycopg2.extras.execute_values(
+                cur,
+                "INSERT INTO poly_price_history (token_id, ts, price, market_id) VALUES %s ON CONFLICT (token_id, ts) DO NOTHING",
+                [(token_id, int(ts), float(price), market_id) for ts, price in points],
+            )
+        conn.commit()
+
+
+def get_poly_prices(token_id: str, since_ts: float) -> list:
+    """Stored (ts, price) points for a CLOB token from ``since_ts`` on, oldest first."""
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                "SELECT ts, price FROM poly_price_history WHERE token_id=%s AND ts >= %s ORDER BY ts",
+                (token_id, int(since_ts)),
+            )
+            return [(int(r["ts"]), float(r["price"])) for r in cur.fetchall()]
+
+
+def prune_poly_prices(before_ts: float) -> int:
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            cur.execute("DELETE FROM poly_price_history WHERE ts < %s", (int(before_ts),))
+            deleted = cur.rowcount
+        conn.commit()
+        return deleted
+
+
 def poly_alert_recently_sent(market_id: str, alert_type: str, hours: int = 4) -> bool:
     with get_conn() as conn:
         with conn.cursor() as cur:
@@ -5615,6 +6571,11 @@ def get_hl_trade_plans(status: str = None) -> list:
 
 
 def save_hl_fills(address: str, fills: list) -> None:
+    """Store new fills and fold them into ``hl_perf_daily`` in one transaction.
+
+    Fills already stored (same trade id) are skipped, so only genuinely new
+    rows reach the daily aggregates. The fills cursor moves with them.
+    """
     if not fills:
         return
     with get_conn() as conn:
@@ -5631,20 +6592,122 @@ def save_hl_fills(address: str, fills: list) -> None:
                         f.get("closed_pnl", 0),
                         f.get("fee", 0),
                         f.get("order_type", "Limit"),
-                        f.get("timestamp"), # Removed duplicate 'closed_pnl'
+                        f.get("closed_pnl", 0),
+                        f.get("timestamp"),
                         f.get("order_id"),
+                        f.get("tid"),
+                        f.get("time_ms"),
                     )
                 )
             psycopg2.extras.execute_values(
                 cur,
                 """
-                INSERT INTO hl_trade_history (address, coin, side, size, price, pnl, fee, order_type, closed_pnl, timestamp, hl_order_id)
-                VALUES %s
-                ON CONFLICT (hl_order_id) DO NOTHING
+                WITH new AS (
+                    INSERT INTO hl_trade_history (address, coin, side, size, price, pnl, fee, order_type, closed_pnl, timestamp, hl_order_id, tid, time_ms)
+                    VALUES %s
+                    ON CONFLICT (address, tid) DO NOTHING
+                    RETURNING address, coin, timestamp, fee, closed_pnl, closed_pnl - fee AS net
+                )
+                INSERT INTO hl_perf_daily AS d (address, day, coin, fills, closes, wins, losses, net_pnl, gross_profit, gross_loss, fees, best_pnl, worst_pnl)
+                SELECT address, DATE(timestamp), coin,
+                       COUNT(*),
+                       COUNT(*) FILTER (WHERE closed_pnl <> 0),
+                       COUNT(*) FILTER (WHERE closed_pnl <> 0 AND net > 0),
+                       COUNT(*) FILTER (WHERE closed_pnl <> 0 AND net < 0),
+                       COALESCE(SUM(net) FILTER (WHERE closed_pnl <> 0), 0),
+                       COALESCE(SUM(net) FILTER (WHERE closed_pnl <> 0 AND net > 0), 0),
+                       COALESCE(-SUM(net) FILTER (WHERE closed_pnl <> 0 AND net < 0), 0),
+                       SUM(fee),
+                       MAX(net) FILTER (WHERE closed_pnl <> 0),
+                       MIN(net) FILTER (WHERE closed_pnl <> 0)
+                FROM new
+                GROUP BY address, DATE(timestamp), coin
+                ON CONFLICT (address, day, coin) DO UPDATE SET
+                    fills = d.fills + EXCLUDED.fills,
+                    closes = d.closes + EXCLUDED.closes,
+                    wins = d.wins + EXCLUDED.wins,
+                    losses = d.losses + EXCLUDED.losses,
+                    net_pnl = d.net_pnl + EXCLUDED.net_pnl,
+                    gross_profit = d.gross_profit + EXCLUDED.gross_profit,
+                    gross_loss = d.gross_loss + EXCLUDED.gross_loss,
+                    fees = d.fees + EXCLUDED.fees,
+                    best_pnl = GREATEST(d.best_pnl, EXCLUDED.best_pnl),
+                    worst_pnl = LEAST(d.worst_pnl, EXCLUDED.worst_pnl)
                 """,
                 rows,
             )
+            cur.execute(
+                """
+                INSERT INTO hl_ingest_cursors (address, fills_ms) VALUES (%s, %s)
+                ON CONFLICT (address) DO UPDATE SET
+                    fills_ms = GREATEST(hl_ingest_cursors.fills_ms, EXCLUDED.fills_ms), updated_at = NOW()
+                """,
+                (address, max(int(f.get("time_ms") or 0) for f in fills)),
+            )
         conn.commit()
+        _cache_clear("dashboard")
+
+
+def save_hl_funding(address: str, entries: list) -> None:
+    """Store new funding payments and add them to ``hl_perf_daily``; moves the funding cursor."""
+    if not entries:
+        return
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            psycopg2.extras.execute_values(
+                cur,
+                """
+                WITH new AS (
+                    INSERT INTO hl_funding_history (address, coin, payment, rate, timestamp, time_ms)
+                    VALUES %s
+                    ON CONFLICT (address, coin, time_ms) DO NOTHING
+                    RETURNING address, coin, timestamp, payment
+                )
+                INSERT INTO hl_perf_daily AS d (address, day, coin, funding)
+                SELECT address, DATE(timestamp), coin, SUM(payment)
+                FROM new
+                GROUP BY address, DATE(timestamp), coin
+                ON CONFLICT (address, day, coin) DO UPDATE SET funding = d.funding + EXCLUDED.funding
+                """,
+                [(address, e.get("coin"), e.get("payment", 0), e.get("rate", 0), e.get("timestamp"), e.get("time")) for e in entries],
+            )
+            cur.execute(
+                """
+                INSERT INTO hl_ingest_cursors (address, funding_ms) VALUES (%s, %s)
+                ON CONFLICT (address) DO UPDATE SET
+                    funding_ms = GREATEST(hl_ingest_cursors.funding_ms, EXCLUDED.funding_ms), updated_at = NOW()
+                """,
+                (address, max(int(e.get("time") or 0) for e in entries)),
+            )
+        conn.commit()
+
+
+def get_hl_ingest_cursor(address: str) -> dict:
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT fills_ms, funding_ms FROM hl_ingest_cursors WHERE address=%s", (address,))
+            row = cur.fetchone()
+            return dict(row) if row else {"fills_ms": 0, "funding_ms": 0}
+
+
+def get_hl_performance(address: str) -> list:
+    """Per-coin totals from ``hl_perf_daily`` plus a grand-total row (``coin`` None)."""
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT coin,
+                       SUM(fills) AS fills, SUM(closes) AS closes, SUM(wins) AS wins, SUM(losses) AS losses,
+                       SUM(net_pnl) AS net_pnl, SUM(gross_profit) AS gross_profit, SUM(gross_loss) AS gross_loss,
+                       SUM(fees) AS fees, SUM(funding) AS funding,
+                       MAX(best_pnl) AS best_pnl, MIN(worst_pnl) AS worst_pnl
+                FROM hl_perf_daily
+                WHERE address=%s
+                GROUP BY ROLLUP (coin)
+                """,
+                (address,),
+            )
+            return [dict(r) for r in cur.fetchall()]
 
 # ── Security tables/helpers ─────────────────────────
 
@@ -5679,6 +6742,7 @@ def delete_encrypted_key(key_name: str) -> None:
         with conn.cursor() as cur:
             cur.execute("DELETE FROM encrypted_keys WHERE key_name=%s", (key_name,))
         conn.commit()
+        _cache_clear("dashboard")
 
 
 def list_encrypted_keys() -> list:
@@ -5753,6 +6817,7 @@ def set_trading_halted(halted: bool, reason: str = "") -> None:
                     (bool(halted), reason or ("manual stop" if halted else "manual resume")),
                 )
             conn.commit()
+            _cache_clear("dashboard")
     except Exception:
         return
 
@@ -5814,6 +6879,7 @@ def save_sol_position(data: dict) -> int:
             )
             row = cur.fetchone() or {}
         conn.commit()
+        _cache_clear("dashboard")
         return int(row.get("id") or 0)
 
 
@@ -5835,6 +6901,7 @@ def update_sol_position_after_sell(token_address: str, sell_pct: float, usdc_rec
         with conn.cursor() as cur:
             cur.execute("UPDATE sol_positions SET tokens_held=%s, current_price=%s, status=%s, closed_at=CASE WHEN %s='closed' THEN NOW() ELSE closed_at END WHERE id=%s", (remaining, price, status, status, pos["id"]))
         conn.commit()
+        _cache_clear("dashboard")
 
 
 def get_all_open_sol_positions() -> list:
@@ -5919,6 +6986,7 @@ def save_poly_live_trade(data: dict) -> int:
             )
             row = cur.fetchone() or {}
         conn.commit()
+        _cache_clear("dashboard")
         return int(row.get("id") or 0)
 
 
@@ -5947,6 +7015,7 @@ def update_poly_live_trade(id: int, fields: dict) -> None:
         with conn.cursor() as cur:
             cur.execute(f"UPDATE poly_live_trades SET {sets} WHERE id=%s", (*values, id))
         conn.commit()
+        _cache_clear("dashboard")
 
 
 def save_trade_to_history(section: str, plan: dict, result: dict) -> None:
@@ -5979,6 +7048,7 @@ def save_poly_wallet_address(address: str) -> None:
                 (address,),
             )
         conn.commit()
+        _cache_clear("dashboard")
 
 
 def count_open_poly_positions() -> int:
@@ -6040,6 +7110,7 @@ def save_encrypted_key(data: dict) -> bool:
                     (data["key_name"], data["encrypted"], data.get("label", "")),
                 )
             conn.commit()
+            _cache_clear("dashboard")
         return True
     except Exception as e:
         import logging
@@ -6167,6 +7238,7 @@ def reset_demo_balance(section: str, amount: float = 10000.0) -> None:
             conn.commit()
     except Exception:
         pass
+    _cache_clear("open_demo_trades")
     set_demo_balance(section, amount)
 
 
@@ -6197,19 +7269,23 @@ def open_demo_trade(data: dict) -> int:
                 )
                 row = cur.fetchone() or {}
             conn.commit()
-            return int(row.get("id") or 0)
+        _cache_clear("open_demo_trades")
+        return int(row.get("id") or 0)
     except Exception:
         return 0
 
 
 def get_risk_settings(section: str = "perps") -> dict:
     defaults = {"max_risk_pct": 1, "daily_loss_limit": 200, "max_positions": 5, "max_leverage": 10}
+    cached = _settings_get("risk", section)
+    if cached is not None:
+        return cached
     try:
         with get_conn() as conn:
             with conn.cursor() as cur:
                 cur.execute("SELECT * FROM risk_settings WHERE section=%s LIMIT 1", (section,))
                 row = cur.fetchone()
-                return dict(row) if row else defaults
+                return _settings_set("risk", section, dict(row) if row else defaults)
     except Exception:
         return defaults
 
@@ -6241,7 +7317,9 @@ def save_risk_settings(section: str, data: dict) -> bool:
                         int(payload.get("max_daily_trades") or 10),
                     ),
                 )
+                _notify_settings(cur, "risk", section)
             conn.commit()
+        invalidate_settings("risk", section)
         return True
     except Exception:
         return False
@@ -6296,8 +7374,11 @@ def get_user_settings(chat_id: int | None = None) -> dict:
         "display_theme": "dark",
         "briefing_hour": 7,
     }
+    cid = int(chat_id) if chat_id is not None else 0
+    cached = _settings_get("user_settings", cid)
+    if cached is not None:
+        return cached
     try:
-        cid = int(chat_id) if chat_id is not None else 0
         with get_conn() as conn:
             with conn.cursor() as cur:
                 cur.execute("SELECT * FROM user_settings WHERE chat_id=%s", (cid,))
@@ -6305,8 +7386,8 @@ def get_user_settings(chat_id: int | None = None) -> dict:
                 if not row and cid != 0:
                     cur.execute("INSERT INTO user_settings (chat_id) VALUES (%s) ON CONFLICT DO NOTHING", (cid,))
                     conn.commit()
-                    return defaults
-                return {**defaults, **dict(row or {})}
+                    return _settings_set("user_settings", cid, defaults)
+                return _settings_set("user_settings", cid, {**defaults, **dict(row or {})})
     except Exception:
         return defaults
 
@@ -6318,7 +7399,9 @@ def update_user_setting(key: str, value, chat_id: int | None = None) -> bool:
             with conn.cursor() as cur:
                 cur.execute("INSERT INTO user_settings (chat_id) VALUES (%s) ON CONFLICT DO NOTHING", (cid,))
                 cur.execute(f"UPDATE user_settings SET {key}=%s WHERE chat_id=%s", (value, cid))
+                _notify_settings(cur, "user_settings", cid)
             conn.commit()
+        invalidate_settings("user_settings", cid)
         return True
     except Exception:
         return False
@@ -6465,3 +7548,71 @@ def get_sol_pnl_today() -> float:
     except Exception:
         return 0.0
 
+
+
+def get_dashboard_snapshot() -> dict:
+    """
+    Home-screen aggregates in a single round trip.
+    Cached for a few seconds and cleared by the writers that change it.
+    If the query fails the snapshot is returned uncached with
+    unavailable=True and the halt flag read on its own.
+    """
+    cached = _cache_get("dashboard")
+    if cached is not None:
+        return cached
+    snapshot = {
+        "hl_pnl_today": 0.0,
+        "sol_pnl_today": 0.0,
+        "poly_open": 0,
+        "pending_total": 0,
+        "pending_perps": 0,
+        "pending_degen": 0,
+        "pending_predictions": 0,
+        "hl_key": False,
+        "sol_key": False,
+        "poly_key": False,
+        "halted": False,
+        "unavailable": False,
+    }
+    try:
+        with get_conn() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    WITH pending AS (
+                        SELECT section FROM pending_signals
+                        WHERE status='pending'
+                          AND (expires_at IS NULL OR expires_at > NOW())
+                          AND dismissed_at IS NULL
+                    ), keys AS (
+                        SELECT key_name FROM encrypted_keys
+                        WHERE key_name IN ('hl_api_wallet', 'sol_hot_wallet', 'poly_hot_wallet')
+                    )
+                    SELECT
+                        (SELECT COALESCE(SUM(closed_pnl),0) FROM hl_trade_history WHERE DATE(timestamp)=CURRENT_DATE) AS hl_pnl_today,
+                        (SELECT COALESCE(SUM(realised_pnl),0) FROM sol_positions WHERE DATE(closed_at)=CURRENT_DATE) AS sol_pnl_today,
+                        (SELECT COUNT(*) FROM poly_live_trades WHERE status='open') AS poly_open,
+                        (SELECT COUNT(*) FROM pending) AS pending_total,
+                        (SELECT COUNT(*) FROM pending WHERE section='perps') AS pending_perps,
+                        (SELECT COUNT(*) FROM pending WHERE section='degen') AS pending_degen,
+                        (SELECT COUNT(*) FROM pending WHERE section='predictions') AS pending_predictions,
+                        EXISTS (SELECT 1 FROM keys WHERE key_name='hl_api_wallet') AS hl_key,
+                        EXISTS (SELECT 1 FROM keys WHERE key_name='sol_hot_wallet') AS sol_key,
+                        EXISTS (SELECT 1 FROM keys WHERE key_name='poly_hot_wallet') AS poly_key,
+                        COALESCE((SELECT halted FROM emergency_stop ORDER BY id DESC LIMIT 1), FALSE) AS halted
+                    """
+                )
+                row = dict(cur.fetchone() or {})
+    except Exception as e:
+        log.warning("Dashboard snapshot failed: %s", e)
+        snapshot["halted"] = is_trading_halted()
+        snapshot["unavailable"] = True
+        return snapshot
+    for key in ("hl_pnl_today", "sol_pnl_today"):
+        snapshot[key] = float(row.get(key) or 0)
+    for key in ("poly_open", "pending_total", "pending_perps", "pending_degen", "pending_predictions"):
+        snapshot[key] = int(row.get(key) or 0)
+    for key in ("hl_key", "sol_key", "poly_key", "halted"):
+        snapshot[key] = bool(row.get(key))
+    _cache_set("dashboard", snapshot)
+    return snapshot
@@ -0,0 +1,199 @@
+"""Delayed rescoring of freshly scanned degen tokens.
+
+Tokens are queued ``RESCORE_DELAY`` seconds after their first score. The
+queue is a min-heap of (due_at, address) drained by one scheduled job. Each
+tick pops everything due, fetches DexScreener data for the batch in one
+pass, and rescores the batch with bounded concurrency. A failed batch is
+retried with exponential backoff, and a token that fails
+``RESCORE_MAX_ATTEMPTS`` times is dropped and logged. A token is rescored
+once: ``RESCORED`` remembers what has come due, so the degen scan
+re-queueing its recent tokens every pass doesn't re-arm them. Queue changes are
+written behind to the ``rescore_queue`` table, and ``load_rescore_queue()``
+restores pending rescoring after a restart.
+"""
+
+import asyncio
+import heapq
+import logging
+import time
+
+from utils.cache import BoundedCache
+
+log = logging.getLogger(__name__)
+
+RESCORE_DELAY = 900
+RESCORE_TICK_SECONDS = 30
+RESCORE_CONCURRENCY = 6
+# Cap per tick so a backlog after downtime drains over a few ticks.
+RESCORE_BATCH = 200
+# A token in a failed batch is retried after 30s, 60s, 120s, ... and dropped after this many failures.
+RESCORE_MAX_ATTEMPTS = 5
+
+_heap: list = []  # (due_at, address); stale entries skipped on pop
+_pending: dict = {}  # address -> (due_at, chain)
+_dirty: dict = {}  # address -> (chain, due_at) to upsert, or None to delete
+_attempts: dict = {}  # address -> failed batches so far
+# Addresses whose rescore has come due; outlives the scan's recent-token window.
+RESCORED = BoundedCache("rescored", maxsize=20000, ttl=2 * 86400)
+
+
+def schedule_rescore(address: str, chain: str, delay: float = RESCORE_DELAY, now: float | None = None) -> bool:
+    """Queue ``address`` for rescoring; False if it is already queued or was rescored."""
+    if not address or address in _pending or address in RESCORED:
+        return False
+    _push(address, chain, (time.time() if now is None else now) + delay)
+    return True
+
+
+def _push(address: str, chain: str, due: float) -> None:
+    _pending[address] = (due, chain)
+    heapq.heappush(_heap, (due, address))
+    _dirty[address] = (chain, due)
+
+
+def cancel_rescore(address: str) -> bool:
+    _attempts.pop(address, None)
+    if _pending.pop(address, None) is None:
+        return False
+    _dirty[address] = None
+    return True
+
+
+def pop_due(now: float | None = None, limit: int = RESCORE_BATCH) -> list:
+    """Remove and return up to ``limit`` (address, chain) entries that are due."""
+    now = time.time() if now is None else now
+    due = []
+    while _heap and _heap[0][0] <= now and len(due) < limit:
+        at, address = heapq.heappop(_heap)
+        entry = _pending.get(address)
+        if entry is None or entry[0] != at:
+            continue  # cancelled or rescheduled
+        del _pending[address]
+        _dirty[address] = None
+        RESCORED.add(address)
+        due.append((address, entry[1]))
+    if len(_heap) > 2 * len(_pending) + 64:
+        # Mostly cancelled entries: rebuild rather than let them pile up.
+        _heap[:] = [(at, a) for a, (at, _) in _pending.items()]
+        heapq.heapify(_heap)
+    return due
+
+
+def retry_rescores(entries: list, now: float | None = None) -> list:
+    """Requeue (address, chain) entries of a failed batch with backoff; returns those dropped."""
+    dropped = []
+    now = time.time() if now is None else now
+    for address, chain in entries:
+        attempts = _attempts[address] = _attempts.get(address, 0) + 1
+        if attempts >= RESCORE_MAX_ATTEMPTS:
+            del _attempts[address]
+            dropped.append(address)
+            continue
+        _push(address, chain, now + RESCORE_TICK_SECONDS * 2 ** (attempts - 1))
+    return dropped
+
+
+def queue_size() -> int:
+    return len(_pending)
+
+
+def flush_rescore_queue() -> int:
+    """Write queued changes to Postgres; returns rows touched."""
+    import db
+
+    if not _dirty:
+        return 0
+    pending = dict(_dirty)
+    _dirty.clear()
+    upserts = [(a, v[0], v[1]) for a, v in pending.items() if v is not None]
+    deletes = [a for a, v in pending.items() if v is None]
+    try:
+        db.save_rescore_queue(upserts, deletes)
+    except Exception:
+        for address, value in pending.items():
+            _dirty.setdefault(address, value)
+        raise
+    return len(pending)
+
+
+def load_rescore_queue() -> int:
+    """Rebuild the heap from Postgres; returns entries restored."""
+    import db
+
+    _heap.clear()
+    _pending.clear()
+    for row in db.get_rescore_queue():
+        due = float(row["due_at"])
+        _pending[row["address"]] = (due, row.get("chain") or "SOL")
+        _heap.append((due, row["address"]))
+    heapq.heapify(_heap)
+    return len(_pending)
+
+
+async def rescore_batch(entries: list) -> int:
+    """Refetch and rescore (address, chain) entries; returns tokens updated."""
+    import db
+    from degen.risk_engine import score_tokens, score_trajectory
+    from engine.degen.dexscreener import prefetch
+
+    tokens = db.get_degen_tokens_by_address([a for a, _ in entries])
+    live = [t for t in tokens.values() if not t.get("rugged")]
+    if not live:
+        return 0
+    await prefetch(t["address"] for t in live)
+    sem = asyncio.Semaphore(RESCORE_CONCURRENCY)
+
+    async def _fresh(tok: dict) -> dict:
+        async with sem:
+            return await fetch_market_data(tok)
+
+    fresh = await asyncio.gather(*(_fresh(t) for t in live))
+    payloads = []
+    for tok, data, scored in zip(live, fresh, await score_tokens(fresh)):
+        risk2 = scored["risk"]
+        traj = score_trajectory({"risk_score": tok.get("initial_risk_score") or tok.get("risk_score")}, risk2)
+        # token_data is already merged into the row; keep it from nesting into itself.
+        snapshot = {k: v for k, v in data.items() if k != "token_data"}
+        payloads.append({**snapshot, **risk2, "trajectory": traj["trajectory"], "address": tok["address"], "chain": tok.get("chain")})
+    db.update_degen_token_rescores(payloads)
+    return len(payloads)
+
+
+async def fetch_market_data(token: dict) -> dict:
+    """``token`` refreshed with DexScreener liquidity, mcap, price and pair."""
+    from engine.degen.dexscreener import get_token_pairs
+
+    out = dict(token)
+    try:
+        pair = (await get_token_pairs(token.get("address")) or [{}])[0]
+        out.update({
+            "liquidity_usd": float((pair.get("liquidity") or {}).get("usd") or out.get("liquidity_usd") or 0),
+            "mcap": float(pair.get("fdv") or pair.get("marketCap") or out.get("mcap") or 0),
+            "price_usd": float(pair.get("priceUsd") or out.get("price_usd") or 0),
+            "pairAddress": pair.get("pairAddress"),
+            "url": pair.get("url", out.get("url")),
+        })
+    except Exception:
+        pass
+    return out
+
+
+async def rescore_due_job(context) -> None:
+    """Scheduled job: rescore every queued token that has come due."""
+    from engine.job_metrics import record_items
+
+    due = pop_due()
+    try:
+        if due:
+            record_items(await rescore_batch(due))
+            for address, _ in due:
+                _attempts.pop(address, None)
+    except Exception as e:
+        log.error("Rescore batch of %s failed: %s", len(due), e)
+        dropped = retry_rescores(due)
+        if dropped:
+            log.warning("Dropping %s rescores after %s failed attempts: %s", len(dropped), RESCORE_MAX_ATTEMPTS, ", ".join(dropped[:10]))
+    try:
+        flush_rescore_queue()
+    except Exception as e:
+        log.error("Rescore queue flush failed: %s", e)
@@ -1,14 +1,33 @@
+"""Degen token risk scoring.
+
+Scoring is split in two stages. ``prefetch_risk_inputs()`` is the only I/O.
+It gathers LP providers (DexScreener) and top-holder wallet creation times
+(Solscan) for a batch of tokens concurrently over one pooled client. It
+returns copies of the tokens with those inputs attached. ``score_token_risk()``
+and everything below it are pure CPU over that data, so they can run inline,
+in a thread or in a process pool (``scoring_executor()``).
+"""
+
 from __future__ import annotations
 
-import math
+import asyncio
+import logging
 import statistics
-import time
-from datetime import datetime, timezone
-from typing import Any
 
-import requests
+import httpx
+
+from config import DEXSCREENER_BASE, RISK_SCORING_WORKERS
+from utils.cache import BoundedCache
+
+log = logging.getLogger(__name__)
 
-_SOLSCAN_CREATION_CACHE: dict[str, float] = {}
+SOLSCAN_URL = "https://public-api.solscan.io"
+SOLSCAN_CONCURRENCY = 4
+HOLDERS_CHECKED = 15
+
+# Wallet creation time never changes; LFU keeps the wallets that recur across
+# tokens (deployers, snipers) while one-off holders age out.
+_SOLSCAN_CREATION_CACHE = BoundedCache("solscan_creation", maxsize=20000, ttl=7 * 86400, policy="lfu")
 
 
 def get_token_profile(token_data: dict) -> str:
@@ -60,14 +79,6 @@ def _safe_mean(values: list[float]) -> float:
 
 def check_liquidity_depth(token_data: dict) -> dict:
     providers = token_data.get("lp_providers") or []
-    if not providers and token_data.get("pairAddress") and token_data.get("chain"):
-        try:
-            url = f"https://api.dexscreener.com/latest/dex/pairs/{token_data['chain']}/{token_data['pairAddress']}"
-            payload = requests.get(url, timeout=8).json()
-            pair = (payload.get("pair") or {}) if isinstance(payload, dict) else {}
-            providers = pair.get("liquidityProviders") or []
-        except Exception:
-            providers = []
     if providers:
         vals = [float(p.get("usd") or p.get("value") or 0) for p in providers]
         total = sum(vals) or 1
@@ -155,25 +166,13 @@ def check_volume_authenticity(token_data: dict, recent_txs: list) -> dict:
     return {"authenticity_score": score, "authenticity_label": label, "risk_added": risk, "flags": flags, "round_number_pct": round(round_pct, 2), "wallet_clustering": wallet_clustering, "timing_uniform": timing_uniform}
 
 
-def _solscan_first_tx_ts(wallet: str) -> float:
-    if wallet in _SOLSCAN_CREATION_CACHE:
-        return _SOLSCAN_CREATION_CACHE[wallet]
-    time.sleep(0.2)
-    try:
-        url = f"https://public-api.solscan.io/account/transactions?account={wallet}&limit=1&offset=0"
-        rows = requests.get(url, timeout=8).json()
-        ts = float(rows[-1].get("blockTime") if rows else 0)
-    except Exception:
-        ts = 0.0
-    _SOLSCAN_CREATION_CACHE[wallet] = ts
-    return ts
-
-
-def check_holder_clustering(top_holders: list, chain: str) -> dict:
-    holders = [h for h in top_holders[:15] if h]
+def check_holder_clustering(top_holders: list, chain: str, created: dict | None = None) -> dict:
+    """Creation-date clustering of the top holders; ``created`` maps wallet -> first tx time."""
+    holders = [h for h in top_holders[:HOLDERS_CHECKED] if h]
     if chain.upper() != "SOL" or not holders:
         return {"cluster_pct": 0.0, "largest_cluster_size": 0, "total_checked": 0, "risk_added": 0, "label": "N/A", "coordinated_launch": False}
-    dates = [int(_solscan_first_tx_ts(w)) for w in holders if _solscan_first_tx_ts(w) > 0]
+    created = created or {}
+    dates = [int(ts) for ts in (created.get(w) or _SOLSCAN_CREATION_CACHE.get(w) or 0 for w in holders) if ts > 0]
     dates.sort()
     largest = 0
     for i, ts in enumerate(dates):
@@ -325,6 +324,13 @@ def score_token_risk(token: dict, token_profile: str | None = None) -> dict:
     if insider.get("insider_risk"):
         flags.append(insider.get("label"))
 
+    clustering = None
+    if token.get("holder_created"):
+        clustering = check_holder_clustering(token.get("top_holders") or [], str(token.get("chain") or ""), token["holder_created"])
+        score += int(clustering["risk_added"])
+        if clustering["risk_added"] > 0:
+            flags.append(clustering["label"])
+
     score = max(1, min(100, int(score)))
     level = "LOW" if score < 35 else "MEDIUM" if score < 70 else "HIGH"
     return {
@@ -336,4 +342,88 @@ def score_token_risk(token: dict, token_profile: str | None = None) -> dict:
         "description": desc,
         "volume_pattern": volume,
         "insider": insider,
+        "holder_clustering": clustering,
+    }
+
+
+def score_prefetched(token: dict) -> dict:
+    """Risk and moonshot scores for a token from ``prefetch_risk_inputs``."""
+    from degen.moon_engine import score_moonshot_potential
+
+    risk = score_token_risk(token)
+    return {"risk": risk, "moon": score_moonshot_potential(token, risk.get("profile"))}
+
+
+async def _lp_providers(client: httpx.AsyncClient, token: dict) -> list | None:
+    try:
+        r = await client.get(f"{DEXSCREENER_BASE}/dex/pairs/{token['chain']}/{token['pairAddress']}")
+        payload = r.json()
+        pair = (payload.get("pair") or {}) if isinstance(payload, dict) else {}
+        return pair.get("liquidityProviders") or []
+    except Exception as e:
+        log.debug("LP providers for %s failed: %s", token.get("address"), e)
+        return None
+
+
+async def _first_tx_ts(client: httpx.AsyncClient, sem: asyncio.Semaphore, wallet: str) -> None:
+    async with sem:
+        try:
+            r = await client.get(f"{SOLSCAN_URL}/account/transactions", params={"account": wallet, "limit": 1, "offset": 0})
+            rows = r.json()
+            ts = float(rows[-1].get("blockTime") if rows else 0)
+        except Exception:
+            ts = 0.0
+    _SOLSCAN_CREATION_CACHE[wallet] = ts
+
+
+async def prefetch_risk_inputs(tokens: list) -> list:
+    """Copies of ``tokens`` with LP providers and holder creation times attached."""
+    out = [dict(t) for t in tokens]
+    need_lp = [t for t in out if not t.get("lp_providers") and t.get("pairAddress") and t.get("chain")]
+    wallets = {
+        w
+        for t in out
+        if str(t.get("chain") or "").upper() == "SOL"
+        for w in (t.get("top_holders") or [])[:HOLDERS_CHECKED]
+        if w and _SOLSCAN_CREATION_CACHE.get(w) is None
     }
+    if need_lp or wallets:
+        sem = asyncio.Semaphore(SOLSCAN_CONCURRENCY)
+        limits = httpx.Limits(max_connections=SOLSCAN_CONCURRENCY + 8)
+        async with httpx.AsyncClient(timeout=8, limits=limits) as client:
+            providers = await asyncio.gather(
+                *(_lp_providers(client, t) for t in need_lp),
+                *(_first_tx_ts(client, sem, w) for w in wallets),
+            )
+        for t, lp in zip(need_lp, providers):
+            if lp is not None:
+                t["lp_providers"] = lp
+    for t in out:
+        holders = [w for w in (t.get("top_holders") or [])[:HOLDERS_CHECKED] if w]
+        if holders and str(t.get("chain") or "").upper() == "SOL":
+            t["holder_created"] = {w: _SOLSCAN_CREATION_CACHE.get(w) or 0.0 for w in holders}
+    return out
+
+
+_scoring_pool = {"executor": None}
+
+
+def scoring_executor():
+    """Process pool for ``score_prefetched`` when RISK_SCORING_WORKERS > 0, else None (score inline)."""
+    if RISK_SCORING_WORKERS <= 0:
+        return None
+    if _scoring_pool["executor"] is None:
+        from concurrent.futures import ProcessPoolExecutor
+
+        _scoring_pool["executor"] = ProcessPoolExecutor(max_workers=RISK_SCORING_WORKERS)
+    return _scoring_pool["executor"]
+
+
+async def score_tokens(tokens: list) -> list:
+    """Prefetch inputs for ``tokens`` and score them; returns [{"risk", "moon"}, ...]."""
+    prepared = await prefetch_risk_inputs(tokens)
+    pool = scoring_executor()
+    if pool is None:
+        return [score_prefetched(t) for t in prepared]
+    loop = asyncio.get_running_loop()
+    return list(await asyncio.gather(*(loop.run_in_executor(pool, score_prefetched, t) for t in prepared)))
@@ -2,17 +2,15 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from concurrent.futures import ThreadPoolExecutor
-
-import httpx
 
 import db
 from degen.model_engine import evaluate_token_against_model
-from degen.moon_engine import score_moonshot_potential
 from degen.narrative_tracker import update_narrative_trends
 from degen.postmortem import create_postmortem
-from degen.risk_engine import score_token_risk, score_trajectory
+from degen.rescoring import cancel_rescore, fetch_market_data, schedule_rescore
+from degen.risk_engine import score_tokens
 from engine.degen.contract_scanner import calculate_degen_position, scan_contract
+from engine.degen.dexscreener import prefetch
 from engine.degen.early_entry import calculate_early_score
 from engine.degen.narrative_detector import detect_token_narrative
 from engine.degen.social_velocity import format_social_velocity, get_token_mention_velocity
@@ -21,8 +19,6 @@ from handlers.degen_journal_handler import auto_create_degen_journal
 log = logging.getLogger(__name__)
 
 SOLSCAN_RATE_LIMIT_DELAY = 0.2
-_RESCORING_JOBS: dict[str, object] = {}
-_executor = ThreadPoolExecutor(max_workers=2)
 
 
 async def send_model_alert(bot, chat_id: int, model: dict, token_data: dict, result: dict, intel: dict | None = None):
@@ -51,41 +47,7 @@ async def send_model_alert(bot, chat_id: int, model: dict, token_data: dict, res
 
 
 async def score_token_async(token_data: dict) -> dict:
-    loop = asyncio.get_event_loop()
-    risk = await loop.run_in_executor(_executor, score_token_risk, token_data)
-    moon = await loop.run_in_executor(_executor, score_moonshot_potential, token_data, risk.get("profile"))
-    return {"risk": risk, "moon": moon}
-
-
-async def _fetch_external_data(token: dict) -> dict:
-    out = dict(token)
-    try:
-        async with httpx.AsyncClient(timeout=8) as client:
-            payload = (await client.get(f"https://api.dexscreener.com/latest/dex/tokens/{token.get('address')}" )).json()
-        pair = (payload.get("pairs") or [{}])[0]
-        out.update({
-            "liquidity_usd": float((pair.get("liquidity") or {}).get("usd") or out.get("liquidity_usd") or 0),
-            "mcap": float(pair.get("fdv") or pair.get("marketCap") or out.get("mcap") or 0),
-            "price_usd": float(pair.get("priceUsd") or out.get("price_usd") or 0),
-            "pairAddress": pair.get("pairAddress"),
-            "url": pair.get("url", out.get("url")),
-        })
-    except Exception:
-        pass
-    return out
-
-
-async def rescore_token_job(context):
-    data = context.job.data
-    address, chain = data["token_address"], data["chain"]
-    tok = db.get_degen_token_by_address(address)
-    if not tok or tok.get("rugged"):
-        return
-    fresh = await _fetch_external_data(tok)
-    risk2 = (await score_token_async(fresh))["risk"]
-    traj = score_trajectory({"risk_score": tok.get("initial_risk_score") or tok.get("risk_score")}, risk2)
-    payload = {**fresh, **risk2, "trajectory": traj["trajectory"]}
-    db.update_degen_token_rescore(address, chain, payload)
+    return (await score_tokens([token_data]))[0]
 
 
 async def holder_accumulation_check(context):
@@ -120,9 +82,7 @@ async def degen_exit_monitor(context):
         if drop > 0.7 and float(t.get("age_hours") or 0) <= 6 and not t.get("rugged"):
             db.mark_degen_token_rugged(t["id"])
             create_postmortem(t["id"])
-            job = _RESCORING_JOBS.pop(t.get("address"), None)
-            if job:
-                job.schedule_removal()
+            cancel_rescore(t.get("address"))
 
 
 async def degen_scan_job(context):
@@ -131,12 +91,16 @@ async def degen_scan_job(context):
     tokens = db.get_recent_degen_tokens(limit=100)
     models = db.get_active_degen_models()
     sem = asyncio.Semaphore(6)
+    await prefetch(t.get("address") for t in tokens)
 
-    async def _process_token(token: dict):
+    async def _fresh(token: dict) -> dict:
         async with sem:
-            token_data = await _fetch_external_data(dict(token))
+            token_data = await fetch_market_data(token)
             await asyncio.sleep(SOLSCAN_RATE_LIMIT_DELAY)
-            scored = await score_token_async(token_data)
+            return token_data
+
+    async def _process_token(token_data: dict, scored: dict):
+        async with sem:
             risk = scored["risk"]
             moon = scored["moon"]
             token_data.update(risk)
@@ -151,14 +115,7 @@ async def degen_scan_job(context):
             token_id = db.upsert_degen_token_snapshot(token_data)
             update_narrative_trends(token_data, moon.get("moon_score", 0), risk.get("risk_score", 0))
 
-            addr = token_data.get("address")
-            if addr and addr not in _RESCORING_JOBS:
-                _RESCORING_JOBS[addr] = context.application.job_queue.run_once(
-                    rescore_token_job,
-                    when=900,
-                    data={"token_address": addr, "chain": token_data.get("chain", "SOL")},
-                    name=f"rescore:{addr}",
-                )
+            schedule_rescore(token_data.get("address"), token_data.get("chain", "SOL"))
 
             for model in models:
                 try:
@@ -211,6 +168,9 @@ async def degen_scan_job(context):
                     log.exception("degen scan failed for model=%s token=%s err=%s", model.get("id"), token_data.get("symbol"), exc)
 
     if tokens:
-        await asyncio.gather(*[_process_token(token) for token in tokens])
+        # Score the whole batch at once so risk inputs share one prefetch pass, as rescore_batch does.
+        fresh = await asyncio.gather(*(_fresh(token) for token in tokens))
+        scored = await score_tokens(fresh)
+        await asyncio.gather(*[_process_token(data, result) for data, result in zip(fresh, scored)])
     await holder_accumulation_check(context)
     await degen_exit_monitor(context)
@@ -12,6 +12,8 @@ import db
 import moon_engine
 import risk_engine
 from config import CHAT_ID, HELIUS_API_KEY, ETHERSCAN_KEY, BSCSCAN_KEY, WAT
+from engine.degen.dexscreener import get_token_pairs
+from engine.job_metrics import instrumented
 
 log = logging.getLogger(__name__)
 
@@ -19,7 +21,6 @@ SOLSCAN_TX_URL = "https://api.solscan.io/account/transactions?account={address}&
 SOLSCAN_TOKEN_URL = "https://api.solscan.io/account/tokens?account={address}"
 SOLSCAN_ACCOUNT_URL = "https://api.solscan.io/account?account={address}"
 HELIUS_TX_URL = "https://api.helius.xyz/v0/addresses/{address}/transactions?api-key={api_key}&limit={limit}"
-DEXSCREENER_URL = "https://api.dexscreener.com/latest/dex/tokens/{token}"
 ETHERSCAN_TX_URL = "https://api.etherscan.io/api?module=account&action=tokentx&address={address}&sort=desc&apikey={api_key}"
 BSCSCAN_TX_URL = "https://api.bscscan.com/api?module=account&action=tokentx&address={address}&sort=desc&apikey={api_key}"
 
@@ -211,8 +212,11 @@ async def score_whale_reputation(wallet_address: str, chain: str) -> dict:
 
 
 async def get_token_market_data(token_address: str) -> dict:
-    payload = await _safe_get(DEXSCREENER_URL.format(token=token_address))
-    pairs = payload.get("pairs") or []
+    try:
+        pairs = await get_token_pairs(token_address)
+    except Exception as exc:
+        log.warning("wallet api failed token=%s err=%s", token_address, exc)
+        return {}
     if not pairs:
         return {}
     p = pairs[0]
@@ -279,6 +283,7 @@ async def _send_sell_alert(bot, wallet: dict, tx: dict):
     await bot.send_message(chat_id=CHAT_ID, text=msg, reply_markup=kb)
 
 
+@instrumented("wallet_monitor")
 async def wallet_monitor_job(context):
     wallets = db.get_tracked_wallets(active_only=True)
     if not wallets:
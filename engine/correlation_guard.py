@@ -1,9 +1,180 @@
+import logging
+import math
+from collections import deque
+
+import numpy as np
+
+from config import CORRELATION_HIGH, CORRELATION_THRESHOLD, CORRELATION_TIMEFRAME, CORRELATION_WINDOWS
+
+log = logging.getLogger(__name__)
+
+# Static fallback used until the rolling matrix has enough bars for a pair.
 CORRELATION_GROUPS = {
     "crypto_majors": ["BTCUSDT", "ETHUSDT", "BNBUSDT", "SOLUSDT", "AVAXUSDT", "ADAUSDT"],
     "btc_correlated": ["BTCUSDT", "ETHUSDT"],
     "gold": ["XAUUSD", "XAGUSD"],
 }
 
+MIN_BARS = 12
+
+
+class RollingCorrelation:
+    """Correlation of log returns over the last ``window`` bars.
+
+    Keeps running sums of returns and of their outer products so each new bar
+    costs one add and one evict, independent of the window length. Sums are
+    rebuilt from the buffer once per window to shed float drift.
+    """
+
+    def __init__(self, symbols: list, window: int):
+        self.symbols = list(symbols)
+        self.index = {s: i for i, s in enumerate(self.symbols)}
+        self.window = int(window)
+        n = len(self.symbols)
+        self._buf = deque()
+        self._sum = np.zeros(n)
+        self._cross = np.zeros((n, n))
+        self._since_rebuild = 0
+        self._matrix = None
+
+    def push(self, returns) -> None:
+        r = np.asarray(returns, dtype=float)
+        self._buf.append(r)
+        self._sum += r
+        self._cross += np.outer(r, r)
+        if len(self._buf) > self.window:
+            old = self._buf.popleft()
+            self._sum -= old
+            self._cross -= np.outer(old, old)
+        self._since_rebuild += 1
+        if self._since_rebuild >= self.window:
+            stacked = np.array(self._buf)
+            self._sum = stacked.sum(axis=0)
+            self._cross = stacked.T @ stacked
+            self._since_rebuild = 0
+        self._matrix = None
+
+    @property
+    def bars(self) -> int:
+        return len(self._buf)
+
+    def matrix(self):
+        if self._matrix is not None or self.bars < MIN_BARS:
+            return self._matrix
+        k = self.bars
+        mean = self._sum / k
+        cov = self._cross / k - np.outer(mean, mean)
+        sd = np.sqrt(np.clip(np.diag(cov), 0, None))
+        denom = np.outer(sd, sd)
+        self._matrix = np.divide(cov, denom, out=np.zeros_like(cov), where=denom > 0)
+        return self._matrix
+
+    def get(self, a: str, b: str):
+        m = self.matrix()
+        if m is None or a not in self.index or b not in self.index:
+            return None
+        return float(m[self.index[a], self.index[b]])
+
+
+# "empty" holds configured symbols whose last fetch returned no candles (e.g.
+# XAUUSD on a crypto feed); they don't count as a change in the tracked set.
+_STATE = {"symbols": [], "empty": set(), "last_ts": None, "last_close": None, "trackers": {}}
+
+
+def _reset(symbols: list) -> None:
+    _STATE["symbols"] = list(symbols)
+    _STATE["last_ts"] = None
+    _STATE["last_close"] = None
+    _STATE["trackers"] = {w: RollingCorrelation(symbols, w) for w in CORRELATION_WINDOWS}
+
+
+def ingest_bars(closes_by_symbol: dict) -> int:
+    """Push every new bar shared by all tracked symbols; returns bars added.
+
+    ``closes_by_symbol`` maps symbol -> {bar_time: close}. A change in the
+    symbol set restarts the trackers from the supplied history.
+    """
+    symbols = sorted(closes_by_symbol)
+    if symbols != _STATE["symbols"]:
+        _reset(symbols)
+    if not symbols:
+        return 0
+    common = set.intersection(*(set(c) for c in closes_by_symbol.values()))
+    last_ts = _STATE["last_ts"]
+    added = 0
+    for ts in sorted(t for t in common if last_ts is None or t > last_ts):
+        closes = [float(closes_by_symbol[s][ts]) for s in symbols]
+        prev = _STATE["last_close"]
+        if prev is not None and all(c > 0 for c in closes) and all(p > 0 for p in prev):
+            r = [math.log(c / p) for c, p in zip(closes, prev)]
+            for tracker in _STATE["trackers"].values():
+                tracker.push(r)
+            added += 1
+        _STATE["last_close"] = closes
+        _STATE["last_ts"] = ts
+    return added
+
+
+def _tracked_symbols() -> list:
+    import db
+    from config import SUPPORTED_PAIRS
+
+    symbols = set(SUPPORTED_PAIRS)
+    for model in db.get_active_models():
+        pair = str(model.get("pair") or "").upper()
+        if pair and pair != "ALL":
+            symbols.add(pair)
+    for trade in db.get_open_demo_trades_all():
+        pair = str(trade.get("pair") or "").upper()
+        if pair.endswith("USDT"):
+            symbols.add(pair)
+    return sorted(symbols)
+
+
+async def update_correlation_job(context) -> None:
+    """Scheduled job: feed newly closed bars into the rolling matrices."""
+    import asyncio
+
+    from engine.rules import get_candles, _confirmed
+
+    try:
+        symbols = _tracked_symbols()
+        full = max(CORRELATION_WINDOWS) + 2
+        known = set(_STATE["symbols"]) | _STATE["empty"]
+        limit = full if set(symbols) != known or _STATE["last_ts"] is None else 6
+        cache = {}
+        candle_sets = await asyncio.gather(*(get_candles(s, CORRELATION_TIMEFRAME, limit, cache) for s in symbols))
+        closes = {s: {c["time"]: c["close"] for c in _confirmed(cs)} for s, cs in zip(symbols, candle_sets) if cs}
+        if limit < full and sorted(closes) != _STATE["symbols"]:
+            # A symbol gained or lost data: the trackers restart, so give them full history.
+            cache = {}
+            candle_sets = await asyncio.gather(*(get_candles(s, CORRELATION_TIMEFRAME, full, cache) for s in symbols))
+            closes = {s: {c["time"]: c["close"] for c in _confirmed(cs)} for s, cs in zip(symbols, candle_sets) if cs}
+        _STATE["empty"] = set(symbols) - set(closes)
+        added = ingest_bars(closes)
+        if added:
+            log.info("Correlation matrix: +%s bars across %s symbols", added, len(closes))
+    except Exception as e:
+        log.error("Correlation update failed: %s", e)
+
+
+def get_correlation(a: str, b: str, window: int | None = None):
+    """Rolling correlation of ``a`` and ``b``, or None while warming up."""
+    if a == b:
+        return 1.0
+    tracker = _STATE["trackers"].get(window or min(CORRELATION_WINDOWS))
+    return tracker.get(a, b) if tracker else None
+
+
+def _static_correlation(a: str, b: str):
+    """Stand-in correlation from ``CORRELATION_GROUPS``, or None if ungrouped."""
+    btc_group = CORRELATION_GROUPS["btc_correlated"]
+    if a in btc_group and b in btc_group:
+        return CORRELATION_HIGH
+    if b in get_correlated_pairs(a):
+        return CORRELATION_THRESHOLD
+    return None
+
 
 def get_correlated_pairs(pair: str) -> list:
     correlated = []
@@ -15,7 +186,35 @@ def get_correlated_pairs(pair: str) -> list:
     return correlated
 
 
-def check_correlation(new_pair: str, new_direction: str, open_trades: list) -> dict:
+def _sign(direction) -> int:
+    return 1 if str(direction).lower() in {"bullish", "bull", "long", "buy"} else -1
+
+
+def exposure_correlation(new_pair: str, new_direction: str, open_trades: list) -> float:
+    """Size-weighted correlation between a new position and the open book.
+
+    Each trade contributes corr × (same side ? +1 : -1); positive values mean
+    the new trade adds to existing directional exposure. Pairs the rolling
+    matrix doesn't cover fall back to the static groups, as in
+    ``check_correlation``.
+    """
+    total_w = 0.0
+    acc = 0.0
+    s_new = _sign(new_direction)
+    for trade in open_trades:
+        trade_pair = trade.get("pair", "")
+        rho = get_correlation(new_pair, trade_pair)
+        if rho is None:
+            rho = _static_correlation(new_pair, trade_pair)
+        if rho is None:
+            continue
+        w = abs(float(trade.get("position_size") or 0)) or 1.0
+        acc += w * rho * s_new * _sign(trade.get("direction", ""))
+        total_w += w
+    return acc / total_w if total_w else 0.0
+
+
+def _check_groups(new_pair: str, new_direction: str, open_trades: list) -> dict:
     correlated = get_correlated_pairs(new_pair)
     if not correlated:
         return {"conflict": False, "severity": "none", "reason": "", "conflicts": []}
@@ -35,3 +234,31 @@ def check_correlation(new_pair: str, new_direction: str, open_trades: list) -> d
     pair_list = ", ".join(c["pair"] for c in conflicts)
     reason = f"Already {new_direction.lower()} on {pair_list} — adding {new_pair} would create {'heavily ' if high_corr else ''}correlated exposure"
     return {"conflict": True, "severity": severity, "reason": reason, "conflicts": conflicts}
+
+
+def check_correlation(new_pair: str, new_direction: str, open_trades: list) -> dict:
+    tracker = _STATE["trackers"].get(min(CORRELATION_WINDOWS))
+    if tracker is None or new_pair not in tracker.index or tracker.matrix() is None:
+        return _check_groups(new_pair, new_direction, open_trades)
+
+    s_new = _sign(new_direction)
+    conflicts = []
+    for trade in open_trades:
+        trade_pair = trade.get("pair", "")
+        if trade_pair == new_pair:
+            continue
+        rho = tracker.get(new_pair, trade_pair)
+        if rho is None:
+            continue
+        effective = rho * s_new * _sign(trade.get("direction", ""))
+        if effective >= CORRELATION_THRESHOLD:
+            conflicts.append({"pair": trade_pair, "direction": str(trade.get("direction", "")).lower(), "entry": trade.get("entry_price", 0), "correlation": round(rho, 2)})
+    exposure = exposure_correlation(new_pair, new_direction, open_trades)
+    if not conflicts:
+        return {"conflict": False, "severity": "none", "reason": "", "conflicts": [], "exposure_corr": exposure}
+
+    high_corr = any(abs(c["correlation"]) >= CORRELATION_HIGH for c in conflicts)
+    severity = "high" if high_corr else "medium"
+    pair_list = ", ".join(f"{c['pair']} (ρ {c['correlation']:+.2f})" for c in conflicts)
+    reason = f"Open {pair_list} — adding {new_pair} {new_direction.lower()} would create {'heavily ' if high_corr else ''}correlated exposure (book ρ {exposure:+.2f})"
+    return {"conflict": True, "severity": severity, "reason": reason, "conflicts": conflicts, "exposure_corr": exposure}
@@ -9,8 +9,10 @@ from telegram import InlineKeyboardButton, InlineKeyboardMarkup
 import db
 from config import CHAT_ID
 from engine.degen.contract_scanner import scan_contract
+from engine.degen.dexscreener import prefetch
 from engine.degen.early_entry import calculate_early_score
 from engine.degen.narrative_detector import detect_token_narrative
+from engine.job_metrics import instrumented, record_timeout
 from engine.degen.social_velocity import get_token_mention_velocity
 
 log = logging.getLogger(__name__)
@@ -366,10 +368,12 @@ async def send_scanner_alert(context, token: dict, rank: int, run_id: str, total
         return None
 
 
+@instrumented("auto_scanner")
 async def run_auto_scanner(context) -> None:
     try:
         await asyncio.wait_for(_run_auto_scanner_inner(context), timeout=300)
     except asyncio.TimeoutError:
+        record_timeout()
         log.warning("auto_scanner timed out after 5 minutes")
     except Exception as e:
         log.error(f"auto_scanner error: {e}")
@@ -441,6 +445,7 @@ async def _run_auto_scanner_inner(context) -> None:
                 log.error("Score candidate error %s: %s", address[:12], exc)
                 return None
 
+    await prefetch(c["address"] for c in candidates[:30])
     tasks = [score_candidate(c) for c in candidates[:30]]
     results = await asyncio.gather(*tasks)
     scored = [r for r in results if r is not None]
@@ -3,13 +3,17 @@ from __future__ import annotations
 from typing import Callable, Awaitable
 
 
-async def _safe(fn, token_data: dict, model: dict) -> bool:
+def _safe_call(fn, token_data: dict, model: dict) -> bool:
     try:
         return bool(fn(token_data, model))
     except Exception:
         return False
 
 
+async def _safe(fn, token_data: dict, model: dict) -> bool:
+    return _safe_call(fn, token_data, model)
+
+
 def _dev_sold_pct(token_data: dict) -> float:
     return float((token_data.get("dev_activity") or {}).get("sold_pct_30m", 100) or 100)
 
@@ -45,6 +49,39 @@ CHECKS: dict[str, Callable[[dict, dict], bool]] = {
 }
 
 
+# Model fields each check reads. Checks not listed depend on the token only, so
+# one result serves every model that asks for them.
+CHECK_PARAMS: dict[str, tuple[str, ...]] = {
+    "check_rug_score_low": ("max_rug_score",),
+    "check_min_liquidity": ("min_liquidity_usd",),
+    "check_mcap_in_range": ("min_mcap_usd", "max_mcap_usd"),
+    "check_narrative_match": ("narrative_filter",),
+    "check_age_in_range": ("min_age_minutes", "max_age_minutes"),
+    "check_min_holders": ("min_holder_count",),
+}
+
+
+def _freeze(value):
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    return value
+
+
+def check_key(name: str, model: dict) -> tuple:
+    """Memo key for ``name`` under ``model``: the check plus the params it reads."""
+    return (name,) + tuple(_freeze(model.get(p)) for p in CHECK_PARAMS.get(name, ()))
+
+
+def run_check(name: str, token_data: dict, model: dict) -> bool | None:
+    """Synchronous check call; None for an unknown check name."""
+    fn = CHECKS.get(name)
+    if fn is None:
+        return None
+    return _safe_call(fn, token_data, model)
+
+
 def get_check_function(name: str):
     fn = CHECKS.get(name)
     if fn is None:
@@ -5,7 +5,8 @@ from datetime import datetime, timedelta, timezone
 import httpx
 
 import db
-from config import DEXSCREENER_BASE, GOPLUSLABS_BASE, HONEYPOT_BASE
+from config import GOPLUSLABS_BASE, HONEYPOT_BASE
+from engine.degen.dexscreener import get_token_pairs
 
 log = logging.getLogger(__name__)
 
@@ -50,19 +51,12 @@ async def fetch_goplus_data(address: str, chain: str) -> dict:
 
 
 async def fetch_dexscreener_data(address: str) -> dict:
-    url = f"{DEXSCREENER_BASE}/dex/tokens/{address}"
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            response = await client.get(url)
-            response.raise_for_status()
-            data = response.json()
-
-        pairs = data.get("pairs") or []
+        pairs = await get_token_pairs(address)
         if not pairs:
             return {"liquidity_usd": 0, "volume_24h": 0, "price_usd": 0, "market_cap": 0}
 
-        pairs.sort(key=lambda p: (p.get("liquidity") or {}).get("usd") or 0, reverse=True)
-        best = pairs[0]
+        best = max(pairs, key=lambda p: (p.get("liquidity") or {}).get("usd") or 0)
 
         pair_created = None
         if best.get("pairCreatedAt"):
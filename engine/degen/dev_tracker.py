@@ -6,6 +6,7 @@ from telegram import InlineKeyboardButton, InlineKeyboardMarkup
 
 import db
 from config import CHAT_ID, ETHERSCAN_KEY
+from engine.job_metrics import instrumented, record_timeout
 
 log = logging.getLogger(__name__)
 
@@ -199,10 +200,12 @@ async def send_dev_wallet_alert(context, event: dict, scan: dict) -> None:
     )
 
 
+@instrumented("dev_wallet_monitor")
 async def run_dev_wallet_monitor(context) -> None:
     try:
         await asyncio.wait_for(_run_dev_wallet_monitor_inner(context), timeout=60)
     except asyncio.TimeoutError:
+        record_timeout()
         log.warning("dev_wallet_monitor timed out after 60 seconds")
     except Exception as e:
         log.error(f"dev_wallet_monitor error: {e}")
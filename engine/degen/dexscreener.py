@@ -0,0 +1,171 @@
+"""Batched DexScreener token lookups.
+
+``/latest/dex/tokens/`` accepts up to 30 comma-separated addresses, so
+``get_token_pairs()`` does not request a token on its own. It parks the
+caller on a future and waits ``BATCH_WINDOW`` seconds for other lookups to
+join. One request then serves every address in the batch, and each future
+gets that token's pairs. Results are cached for ``PAIRS_TTL`` seconds, so a
+scan cycle touching the same token from several paths costs one call.
+
+A response carries at most ``RESPONSE_PAIR_CAP`` pairs, so a few popular
+tokens can crowd the rest of a batch out. When a response is full, the
+addresses it left out (and the one its last pair belongs to, which may have
+been cut short) are asked for again in a smaller batch rather than cached as
+having no pairs.
+
+Paths that have their whole token list up front (scan jobs behind a
+semaphore) should call ``prefetch()`` first, so the cache is warm before
+their workers ask one token at a time.
+"""
+
+import asyncio
+import logging
+
+import httpx
+
+from config import DEXSCREENER_BASE
+from engine.job_metrics import register_metrics, stat_lines
+from utils.cache import BoundedCache
+
+log = logging.getLogger(__name__)
+
+API_BASE = DEXSCREENER_BASE
+MAX_BATCH = 30
+RESPONSE_PAIR_CAP = 30
+BATCH_WINDOW = 0.05
+PAIRS_TTL = 30
+
+PAIRS_CACHE = BoundedCache("dexscreener_pairs", maxsize=2000, ttl=PAIRS_TTL)
+DEX_STATS = {"lookups": 0, "cache_hits": 0, "joined": 0, "requests": 0, "addresses": 0, "retried": 0, "errors": 0}
+
+_pending: dict = {}  # address -> future, waiting for the next batch
+_flush_handle = {"task": None}
+
+
+def _key(address: str) -> str:
+    # EVM addresses are case-insensitive; Solana mints are not.
+    return address.lower() if address.startswith("0x") else address
+
+
+async def _request(addresses: list) -> tuple:
+    """Fetch one batch; returns (key -> pairs for the keys seen, whether the response was full)."""
+    DEX_STATS["requests"] += 1
+    DEX_STATS["addresses"] += len(addresses)
+    async with httpx.AsyncClient(timeout=10) as client:
+        response = await client.get(f"{API_BASE}/dex/tokens/{','.join(addresses)}")
+        response.raise_for_status()
+        data = response.json()
+    wanted = {_key(a) for a in addresses}
+    out = {}
+    pairs = data.get("pairs") or []
+    matched = set()
+    for pair in pairs:
+        matched = set()
+        for side in ("baseToken", "quoteToken"):
+            k = _key(str((pair.get(side) or {}).get("address") or ""))
+            if k in wanted and k not in matched:
+                out.setdefault(k, []).append(pair)
+                matched.add(k)
+    # A full response may have cut the last pair's tokens short.
+    partial = matched if len(pairs) >= RESPONSE_PAIR_CAP else set()
+    return out, partial
+
+
+async def _fetch(addresses: list) -> dict:
+    """Pairs for every key in ``addresses``, re-asking for any a full response left out."""
+    out, partial = await _request(addresses)
+    if partial:
+        retry = [a for a in addresses if _key(a) not in out]
+        if len(retry) + len(partial) < len(addresses):
+            retry += [a for a in addresses if _key(a) in partial]
+        if retry and len(retry) < len(addresses):
+            DEX_STATS["retried"] += len(retry)
+            out.update(await _fetch(retry))
+    for address in addresses:
+        out.setdefault(_key(address), [])
+    return out
+
+
+async def _run_batch(batch: dict) -> None:
+    try:
+        result = await _fetch(list(batch))
+    except Exception as exc:
+        DEX_STATS["errors"] += 1
+        log.warning("DexScreener batch of %s failed: %s", len(batch), exc)
+        for fut in batch.values():
+            if not fut.done():
+                fut.set_exception(exc)
+        return
+    for address, fut in batch.items():
+        pairs = result.get(_key(address), [])
+        PAIRS_CACHE.set(_key(address), pairs)
+        if not fut.done():
+            fut.set_result(pairs)
+
+
+def _take_batch() -> dict:
+    batch = {}
+    for address in list(_pending)[:MAX_BATCH]:
+        batch[address] = _pending.pop(address)
+    return batch
+
+
+async def _flush_later() -> None:
+    await asyncio.sleep(BATCH_WINDOW)
+    _flush_handle["task"] = None
+    batches = []
+    while _pending:
+        batches.append(_take_batch())
+    await asyncio.gather(*(_run_batch(b) for b in batches))
+
+
+async def get_token_pairs(address: str) -> list:
+    """All DexScreener pairs for ``address`` (possibly empty); raises on API failure."""
+    DEX_STATS["lookups"] += 1
+    key = _key(address)
+    cached = PAIRS_CACHE.get(key)
+    if cached is not None:
+        DEX_STATS["cache_hits"] += 1
+        return list(cached)
+    fut = _pending.get(key)
+    if fut is not None:
+        DEX_STATS["joined"] += 1
+    else:
+        fut = _pending[key] = asyncio.get_running_loop().create_future()
+        if len(_pending) >= MAX_BATCH:
+            asyncio.ensure_future(_run_batch(_take_batch()))
+        elif _flush_handle["task"] is None:
+            _flush_handle["task"] = asyncio.ensure_future(_flush_later())
+    return list(await asyncio.shield(fut))
+
+
+async def prefetch(addresses) -> int:
+    """Warm the cache for ``addresses`` in as few requests as possible; returns how many were fetched."""
+    missing = list(dict.fromkeys(_key(a) for a in addresses if a and PAIRS_CACHE.get(_key(a)) is None))
+    chunks = [missing[i : i + MAX_BATCH] for i in range(0, len(missing), MAX_BATCH)]
+    results = await asyncio.gather(*(_fetch(chunk) for chunk in chunks), return_exceptions=True)
+    fetched = 0
+    for chunk, result in zip(chunks, results):
+        if isinstance(result, Exception):
+            # Workers fall back to their own lookups for these.
+            DEX_STATS["errors"] += 1
+            log.warning("DexScreener prefetch of %s failed: %s", len(chunk), result)
+            continue
+        for key in chunk:
+            PAIRS_CACHE.set(key, result[key])
+        fetched += len(chunk)
+    return fetched
+
+
+def _metrics() -> list:
+    return stat_lines(DEX_STATS, (
+        ("lookups", "dexscreener_lookups_total", "counter", "Token pair lookups requested by callers"),
+        ("cache_hits", "dexscreener_cache_hits_total", "counter", "Lookups served from the pair cache"),
+        ("requests", "dexscreener_requests_total", "counter", "Batched token requests sent to DexScreener"),
+        ("addresses", "dexscreener_addresses_total", "counter", "Addresses carried by those requests"),
+        ("retried", "dexscreener_retried_total", "counter", "Addresses re-asked for after a full response left them out"),
+        ("errors", "dexscreener_errors_total", "counter", "Batched requests that failed"),
+    ))
+
+
+register_metrics(_metrics)
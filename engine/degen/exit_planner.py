@@ -24,12 +24,13 @@ def format_exit_plan(entry_price: float, position_size: float) -> str:
 
 
 async def monitor_exit_triggers(context) -> None:
-    import httpx
     from config import CHAT_ID
+    from engine.degen.dexscreener import get_token_pairs, prefetch
 
     open_trades = db.get_open_degen_journal_entries()
     if not open_trades:
         return
+    await prefetch(t.get("contract_address") for t in open_trades)
 
     for trade in open_trades:
         try:
@@ -37,12 +38,7 @@ async def monitor_exit_triggers(context) -> None:
             if not contract:
                 continue
 
-            async with httpx.AsyncClient(timeout=8) as client:
-                response = await client.get(f"https://api.dexscreener.com/latest/dex/tokens/{contract}")
-                response.raise_for_status()
-                data = response.json()
-
-            pairs = data.get("pairs") or []
+            pairs = await get_token_pairs(contract)
             if not pairs:
                 continue
 
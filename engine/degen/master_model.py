@@ -1,11 +1,17 @@
 from __future__ import annotations
 
 import db
-from engine.degen.model_evaluator import evaluate_token_against_model
+from engine.degen.model_evaluator import evaluate_token_against_models
 
 
-async def evaluate_master_degen(token_data: dict) -> dict:
-    models = db.get_active_degen_models()
+async def evaluate_master_degen(token_data: dict, models: list | None = None, compiled: dict | None = None) -> dict:
+    """Score ``token_data`` against every active model.
+
+    A scan over many tokens should load the models and ``compile_models`` them
+    once, then pass both in; without them each call reads and compiles afresh.
+    """
+    if models is None:
+        models = db.get_active_degen_models()
     if not models:
         return {"passed": False, "reason": "No active degen models"}
 
@@ -15,8 +21,8 @@ async def evaluate_master_degen(token_data: dict) -> dict:
     passing_models = []
     failing_models = []
 
-    for model in models:
-        result = await evaluate_token_against_model(token_data, model)
+    results = await evaluate_token_against_models(token_data, models, compiled)
+    for model, result in zip(models, results):
         result["model_name"] = model.get("name")
         model_results.append(result)
         if result["passed"]:
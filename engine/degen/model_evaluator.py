@@ -1,62 +1,112 @@
 from __future__ import annotations
 
-from engine.degen.checks import get_check_function
+from engine.degen.checks import CHECKS, check_key, run_check
 
 
-async def evaluate_token_against_model(token_data: dict, model: dict) -> dict:
-    mandatory_fails = []
-    passed_checks = []
-    failed_checks = []
-    weighted_score = 0.0
-    total_weight = 0.0
+def _grade(score: float) -> str:
+    return "A" if score >= 85 else "B" if score >= 70 else "C" if score >= 55 else "D" if score >= 40 else "F"
 
-    for check_name in model.get("mandatory_checks", []):
-        check_fn = get_check_function(check_name)
-        if check_fn is None:
+
+def compile_models(models: list) -> dict:
+    """Resolve every model's checks to shared slots, one per distinct check.
+
+    Two models share a slot when they ask for the same check with the same
+    params it reads (see ``CHECK_PARAMS``), so a token-only check is one slot
+    for the whole model set. Compile once per model set and reuse it across
+    tokens.
+    """
+    slots = {}
+    probes = []
+
+    def slot(name: str, model: dict) -> int:
+        key = check_key(name, model)
+        index = slots.get(key)
+        if index is None:
+            index = slots[key] = len(probes)
+            probes.append((name, model))
+        return index
+
+    plans = []
+    for model in models:
+        mandatory = [(name, slot(name, model)) for name in model.get("mandatory_checks", []) if name in CHECKS]
+        weighted = [
+            (wc.get("check", ""), slot(wc.get("check", ""), model), float(wc.get("weight", 1) or 1))
+            for wc in model.get("weighted_checks", [])
+            if wc.get("check", "") in CHECKS
+        ]
+        plans.append((mandatory, weighted, float(model.get("min_score", 60) or 60)))
+    return {"probes": probes, "plans": plans, "ids": [model.get("id") for model in models]}
+
+
+def evaluate_compiled(token_data: dict, compiled: dict) -> list:
+    """Verdicts for one token against a compiled model set, in model order.
+
+    Each slot runs at most once for the token, so a mandatory failure found
+    for one model is a lookup for the next, and a model that fails a mandatory
+    check never runs its weighted checks.
+    """
+    probes = compiled["probes"]
+    results = [None] * len(probes)
+
+    def resolve(index: int) -> bool:
+        result = results[index]
+        if result is None:
+            name, model = probes[index]
+            result = results[index] = run_check(name, token_data, model)
+        return result
+
+    verdicts = []
+    for mandatory, weighted, min_score in compiled["plans"]:
+        passed_checks = []
+        mandatory_fails = []
+        for name, index in mandatory:
+            (passed_checks if resolve(index) else mandatory_fails).append(name)
+        if mandatory_fails:
+            verdicts.append({
+                "passed": False,
+                "score": 0.0,
+                "grade": "F",
+                "passed_checks": passed_checks,
+                "failed_checks": mandatory_fails,
+                "mandatory_fails": mandatory_fails,
+                "weighted_score": 0.0,
+                "recommendation": f"Failed mandatory: {', '.join(mandatory_fails)}",
+            })
             continue
-        result = await check_fn(token_data, model)
-        if not result:
-            mandatory_fails.append(check_name)
-        else:
-            passed_checks.append(check_name)
-
-    if mandatory_fails:
-        return {
-            "passed": False,
-            "score": 0.0,
-            "grade": "F",
+
+        failed_checks = []
+        weighted_score = 0.0
+        total_weight = 0.0
+        for name, index, weight in weighted:
+            total_weight += weight
+            if resolve(index):
+                weighted_score += weight
+                passed_checks.append(name)
+            else:
+                failed_checks.append(name)
+
+        score = weighted_score / total_weight * 100 if total_weight > 0 else 0
+        verdicts.append({
+            "passed": score >= min_score,
+            "score": round(score, 1),
+            "grade": _grade(score),
             "passed_checks": passed_checks,
-            "failed_checks": mandatory_fails,
-            "mandatory_fails": mandatory_fails,
-            "weighted_score": 0.0,
-            "recommendation": f"Failed mandatory: {', '.join(mandatory_fails)}",
-        }
-
-    for wc in model.get("weighted_checks", []):
-        check_name = wc.get("check", "")
-        weight = float(wc.get("weight", 1) or 1)
-        check_fn = get_check_function(check_name)
-        if check_fn is None:
-            continue
-        total_weight += weight
-        result = await check_fn(token_data, model)
-        if result:
-            weighted_score += weight
-            passed_checks.append(check_name)
-        else:
-            failed_checks.append(check_name)
-
-    score = weighted_score / total_weight * 100 if total_weight > 0 else 0
-    grade = "A" if score >= 85 else "B" if score >= 70 else "C" if score >= 55 else "D" if score >= 40 else "F"
-    passed = score >= float(model.get("min_score", 60) or 60)
-    recommendation = "Strong buy — A/B" if score >= 80 else "Potential — verify manually" if score >= 60 else "Weak — skip or watch"
-    return {
-        "passed": passed,
-        "score": round(score, 1),
-        "grade": grade,
-        "passed_checks": passed_checks,
-        "failed_checks": failed_checks,
-        "mandatory_fails": [],
-        "weighted_score": round(weighted_score, 1),
-        "recommendation": recommendation,
-    }
+            "failed_checks": failed_checks,
+            "mandatory_fails": [],
+            "weighted_score": round(weighted_score, 1),
+            "recommendation": "Strong buy — A/B" if score >= 80 else "Potential — verify manually" if score >= 60 else "Weak — skip or watch",
+        })
+    return verdicts
+
+
+async def evaluate_token_against_models(token_data: dict, models: list, compiled: dict | None = None) -> list:
+    """Verdicts for ``models``; scans pass ``compiled`` from one ``compile_models(models)`` call."""
+    return evaluate_compiled(token_data, compiled or compile_models(models))
+
+
+async def evaluate_token_against_model(token_data: dict, model: dict, compiled: dict | None = None) -> dict:
+    """Verdict for ``model``, picked out of ``compiled`` by model id when it is there."""
+    model_id = model.get("id")
+    if compiled is not None and model_id is not None and model_id in compiled["ids"]:
+        return evaluate_compiled(token_data, compiled)[compiled["ids"].index(model_id)]
+    return evaluate_compiled(token_data, compile_models([model]))[0]
@@ -2,6 +2,9 @@ import logging
 
 import db
 
+# Posts considered per refresh — one CryptoPanic page, as the old direct fetch saw.
+NARRATIVE_PAGE = 20
+
 NARRATIVE_KEYWORDS = {
     "AI": ["ai", "artificial intelligence", "gpt", "llm", "machine learning", "neural", "openai", "agent"],
     "DeFi": ["defi", "decentralized finance", "yield", "amm", "liquidity", "lending", "borrowing", "protocol"],
@@ -37,24 +40,12 @@ def detect_token_narrative(token_name: str, token_symbol: str, description: str
 
 async def update_narrative_momentum(context=None) -> dict:
     from config import CRYPTOPANIC_TOKEN
-    import httpx
+    from news import NEWS
 
     if not CRYPTOPANIC_TOKEN:
         return {}
 
-    try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            response = await client.get(
-                "https://cryptopanic.com/api/v1/posts/",
-                params={"auth_token": CRYPTOPANIC_TOKEN, "public": "true", "kind": "news"},
-            )
-            response.raise_for_status()
-            data = response.json()
-    except Exception as exc:
-        logging.getLogger(__name__).error("CryptoPanic narrative fetch: %s", exc)
-        return {}
-
-    posts = data.get("results") or []
+    posts = NEWS.latest(NARRATIVE_PAGE, feed="news")
     counts = {n: 0 for n in NARRATIVE_KEYWORDS}
     token_map = {n: [] for n in NARRATIVE_KEYWORDS}
 
@@ -64,7 +55,7 @@ async def update_narrative_momentum(context=None) -> dict:
         if not narrative:
             continue
         counts[narrative] = counts.get(narrative, 0) + 1
-        currencies = [c.get("code") for c in (post.get("currencies") or []) if c.get("code")]
+        currencies = list(post["currencies"])
         token_map[narrative].extend(currencies)
 
     results = {}
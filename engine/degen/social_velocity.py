@@ -1,7 +1,5 @@
 import logging
-from datetime import datetime, timedelta, timezone
-
-import httpx
+import time
 
 from config import CRYPTOPANIC_TOKEN
 
@@ -12,34 +10,12 @@ async def get_token_mention_velocity(symbol: str, hours: int = 2) -> dict:
     if not CRYPTOPANIC_TOKEN:
         return {"symbol": symbol, "velocity": 0, "trend": "unknown", "trend_emoji": "❓", "recent_count": 0, "prev_count": 0}
 
-    try:
-        async with httpx.AsyncClient(timeout=8) as client:
-            response = await client.get(
-                "https://cryptopanic.com/api/v1/posts/",
-                params={"auth_token": CRYPTOPANIC_TOKEN, "currencies": symbol.upper(), "public": "true"},
-            )
-            response.raise_for_status()
-            data = response.json()
-    except Exception as exc:
-        log.error("Social velocity error %s: %s", symbol, exc)
-        return {"symbol": symbol, "velocity": 0, "trend": "unknown", "trend_emoji": "❓", "recent_count": 0, "prev_count": 0}
-
-    now = datetime.now(timezone.utc)
-    hour_ago = now - timedelta(hours=1)
-    two_ago = now - timedelta(hours=2)
+    from news import NEWS, ensure_currency_news
 
-    posts = data.get("results") or []
-    recent_count = 0
-    prev_count = 0
-    for post in posts:
-        try:
-            post_time = datetime.fromisoformat(post["created_at"].replace("Z", "+00:00"))
-            if post_time >= hour_ago:
-                recent_count += 1
-            elif post_time >= two_ago:
-                prev_count += 1
-        except Exception:
-            continue
+    await ensure_currency_news(symbol)
+    now = time.time()
+    recent_count = len(NEWS.window(now - 3600, now, currency=symbol))
+    prev_count = len(NEWS.window(now - 7200, now - 3600, currency=symbol))
 
     if prev_count == 0:
         velocity = recent_count * 10
@@ -15,8 +15,8 @@ async def run_execution_pipeline(
 ) -> dict:
     """Universal execution pipeline for all live trades."""
     from security.emergency_stop import is_halted
-    from security.rate_limiter import check_trade_rate, record_trade
-    from security.spending_limits import run_all_checks, record_spend, record_trade_time
+    from security.limits import reserve_trade
+    from security.spending_limits import run_all_checks
     from security.anomaly_detector import run_all_anomaly_checks
     from security.audit import log_trade_attempt, log_trade_executed, log_event
     import db
@@ -30,11 +30,6 @@ async def run_execution_pipeline(
         log_event("trade_blocked_halt", {"section": section, "coin": coin}, user_id=user_id, success=False, error="Trading halted")
         return {"success": False, "error": "🛑 Trading is halted.\nRun /resume to restart."}
 
-    allowed, reason = check_trade_rate(user_id)
-    if not allowed:
-        log_event("trade_blocked_rate", {"section": section, "reason": reason}, user_id=user_id, success=False, error=reason)
-        return {"success": False, "error": reason}
-
     current_positions = db.count_open_positions(section)
     all_ok, failures = run_all_checks(
         section=section,
@@ -42,11 +37,20 @@ async def run_execution_pipeline(
         market_key=market_key,
         leverage=leverage,
         current_positions=current_positions,
+        windows=False,
     )
     if not all_ok:
         log_trade_attempt(section, plan, user_id, blocked_by="; ".join(failures))
         return {"success": False, "error": "⛔ Limit check failed:\n" + "\n".join([f"• {f}" for f in failures])}
 
+    # Rate, spend and cooldown windows: checked only while awaiting confirmation,
+    # checked and reserved in one step right before execution.
+    reservation, failures = reserve_trade(section, size_usd, market_key, user_id=user_id, wallet=plan.get("wallet"), dry_run=not skip_confirm)
+    if reservation is None:
+        log_event("trade_blocked_rate", {"section": section, "reason": "; ".join(failures)}, user_id=user_id, success=False, error="; ".join(failures))
+        log_trade_attempt(section, plan, user_id, blocked_by="; ".join(failures))
+        return {"success": False, "error": "⛔ Limit check failed:\n" + "\n".join([f"• {f}" for f in failures])}
+
     anomaly_ok, issues = await run_all_anomaly_checks(section=section, plan=plan, signal_id=signal_id)
     if not anomaly_ok:
         plan["anomaly_warnings"] = issues
@@ -78,19 +82,18 @@ async def run_execution_pipeline(
     try:
         result = await executor(plan)
     except Exception as e:
+        reservation.release()
         error_msg = f"{type(e).__name__}: {str(e)[:200]}"
         log_event("trade_execution_error", {"section": section, "coin": coin, "error": error_msg}, user_id=user_id, success=False, error=error_msg)
         return {"success": False, "error": f"Execution failed: {error_msg}"}
 
     if not result.get("success"):
+        reservation.release()
         err = result.get("error", "")
         log_event("trade_failed", {"section": section, "coin": coin, "error": err}, user_id=user_id, success=False, error=err)
         return result
 
     tx_id = result.get("tx_id", "")
-    record_spend(section, size_usd)
-    record_trade_time(market_key)
-    record_trade(user_id)
 
     if signal_id:
         db.mark_signal_executed(signal_id, section, coin)
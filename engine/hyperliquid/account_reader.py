@@ -3,7 +3,6 @@ from datetime import datetime, timezone
 
 from engine.hyperliquid.client import (
     get_account_state,
-    get_all_mids,
     get_funding_history,
     get_open_orders,
     get_user_fills,
@@ -80,7 +79,9 @@ async def fetch_positions_with_prices(address: str) -> list:
     if not summary:
         return []
 
-    mids = await get_all_mids()
+    from engine.hyperliquid.market_data import get_mids
+
+    mids = await get_mids()
     positions = summary.get("positions", [])
     for pos in positions:
         mark_price = float(mids.get(pos["coin"], 0) or 0)
@@ -99,6 +100,41 @@ async def fetch_positions_with_prices(address: str) -> list:
     return positions
 
 
+def parse_fill(f: dict) -> dict:
+    ts_ms = int(f.get("time", 0) or 0)
+    ts = datetime.fromtimestamp(ts_ms / 1000, tz=timezone.utc) if ts_ms else None
+    cpnl = float(f.get("closedPnl", 0) or 0)
+    fee = float(f.get("fee", 0) or 0)
+    return {
+        "coin": f.get("coin", ""),
+        "side": "Long" if f.get("side") == "B" else "Short",
+        "size": float(f.get("sz", 0) or 0),
+        "price": float(f.get("px", 0) or 0),
+        "size_usd": round(float(f.get("sz", 0) or 0) * float(f.get("px", 0) or 0), 2),
+        "fee": round(fee, 4),
+        "closed_pnl": round(cpnl, 2),
+        "net_pnl": round(cpnl - fee, 2),
+        "timestamp": ts,
+        "time_ms": ts_ms,
+        "order_id": str(f.get("oid", "")),
+        "tid": int(f["tid"]) if f.get("tid") is not None else None,
+        "is_close": cpnl != 0,
+    }
+
+
+def parse_funding(entry: dict) -> dict:
+    # userFunding nests the payment under "delta"; older payloads are flat.
+    delta = entry.get("delta") or entry
+    ts_ms = int(entry.get("time", 0) or 0)
+    return {
+        "coin": delta.get("coin", ""),
+        "payment": float(delta.get("usdc", 0) or 0),
+        "rate": float(delta.get("fundingRate", 0) or 0),
+        "time": ts_ms,
+        "timestamp": datetime.fromtimestamp(ts_ms / 1000, tz=timezone.utc) if ts_ms else None,
+    }
+
+
 async def fetch_trade_history(address: str, limit: int = 50) -> list:
     fills = await get_user_fills(address)
     if not fills:
@@ -107,25 +143,7 @@ async def fetch_trade_history(address: str, limit: int = 50) -> list:
     trades = []
     for f in fills[:limit]:
         try:
-            ts_ms = int(f.get("time", 0) or 0)
-            ts = datetime.fromtimestamp(ts_ms / 1000, tz=timezone.utc) if ts_ms else None
-            cpnl = float(f.get("closedPnl", 0) or 0)
-            fee = float(f.get("fee", 0) or 0)
-            trades.append(
-                {
-                    "coin": f.get("coin", ""),
-                    "side": "Long" if f.get("side") == "B" else "Short",
-                    "size": float(f.get("sz", 0) or 0),
-                    "price": float(f.get("px", 0) or 0),
-                    "size_usd": round(float(f.get("sz", 0) or 0) * float(f.get("px", 0) or 0), 2),
-                    "fee": round(fee, 4),
-                    "closed_pnl": round(cpnl, 2),
-                    "net_pnl": round(cpnl - fee, 2),
-                    "timestamp": ts,
-                    "order_id": str(f.get("oid", "")),
-                    "is_close": cpnl != 0,
-                }
-            )
+            trades.append(parse_fill(f))
         except Exception as e:
             log.debug("Fill parse error: %s", e)
     return trades
@@ -166,13 +184,10 @@ async def fetch_funding_summary(address: str) -> dict:
     entries = []
     for entry in history:
         try:
-            payment = float(entry.get("usdc", 0) or 0)
-            coin = entry.get("coin", "")
-            rate = float(entry.get("fundingRate", 0) or 0)
-            ts = int(entry.get("time", 0) or 0)
-            total += payment
-            by_coin[coin] = by_coin.get(coin, 0) + payment
-            entries.append({"coin": coin, "payment": payment, "rate": rate, "time": ts})
+            f = parse_funding(entry)
+            total += f["payment"]
+            by_coin[f["coin"]] = by_coin.get(f["coin"], 0) + f["payment"]
+            entries.append({"coin": f["coin"], "payment": f["payment"], "rate": f["rate"], "time": f["time"]})
         except Exception:
             continue
 
@@ -1,58 +1,65 @@
 async def calculate_hl_performance(address: str) -> dict:
-    from engine.hyperliquid.account_reader import fetch_funding_summary, fetch_trade_history
+    """Win rate, expectancy and per-coin stats from the stored ``hl_perf_daily`` aggregates."""
+    import db
+    from engine.hyperliquid.ingest import ensure_synced
 
-    trades = await fetch_trade_history(address, limit=200)
-    funding = await fetch_funding_summary(address)
-    if not trades:
-        return {"total_trades": 0, "funding": funding}
+    await ensure_synced(address)
+    rows = db.get_hl_performance(address)
+    total = next((r for r in rows if r.get("coin") is None), None) or {}
+    coins = [r for r in rows if r.get("coin") is not None]
+
+    def _f(row, key):
+        return float(row.get(key) or 0)
 
-    closes = [t for t in trades if t["is_close"]]
+    funding_total = _f(total, "funding")
+    by_funding = {r["coin"]: round(_f(r, "funding"), 4) for r in coins if r.get("funding")}
+    funding = {"total": round(funding_total, 4), "by_coin": dict(sorted(by_funding.items(), key=lambda x: abs(x[1]), reverse=True))}
+
+    fills = int(total.get("fills") or 0)
+    if not fills:
+        return {"total_trades": 0, "funding": funding}
+    closes = int(total.get("closes") or 0)
     if not closes:
-        return {"total_trades": len(trades), "closes": 0, "funding": funding}
+        return {"total_trades": fills, "closes": 0, "funding": funding}
 
-    wins = [t for t in closes if t["net_pnl"] > 0]
-    losses = [t for t in closes if t["net_pnl"] < 0]
-    total_pnl = sum(t["net_pnl"] for t in closes)
-    total_fees = sum(t["fee"] for t in trades)
-    win_rate = len(wins) / len(closes) * 100 if closes else 0
-    avg_win = sum(t["net_pnl"] for t in wins) / len(wins) if wins else 0
-    avg_loss = sum(t["net_pnl"] for t in losses) / len(losses) if losses else 0
+    wins, losses = int(total.get("wins") or 0), int(total.get("losses") or 0)
+    total_pnl = _f(total, "net_pnl")
+    gross_profit, gross_loss = _f(total, "gross_profit"), _f(total, "gross_loss")
+    win_rate = wins / closes * 100
+    avg_win = gross_profit / wins if wins else 0
+    avg_loss = -gross_loss / losses if losses else 0
     expectancy = win_rate / 100 * avg_win + (1 - win_rate / 100) * avg_loss
-    gross_profit = sum(t["net_pnl"] for t in wins)
-    gross_loss = abs(sum(t["net_pnl"] for t in losses))
     profit_factor = gross_profit / gross_loss if gross_loss > 0 else 0
-    best = max(closes, key=lambda x: x["net_pnl"])
-    worst = min(closes, key=lambda x: x["net_pnl"])
+    closed = [r for r in coins if r.get("closes")]
+    best = max(closed, key=lambda r: _f(r, "best_pnl"))
+    worst = min(closed, key=lambda r: _f(r, "worst_pnl"))
 
     by_coin = {}
-    for t in closes:
-        coin = t["coin"]
-        by_coin.setdefault(coin, {"trades": 0, "pnl": 0, "wins": 0})
-        by_coin[coin]["trades"] += 1
-        by_coin[coin]["pnl"] += t["net_pnl"]
-        if t["net_pnl"] > 0:
-            by_coin[coin]["wins"] += 1
-    for coin, data in by_coin.items():
-        data["win_rate"] = round(data["wins"] / data["trades"] * 100, 1)
-        data["pnl"] = round(data["pnl"], 2)
+    for r in closed:
+        by_coin[r["coin"]] = {
+            "trades": int(r["closes"]),
+            "pnl": round(_f(r, "net_pnl"), 2),
+            "wins": int(r.get("wins") or 0),
+            "win_rate": round(int(r.get("wins") or 0) / int(r["closes"]) * 100, 1),
+        }
 
     return {
-        "total_trades": len(trades),
-        "closes": len(closes),
-        "wins": len(wins),
-        "losses": len(losses),
+        "total_trades": fills,
+        "closes": closes,
+        "wins": wins,
+        "losses": losses,
         "win_rate": round(win_rate, 1),
         "total_pnl": round(total_pnl, 2),
-        "total_fees": round(total_fees, 4),
+        "total_fees": round(_f(total, "fees"), 4),
         "avg_win": round(avg_win, 2),
         "avg_loss": round(avg_loss, 2),
         "expectancy": round(expectancy, 2),
         "profit_factor": round(profit_factor, 2),
-        "best_trade": best,
-        "worst_trade": worst,
+        "best_trade": {"coin": best["coin"], "net_pnl": round(_f(best, "best_pnl"), 2)},
+        "worst_trade": {"coin": worst["coin"], "net_pnl": round(_f(worst, "worst_pnl"), 2)},
         "by_coin": by_coin,
         "funding": funding,
-        "net_with_funding": round(total_pnl + funding["total"], 2),
+        "net_with_funding": round(total_pnl + funding_total, 2),
     }
 
 
@@ -55,6 +55,14 @@ async def get_meta() -> dict:
     return result
 
 
+async def get_meta_and_asset_ctxs() -> list:
+    """Universe plus per-asset contexts (funding, OI, mark/mid) in one call."""
+    result = await hl_info({"type": "metaAndAssetCtxs"})
+    if not isinstance(result, list) or len(result) < 2:
+        return []
+    return result
+
+
 async def get_account_state(address: str) -> dict:
     if not address:
         return {}
@@ -76,15 +84,26 @@ async def get_user_fills(address: str) -> list:
     return result if isinstance(result, list) else []
 
 
+async def get_user_fills_by_time(address: str, start_time: int, end_time: int = None) -> list:
+    """Fills at or after ``start_time`` (ms), oldest first, at most 2000 per call."""
+    if not address:
+        return []
+    payload = {"type": "userFillsByTime", "user": address, "startTime": int(start_time)}
+    if end_time:
+        payload["endTime"] = int(end_time)
+    result = await hl_info(payload)
+    return result if isinstance(result, list) else []
+
+
 async def get_funding_history(address: str, start_time: int = None) -> list:
     if not address:
         return []
     import time
 
     payload = {
-        "type": "userFundingHistory",
+        "type": "userFunding",
         "user": address,
-        "startTime": start_time or int((time.time() - 7 * 86400) * 1000),
+        "startTime": start_time if start_time is not None else int((time.time() - 7 * 86400) * 1000),
     }
     result = await hl_info(payload)
     return result if isinstance(result, list) else []
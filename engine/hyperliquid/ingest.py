@@ -0,0 +1,136 @@
+"""Incremental Hyperliquid fill and funding ingestion.
+
+``sync_account()`` asks Hyperliquid only for fills and funding payments at or
+after the cursors stored in ``hl_ingest_cursors``, paging forward until a
+short page. ``db.save_hl_fills`` / ``db.save_hl_funding`` skip rows already
+stored (by trade id / coin and time) and fold the new ones into the per-coin,
+per-day ``hl_perf_daily`` aggregates in the same transaction, so performance
+views read one small query however long the history gets.
+"""
+
+import asyncio
+import logging
+import time
+
+import db
+from config import HL_ADDRESS
+from engine import job_metrics
+from engine.hyperliquid.account_reader import parse_fill, parse_funding
+from engine.hyperliquid.client import get_funding_history, get_user_fills_by_time
+
+log = logging.getLogger(__name__)
+
+HL_INGEST_INTERVAL = 300
+# A performance view within this many seconds of a sync reads the table as-is.
+SYNC_TTL = 60
+# Response caps of userFillsByTime and userFunding; a full page means "more".
+FILLS_PAGE = 2000
+FUNDING_PAGE = 500
+MAX_PAGES = 10
+
+HL_INGEST_STATS = {"syncs": 0, "requests": 0, "fills": 0, "funding": 0, "errors": 0}
+
+_synced_at: dict = {}  # address -> monotonic time of the last completed sync
+_inflight: dict = {}  # address -> task syncing it
+
+
+async def _pull(fetch, start_ms: int, page_size: int) -> list:
+    """Raw rows from ``start_ms`` on, following full pages forward in time."""
+    rows = []
+    for _ in range(MAX_PAGES):
+        HL_INGEST_STATS["requests"] += 1
+        page = await fetch(start_ms)
+        rows.extend(page)
+        if len(page) < page_size:
+            break
+        last = max(int(r.get("time", 0) or 0) for r in page)
+        if last <= start_ms:
+            break
+        # Inclusive: rows sharing the boundary millisecond come back and are skipped on insert.
+        start_ms = last
+    return rows
+
+
+def _parse(rows: list, parser) -> list:
+    parsed = []
+    for row in rows:
+        try:
+            parsed.append(parser(row))
+        except Exception as e:
+            log.debug("HL ingest parse error: %s", e)
+    return parsed
+
+
+async def _sync(address: str) -> dict:
+    HL_INGEST_STATS["syncs"] += 1
+    cursor = db.get_hl_ingest_cursor(address)
+    fills = _parse(
+        await _pull(lambda s: get_user_fills_by_time(address, s), int(cursor.get("fills_ms") or 0), FILLS_PAGE),
+        parse_fill,
+    )
+    fills = [f for f in fills if f["tid"] is not None]
+    funding = _parse(
+        await _pull(lambda s: get_funding_history(address, s), int(cursor.get("funding_ms") or 0), FUNDING_PAGE),
+        parse_funding,
+    )
+    db.save_hl_fills(address, fills)
+    db.save_hl_funding(address, funding)
+    HL_INGEST_STATS["fills"] += len(fills)
+    HL_INGEST_STATS["funding"] += len(funding)
+    _synced_at[address] = time.monotonic()
+    return {"fills": len(fills), "funding": len(funding)}
+
+
+async def sync_account(address: str) -> dict:
+    """Ingest fills and funding newer than the stored cursors; concurrent callers share one run."""
+    task = _inflight.get(address)
+    if task is None:
+
+        async def _run():
+            try:
+                return await _sync(address)
+            finally:
+                _inflight.pop(address, None)
+
+        task = _inflight[address] = asyncio.ensure_future(_run())
+    return await asyncio.shield(task)
+
+
+async def ensure_synced(address: str) -> None:
+    """Sync ``address`` unless it was synced within ``SYNC_TTL`` seconds."""
+    if time.monotonic() - _synced_at.get(address, float("-inf")) < SYNC_TTL:
+        return
+    try:
+        await sync_account(address)
+    except Exception as e:
+        HL_INGEST_STATS["errors"] += 1
+        log.warning("HL ingest %s failed: %s", address, e)
+
+
+async def hl_ingest_job(context) -> None:
+    addresses = {HL_ADDRESS}
+    try:
+        addresses.add(db.get_hl_address())
+    except Exception as e:
+        log.debug("HL address lookup failed: %s", e)
+    for address in sorted(a for a in addresses if a):
+        try:
+            result = await sync_account(address)
+        except Exception as e:
+            HL_INGEST_STATS["errors"] += 1
+            log.warning("HL ingest %s failed: %s", address, e)
+            continue
+        job_metrics.record_items(result["fills"] + result["funding"])
+
+
+def _metrics() -> list:
+    return job_metrics.stat_lines(HL_INGEST_STATS, (
+        ("syncs", "hl_ingest_syncs_total", "counter", "Incremental fill/funding syncs"),
+        ("requests", "hl_ingest_requests_total", "counter", "Hyperliquid pages requested by those syncs"),
+        ("fills", "hl_ingest_fills_total", "counter", "Fills fetched past the stored cursor"),
+        ("funding", "hl_ingest_funding_total", "counter", "Funding payments fetched past the stored cursor"),
+        ("errors", "hl_ingest_errors_total", "counter", "Failed syncs"),
+    ))
+
+
+job_metrics.register_metrics(_metrics)
@@ -1,38 +1,94 @@
+import asyncio
 import logging
+import time
 
-from engine.hyperliquid.client import get_all_mids, get_l2_book, get_meta
+from engine.hyperliquid.client import get_l2_book, get_meta_and_asset_ctxs
 
 log = logging.getLogger(__name__)
 
+# One in-process view of the HL perp universe, refreshed by the hl_universe
+# job. Planner, bridge, monitor and funding lookups read from here instead
+# of issuing their own meta/allMids calls.
+UNIVERSE_REFRESH_SECONDS = 30
+UNIVERSE_MAX_AGE = UNIVERSE_REFRESH_SECONDS * 3
 
-async def fetch_all_markets() -> list:
-    meta = await get_meta()
-    mids = await get_all_mids()
-    if not meta:
-        return []
-    universe = meta.get("universe", [])
-    asset_ctxs = meta.get("assetCtxs", [])
-    markets = []
-    for i, m in enumerate(universe):
+_UNIVERSE = {"markets": {}, "mids": {}, "fetched_at": 0.0}
+_universe_lock = asyncio.Lock()
+
+
+def _build_universe(meta: dict, asset_ctxs: list) -> dict:
+    markets, mids = {}, {}
+    for i, m in enumerate(meta.get("universe", [])):
         coin = m.get("name", "")
+        if not coin:
+            continue
         ctx = asset_ctxs[i] if i < len(asset_ctxs) else {}
-        markets.append(
-            {
-                "coin": coin,
-                "price": float(mids.get(coin, 0) or 0),
-                "sz_decimals": m.get("szDecimals", 5),
-                "max_leverage": m.get("maxLeverage", 50),
-                "only_isolated": m.get("onlyIsolated", False),
-                "funding_rate": float(ctx.get("funding", 0) or 0),
-                "day_volume": float(ctx.get("dayNtlVlm", 0) or 0),
-                "open_interest": float(ctx.get("openInterest", 0) or 0),
-            }
-        )
-    return sorted(markets, key=lambda x: x["coin"])
+        price = float(ctx.get("midPx") or ctx.get("markPx") or 0)
+        mids[coin] = price
+        markets[coin.upper()] = {
+            "coin": coin,
+            "index": i,
+            "price": price,
+            "mark_price": float(ctx.get("markPx", 0) or 0),
+            "sz_decimals": m.get("szDecimals", 5),
+            "max_leverage": m.get("maxLeverage", 50),
+            "only_isolated": m.get("onlyIsolated", False),
+            "funding_rate": float(ctx.get("funding", 0) or 0),
+            "day_volume": float(ctx.get("dayNtlVlm", 0) or 0),
+            "open_interest": float(ctx.get("openInterest", 0) or 0),
+        }
+    return {"markets": markets, "mids": mids}
+
+
+async def refresh_universe() -> dict:
+    """Fetch meta + asset contexts (one POST) and swap in a new snapshot.
+
+    On failure the previous snapshot is kept.
+    """
+    result = await get_meta_and_asset_ctxs()
+    if not result:
+        return _UNIVERSE
+    meta, asset_ctxs = result[0] or {}, result[1] or []
+    built = _build_universe(meta, asset_ctxs)
+    if built["markets"]:
+        _UNIVERSE.update(built, fetched_at=time.monotonic())
+    return _UNIVERSE
+
+
+async def get_universe() -> dict:
+    """Current snapshot; refreshes inline only if the job has fallen behind."""
+    if time.monotonic() - _UNIVERSE["fetched_at"] > UNIVERSE_MAX_AGE:
+        async with _universe_lock:
+            if time.monotonic() - _UNIVERSE["fetched_at"] > UNIVERSE_MAX_AGE:
+                await refresh_universe()
+    return _UNIVERSE
+
+
+async def refresh_universe_job(context) -> None:
+    try:
+        async with _universe_lock:
+            await refresh_universe()
+    except Exception as e:
+        log.error("HL universe refresh error: %s", e)
+
+
+async def get_market(coin: str) -> dict:
+    universe = await get_universe()
+    return universe["markets"].get((coin or "").upper(), {})
+
+
+async def get_mids() -> dict:
+    universe = await get_universe()
+    return universe["mids"]
+
+
+async def fetch_all_markets() -> list:
+    universe = await get_universe()
+    return sorted(universe["markets"].values(), key=lambda x: x["coin"])
 
 
 async def get_market_price(coin: str) -> float:
-    mids = await get_all_mids()
+    mids = await get_mids()
     return float(mids.get(coin, 0) or 0)
 
 
@@ -69,14 +125,5 @@ async def get_order_book_summary(coin: str) -> dict:
 
 
 async def get_funding_rates() -> dict:
-    meta = await get_meta()
-    if not meta:
-        return {}
-    universe = meta.get("universe", [])
-    asset_ctxs = meta.get("assetCtxs", [])
-    rates = {}
-    for i, ctx in enumerate(asset_ctxs):
-        if i >= len(universe):
-            break
-        rates[universe[i].get("name", "")] = float(ctx.get("funding", 0) or 0)
-    return rates
+    universe = await get_universe()
+    return {m["coin"]: m["funding_rate"] for m in universe["markets"].values()}
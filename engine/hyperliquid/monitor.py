@@ -4,6 +4,7 @@ from datetime import datetime, timedelta, timezone
 
 import db
 from config import CHAT_ID, HL_ADDRESS
+from engine import job_metrics
 from engine.hyperliquid.account_reader import (
     fetch_account_summary,
     fetch_open_orders_parsed,
@@ -26,6 +27,7 @@ async def _run_monitor_inner(context) -> None:
         return
 
     db.upsert_hl_account(summary)
+    job_metrics.record_items(len(positions))
     for pos in positions:
         db.upsert_hl_position(HL_ADDRESS, pos)
 
@@ -188,6 +190,7 @@ async def run_hl_monitor(context) -> None:
     try:
         await asyncio.wait_for(_run_monitor_inner(context), timeout=60)
     except asyncio.TimeoutError:
+        job_metrics.record_timeout()
         log.warning("HL monitor timed out after 60 seconds")
     except Exception as e:
         log.error("HL monitor fetch error: %s", e)
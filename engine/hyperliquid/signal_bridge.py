@@ -16,7 +16,7 @@ async def enrich_signal_with_hl_plan(signal: dict) -> dict:
             return signal
 
         signal["hl_available"] = True
-        signal["hl_market"] = market
+        signal["hl_market"] = dict(market)
 
         account_value = 0.0
         if HL_ADDRESS:
@@ -25,7 +25,7 @@ async def enrich_signal_with_hl_plan(signal: dict) -> dict:
             summary = await fetch_account_summary(HL_ADDRESS)
             account_value = summary.get("account_value", 0)
 
-        signal["hl_plan"] = await generate_hl_trade_plan(signal, account_value)
+        signal["hl_plan"] = await generate_hl_trade_plan(signal, account_value, market)
     except Exception as e:
         log.error("HL signal bridge error %s: %s", signal.get("pair", ""), e)
         signal["hl_available"] = False
@@ -1,6 +1,6 @@
 import logging
 
-from engine.hyperliquid.market_data import fetch_all_markets, get_market_price, get_order_book_summary
+from engine.hyperliquid.market_data import get_market, get_order_book_summary
 
 log = logging.getLogger(__name__)
 
@@ -14,24 +14,20 @@ async def coin_from_pair(pair: str) -> str:
 
 async def get_hl_market_for_pair(pair: str) -> dict:
     coin = await coin_from_pair(pair)
-    markets = await fetch_all_markets()
-    for market in markets:
-        if market["coin"].upper() == coin.upper():
-            return market
-    return {}
+    return await get_market(coin)
 
 
-async def generate_hl_trade_plan(signal: dict, account_value: float = 0) -> dict:
+async def generate_hl_trade_plan(signal: dict, account_value: float = 0, market: dict | None = None) -> dict:
     pair = signal.get("pair", "")
     direction = signal.get("direction", "Bullish")
     side = "Long" if "bull" in str(direction).lower() else "Short"
 
     coin = await coin_from_pair(pair)
-    market = await get_hl_market_for_pair(pair)
+    market = market or await get_hl_market_for_pair(pair)
     if not market:
         return {"success": False, "error": f"{coin} not available on Hyperliquid. Check pair name."}
 
-    mark_price = await get_market_price(coin)
+    mark_price = float(market.get("price", 0) or 0)
     if mark_price <= 0:
         return {"success": False, "error": "Could not fetch mark price"}
 
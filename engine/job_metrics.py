@@ -0,0 +1,380 @@
+"""Scheduled-job instrumentation.
+
+Every job registered in main.py runs through ``instrument()``, which records
+per-job run duration, timeouts, errors, overlapping invocations, scheduler
+skips, items processed and outbound HTTP calls; jobs scheduled elsewhere use
+the ``instrumented()`` decorator. Event-loop lag is sampled by a background
+task. Numbers are exposed as Prometheus text on a local endpoint and
+summarised by the /perf command. Subsystems add their own metric blocks with
+``register_metrics()``; a block that fails is skipped, not the endpoint.
+"""
+
+import asyncio
+import contextvars
+import functools
+import logging
+import time
+
+log = logging.getLogger(__name__)
+
+LAG_SAMPLE_INTERVAL = 1.0
+LAG_WINDOW = 300
+
+JOB_STATS: dict[str, dict] = {}
+LOOP_LAG = {"last_ms": 0.0, "max_ms": 0.0, "samples": []}
+
+_current_run: contextvars.ContextVar = contextvars.ContextVar("job_run", default=None)
+_active: dict[str, int] = {}
+_tick_hooks: list = []
+_metric_blocks: list = []
+_http_installed = {"done": False}
+
+
+def _stats(name: str) -> dict:
+    st = JOB_STATS.get(name)
+    if st is None:
+        st = {
+            "runs": 0,
+            "errors": 0,
+            "timeouts": 0,
+            "overlaps": 0,
+            "skips": 0,
+            "items": 0,
+            "http_calls": 0,
+            "total_s": 0.0,
+            "last_s": 0.0,
+            "max_s": 0.0,
+            "last_items": 0,
+            "last_http_calls": 0,
+            "last_finished": 0.0,
+            "running": 0,
+        }
+        JOB_STATS[name] = st
+    return st
+
+
+def record_items(n: int = 1) -> None:
+    """Add ``n`` processed items to the job run in the current context."""
+    run = _current_run.get()
+    if run is not None:
+        run["items"] += int(n)
+
+
+def record_timeout() -> None:
+    """Mark the current run as timed out (for jobs that enforce their own deadline)."""
+    run = _current_run.get()
+    if run is not None:
+        run["timed_out"] = True
+
+
+def _count_http() -> None:
+    run = _current_run.get()
+    if run is not None:
+        run["http_calls"] += 1
+
+
+def install_http_counters() -> None:
+    """Count outbound httpx/requests calls against the job run that made them."""
+    if _http_installed["done"]:
+        return
+    _http_installed["done"] = True
+
+    try:
+        import httpx
+
+        async_send = httpx.AsyncClient.send
+        sync_send = httpx.Client.send
+
+        @functools.wraps(async_send)
+        async def _async_send(self, *args, **kwargs):
+            _count_http()
+            return await async_send(self, *args, **kwargs)
+
+        @functools.wraps(sync_send)
+        def _sync_send(self, *args, **kwargs):
+            _count_http()
+            return sync_send(self, *args, **kwargs)
+
+        httpx.AsyncClient.send = _async_send
+        httpx.Client.send = _sync_send
+    except ImportError:
+        pass
+
+    try:
+        import requests
+
+        req_send = requests.Session.send
+
+        @functools.wraps(req_send)
+        def _req_send(self, *args, **kwargs):
+            _count_http()
+            return req_send(self, *args, **kwargs)
+
+        requests.Session.send = _req_send
+    except ImportError:
+        pass
+
+
+def on_tick(hook) -> None:
+    """Run ``hook()`` at the start of every instrumented job run."""
+    if hook not in _tick_hooks:
+        _tick_hooks.append(hook)
+
+
+def instrument(name: str, fn, timeout: float | None = None, allow_overlap: bool = False):
+    """Wrap a job-queue callback with run accounting.
+
+    An invocation that arrives while the previous run is still in progress is
+    counted as an overlap and, unless ``allow_overlap`` is set, dropped.
+    ``timeout`` optionally enforces a deadline around the whole run.
+    """
+
+    @functools.wraps(fn)
+    async def _job(context):
+        st = _stats(name)
+        if _active.get(name, 0):
+            st["overlaps"] += 1
+            if not allow_overlap:
+                st["skips"] += 1
+                log.warning("job %s still running — skipping this tick", name)
+                return None
+
+        for hook in _tick_hooks:
+            try:
+                hook()
+            except Exception as e:
+                log.debug("tick hook %s failed: %s", getattr(hook, "__name__", hook), e)
+
+        run = {"items": 0, "http_calls": 0, "timed_out": False}
+        token = _current_run.set(run)
+        _active[name] = _active.get(name, 0) + 1
+        st["running"] = _active[name]
+        started = time.perf_counter()
+        try:
+            if timeout:
+                return await asyncio.wait_for(fn(context), timeout=timeout)
+            return await fn(context)
+        except asyncio.TimeoutError:
+            # Only our own deadline counts as a timeout; a TimeoutError the job
+            # raised itself is an ordinary failure.
+            if not timeout or time.perf_counter() - started < timeout:
+                st["errors"] += 1
+                raise
+            run["timed_out"] = True
+            log.warning("job %s timed out after %ss", name, timeout)
+        except Exception:
+            st["errors"] += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            _current_run.reset(token)
+            _active[name] -= 1
+            st["running"] = _active[name]
+            st["runs"] += 1
+            st["total_s"] += elapsed
+            st["last_s"] = elapsed
+            st["max_s"] = max(st["max_s"], elapsed)
+            st["items"] += run["items"]
+            st["http_calls"] += run["http_calls"]
+            st["last_items"] = run["items"]
+            st["last_http_calls"] = run["http_calls"]
+            st["last_finished"] = time.time()
+            if run["timed_out"]:
+                st["timeouts"] += 1
+
+    return _job
+
+
+def instrumented(name: str, timeout: float | None = None, allow_overlap: bool = False):
+    """Decorator form of ``instrument()`` for jobs scheduled outside main.py."""
+    return lambda fn: instrument(name, fn, timeout=timeout, allow_overlap=allow_overlap)
+
+
+def register_metrics(block) -> None:
+    """Add ``block()`` (returning Prometheus text lines) to every /metrics render."""
+    if block not in _metric_blocks:
+        _metric_blocks.append(block)
+
+
+def stat_lines(stats: dict, spec, labels: str = "") -> list:
+    """Prometheus lines for ``stats`` from (key, metric, kind, help) tuples."""
+    lines = []
+    for key, metric, kind, help_text in spec:
+        lines.append(f"# HELP bot_{metric} {help_text}")
+        lines.append(f"# TYPE bot_{metric} {kind}")
+        lines.append(f"bot_{metric}{labels} {stats[key]}")
+    return lines
+
+
+def watch_scheduler(job_queue) -> None:
+    """Count ticks the scheduler itself dropped (missed or max-instances)."""
+    try:
+        from apscheduler.events import EVENT_JOB_MAX_INSTANCES, EVENT_JOB_MISSED
+    except ImportError:
+        return
+
+    scheduler = job_queue.scheduler
+
+    def _on_skip(event):
+        job = scheduler.get_job(event.job_id)
+        if job is not None:
+            _stats(job.name)["skips"] += 1
+
+    scheduler.add_listener(_on_skip, EVENT_JOB_MAX_INSTANCES | EVENT_JOB_MISSED)
+
+
+async def _sample_loop_lag() -> None:
+    samples = LOOP_LAG["samples"]
+    while True:
+        started = time.perf_counter()
+        await asyncio.sleep(LAG_SAMPLE_INTERVAL)
+        lag_ms = max(0.0, (time.perf_counter() - started - LAG_SAMPLE_INTERVAL) * 1000)
+        LOOP_LAG["last_ms"] = lag_ms
+        LOOP_LAG["max_ms"] = max(LOOP_LAG["max_ms"], lag_ms)
+        samples.append(lag_ms)
+        if len(samples) > LAG_WINDOW:
+            del samples[: len(samples) - LAG_WINDOW]
+
+
+def loop_lag_summary() -> dict:
+    samples = sorted(LOOP_LAG["samples"])
+    if not samples:
+        return {"last_ms": 0.0, "p50_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+    return {
+        "last_ms": LOOP_LAG["last_ms"],
+        "p50_ms": samples[len(samples) // 2],
+        "p99_ms": samples[min(len(samples) - 1, int(len(samples) * 0.99))],
+        "max_ms": LOOP_LAG["max_ms"],
+    }
+
+
+def render_prometheus() -> str:
+    counters = [
+        ("runs", "job_runs_total", "Completed job runs"),
+        ("errors", "job_errors_total", "Job runs that raised"),
+        ("timeouts", "job_timeouts_total", "Job runs that hit their deadline"),
+        ("overlaps", "job_overlaps_total", "Invocations while the previous run was active"),
+        ("skips", "job_skips_total", "Invocations dropped by the wrapper or scheduler"),
+        ("items", "job_items_total", "Items processed by job runs"),
+        ("http_calls", "job_http_calls_total", "Outbound HTTP calls made by job runs"),
+        ("total_s", "job_duration_seconds_total", "Cumulative job run time"),
+    ]
+    gauges = [
+        ("last_s", "job_last_duration_seconds", "Duration of the last run"),
+        ("max_s", "job_max_duration_seconds", "Longest run seen"),
+        ("running", "job_running", "Runs currently in progress"),
+        ("last_finished", "job_last_finished_timestamp", "Unix time the last run finished"),
+    ]
+    lines = []
+    for kind, metrics in (("counter", counters), ("gauge", gauges)):
+        for key, metric, help_text in metrics:
+            lines.append(f"# HELP bot_{metric} {help_text}")
+            lines.append(f"# TYPE bot_{metric} {kind}")
+            for name, st in sorted(JOB_STATS.items()):
+                lines.append(f'bot_{metric}{{job="{name}"}} {st[key]}')
+
+    for block in list(_metric_blocks):
+        try:
+            lines.extend(block())
+        except Exception as e:
+            log.warning("metrics block %s failed: %s", getattr(block, "__module__", block), e)
+
+    lag = loop_lag_summary()
+    lines.append("# HELP bot_event_loop_lag_ms Event loop scheduling lag")
+    lines.append("# TYPE bot_event_loop_lag_ms gauge")
+    for key in ("last", "p50", "p99", "max"):
+        lines.append(f'bot_event_loop_lag_ms{{stat="{key}"}} {lag[key + "_ms"]:.3f}')
+    return "\n".join(lines) + "\n"
+
+
+def _cache_metrics() -> list:
+    from utils.cache import cache_stats
+
+    caches = cache_stats()
+    lines = []
+    for key, metric, kind, help_text in (
+        ("entries", "cache_entries", "gauge", "Entries held by a bounded cache"),
+        ("bytes", "cache_bytes", "gauge", "Approximate shallow memory of a bounded cache"),
+        ("hits", "cache_hits_total", "counter", "Cache lookups that found a live entry"),
+        ("misses", "cache_misses_total", "counter", "Cache lookups that missed"),
+        ("evictions", "cache_evictions_total", "counter", "Entries evicted for space"),
+        ("expirations", "cache_expirations_total", "counter", "Entries dropped after their TTL"),
+    ):
+        lines.append(f"# HELP bot_{metric} {help_text}")
+        lines.append(f"# TYPE bot_{metric} {kind}")
+        for name, info in caches.items():
+            lines.append(f'bot_{metric}{{cache="{name}"}} {info[key]}')
+    return lines
+
+
+register_metrics(_cache_metrics)
+
+
+async def _serve_metrics(reader, writer) -> None:
+    try:
+        request_line = await asyncio.wait_for(reader.readline(), timeout=5)
+        while True:
+            line = await asyncio.wait_for(reader.readline(), timeout=5)
+            if not line or line in (b"\r\n", b"\n"):
+                break
+        parts = request_line.decode("latin-1").split()
+        if len(parts) >= 2 and parts[1].split("?")[0] == "/metrics":
+            status, body = "200 OK", render_prometheus().encode()
+        else:
+            status, body = "404 Not Found", b"not found\n"
+        writer.write(
+            f"HTTP/1.1 {status}\r\n"
+            "Content-Type: text/plain; version=0.0.4\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: close\r\n\r\n".encode()
+            + body
+        )
+        await writer.drain()
+    except Exception as e:
+        log.debug("metrics request failed: %s", e)
+    finally:
+        writer.close()
+
+
+async def start(app) -> None:
+    """Start the loop-lag sampler and, if configured, the local metrics endpoint."""
+    from config import METRICS_HOST, METRICS_PORT
+
+    install_http_counters()
+    watch_scheduler(app.job_queue)
+    app.bot_data["_loop_lag_task"] = asyncio.get_running_loop().create_task(_sample_loop_lag())
+
+    if not METRICS_PORT:
+        return
+    try:
+        server = await asyncio.start_server(_serve_metrics, METRICS_HOST, METRICS_PORT)
+        app.bot_data["_metrics_server"] = server
+        log.info("✅ Metrics: http://%s:%s/metrics", METRICS_HOST, METRICS_PORT)
+    except OSError as e:
+        log.error("Metrics endpoint failed to bind %s:%s: %s", METRICS_HOST, METRICS_PORT, e)
+
+
+def format_perf() -> str:
+    lag = loop_lag_summary()
+    text = (
+        "⏱ *Job Performance*\n━━━━━━━━━━━━━━━━━━━━━━━━\n"
+        f"Loop lag: {lag['last_ms']:.0f}ms now · p99 {lag['p99_ms']:.0f}ms · max {lag['max_ms']:.0f}ms\n\n"
+    )
+    if not JOB_STATS:
+        return text + "_No job runs recorded yet._"
+
+    for name, st in sorted(JOB_STATS.items()):
+        avg = st["total_s"] / st["runs"] if st["runs"] else 0.0
+        flags = []
+        if st["timeouts"]:
+            flags.append(f"⏰{st['timeouts']}")
+        if st["errors"]:
+            flags.append(f"❌{st['errors']}")
+        if st["overlaps"] or st["skips"]:
+            flags.append(f"⏭{st['overlaps']}/{st['skips']}")
+        text += (
+            f"`{name}`{'  ' + ' '.join(flags) if flags else ''}\n"
+            f"  {st['runs']} runs · last {st['last_s']:.1f}s · avg {avg:.1f}s · max {st['max_s']:.1f}s\n"
+            f"  last: {st['last_items']} items · {st['last_http_calls']} http\n"
+        )
+    return text
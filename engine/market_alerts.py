@@ -7,6 +7,8 @@ and other time-based market events.
 import logging
 from datetime import datetime, timezone, timedelta
 
+from utils.cache import BoundedCache
+
 log = logging.getLogger(__name__)
 
 # ── Session schedule (UTC hours) ──────────────────────────────
@@ -18,10 +20,10 @@ SESSIONS = {
 }
 
 # Track which sessions we've already notified about today
-_session_notified: dict[str, str] = {}
+_session_notified = BoundedCache("session_notified", maxsize=64, ttl=2 * 86400)
 
-# Track last known prices for change detection
-_last_prices: dict[str, float] = {}
+# Alerted (pair, whole-percent move) levels; each level re-arms after 6 hours
+_last_prices = BoundedCache("price_alert_levels", maxsize=256, ttl=6 * 3600)
 
 
 async def check_session_opens(context) -> None:
@@ -30,6 +32,7 @@ async def check_session_opens(context) -> None:
     Sends a Telegram notification when a session opens.
     """
     from config import CHAT_ID
+    from news import CALENDAR
     from telegram import InlineKeyboardButton as IKB, InlineKeyboardMarkup as IKM
 
     now = datetime.now(timezone.utc)
@@ -44,11 +47,18 @@ async def check_session_opens(context) -> None:
         if current_hour == session["open"]:
             _session_notified[notify_key] = today_str
 
+            event_line = ""
+            event = CALENDAR.next_event(int(now.timestamp()), impact="high", horizon_hours=12)
+            if event:
+                mins = max(0, (event["ts"] - int(now.timestamp())) // 60)
+                event_line = f"📅 Next high-impact: {event['country']} {event['title']} in {mins // 60}h{mins % 60:02d}m\n\n"
+
             text = (
                 f"{session['emoji']} *{session['label']} Open*\n"
                 f"━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
                 f"⏰ {now.strftime('%H:%M UTC')}\n"
                 f"Session runs until {session['close']:02d}:00 UTC\n\n"
+                f"{event_line}"
                 f"_Check your setups and watchlist._"
             )
 
@@ -66,9 +76,9 @@ async def check_session_opens(context) -> None:
                 log.error("Session alert error: %s", e)
 
     # Cleanup old entries
-    for k in list(_session_notified.keys()):
+    for k in _session_notified.keys():
         if not k.endswith(today_str):
-            del _session_notified[k]
+            _session_notified.pop(k)
 
 
 async def check_price_changes(context) -> None:
@@ -146,8 +156,3 @@ async def check_price_changes(context) -> None:
 
     except Exception as e:
         log.error("Price change monitor error: %s", e)
-
-    # Cleanup old price alerts (reset every 6 hours)
-    now = datetime.now(timezone.utc)
-    if now.hour % 6 == 0 and now.minute < 5:
-        _last_prices.clear()
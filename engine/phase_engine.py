@@ -5,6 +5,7 @@ from telegram import InlineKeyboardButton, InlineKeyboardMarkup
 
 import db
 from config import CHAT_ID, SUPPORTED_PAIRS
+from engine import job_metrics
 import prices as px
 from engine.ict_engine import ConfluenceEngine, FeatureLayer, ModelFactory, create_model as create_ict_model
 from engine.rules import calc_atr, evaluate_rule, get_candles
@@ -13,6 +14,9 @@ log = logging.getLogger(__name__)
 
 PHASE_EXPIRY = {1: 4 * 3600, 2: 1 * 3600, 3: 0, 4: 3 * 900}
 PHASE_THRESHOLDS = {1: 60, 2: 55, 3: 70, 4: 50}
+PHASE_WRITE_CHUNK = 50
+# A write the database keeps rejecting on its own is dropped after this many flushes.
+PHASE_WRITE_ATTEMPTS = 3
 
 
 DEFAULT_PAIRS = ["BTCUSDT", "ETHUSDT", "SOLUSDT", "BNBUSDT", "XAUUSD"]
@@ -49,6 +53,118 @@ def get_directions_for_model(model: dict) -> list[str]:
     return ["bullish", "bearish"]
 
 
+# Writes a failed flush kept; the next cycle replays them onto its rows and commits them first.
+_UNFLUSHED: list = []
+_WRITE_FAILURES: dict = {}  # id(payload) -> flushes in which that write alone failed
+
+
+class PhaseCycle:
+    """
+    Setup-phase rows for one scanner cycle, loaded in bulk.
+    Transitions are queued and committed together by flush().
+    """
+
+    def __init__(self, phases: dict):
+        self.phases = phases
+        self.by_id = {row["id"]: row for row in phases.values()}
+        self.writes = list(_UNFLUSHED)
+        self.kept = 0
+        _UNFLUSHED.clear()
+        for kind, payload in self.writes:
+            self._track(kind, payload)
+
+    def get(self, model_id, pair: str, direction: str):
+        return self.phases.get((str(model_id), pair, direction))
+
+    def _track(self, kind: str, payload: dict) -> None:
+        if kind == "status":
+            row = self.by_id.get(payload["id"])
+            if row is not None:
+                row[f"phase{payload['phase_num']}_status"] = payload["status"]
+                row["overall_status"] = payload["next_status"]
+        else:
+            row = self.by_id.get(payload.get("id"))
+            if row is not None:
+                row.update({k: v for k, v in payload.items() if k != "id"})
+
+    def update_status(self, existing: dict, phase_num: int, status: str, data: dict) -> None:
+        write = db.phase_status_write(existing["id"], phase_num, status, data)
+        self.writes.append(("status", write))
+        self._track("status", write)
+
+    def save(self, phase: dict) -> None:
+        self.writes.append(("save", phase))
+        self._track("save", phase)
+
+    def flush_due(self) -> bool:
+        """A chunk of writes has queued since the last flush attempt."""
+        return len(self.writes) - self.kept >= PHASE_WRITE_CHUNK
+
+    def flush(self) -> None:
+        writes, self.writes = self.writes, []
+        try:
+            failed = db.apply_setup_phase_writes(writes)
+        except Exception as e:
+            # Their alerts are already out, so the transitions must not be dropped.
+            self._keep(writes)
+            log.error("Phase write flush failed, keeping %s writes for retry: %s", len(self.writes), e)
+            return
+        failed_ids = {id(item[1]) for item, _ in failed}
+        for _, payload in writes:
+            if id(payload) not in failed_ids:
+                _WRITE_FAILURES.pop(id(payload), None)
+        retry = []
+        for item, e in failed:
+            kind, payload = item
+            attempts = _WRITE_FAILURES.pop(id(payload), 0) + 1
+            if attempts >= PHASE_WRITE_ATTEMPTS:
+                log.error("Dropping %s write for setup phase %s after %s failed flushes: %s", kind, payload.get("id"), attempts, e)
+                continue
+            _WRITE_FAILURES[id(payload)] = attempts
+            retry.append(item)
+        if retry:
+            self._keep(retry)
+            log.warning("%s phase writes failed, keeping them for retry", len(retry))
+            return
+        self.kept = 0
+        _UNFLUSHED.clear()
+
+    def _keep(self, writes: list) -> None:
+        self.writes = writes + self.writes
+        self.kept = len(self.writes)
+        _UNFLUSHED[:] = self.writes
+
+
+def load_phase_cycle(plan: list) -> PhaseCycle:
+    """Load (and create where missing) the setup_phases rows for every phase-model combination."""
+    phases = db.get_setup_phases_for_models(list({str(model["id"]) for model, _, _ in plan}))
+    missing = [
+        {"model_id": model["id"], "model_name": model["name"], "pair": pair, "direction": direction, "overall_status": "phase1", "check_count": 0}
+        for model, pairs, directions in plan
+        if "features" not in model
+        for pair in pairs
+        for direction in directions
+        if (str(model["id"]), pair, direction) not in phases
+    ]
+    if missing:
+        phases.update(db.create_setup_phases(missing))
+    return PhaseCycle(phases)
+
+
+def _update_phase(cycle, existing: dict, phase_num: int, status: str, data: dict) -> None:
+    if cycle is None:
+        db.update_phase_status(existing["id"], phase_num, status, data)
+    else:
+        cycle.update_status(existing, phase_num, status, data)
+
+
+def _save_phase(cycle, phase: dict) -> None:
+    if cycle is None:
+        db.save_setup_phase(phase)
+    else:
+        cycle.save(phase)
+
+
 async def passes_volatility_gate(pair: str, timeframe: str, cache: dict) -> bool:
     candles = await get_candles(pair, timeframe, 20, cache)
     if not candles or len(candles) < 2:
@@ -126,6 +242,7 @@ async def run_phase_engine(context):
     try:
         await asyncio.wait_for(_run_phase_engine_inner(context), timeout=240)
     except asyncio.TimeoutError:
+        job_metrics.record_timeout()
         log.warning("phase_engine timed out after 4 minutes")
     except Exception as e:
         log.error(f"phase_engine error: {e}")
@@ -150,25 +267,36 @@ async def _run_phase_engine_inner(context):
 
     log.info("Phase scanner: running %s models", len(models))
     candle_cache = {}
+    plan = []
     for model in models:
-        rules = model.get("rules", [])
-        if not rules:
+        if not model.get("rules", []):
             log.warning("Model '%s' has no rules — skipping", model.get("name"))
             continue
-        for pair in get_pairs_for_model(model):
-            for direction in get_directions_for_model(model):
-                await evaluate_model_phases(context, model, pair, direction, rules, candle_cache)
+        plan.append((model, get_pairs_for_model(model), get_directions_for_model(model)))
+
+    cycle = load_phase_cycle(plan)
+    try:
+        for model, pairs, directions in plan:
+            rules = model.get("rules", [])
+            for pair in pairs:
+                for direction in directions:
+                    await evaluate_model_phases(context, model, pair, direction, rules, candle_cache, cycle)
+                    job_metrics.record_items()
+                    if cycle.flush_due():
+                        cycle.flush()
+    finally:
+        cycle.flush()
     log.info("Phase scanner complete")
 
 
-async def evaluate_model_phases(context, model, pair, direction, rules, candle_cache):
+async def evaluate_model_phases(context, model, pair, direction, rules, candle_cache, cycle=None):
     # Support for new ICT Engine models
     if model.get("features") or "features" in model:
-        await evaluate_ict_model_confluence(context, model, pair, direction, candle_cache)
+        await evaluate_ict_model_confluence(context, model, pair, direction, candle_cache, cycle)
         return
 
     phase_tfs = model.get("phase_timeframes", {"1": "4h", "2": "1h", "3": "15m", "4": "5m"})
-    existing = db.get_setup_phase(model["id"], pair, direction)
+    existing = cycle.get(model["id"], pair, direction) if cycle else db.get_setup_phase(model["id"], pair, direction)
     if existing is None:
         sid = db.save_setup_phase({"model_id": model["id"], "model_name": model["name"], "pair": pair, "direction": direction, "overall_status": "phase1", "check_count": 0})
         existing = db.get_setup_phase(model["id"], pair, direction) or {"id": sid, "overall_status": "phase1"}
@@ -178,31 +306,31 @@ async def evaluate_model_phases(context, model, pair, direction, rules, candle_c
     if status == "phase1":
         result = await evaluate_phase(1, rules, pair, phase_tfs.get("1", "4h"), candle_cache, direction)
         if result["passed"]:
-            await _complete_phase(context, existing, 1, result, model, pair, direction)
+            await _complete_phase(context, existing, 1, result, model, pair, direction, cycle)
         elif result["invalidated"]:
-            await _invalidate_setup(existing, result)
+            await _invalidate_setup(existing, result, cycle)
     elif status == "phase2":
         if _is_expired(existing, 1):
-            await _reset_to_phase1(existing)
+            await _reset_to_phase1(existing, cycle)
             return
         result = await evaluate_phase(2, rules, pair, phase_tfs.get("2", "1h"), candle_cache, direction)
         if result["passed"]:
-            await _complete_phase(context, existing, 2, result, model, pair, direction)
+            await _complete_phase(context, existing, 2, result, model, pair, direction, cycle)
         elif result["invalidated"]:
-            await _invalidate_setup(existing, result)
+            await _invalidate_setup(existing, result, cycle)
     elif status == "phase3":
         if _is_expired(existing, 2):
-            await _reset_to_phase1(existing)
+            await _reset_to_phase1(existing, cycle)
             return
         result = await evaluate_phase(3, rules, pair, phase_tfs.get("3", "15m"), candle_cache, direction)
         if result["passed"]:
-            await _fire_alert(context, existing, result, model, pair)
+            await _fire_alert(context, existing, result, model, pair, cycle)
     elif status == "phase4":
         result = await evaluate_phase(4, rules, pair, phase_tfs.get("4", "5m"), candle_cache, direction)
-        await _send_phase4_result(context, existing, result, model, pair)
+        await _send_phase4_result(context, existing, result, model, pair, cycle)
 
 
-async def evaluate_ict_model_confluence(context, model: dict, pair: str, direction: str, candle_cache: dict):
+async def evaluate_ict_model_confluence(context, model: dict, pair: str, direction: str, candle_cache: dict, cycle=None):
     """Bridge to the new ICT Engine logic."""
     try:
         ict_model = ModelFactory.create_model(model)
@@ -246,12 +374,12 @@ async def evaluate_ict_model_confluence(context, model: dict, pair: str, directi
                 "confidence": res["confidence_score"]
             }
             
-            existing = db.get_setup_phase(model["id"], pair, direction)
+            existing = cycle.get(model["id"], pair, direction) if cycle else db.get_setup_phase(model["id"], pair, direction)
             if existing is None:
                 sid = db.save_setup_phase({"model_id": model["id"], "model_name": model["name"], "pair": pair, "direction": direction, "overall_status": "phase1"})
                 existing = db.get_setup_phase(model["id"], pair, direction)
             
-            await _fire_alert(context, existing, result, model, pair)
+            await _fire_alert(context, existing, result, model, pair, cycle)
             
     except Exception as e:
         log.error("Error in ICT confluence evaluation for %s: %s", model.get('name'), e, exc_info=True)
@@ -262,16 +390,16 @@ def _is_expired(existing: dict, phase_num: int) -> bool:
     return bool(expiry and datetime.utcnow() > expiry)
 
 
-async def _reset_to_phase1(existing: dict):
-    db.update_phase_status(existing["id"], 1, "pending", {"reset": True})
+async def _reset_to_phase1(existing: dict, cycle=None):
+    _update_phase(cycle, existing, 1, "pending", {"reset": True})
 
 
-async def _invalidate_setup(existing: dict, result: dict):
-    db.update_phase_status(existing["id"], 1, "pending", {"invalidated": True, "reason": result.get("mandatory_failed", [])})
+async def _invalidate_setup(existing: dict, result: dict, cycle=None):
+    _update_phase(cycle, existing, 1, "pending", {"invalidated": True, "reason": result.get("mandatory_failed", [])})
 
 
-async def _complete_phase(context, existing, phase_num, result, model, pair, direction):
-    db.update_phase_status(existing["id"], phase_num, "completed", result)
+async def _complete_phase(context, existing, phase_num, result, model, pair, direction, cycle=None):
+    _update_phase(cycle, existing, phase_num, "completed", result)
     
     expires = (datetime.now(timezone.utc) + timedelta(hours=24)).isoformat()
     db.save_pending_signal({
@@ -293,13 +421,13 @@ async def _complete_phase(context, existing, phase_num, result, model, pair, dir
 
     if phase_num == 1:
         msg = await context.bot.send_message(chat_id=CHAT_ID, text=f"🔭 *Phase 1 Complete — Context Set*\n⚙️ {model['name']} | 🪙 {pair}\n📊 Direction: {direction.upper()}\n✅ {len(result['passed_rules'])} HTF rules passed\n⏳ Watching for Phase 2 (MTF Setup)...", parse_mode="Markdown")
-        db.save_setup_phase({"id": existing["id"], "overall_status": "phase2", "alert_message_id": msg.message_id})
+        _save_phase(cycle, {"id": existing["id"], "overall_status": "phase2", "alert_message_id": msg.message_id})
     elif phase_num == 2:
         msg = await context.bot.send_message(chat_id=CHAT_ID, text=f"🔬 *Phase 2 Complete — Setup Building*\n⚙️ {model['name']} | 🪙 {pair}\n📊 Direction: {direction.upper()}\n✅ Phase 1: HTF Context ✓\n✅ Phase 2: MTF Setup ✓\n⚡ Watching for Phase 3 (LTF Trigger)...", parse_mode="Markdown")
-        db.save_setup_phase({"id": existing["id"], "overall_status": "phase3", "alert_message_id": msg.message_id})
+        _save_phase(cycle, {"id": existing["id"], "overall_status": "phase3", "alert_message_id": msg.message_id})
 
 
-async def _fire_alert(context, existing, result, model, pair):
+async def _fire_alert(context, existing, result, model, pair, cycle=None):
     from telegram import InlineKeyboardButton, InlineKeyboardMarkup
     from engine import get_session
     from engine.correlation_guard import check_correlation
@@ -423,11 +551,13 @@ async def _fire_alert(context, existing, result, model, pair):
     }
     db.save_pending_signal(signal_payload)
     log.info("Signal phase %s — stored in Pending, no alert sent", signal_payload["phase"])
-    db.save_setup_phase({"id": existing["id"], "overall_status": "phase4", "entry_price": price, "stop_loss": sl, "tp1": tp1, "tp2": tp2, "tp3": tp3})
+    _save_phase(cycle, {"id": existing["id"], "overall_status": "phase4", "entry_price": price, "stop_loss": sl, "tp1": tp1, "tp2": tp2, "tp3": tp3})
     lc_id = db.save_alert_lifecycle({"setup_phase_id": existing["id"], "model_id": model["id"], "pair": pair, "direction": direction, "entry_price": price, "risk_level": risk.get("risk_level"), "risk_amount": risk.get("position", {}).get("risk_amount"), "position_size": risk.get("position", {}).get("position_size"), "leverage": risk.get("position", {}).get("leverage_needed"), "rr_ratio": risk.get("position", {}).get("rr_ratio"), "quality_grade": quality["grade"], "quality_score": quality["score"]})
     context.job_queue.run_once(phase4_check_job, when=900, data={"setup_phase_id": existing["id"], "lifecycle_id": lc_id})
 
 
+# One run_once per alert, so runs may overlap.
+@job_metrics.instrumented("phase4_check", allow_overlap=True)
 async def phase4_check_job(context):
     setup_phase_id = context.job.data.get("setup_phase_id")
     setup = next((x for x in db.get_phases_awaiting_phase4() if x["id"] == setup_phase_id), None)
@@ -437,7 +567,7 @@ async def phase4_check_job(context):
     await _send_phase4_result(context, setup, {"passed": True, "passed_rules": [], "failed_rules": []}, model or {"name": setup["model_id"]}, setup["pair"])
 
 
-async def _send_phase4_result(context, existing, result, model, pair):
+async def _send_phase4_result(context, existing, result, model, pair, cycle=None):
     passed = result.get("passed", False)
     text = "✅ *Phase 4 Confirmed*\nSetup is following through as expected.\nEntry is valid — manage your position." if passed else "❌ *Phase 4 Failed*\nSetup did not follow through.\nConsider reducing position or exiting."
     reply_markup = None
@@ -493,12 +623,13 @@ async def _send_phase4_result(context, existing, result, model, pair):
     if lc:
         db.update_alert_lifecycle(lc["id"], {"phase4_result": "confirmed" if passed else "failed", "phase4_message": text, "phase4_sent_at": datetime.utcnow(), "outcome": "active" if passed else "failed"})
     db.update_model_performance(existing["model_id"])
-    current_regime = db.get_latest_regime()
+    current_regime = db.get_latest_pair_regimes().get(pair) or db.get_latest_regime()
     if current_regime:
         db.update_model_regime_performance(model.get("id", existing["model_id"]), current_regime["regime"], confirmed=passed)
-    db.save_setup_phase({"id": existing["id"], "overall_status": "phase1", "phase1_status": "pending", "phase2_status": "waiting", "phase3_status": "waiting", "phase4_status": "waiting"})
+    _save_phase(cycle, {"id": existing["id"], "overall_status": "phase1", "phase1_status": "pending", "phase2_status": "waiting", "phase3_status": "waiting", "phase4_status": "waiting"})
 
 
+@job_metrics.instrumented("alert_lifecycle")
 async def alert_lifecycle_job(context):
     lifecycles = db.get_active_lifecycles()
     cache = {}
@@ -541,9 +672,12 @@ def calculate_model_grade(perf: dict) -> str:
 
 
 async def model_grading_job(context):
-    for model in db.get_active_models():
-        db.update_model_performance(model["id"])
-        perf = db.get_model_performance(model["id"])
+    models = db.get_active_models()
+    ids = [model["id"] for model in models]
+    db.refresh_model_performance(ids)
+    perfs = db.get_model_performances(ids)
+    for model in models:
+        perf = perfs.get(str(model["id"])) or db.get_model_performance(model["id"])
         grade = calculate_model_grade(perf)
         if grade in ["D", "F"]:
             await context.bot.send_message(chat_id=CHAT_ID, text=f"⚠️ *Model Grade: {grade}*\n⚙️ {model['name']}\nAlerts: {perf['total_alerts']}\nWin rate: {perf['demo_win_rate']:.0%}\nAvg R: {perf['avg_r']:.1f}\n\nConsider reviewing this model's rules.", parse_mode="Markdown")
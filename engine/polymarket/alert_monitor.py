@@ -1,6 +1,7 @@
 import logging
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup
 import db
+from engine import job_metrics
 
 log = logging.getLogger(__name__)
 
@@ -12,6 +13,7 @@ async def run_polymarket_monitor(context) -> None:
     watchlist = db.get_poly_watchlist()
     if not watchlist:
         return
+    job_metrics.record_items(len(watchlist))
 
     for item in watchlist:
         market_id = item["market_id"]
@@ -71,15 +71,22 @@ async def fetch_market_by_id(market_id: str) -> dict:
 
 
 async def fetch_price_history(market_id: str, resolution: str = "1h", limit: int = 48) -> list:
+    """Last ``limit`` points of the CLOB token ``market_id`` at ``resolution``.
+
+    Served from the local price-history store, which only asks the CLOB for
+    points newer than the ones it already holds.
+    """
+    from engine.polymarket import price_history
+
     try:
-        async with httpx.AsyncClient(timeout=10) as c:
-            r = await c.get(
-                f"{POLYMARKET_CLOB}/prices-history",
-                params={"market": market_id, "resolution": resolution, "limit": limit, "fidelity": resolution},
-            )
-            r.raise_for_status()
-            data = r.json()
-        return data.get("history", [])
+        series = await price_history.sync(market_id)
     except Exception as e:
         log.debug(f"Price history {market_id}: {e}")
         return []
+    if not series["ts"]:
+        return []
+    step = price_history.TF_SECONDS.get(resolution, 3600)
+    buckets: dict = {}
+    for ts, price in price_history.window(market_id, series["ts"][-1] - step * limit):
+        buckets[ts // step] = {"t": ts, "p": price}  # last point in each bucket
+    return list(buckets.values())[-limit:]
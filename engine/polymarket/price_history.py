@@ -0,0 +1,231 @@
+"""Local Polymarket price history.
+
+Every CLOB token's price series is kept in the ``poly_price_history`` table
+and, for recently used tokens, in ``SERIES``. ``sync()`` asks the CLOB only
+for points after the newest one already stored (a new token backfills
+``BACKFILL_SECONDS``), so repeat reads cost at most one small request.
+Windowed reads, candles and momentum are then served locally.
+
+Momentum is kept up to date as points are appended. Each series carries a
+running sum and sum of squares of its point-to-point moves over the last
+24h, so volatility is O(1) and the 1h/24h changes are one bisect each.
+"""
+
+import asyncio
+import bisect
+import json
+import logging
+import time
+from collections import deque
+
+import httpx
+import pandas as pd
+
+from config import POLYMARKET_CLOB
+from utils.cache import BoundedCache
+
+log = logging.getLogger(__name__)
+
+CLOB_URL = POLYMARKET_CLOB
+FIDELITY_MINUTES = 5
+BACKFILL_SECONDS = 2 * 86400
+# Points older than this leave memory; Postgres keeps RETAIN_SECONDS.
+MEMORY_SECONDS = 2 * 86400
+RETAIN_SECONDS = 30 * 86400
+# A series read again within this many seconds is not re-synced.
+SYNC_TTL = 60
+SYNC_CONCURRENCY = 6
+VOL_WINDOW = 86400
+
+TF_SECONDS = {"1m": 60, "5m": 300, "15m": 900, "30m": 1800, "1h": 3600, "4h": 14400, "6h": 21600, "1d": 86400}
+
+SERIES = BoundedCache("poly_price_series", maxsize=2000, ttl=6 * 3600)
+HISTORY_STATS = {"syncs": 0, "requests": 0, "points_fetched": 0, "loaded": 0, "errors": 0}
+
+_inflight: dict = {}  # token -> task syncing it
+
+
+def yes_token_id(market: dict) -> str:
+    """The YES outcome's CLOB token id from a Gamma or CLOB market payload."""
+    for t in market.get("tokens") or []:
+        if str(t.get("outcome", "")).lower() == "yes" and t.get("token_id"):
+            return str(t["token_id"])
+    ids = market.get("clobTokenIds")
+    if isinstance(ids, str):
+        try:
+            ids = json.loads(ids)
+        except ValueError:
+            ids = None
+    return str(ids[0]) if ids else ""
+
+
+def _new_series(market_id: str | None) -> dict:
+    return {"market_id": market_id, "ts": [], "price": [], "synced_at": 0.0, "moves": deque(), "sum": 0.0, "sumsq": 0.0}
+
+
+def _append(series: dict, points: list) -> int:
+    """Append points newer than the series tail; returns how many were kept."""
+    ts, price, moves = series["ts"], series["price"], series["moves"]
+    kept = 0
+    for t, p in points:
+        t, p = int(t), float(p)
+        if ts and t <= ts[-1]:
+            continue
+        if price:
+            move = p - price[-1]
+            moves.append((t, move))
+            series["sum"] += move
+            series["sumsq"] += move * move
+        ts.append(t)
+        price.append(p)
+        kept += 1
+    if not kept:
+        return 0
+    while moves and moves[0][0] <= ts[-1] - VOL_WINDOW:
+        _, move = moves.popleft()
+        series["sum"] -= move
+        series["sumsq"] -= move * move
+    cut = bisect.bisect_left(ts, ts[-1] - MEMORY_SECONDS)
+    if cut > len(ts) // 2:
+        # Trim in bulk rather than popping one point per append.
+        del ts[:cut], price[:cut]
+    return kept
+
+
+def _load(token: str, market_id: str | None, now: float) -> dict:
+    import db
+
+    series = _new_series(market_id)
+    try:
+        _append(series, db.get_poly_prices(token, now - BACKFILL_SECONDS))
+        HISTORY_STATS["loaded"] += 1
+    except Exception as e:
+        log.warning("Price history load %s failed: %s", token, e)
+    SERIES.set(token, series)
+    return series
+
+
+async def _fetch(client: httpx.AsyncClient, token: str, start: int, end: int) -> list:
+    HISTORY_STATS["requests"] += 1
+    r = await client.get(
+        f"{CLOB_URL}/prices-history",
+        params={"market": token, "startTs": start, "endTs": end, "fidelity": FIDELITY_MINUTES},
+    )
+    r.raise_for_status()
+    history = r.json().get("history") or []
+    return sorted((int(h["t"]), float(h["p"])) for h in history if h.get("t") is not None and h.get("p") is not None)
+
+
+async def _sync(client: httpx.AsyncClient, token: str, market_id: str | None, now: float) -> dict:
+    import db
+
+    series = SERIES.get(token) or _load(token, market_id, now)
+    if now - series["synced_at"] < SYNC_TTL:
+        return series
+    HISTORY_STATS["syncs"] += 1
+    start = series["ts"][-1] + 1 if series["ts"] else int(now - BACKFILL_SECONDS)
+    try:
+        points = [p for p in await _fetch(client, token, start, int(now)) if p[0] >= start]
+        db.save_poly_prices(token, market_id or series["market_id"], points)
+    except Exception as e:
+        HISTORY_STATS["errors"] += 1
+        log.debug("Price history sync %s: %s", token, e)
+        return series
+    HISTORY_STATS["points_fetched"] += len(points)
+    _append(series, points)
+    series["synced_at"] = now
+    if market_id:
+        series["market_id"] = market_id
+    return series
+
+
+async def sync(token: str, market_id: str | None = None, client: httpx.AsyncClient | None = None) -> dict:
+    """Bring ``token``'s series up to date; concurrent callers share one fetch."""
+    task = _inflight.get(token)
+    if task is None:
+
+        async def _run():
+            try:
+                if client is not None:
+                    return await _sync(client, token, market_id, time.time())
+                async with httpx.AsyncClient(timeout=10) as own:
+                    return await _sync(own, token, market_id, time.time())
+            finally:
+                _inflight.pop(token, None)
+
+        task = _inflight[token] = asyncio.ensure_future(_run())
+    return await asyncio.shield(task)
+
+
+async def sync_many(tokens) -> int:
+    """Sync (token, market_id) pairs over one client; returns how many synced."""
+    pairs = list(dict(tokens).items())
+    if not pairs:
+        return 0
+    sem = asyncio.Semaphore(SYNC_CONCURRENCY)
+    async with httpx.AsyncClient(timeout=10) as client:
+
+        async def _one(token, market_id):
+            async with sem:
+                await sync(token, market_id, client)
+
+        await asyncio.gather(*(_one(t, m) for t, m in pairs))
+    return len(pairs)
+
+
+def window(token: str, start: float, end: float | None = None) -> list:
+    """Locally held (ts, price) points with ``start <= ts <= end``."""
+    series = SERIES.get(token)
+    if not series:
+        return []
+    ts = series["ts"]
+    lo = bisect.bisect_left(ts, start)
+    hi = len(ts) if end is None else bisect.bisect_right(ts, end)
+    return list(zip(ts[lo:hi], series["price"][lo:hi]))
+
+
+def _price_at(series: dict, at: float) -> float | None:
+    i = bisect.bisect_right(series["ts"], at) - 1
+    return series["price"][i] if i >= 0 else None
+
+
+def momentum(token: str) -> dict:
+    """Last price, 1h/24h change and 24h volatility, all in percentage points."""
+    series = SERIES.get(token)
+    if not series or not series["ts"]:
+        return {}
+    last_ts, last = series["ts"][-1], series["price"][-1]
+    out = {"price": round(last * 100, 2), "last_ts": last_ts, "points": len(series["ts"])}
+    for key, span in (("change_1h", 3600), ("change_24h", 86400)):
+        then = _price_at(series, last_ts - span)
+        out[key] = round((last - then) * 100, 2) if then is not None else None
+    n = len(series["moves"])
+    if n >= 2:
+        mean = series["sum"] / n
+        variance = max(series["sumsq"] / n - mean * mean, 0.0)
+        out["volatility_24h"] = round(variance**0.5 * 100, 3)
+    else:
+        out["volatility_24h"] = None
+    return out
+
+
+def candles(token: str, tf: str = "1h", bars: int = 200) -> pd.DataFrame:
+    """OHLCV frame (``timestamp`` in ms, zero volume) of the last ``bars`` buckets."""
+    step = TF_SECONDS.get(tf, 3600)
+    series = SERIES.get(token)
+    if not series or not series["ts"]:
+        return pd.DataFrame(columns=["timestamp", "open", "high", "low", "close", "volume"])
+    points = window(token, series["ts"][-1] - step * bars)
+    df = pd.DataFrame(points, columns=["ts", "price"])
+    df["bucket"] = df["ts"] // step * step
+    out = df.groupby("bucket")["price"].agg(open="first", high="max", low="min", close="last").reset_index()
+    out["timestamp"] = out.pop("bucket") * 1000
+    out["volume"] = 0.0
+    return out[["timestamp", "open", "high", "low", "close", "volume"]].tail(bars).reset_index(drop=True)
+
+
+def prune_history(now: float | None = None) -> int:
+    """Drop stored points older than ``RETAIN_SECONDS``; returns rows deleted."""
+    import db
+
+    return db.prune_poly_prices((time.time() if now is None else now) - RETAIN_SECONDS)
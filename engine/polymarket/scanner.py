@@ -1,12 +1,46 @@
+"""Polymarket universe scanner.
+
+``run_market_scanner()`` pages through every active Gamma market (a few
+pages in flight at once) and keeps ``_SNAPSHOT``: per market id, the yes
+price, 24h volume and liquidity it was last evaluated at. Active prediction
+models are compiled into range predicates and checked against only the
+markets that are new or have moved past ``PRICE_DELTA`` / ``VOLUME_DELTA`` /
+``LIQUIDITY_DELTA`` since then. Matches are upserted in one statement keyed
+by market id, so an unchanged market is never re-saved; its pending signal
+only has ``expires_at`` pushed back, and one that has expired or been deleted
+is evaluated afresh. Matched signals carry the YES token's momentum from the
+local price-history store.
+"""
+
+import asyncio
 import logging
 from datetime import datetime, timezone
 
 import httpx
+import numpy as np
 
 import db
+from config import POLYMARKET_GAMMA
 
 log = logging.getLogger(__name__)
 
+GAMMA_URL = POLYMARKET_GAMMA
+PAGE_SIZE = 500
+MAX_PAGES = 40
+PAGE_CONCURRENCY = 4
+# Server-side floors; lowered to the loosest active model's minimums.
+SCAN_MIN_LIQUIDITY = 5000
+SCAN_MIN_VOLUME = 10000
+# Re-evaluate once yes moves a point, or volume/liquidity moves 10%.
+PRICE_DELTA = 0.01
+VOLUME_DELTA = 0.10
+LIQUIDITY_DELTA = 0.10
+
+_SNAPSHOT: dict = {}  # market id -> (yes, volume24hr, liquidity) at last evaluation
+_MATCHED: set = set()  # market ids whose last evaluation saved a signal
+_MODELS_KEY = {"key": None}
+SCAN_STATS = {"markets": 0, "pages": 0, "evaluated": 0, "matched": 0, "written": 0, "complete": True}
+
 
 def _score_market(m: dict) -> float:
     """
@@ -63,67 +97,221 @@ def _score_market(m: dict) -> float:
     return min(100, score)
 
 
+def _num(value, default: float = 0.0) -> float:
+    try:
+        return float(value if value is not None else default)
+    except (TypeError, ValueError):
+        return default
+
+
+def _market_values(m: dict) -> tuple:
+    return (
+        _num(m.get("bestAsk") or m.get("yes_bid") or 0.5),
+        _num(m.get("volume24hr")),
+        _num(m.get("liquidity")),
+    )
+
+
+def compile_models(models: list) -> dict:
+    """Active models as column arrays of their yes / volume / liquidity ranges."""
+    return {
+        "ids": [m.get("id") for m in models],
+        "min_yes": np.array([_num(m.get("min_yes_pct"), 0) for m in models]),
+        "max_yes": np.array([_num(m.get("max_yes_pct"), 100) for m in models]),
+        "min_vol": np.array([_num(m.get("min_volume_24h"), 0) for m in models]),
+        "min_liq": np.array([_num(m.get("min_liquidity"), 0) for m in models]),
+    }
+
+
+def match_markets(values: np.ndarray, compiled: dict) -> np.ndarray:
+    """Index of the first model each (yes, vol, liq) row satisfies, or -1."""
+    if not len(values) or not len(compiled["ids"]):
+        return np.full(len(values), -1)
+    yes_pct = values[:, 0:1] * 100
+    hits = (
+        (compiled["min_yes"] <= yes_pct)
+        & (yes_pct <= compiled["max_yes"])
+        & (values[:, 1:2] >= compiled["min_vol"])
+        & (values[:, 2:3] >= compiled["min_liq"])
+    )
+    return np.where(hits.any(axis=1), hits.argmax(axis=1), -1)
+
+
+def _changed(values: tuple, prev: tuple | None) -> bool:
+    if prev is None:
+        return True
+    yes, vol, liq = values
+    return (
+        abs(yes - prev[0]) >= PRICE_DELTA
+        or abs(vol - prev[1]) >= VOLUME_DELTA * max(prev[1], 1.0)
+        or abs(liq - prev[2]) >= LIQUIDITY_DELTA * max(prev[2], 1.0)
+    )
+
+
+async def _fetch_page(client: httpx.AsyncClient, params: dict, offset: int) -> list:
+    resp = await client.get(f"{GAMMA_URL}/markets", params={**params, "limit": PAGE_SIZE, "offset": offset})
+    resp.raise_for_status()
+    data = resp.json()
+    return data if isinstance(data, list) else data.get("markets", [])
+
+
+async def fetch_universe(min_liquidity: float = SCAN_MIN_LIQUIDITY, min_volume: float = SCAN_MIN_VOLUME) -> tuple:
+    """Every active market above the floors; returns (markets, pages, complete).
+
+    Pages are ordered by id so offsets stay stable while the scan runs, and
+    fetched ``PAGE_CONCURRENCY`` at a time until one comes back short. A
+    failed page is skipped and marks the scan incomplete.
+    """
+    params = {
+        "active": "true",
+        "closed": "false",
+        "order": "id",
+        "ascending": "true",
+        "liquidity_min": str(min_liquidity),
+        "volume_num_min": str(min_volume),
+    }
+    markets: dict = {}
+    pages, complete = 0, True
+    async with httpx.AsyncClient(timeout=10.0) as client:
+        while True:
+            if pages >= MAX_PAGES:
+                complete = False
+                log.warning("Market scanner stopped at %s pages", MAX_PAGES)
+                break
+            offsets = [(pages + i) * PAGE_SIZE for i in range(min(PAGE_CONCURRENCY, MAX_PAGES - pages))]
+            results = await asyncio.gather(*(_fetch_page(client, params, o) for o in offsets), return_exceptions=True)
+            pages += len(offsets)
+            last = False
+            for offset, result in zip(offsets, results):
+                if isinstance(result, Exception):
+                    complete = False
+                    log.warning("Market scanner page at offset %s failed: %s", offset, result)
+                    continue
+                for m in result:
+                    mid = str(m.get("id") or m.get("condition_id") or m.get("conditionId") or "")
+                    if mid:
+                        markets[mid] = m
+                last = last or len(result) < PAGE_SIZE
+            if last:
+                break
+    return markets, pages, complete
+
+
+async def _attach_momentum(rows: list) -> None:
+    """Add 1h/24h change and volatility from the price-history store to matched signals."""
+    from engine.polymarket import price_history
+
+    tokens = {}
+    for row in rows:
+        token = price_history.yes_token_id(row["signal_data"])
+        if token:
+            tokens[token] = row["signal_key"]
+            row["signal_data"] = {**row["signal_data"], "yes_token_id": token}
+    try:
+        await price_history.sync_many(tokens.items())
+    except Exception as e:
+        log.warning("Market scanner: price history sync failed: %s", e)
+        return
+    for row in rows:
+        token = row["signal_data"].get("yes_token_id")
+        if token:
+            row["signal_data"]["momentum"] = price_history.momentum(token)
+
+
 async def run_market_scanner() -> list:
     """
-    Fetch markets from Polymarket.
-    Returns empty list on timeout or error.
+    Scan the active Polymarket universe and save model matches.
+    Returns markets by 24h volume; empty list on error.
     """
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            resp = await client.get(
-                "https://gamma-api.polymarket.com/markets",
-                params={
-                    "limit": 25,
-                    "active": "true",
-                    "closed": "false",
-                    "order": "volume24hr",
-                    "ascending": "false",
-                    "tag_slug": "",
-                    "liquidity_min": "5000",
-                    "volume_num_min": "10000",
-                },
-            )
-            resp.raise_for_status()
-            data = resp.json()
-            markets = data if isinstance(data, list) else data.get("markets", [])
-
-            active_models = db.get_active_prediction_models()
-            if active_models:
-                for m in markets:
-                    yes = float(m.get("bestAsk") or m.get("yes_bid") or 0.5)
-                    vol = float(m.get("volume24hr") or 0)
-                    liq = float(m.get("liquidity") or 0)
-                    market_score = _score_market(m)
-                    for model in active_models:
-                        yes_pct = yes * 100
-                        mn = model.get("min_yes_pct", 0)
-                        mx = model.get("max_yes_pct", 100)
-                        min_vol = model.get("min_volume_24h", 0)
-                        min_liq = model.get("min_liquidity", 0)
-                        if mn <= yes_pct <= mx and vol >= min_vol and liq >= min_liq:
-                            try:
-                                db.save_pending_signal(
-                                    {
-                                        "section": "predictions",
-                                        "pair": (m.get("question", "?"))[:80],
-                                        "direction": "YES" if yes_pct >= 50 else "NO",
-                                        "phase": 4,
-                                        "quality_score": market_score,
-                                        "quality_grade": "A" if market_score >= 70 else "B",
-                                        "signal_data": m,
-                                        "status": "pending",
-                                    }
-                                )
-                            except Exception:
-                                pass
-                            break
-            return markets
-    except httpx.TimeoutException:
-        return []
+        models = db.get_active_prediction_models()
+        compiled = compile_models(models)
+        key = tuple(zip(compiled["ids"], *(compiled[k].tolist() for k in ("min_yes", "max_yes", "min_vol", "min_liq"))))
+        if key != _MODELS_KEY["key"]:
+            # Different predicates: every market needs a fresh look.
+            _SNAPSHOT.clear()
+            _MATCHED.clear()
+            _MODELS_KEY["key"] = key
+        min_liq = min([SCAN_MIN_LIQUIDITY, *compiled["min_liq"].tolist()])
+        min_vol = min([SCAN_MIN_VOLUME, *compiled["min_vol"].tolist()])
+        universe, pages, complete = await fetch_universe(min_liq, min_vol)
     except Exception as e:
         log.error("Market scanner: %s", e)
         return []
 
+    unchanged = [mid for mid in _MATCHED if mid in universe and not _changed(_market_values(universe[mid]), _SNAPSHOT.get(mid))]
+    try:
+        alive = db.touch_pending_signals("predictions", unchanged)
+    except Exception as e:
+        log.error("Market scanner: refreshing %s signals failed: %s", len(unchanged), e)
+        alive = set(unchanged)
+    for mid in unchanged:
+        if mid not in alive:
+            # Expired or deleted while the market sat still: evaluate it again.
+            _SNAPSHOT.pop(mid, None)
+            _MATCHED.discard(mid)
+
+    ids, values = [], []
+    for mid, m in universe.items():
+        current = _market_values(m)
+        if _changed(current, _SNAPSHOT.get(mid)):
+            ids.append(mid)
+            values.append(current)
+    first = match_markets(np.array(values, dtype=float).reshape(-1, 3), compiled)
+
+    rows = []
+    for mid, current, model_idx in zip(ids, values, first.tolist()):
+        if model_idx < 0:
+            continue
+        m = universe[mid]
+        market_score = _score_market(m)
+        yes_pct = current[0] * 100
+        rows.append(
+            {
+                "section": "predictions",
+                "signal_key": mid,
+                "pair": (m.get("question") or "?")[:80],
+                "direction": "YES" if yes_pct >= 50 else "NO",
+                "phase": 4,
+                "quality_score": market_score,
+                "quality_grade": "A" if market_score >= 70 else "B",
+                "signal_data": m,
+                "status": "pending",
+            }
+        )
+    await _attach_momentum(rows)
+    written = 0
+    try:
+        written = db.save_pending_signals(rows)
+    except Exception as e:
+        log.error("Market scanner: saving %s signals failed: %s", len(rows), e)
+    else:
+        for mid, current in zip(ids, values):
+            _SNAPSHOT[mid] = current
+            _MATCHED.discard(mid)
+        _MATCHED.update(row["signal_key"] for row in rows)
+    if complete:
+        for mid in [mid for mid in _SNAPSHOT if mid not in universe]:
+            del _SNAPSHOT[mid]  # closed or fell below the floors
+            _MATCHED.discard(mid)
+
+    SCAN_STATS.update(markets=len(universe), pages=pages, evaluated=len(ids), matched=len(rows), written=written, complete=complete)
+    return sorted(universe.values(), key=lambda m: _num(m.get("volume24hr")), reverse=True)
+
+
+async def run_market_scanner_job(context) -> None:
+    """Scheduled job: incremental scan of the Polymarket universe."""
+    from engine.job_metrics import record_items
+
+    from engine.polymarket.price_history import prune_history
+
+    await run_market_scanner()
+    record_items(SCAN_STATS["evaluated"])
+    try:
+        prune_history()
+    except Exception as e:
+        log.error("Price history prune failed: %s", e)
+
 
 def format_scanner_results(markets: list) -> str:
     if not markets:
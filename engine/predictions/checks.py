@@ -70,14 +70,37 @@ def _resolve_min_score(model: dict[str, Any], features: list[dict[str, Any]]) ->
     return max(threshold, 0.0)
 
 
+async def _stored_ohlcv(market: dict[str, Any], features: list[dict[str, Any]]) -> tuple[dict[str, pd.DataFrame], dict[str, Any]]:
+    """Candles and momentum for the market's YES token from the local price-history store."""
+    from engine.polymarket import price_history
+
+    token = price_history.yes_token_id(market)
+    if not token:
+        return {}, {}
+    await price_history.sync(token, str(market.get("conditionId") or market.get("id") or "") or None)
+    out: dict[str, pd.DataFrame] = {}
+    for tf in {str(f.get("tf", "5m")) for f in features}:
+        frame = price_history.candles(token, tf)
+        if not frame.empty:
+            out[tf] = frame
+    return out, price_history.momentum(token)
+
+
 async def evaluate_market_against_model(market: dict[str, Any], model: dict[str, Any]) -> dict[str, Any]:
-    """Evaluate dynamic ICT model against multi-timeframe OHLCV payload."""
+    """Evaluate dynamic ICT model against multi-timeframe OHLCV payload.
 
+    Markets without an ``ohlcv`` payload are evaluated on candles built from
+    the stored CLOB price history of their YES token.
+    """
+
+    features = _coerce_model_features(model)
     ohlcv = _coerce_ohlcv_payload(market)
+    momentum: dict[str, Any] = {}
+    if not ohlcv and features:
+        ohlcv, momentum = await _stored_ohlcv(market, features)
     if not ohlcv:
         return {"passed": False, "score": 0.0, "grade": "F", "reason": "missing_ohlcv", "triggered_features": []}
 
-    features = _coerce_model_features(model)
     if not features:
         return {"passed": False, "score": 0.0, "grade": "F", "reason": "missing_model_features", "triggered_features": []}
 
@@ -119,4 +142,5 @@ async def evaluate_market_against_model(market: dict[str, Any], model: dict[str,
         "time_span_minutes": confluence["time_span_minutes"],
         "hierarchy_ok": confluence["hierarchy_ok"],
         "directional_ok": confluence["directional_ok"],
+        "momentum": momentum,
     }
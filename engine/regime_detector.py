@@ -1,6 +1,9 @@
+import asyncio
 import logging
 from datetime import date
 
+import numpy as np
+
 import db
 
 log = logging.getLogger(__name__)
@@ -14,87 +17,260 @@ REGIMES = {
 }
 
 
-async def detect_market_regime() -> dict:
-    from engine.rules import get_candles, calc_atr, is_bullish_trend, is_bearish_trend, find_swing_highs, find_swing_lows
+# Lookbacks mirror engine.rules: 14-bar ATR and 20-bar range on the daily,
+# 2-bar swings over the last 20 bars for trend, 3-bar swings over the last 30
+# 4h bars for structure range. Pairs with equal candle counts share one numpy pass.
+D1_LIMIT = 30
+H4_LIMIT = 50
+ATR_PERIOD = 14
+RANGE_BARS = 20
+TREND_BARS = 20
+STRUCTURE_BARS = 30
 
-    cache = {}
-    pair = "BTCUSDT"
-    d1_c = await get_candles(pair, "1d", 30, cache)
-    h4_c = await get_candles(pair, "4h", 50, cache)
-    if not d1_c or not h4_c:
-        return {"regime": "ranging", "label": REGIMES["ranging"], "confidence": 0, "details": {"error": "No data"}, "atr_pct": 0, "range_pct": 0}
-    details = {}
-    atr_d1 = calc_atr(d1_c, period=14)
-    price = d1_c[-1]["close"]
-    atr_pct = atr_d1 / price * 100 if price > 0 else 0
-    details["atr_pct_daily"] = round(atr_pct, 3)
-    recent_20 = d1_c[-20:]
-    range_high = max(c["high"] for c in recent_20)
-    range_low = min(c["low"] for c in recent_20)
-    range_pct = (range_high - range_low) / range_low * 100 if range_low > 0 else 0
-    d1_bull = is_bullish_trend(d1_c)
-    d1_bear = is_bearish_trend(d1_c)
-    h4_bull = is_bullish_trend(h4_c)
-    h4_bear = is_bearish_trend(h4_c)
-    highs = find_swing_highs(h4_c[-30:], lookback=3)
-    lows = find_swing_lows(h4_c[-30:], lookback=3)
-    structure_range = ((highs[-1]["price"] - lows[-1]["price"]) / lows[-1]["price"] * 100) if highs and lows and lows[-1]["price"] > 0 else range_pct
+REGIME_HINTS = {
+    "trending_bull": ["htf_bullish", "bos_bullish", "mss_bullish", "htf_ltf_aligned_bull"],
+    "trending_bear": ["htf_bearish", "bos_bearish", "mss_bearish", "htf_ltf_aligned_bear"],
+    "ranging": ["bullish_ob_present", "bearish_ob_present", "discount_zone", "premium_zone", "ote_zone"],
+    "high_volatility": ["volume_spike", "liquidity_swept_bull", "liquidity_swept_bear", "stop_hunt"],
+    "low_volatility": [],
+}
+
+
+def _stack(candle_sets: dict, min_len: int) -> tuple[list, dict]:
+    """Align per-pair candle lists into (pairs x bars) high/low/close arrays."""
+    usable = [p for p, c in candle_sets.items() if c and len(c) >= min_len]
+    if not usable:
+        return [], {}
+    n = min(len(candle_sets[p]) for p in usable)
+    arrays = {
+        key: np.array([[float(c[key]) for c in candle_sets[p][-n:]] for p in usable], dtype=float)
+        for key in ("high", "low", "close")
+    }
+    return usable, arrays
+
+
+def _swing_mask(x: np.ndarray, lookback: int) -> np.ndarray:
+    """Strict swing highs of ``x`` along axis 1 (pass ``-x`` for swing lows)."""
+    n = x.shape[1]
+    mask = np.zeros(x.shape, dtype=bool)
+    if n < lookback * 2 + 1:
+        return mask
+    core = x[:, lookback : n - lookback]
+    cond = np.ones(core.shape, dtype=bool)
+    for k in range(1, lookback + 1):
+        cond &= core > x[:, lookback - k : n - lookback - k]
+        cond &= core > x[:, lookback + k : n - lookback + k]
+    mask[:, lookback : n - lookback] = cond
+    return mask
+
+
+def _last_swings(mask: np.ndarray, x: np.ndarray, count: int = 2) -> tuple[np.ndarray, np.ndarray]:
+    """Values of the last ``count`` swings per row (oldest first) and a validity mask."""
+    idx = np.where(mask, np.arange(x.shape[1]), -1)
+    last = np.sort(idx, axis=1)[:, -count:]
+    valid = last >= 0
+    values = np.take_along_axis(x, np.clip(last, 0, None), axis=1)
+    return values, valid
+
+
+def _trend(high: np.ndarray, low: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Vectorised is_bullish_trend / is_bearish_trend over every row."""
+    # rules.is_*_trend drop the forming bar, take the last 20, and the swing
+    # finders drop the (new) last bar again before scanning.
+    h = high[:, :-1][:, -TREND_BARS:][:, :-1]
+    l = low[:, :-1][:, -TREND_BARS:][:, :-1]
+    hv, h_ok = _last_swings(_swing_mask(h, 2), h)
+    lv, l_ok = _last_swings(_swing_mask(-l, 2), l)
+    ok = h_ok.all(axis=1) & l_ok.all(axis=1) & (high.shape[1] - 1 >= 10)
+    bull = ok & (hv[:, 1] > hv[:, 0]) & (lv[:, 1] > lv[:, 0])
+    bear = ok & (hv[:, 1] < hv[:, 0]) & (lv[:, 1] < lv[:, 0])
+    return bull, bear
+
+
+def trend_by_pair(candle_sets: dict) -> dict:
+    """(bullish, bearish) per pair, matching rules.is_bullish_trend / is_bearish_trend.
+
+    Pairs are stacked by candle count so every row sees its full history.
+    """
+    result = {p: (False, False) for p in candle_sets}
+    by_len = {}
+    for pair, candles in candle_sets.items():
+        if candles and len(candles) >= 11:
+            by_len.setdefault(len(candles), []).append(pair)
+    for group in by_len.values():
+        pairs, arrays = _stack({p: candle_sets[p] for p in group}, 11)
+        bull, bear = _trend(arrays["high"], arrays["low"])
+        for i, pair in enumerate(pairs):
+            result[pair] = (bool(bull[i]), bool(bear[i]))
+    return result
+
+
+def _classify(atr_pct: float, d1_bull: bool, d1_bear: bool, h4_bull: bool, h4_bear: bool, structure_range: float) -> tuple[str, float]:
     if atr_pct > 3.0:
-        regime, confidence = "high_volatility", min(atr_pct / 5.0, 1.0)
-    elif atr_pct < 0.8:
-        regime, confidence = "low_volatility", min((0.8 - atr_pct) / 0.8, 1.0)
-    elif d1_bull and h4_bull:
-        regime, confidence = "trending_bull", 0.7 + (atr_pct / 10)
-    elif d1_bear and h4_bear:
-        regime, confidence = "trending_bear", 0.7 + (atr_pct / 10)
-    else:
-        regime, confidence = "ranging", max(0, 1.0 - (structure_range / 10))
-    confidence = round(min(confidence, 1.0), 2)
-    return {"regime": regime, "label": REGIMES.get(regime, regime), "confidence": confidence, "atr_pct": atr_pct, "range_pct": range_pct, "details": details}
-
-
-async def apply_regime_to_models(regime: str, context) -> dict:
+        return "high_volatility", min(atr_pct / 5.0, 1.0)
+    if atr_pct < 0.8:
+        return "low_volatility", min((0.8 - atr_pct) / 0.8, 1.0)
+    if d1_bull and h4_bull:
+        return "trending_bull", 0.7 + (atr_pct / 10)
+    if d1_bear and h4_bear:
+        return "trending_bear", 0.7 + (atr_pct / 10)
+    return "ranging", max(0, 1.0 - (structure_range / 10))
+
+
+def _no_data() -> dict:
+    return {"regime": "ranging", "label": REGIMES["ranging"], "confidence": 0, "details": {"error": "No data"}, "atr_pct": 0, "range_pct": 0, "trend": None}
+
+
+def classify_pairs(d1_sets: dict, h4_sets: dict) -> dict:
+    """Regime per pair from shared daily and 4h candle lists.
+
+    Pairs are stacked by (daily, 4h) candle count so every row sees its full
+    history, exactly as if it were classified alone.
+    """
+    result = {p: _no_data() for p in set(d1_sets) | set(h4_sets)}
+    by_len = {}
+    for pair in result:
+        d1, h4 = d1_sets.get(pair), h4_sets.get(pair)
+        if d1 and h4 and len(d1) >= ATR_PERIOD + 2 and len(h4) >= STRUCTURE_BARS:
+            by_len.setdefault((len(d1), len(h4)), []).append(pair)
+    for group in by_len.values():
+        result.update(_classify_group({p: d1_sets[p] for p in group}, {p: h4_sets[p] for p in group}))
+    return result
+
+
+def _classify_group(d1_sets: dict, h4_sets: dict) -> dict:
+    """Regime for pairs that all have the same daily and 4h candle counts."""
+    pairs, d1 = _stack(d1_sets, ATR_PERIOD + 2)
+    h4_pairs, h4 = _stack(h4_sets, STRUCTURE_BARS)
+    h4_rows = [h4_pairs.index(p) for p in pairs]
+    dh, dl, dc = d1["high"], d1["low"], d1["close"]
+    hh, hl = h4["high"][h4_rows], h4["low"][h4_rows]
+
+    ch, cl, cc = dh[:, :-1], dl[:, :-1], dc[:, :-1]
+    prev_close = cc[:, :-1]
+    tr = np.maximum.reduce([
+        ch[:, 1:] - cl[:, 1:],
+        np.abs(ch[:, 1:] - prev_close),
+        np.abs(cl[:, 1:] - prev_close),
+    ])
+    atr = tr[:, -ATR_PERIOD:].sum(axis=1) / ATR_PERIOD
+    price = dc[:, -1]
+    atr_pct = np.where(price > 0, atr / np.where(price > 0, price, 1) * 100, 0.0)
+
+    range_high = dh[:, -RANGE_BARS:].max(axis=1)
+    range_low = dl[:, -RANGE_BARS:].min(axis=1)
+    range_pct = np.where(range_low > 0, (range_high - range_low) / np.where(range_low > 0, range_low, 1) * 100, 0.0)
+
+    d1_bull, d1_bear = _trend(dh, dl)
+    h4_bull, h4_bear = _trend(hh, hl)
+
+    sh = hh[:, -STRUCTURE_BARS:][:, :-1]
+    sl = hl[:, -STRUCTURE_BARS:][:, :-1]
+    last_high, high_ok = _last_swings(_swing_mask(sh, 3), sh, count=1)
+    last_low, low_ok = _last_swings(_swing_mask(-sl, 3), sl, count=1)
+    last_high, last_low = last_high[:, 0], last_low[:, 0]
+    struct_ok = high_ok[:, 0] & low_ok[:, 0] & (last_low > 0)
+    structure_range = np.where(struct_ok, (last_high - last_low) / np.where(last_low > 0, last_low, 1) * 100, range_pct)
+
+    result = {}
+    for i, pair in enumerate(pairs):
+        regime, confidence = _classify(
+            float(atr_pct[i]), bool(d1_bull[i]), bool(d1_bear[i]), bool(h4_bull[i]), bool(h4_bear[i]), float(structure_range[i])
+        )
+        trend = "bullish" if d1_bull[i] and h4_bull[i] else "bearish" if d1_bear[i] and h4_bear[i] else "mixed"
+        result[pair] = {
+            "regime": regime,
+            "label": REGIMES.get(regime, regime),
+            "confidence": round(min(confidence, 1.0), 2),
+            "atr_pct": float(atr_pct[i]),
+            "range_pct": float(range_pct[i]),
+            "trend": trend,
+            "details": {"atr_pct_daily": round(float(atr_pct[i]), 3), "structure_range": round(float(structure_range[i]), 3)},
+        }
+    return result
+
+
+async def detect_pair_regimes(pairs) -> dict:
+    from engine.rules import get_candles
+
+    pairs = list(dict.fromkeys(pairs))
+    cache = {}
+    d1 = await asyncio.gather(*(get_candles(p, "1d", D1_LIMIT, cache) for p in pairs))
+    h4 = await asyncio.gather(*(get_candles(p, "4h", H4_LIMIT, cache) for p in pairs))
+    return classify_pairs(dict(zip(pairs, d1)), dict(zip(pairs, h4)))
+
+
+async def detect_market_regime() -> dict:
+    regimes = await detect_pair_regimes(["BTCUSDT"])
+    return regimes["BTCUSDT"]
+
+
+def _model_pairs(model: dict, all_pairs: list) -> list:
+    pair = str(model.get("pair") or "BTCUSDT").upper()
+    return all_pairs if pair == "ALL" else [pair]
+
+
+def _should_be_active(model: dict, regime: str, perf_map: dict) -> bool:
+    perf = perf_map.get((str(model["id"]), regime))
+    if perf and perf.get("total_alerts", 0) >= 20:
+        return perf.get("confirm_rate", 0) >= 0.35
+    if regime == "low_volatility":
+        return False
+    preferred = REGIME_HINTS.get(regime, [])
+    tags = [r.get("tag", "") or r.get("id", "") for r in model.get("rules", [])]
+    return sum(1 for t in tags if t in preferred) >= 1 or not preferred
+
+
+async def apply_regime_to_models(regimes, context) -> dict:
+    """Activate/deactivate models from the regime of the pairs they trade.
+
+    ``regimes`` maps pair -> regime name; a bare regime string applies to
+    every pair. Pairs without a detected regime fall back to BTCUSDT's.
+    """
+    from engine.phase_engine import get_pairs_for_model
+
+    if isinstance(regimes, str):
+        regimes = {"BTCUSDT": regimes}
+    fallback = regimes.get("BTCUSDT") or next(iter(regimes.values()), "ranging")
+    all_pairs = get_pairs_for_model({"pair": "ALL"})
     models = db.get_all_models()
+    perf_map = db.get_regime_performance_for_models([m["id"] for m in models])
+
     changed = {"activated": [], "deactivated": []}
-    hints = {
-        "trending_bull": ["htf_bullish", "bos_bullish", "mss_bullish", "htf_ltf_aligned_bull"],
-        "trending_bear": ["htf_bearish", "bos_bearish", "mss_bearish", "htf_ltf_aligned_bear"],
-        "ranging": ["bullish_ob_present", "bearish_ob_present", "discount_zone", "premium_zone", "ote_zone"],
-        "high_volatility": ["volume_spike", "liquidity_swept_bull", "liquidity_swept_bear", "stop_hunt"],
-        "low_volatility": [],
-    }
-    preferred = hints.get(regime, [])
+    writes = []
     for model in models:
-        perf = db.get_model_regime_performance(model["id"], regime)
-        rules = model.get("rules", [])
-        tags = [r.get("tag", "") or r.get("id", "") for r in rules]
-        if perf and perf.get("total_alerts", 0) >= 20:
-            should_be_active = perf.get("confirm_rate", 0) >= 0.35
-        elif regime == "low_volatility":
-            should_be_active = False
-        else:
-            overlap = sum(1 for t in tags if t in preferred)
-            should_be_active = overlap >= 1 or not preferred
+        model_regimes = {regimes.get(p, fallback) for p in _model_pairs(model, all_pairs)}
+        should_be_active = any(_should_be_active(model, r, perf_map) for r in model_regimes)
         currently_active = str(model.get("status", "inactive")) == "active"
         regime_managed = bool(model.get("regime_managed"))
         if should_be_active and not currently_active and regime_managed:
-            db.set_model_active(model["id"], True, regime_managed=False)
+            writes.append((model["id"], True, False))
             changed["activated"].append(model["name"])
         elif not should_be_active and currently_active:
-            db.set_model_active(model["id"], False, regime_managed=True)
+            writes.append((model["id"], False, True))
             changed["deactivated"].append(model["name"])
+    db.set_models_active(writes)
     return changed
 
 
 async def run_regime_detection(context):
-    from config import CHAT_ID
+    from config import CHAT_ID, SUPPORTED_PAIRS
 
     try:
-        regime_data = await detect_market_regime()
-        regime = regime_data["regime"]
-        db.save_market_regime({"regime_date": date.today().isoformat(), "regime": regime, "confidence": regime_data["confidence"], "btc_atr_pct": regime_data["atr_pct"], "range_size": regime_data["range_pct"], "details": regime_data["details"]})
-        changes = await apply_regime_to_models(regime, context)
-        text = f"🌐 *Market Regime Detected*\n━━━━━━━━━━━━━━━━━━━━━━━━\nRegime:     {regime_data['label']}\nConfidence: {regime_data['confidence']:.0%}\nATR (daily): {regime_data['atr_pct']:.2f}%\n\n"
+        model_pairs = {str(m.get("pair") or "").upper() for m in db.get_all_models()}
+        pairs = ["BTCUSDT", *SUPPORTED_PAIRS, *sorted(p for p in model_pairs if p and p != "ALL")]
+        regimes = await detect_pair_regimes(pairs)
+        today = date.today().isoformat()
+        db.save_pair_regimes(today, regimes)
+
+        btc = regimes["BTCUSDT"]
+        db.save_market_regime({"regime_date": today, "regime": btc["regime"], "confidence": btc["confidence"], "btc_atr_pct": btc["atr_pct"], "btc_trend": btc["trend"], "range_size": btc["range_pct"], "details": btc["details"]})
+        changes = await apply_regime_to_models({p: r["regime"] for p, r in regimes.items()}, context)
+
+        text = "🌐 *Market Regime Detected*\n━━━━━━━━━━━━━━━━━━━━━━━━\n"
+        for pair, r in regimes.items():
+            text += f"{pair}: {r['label']} ({r['confidence']:.0%}, ATR {r['atr_pct']:.2f}%)\n"
+        text += "\n"
         if changes["activated"]:
             text += "*Activated models:*\n" + "\n".join([f"  ✅ {m}" for m in changes["activated"]]) + "\n\n"
         if changes["deactivated"]:
@@ -6,13 +6,19 @@ from datetime import datetime, timedelta, timezone
 import httpx
 import pandas as pd
 
-from config import BINANCE_BASE_URL, CRYPTOPANIC_TOKEN
+from config import BINANCE_BASE_URL, CRYPTOPANIC_FIXTURE, CRYPTOPANIC_TOKEN, NEWS_BLACKOUT_MIN
+from utils.cache import BoundedCache
 
 log = logging.getLogger(__name__)
 
 BINANCE_BASE = f"{BINANCE_BASE_URL.rstrip('/')}/api/v3"
-_GLOBAL_CACHE = {}
 _GLOBAL_CACHE_TTL = 25
+_GLOBAL_CACHE = BoundedCache("candles", maxsize=512, ttl=_GLOBAL_CACHE_TTL)
+
+# Optional async callable (symbol, interval, limit) -> raw Binance kline rows.
+# Used by offline replays in place of the Binance REST endpoint.
+_KLINE_SOURCE = None
+CANDLE_STATS = {"requests": 0, "cache_hits": 0, "fetches": 0}
 
 HTF_MAP = {
     "1m": "5m",
@@ -69,6 +75,12 @@ def get_htf(timeframe: str) -> str:
     return HTF_MAP.get(tf, "4h")
 
 
+def set_kline_source(source) -> None:
+    """Route get_candles fetches through ``source`` instead of Binance; None restores HTTP."""
+    global _KLINE_SOURCE
+    _KLINE_SOURCE = source
+
+
 def _confirmed(candles: list) -> list:
     return candles[:-1] if len(candles) > 1 else candles
 
@@ -80,16 +92,17 @@ async def get_candles(pair: str, timeframe: str, limit: int = 100, cache: dict =
     symbol = _normalize_symbol(pair)
     interval = _normalize_interval(timeframe)
     cache_key = f"{symbol}_{interval}_{limit}"
+    CANDLE_STATS["requests"] += 1
 
     if cache_key in cache:
+        CANDLE_STATS["cache_hits"] += 1
         return cache[cache_key]
 
-    now = time_module.time()
-    if cache_key in _GLOBAL_CACHE:
-        entry = _GLOBAL_CACHE[cache_key]
-        if now - entry["ts"] < _GLOBAL_CACHE_TTL:
-            cache[cache_key] = entry["data"]
-            return entry["data"]
+    cached = _GLOBAL_CACHE.get(cache_key)
+    if cached is not None:
+        CANDLE_STATS["cache_hits"] += 1
+        cache[cache_key] = cached
+        return cached
 
     url = f"{BINANCE_BASE}/klines"
     params = {
@@ -98,18 +111,22 @@ async def get_candles(pair: str, timeframe: str, limit: int = 100, cache: dict =
         "limit": min(max(limit + 1, 2), 1000),
     }
 
+    CANDLE_STATS["fetches"] += 1
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            r = await client.get(url, params=params)
-            if r.status_code == 400:
-                log.warning("Binance 400 for %s %s - invalid symbol or interval", symbol, interval)
-                return []
-            if r.status_code == 429:
-                log.warning("Binance rate limit hit - waiting 5s")
-                await asyncio.sleep(5)
-                return []
-            r.raise_for_status()
-            raw = r.json()
+        if _KLINE_SOURCE is not None:
+            raw = await _KLINE_SOURCE(symbol, interval, params["limit"])
+        else:
+            async with httpx.AsyncClient(timeout=10) as client:
+                r = await client.get(url, params=params)
+                if r.status_code == 400:
+                    log.warning("Binance 400 for %s %s - invalid symbol or interval", symbol, interval)
+                    return []
+                if r.status_code == 429:
+                    log.warning("Binance rate limit hit - waiting 5s")
+                    await asyncio.sleep(5)
+                    return []
+                r.raise_for_status()
+                raw = r.json()
     except httpx.TimeoutException:
         log.error("Binance timeout for %s %s", symbol, interval)
         return []
@@ -136,7 +153,7 @@ async def get_candles(pair: str, timeframe: str, limit: int = 100, cache: dict =
         except (IndexError, ValueError, TypeError):
             continue
 
-    _GLOBAL_CACHE[cache_key] = {"ts": now, "data": candles}
+    _GLOBAL_CACHE[cache_key] = candles
     cache[cache_key] = candles
     log.debug("Binance %s %s: %s candles fetched", symbol, interval, len(candles))
 
@@ -852,22 +869,18 @@ async def rule_three_confluences(pair, tf, direction, cache):
 
 
 async def rule_news_clear(pair, tf, direction, cache):
-    if not CRYPTOPANIC_TOKEN:
-        return True
-    try:
-        symbol = _normalize_symbol(pair).replace("USDT", "")
-        async with httpx.AsyncClient(timeout=5) as client:
-            r = await client.get(
-                "https://cryptopanic.com/api/v1/posts/",
-                params={"auth_token": CRYPTOPANIC_TOKEN, "currencies": symbol, "filter": "important", "public": "true"},
-            )
-            r.raise_for_status()
-            data = r.json()
-        cutoff = datetime.now(timezone.utc) - timedelta(minutes=30)
-        recent = [p for p in data.get("results", []) if datetime.fromisoformat(p["created_at"].replace("Z", "+00:00")) > cutoff]
-        return len(recent) == 0
-    except Exception:
+    from news import CALENDAR, NEWS, ensure_currency_news
+
+    if CALENDAR.near(int(time_module.time()), NEWS_BLACKOUT_MIN, currency="USD", impact="high"):
+        return False
+    if not (CRYPTOPANIC_TOKEN or CRYPTOPANIC_FIXTURE):
         return True
+    symbol = _normalize_symbol(pair).replace("USDT", "")
+    # Keeps the symbol in the poller's watch list; the first check reads through.
+    NEWS.watch(symbol)
+    if symbol not in NEWS.currency_fetched:
+        await ensure_currency_news(symbol)
+    return not NEWS.recent(30, currency=symbol, feed="important")
 
 
 async def rule_higher_high_confirmation(pair, tf, direction, cache):
@@ -0,0 +1,155 @@
+"""Session analytics shared by the pre-session checklist and the journal.
+
+Every pair/timeframe a caller needs is fetched in one concurrent pass, Asian
+and London ranges come from epoch-hour masks over stacked numpy arrays, and
+journal rows are written with a single statement, so covering every
+``SUPPORTED_PAIRS`` symbol costs one round of requests rather than one per pair.
+"""
+
+import asyncio
+import logging
+from datetime import date
+
+import numpy as np
+
+log = logging.getLogger(__name__)
+
+CORE_PAIRS = ("BTCUSDT", "ETHUSDT", "SOLUSDT")
+
+# UTC hour windows, [start, end).
+ASIAN_HOURS = (0, 8)
+LONDON_HOURS = (7, 13)
+
+CHECKLIST_PLAN = {"4h": 30, "1d": 20}
+JOURNAL_PLAN = {"1h": 24}
+JOURNAL_MIN_BARS = 8
+KEY_LEVEL_LOOKBACK = 3
+
+
+def session_pairs() -> list:
+    """Core majors followed by any other supported pair, without duplicates."""
+    from config import SUPPORTED_PAIRS
+
+    return list(dict.fromkeys([*CORE_PAIRS, *(str(p).upper() for p in SUPPORTED_PAIRS)]))
+
+
+async def fetch_plan(pairs, plan: dict, cache: dict | None = None) -> dict:
+    """Fetch every (pair, timeframe) in ``plan`` concurrently.
+
+    ``plan`` maps timeframe -> candle limit. Returns {timeframe: {pair: candles}}.
+    """
+    from engine.rules import get_candles
+
+    cache = {} if cache is None else cache
+    pairs = list(dict.fromkeys(pairs))
+    jobs = [(tf, pair) for tf in plan for pair in pairs]
+    results = await asyncio.gather(*(get_candles(pair, tf, plan[tf], cache) for tf, pair in jobs), return_exceptions=True)
+    out = {tf: {} for tf in plan}
+    for (tf, pair), candles in zip(jobs, results):
+        if isinstance(candles, Exception):
+            log.error("Session candles %s %s: %s", pair, tf, candles)
+            candles = []
+        out[tf][pair] = candles or []
+    return out
+
+
+def _pad(candle_sets: dict, pairs: list) -> dict:
+    """(pairs x bars) time/high/low arrays, left-aligned and NaN-padded."""
+    width = max(len(candle_sets[p]) for p in pairs)
+    arrays = {key: np.full((len(pairs), width), np.nan) for key in ("time", "high", "low")}
+    for i, pair in enumerate(pairs):
+        candles = candle_sets[pair]
+        for key, arr in arrays.items():
+            arr[i, : len(candles)] = [float(c[key]) for c in candles]
+    return arrays
+
+
+def _hour_mask(hours: np.ndarray, window: tuple) -> np.ndarray:
+    return (hours >= window[0]) & (hours < window[1])
+
+
+def session_ranges(candle_sets: dict, min_bars: int = JOURNAL_MIN_BARS) -> dict:
+    """Asian range and London sweep per pair from 1h candles.
+
+    Pairs with fewer than ``min_bars`` candles or no Asian-session candle are
+    left out.
+    """
+    pairs = [p for p, c in candle_sets.items() if c and len(c) >= min_bars]
+    if not pairs:
+        return {}
+    a = _pad(candle_sets, pairs)
+    valid = ~np.isnan(a["time"])
+    hours = np.where(valid, (np.nan_to_num(a["time"]) // 3600) % 24, -1)
+    asian = _hour_mask(hours, ASIAN_HOURS) & valid
+    london = _hour_mask(hours, LONDON_HOURS) & valid
+
+    asian_high = np.where(asian, a["high"], -np.inf).max(axis=1)
+    asian_low = np.where(asian, a["low"], np.inf).min(axis=1)
+    london_high = np.where(london, a["high"], -np.inf).max(axis=1)
+    london_low = np.where(london, a["low"], np.inf).min(axis=1)
+    has_asian = asian.any(axis=1)
+    swept_lows = london.any(axis=1) & (london_low < asian_low)
+    swept_highs = london.any(axis=1) & ~swept_lows & (london_high > asian_high)
+
+    out = {}
+    for i, pair in enumerate(pairs):
+        if not has_asian[i]:
+            continue
+        high, low = float(asian_high[i]), float(asian_low[i])
+        out[pair] = {
+            "asian_high": high,
+            "asian_low": low,
+            "asian_range_pts": high - low,
+            "london_swept": "lows" if swept_lows[i] else "highs" if swept_highs[i] else None,
+        }
+    return out
+
+
+def htf_bias(h4_sets: dict, d1_sets: dict) -> dict:
+    """'bullish' / 'bearish' where 4h and 1d trends agree, else None, per pair."""
+    from engine.regime_detector import trend_by_pair
+
+    h4 = trend_by_pair(h4_sets)
+    d1 = trend_by_pair(d1_sets)
+    out = {}
+    for pair in h4_sets:
+        h4_bull, h4_bear = h4.get(pair, (False, False))
+        d1_bull, d1_bear = d1.get(pair, (False, False))
+        if not h4_sets.get(pair) or not d1_sets.get(pair):
+            out[pair] = None
+        elif h4_bull and d1_bull:
+            out[pair] = "bullish"
+        elif h4_bear and d1_bear:
+            out[pair] = "bearish"
+        else:
+            out[pair] = None
+    return out
+
+
+def journal_rows(candle_sets: dict, session_date: str | None = None) -> list:
+    from engine.rules import find_swing_highs, find_swing_lows
+
+    session_date = session_date or date.today().isoformat()
+    rows = []
+    for pair, ranges in session_ranges(candle_sets).items():
+        candles = candle_sets[pair]
+        highs = find_swing_highs(candles, lookback=KEY_LEVEL_LOOKBACK)
+        lows = find_swing_lows(candles, lookback=KEY_LEVEL_LOOKBACK)
+        key_levels = [{"type": "resistance", "price": h["price"]} for h in highs[-3:]] + [{"type": "support", "price": l["price"]} for l in lows[-3:]]
+        rows.append({"session_date": session_date, "session_name": "London", "pair": pair, **ranges, "key_levels": key_levels})
+    return rows
+
+
+async def record_session_data(context=None) -> int:
+    """Journal today's Asian range and London sweep for every session pair."""
+    import db
+
+    try:
+        candles = await fetch_plan(session_pairs(), JOURNAL_PLAN)
+        rows = journal_rows(candles["1h"])
+        if rows:
+            db.save_session_journals(rows)
+        return len(rows)
+    except Exception as exc:
+        log.error("Session journal error: %s", exc)
+        return 0
@@ -2,15 +2,16 @@ from telegram import InlineKeyboardButton, InlineKeyboardMarkup
 
 import db
 
+BIAS_NOTES_SHOWN = 6
+
 
 async def run_pre_session_checklist(context) -> dict:
     from config import CHAT_ID, CRYPTOPANIC_TOKEN
-    from engine.rules import get_candles, is_bullish_trend, is_bearish_trend
+    from engine.session_analytics import CHECKLIST_PLAN, fetch_plan, htf_bias, session_pairs
 
     cache = {}
     settings = db.get_risk_settings()
     tracker = db.get_daily_tracker()
-    pairs = ["BTCUSDT", "ETHUSDT", "SOLUSDT"]
     checks = []
 
     daily_hit = tracker.get("daily_loss_hit", False)
@@ -24,31 +25,24 @@ async def run_pre_session_checklist(context) -> dict:
     checks.append({"label": "Active setups", "ok": len(warm) > 0, "detail": f"{len(warm)} model(s) in active phases" if warm else "No active phases — scanner may need more time"})
 
     clear_bias, bias_notes = 0, []
-    for pair in pairs:
-        try:
-            h4 = await get_candles(pair, "4h", 30, cache)
-            d1 = await get_candles(pair, "1d", 20, cache)
-            if not h4 or not d1:
-                continue
-            h4_bull, h4_bear = is_bullish_trend(h4), is_bearish_trend(h4)
-            d1_bull, d1_bear = is_bullish_trend(d1), is_bearish_trend(d1)
-            if (h4_bull and d1_bull) or (h4_bear and d1_bear):
+    try:
+        candles = await fetch_plan(session_pairs(), CHECKLIST_PLAN, cache)
+        for pair, bias in htf_bias(candles["4h"], candles["1d"]).items():
+            if bias:
                 clear_bias += 1
-                bias_notes.append(f"{pair}: {'bullish' if h4_bull else 'bearish'}")
-        except Exception:
-            pass
+                bias_notes.append(f"{pair}: {bias}")
+    except Exception:
+        pass
+    if len(bias_notes) > BIAS_NOTES_SHOWN:
+        bias_notes = bias_notes[:BIAS_NOTES_SHOWN] + [f"+{len(bias_notes) - BIAS_NOTES_SHOWN} more"]
     checks.append({"label": "HTF bias clarity", "ok": clear_bias >= 1, "detail": ", ".join(bias_notes) if bias_notes else "Mixed signals on all pairs — wait for clarity"})
 
     news_clear, news_note = True, "No major news detected"
     try:
         if CRYPTOPANIC_TOKEN:
-            import httpx
-            from datetime import datetime, timezone, timedelta
-            async with httpx.AsyncClient(timeout=5) as c:
-                r = await c.get("https://cryptopanic.com/api/v1/posts/", params={"auth_token": CRYPTOPANIC_TOKEN, "filter": "important", "public": "true"})
-            data = r.json()
-            cutoff = datetime.now(timezone.utc) - timedelta(minutes=5)
-            recent = [p for p in data.get("results", []) if datetime.fromisoformat(p["created_at"].replace("Z", "+00:00")) > cutoff]
+            from news import NEWS
+
+            recent = NEWS.recent(5, feed="important")
             if recent:
                 news_clear, news_note = False, f"{len(recent)} important news item(s) in last 5 minutes"
     except Exception:
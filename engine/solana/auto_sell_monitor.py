@@ -2,6 +2,7 @@ import asyncio
 import logging
 
 import db
+from engine import job_metrics
 from engine.solana.wallet_reader import get_token_price_usd
 
 log = logging.getLogger(__name__)
@@ -16,6 +17,7 @@ async def _run_once(context):
             cur.execute("SELECT * FROM auto_sell_configs WHERE active=TRUE")
             configs = [dict(r) for r in cur.fetchall()]
 
+    job_metrics.record_items(len(configs))
     for cfg in configs:
         price = await get_token_price_usd(cfg.get("token_address"))
         entry = float(cfg.get("entry_price") or 0)
@@ -83,6 +85,7 @@ async def run_auto_sell_monitor(context):
     try:
         await asyncio.wait_for(_run_once(context), timeout=30)
     except asyncio.TimeoutError:
+        job_metrics.record_timeout()
         db.log_audit(action="auto_sell_monitor_timeout", details={}, success=False, error="timeout")
     except Exception as exc:
         log.error("auto sell monitor failed: %s", exc)
@@ -0,0 +1,223 @@
+"""Batched Solana transaction confirmation.
+
+Executors ``register()`` a signature and await the returned future (or
+call ``wait_for_confirmation()``). One background loop polls every pending
+signature with a single ``getSignatureStatuses`` call per tick, up to
+``MAX_BATCH`` signatures per call. Ticks start at ``TICK_MIN`` when a
+signature arrives or resolves and back off towards ``TICK_MAX`` while
+nothing changes. Each signature has its own deadline.
+
+When ``SOLANA_WS_URL`` is set and ``websockets`` is installed, signatures
+are also sent as ``signatureSubscribe`` on one shared socket, and
+notifications resolve them at once. Polling then drops to
+``WS_POLL_INTERVAL``: it stays on as a safety net for signatures that
+confirmed before their subscription landed, and for socket drops.
+"""
+
+import asyncio
+import json
+import logging
+import time
+
+import httpx
+
+from config import SOLANA_RPC_URL, SOLANA_WS_URL
+from engine.job_metrics import register_metrics, stat_lines
+
+log = logging.getLogger(__name__)
+
+RPC_URL = SOLANA_RPC_URL
+WS_URL = SOLANA_WS_URL
+MAX_BATCH = 256
+TICK_MIN = 0.4
+TICK_MAX = 2.0
+TICK_BACKOFF = 1.5
+WS_POLL_INTERVAL = 5.0
+DEFAULT_DEADLINE = 40.0
+# A processed-only transaction can still be dropped on a fork.
+SETTLED = ("confirmed", "finalized")
+
+CONFIRM_STATS = {"registered": 0, "requests": 0, "polled": 0, "confirmed": 0, "failed": 0, "timeouts": 0, "ws_notifications": 0, "errors": 0}
+
+_pending: dict = {}  # signature -> {"future", "deadline", "subscribed"}
+_state = {"loop": None, "poller": None, "ws": None, "ws_live": False}
+_wake = {"event": None}
+
+
+def _resolve(signature: str, result: dict) -> None:
+    entry = _pending.pop(signature, None)
+    if entry is None or entry["future"].done():
+        return
+    key = "confirmed" if result.get("success") else "failed" if result.get("success") is False else "timeouts"
+    CONFIRM_STATS[key] += 1
+    entry["future"].set_result(result)
+
+
+def _status_result(status: dict) -> dict | None:
+    """Outcome for one ``getSignatureStatuses`` entry; None while still pending."""
+    if not status:
+        return None
+    if status.get("err") is not None:
+        return {"success": False, "error": f"Tx failed: {status['err']}"}
+    if status.get("confirmationStatus") in SETTLED:
+        return {"success": True, "confirmations": status.get("confirmations") or 1, "status": status["confirmationStatus"]}
+    return None
+
+
+def register(signature: str, deadline: float = DEFAULT_DEADLINE) -> asyncio.Future:
+    """Start tracking ``signature``; the future resolves to a confirmation dict."""
+    loop = asyncio.get_running_loop()
+    entry = _pending.get(signature)
+    if entry is not None and not entry["future"].done():
+        entry["deadline"] = max(entry["deadline"], time.monotonic() + deadline)
+        return entry["future"]
+    CONFIRM_STATS["registered"] += 1
+    _pending[signature] = {"future": loop.create_future(), "deadline": time.monotonic() + deadline, "subscribed": False}
+    _ensure_tasks(loop)
+    _wake["event"].set()
+    return _pending[signature]["future"]
+
+
+async def wait_for_confirmation(signature: str, timeout: float = DEFAULT_DEADLINE) -> dict:
+    future = register(signature, timeout)
+    try:
+        # The poller expires the signature at its deadline; this bounds the caller even if it doesn't.
+        return await asyncio.wait_for(asyncio.shield(future), timeout + TICK_MAX)
+    except asyncio.TimeoutError:
+        result = {"success": None, "error": "Confirmation timeout — check Solscan for tx status"}
+        entry = _pending.get(signature)
+        if entry is not None and entry["future"] is future and entry["deadline"] <= time.monotonic():
+            _resolve(signature, result)
+        return result
+
+
+def _ensure_tasks(loop) -> None:
+    if _state.get("loop") is not loop:  # first use, or a new event loop (scripts)
+        _state.update(loop=loop, poller=None, ws=None, ws_live=False)
+        _wake["event"] = asyncio.Event()
+    if _state["poller"] is None or _state["poller"].done():
+        _state["poller"] = loop.create_task(_poll_loop())
+    if WS_URL and (_state["ws"] is None or _state["ws"].done()):
+        _state["ws"] = loop.create_task(_ws_loop())
+
+
+async def _poll_once(client: httpx.AsyncClient) -> int:
+    """One status sweep over every pending signature; returns how many resolved."""
+    signatures = list(_pending)
+    resolved = 0
+    for i in range(0, len(signatures), MAX_BATCH):
+        chunk = signatures[i : i + MAX_BATCH]
+        CONFIRM_STATS["requests"] += 1
+        CONFIRM_STATS["polled"] += len(chunk)
+        try:
+            r = await client.post(
+                RPC_URL,
+                json={"jsonrpc": "2.0", "id": 1, "method": "getSignatureStatuses", "params": [chunk, {"searchTransactionHistory": True}]},
+            )
+            statuses = (r.json().get("result") or {}).get("value") or []
+        except Exception as e:
+            CONFIRM_STATS["errors"] += 1
+            log.debug("getSignatureStatuses for %s signatures failed: %s", len(chunk), e)
+            continue
+        for signature, status in zip(chunk, statuses):
+            result = _status_result(status)
+            if result is not None:
+                _resolve(signature, result)
+                resolved += 1
+    return resolved
+
+
+def _expire(now: float) -> None:
+    for signature in [s for s, e in _pending.items() if e["deadline"] <= now]:
+        _resolve(signature, {"success": None, "error": "Confirmation timeout — check Solscan for tx status"})
+
+
+async def _poll_loop() -> None:
+    # Outer loop: a register() while the client is closing sees this task still
+    # running and starts no poller of its own, so look at _pending again after.
+    while _pending:
+        interval = TICK_MIN
+        next_poll = time.monotonic() + TICK_MIN
+        async with httpx.AsyncClient(timeout=10) as client:
+            while _pending:
+                _wake["event"].clear()
+                delay = next_poll - time.monotonic()
+                if delay > 0:
+                    try:
+                        await asyncio.wait_for(_wake["event"].wait(), timeout=delay)
+                        # New signature (or the socket dropped): look again soon.
+                        interval = TICK_MIN
+                        next_poll = min(next_poll, time.monotonic() + TICK_MIN)
+                        continue
+                    except asyncio.TimeoutError:
+                        pass
+                resolved = await _poll_once(client)
+                _expire(time.monotonic())
+                interval = TICK_MIN if resolved else min(interval * TICK_BACKOFF, TICK_MAX)
+                next_poll = time.monotonic() + (WS_POLL_INTERVAL if _state["ws_live"] else interval)
+
+
+async def _ws_loop() -> None:
+    try:
+        import websockets
+    except ImportError:
+        log.info("websockets not installed; confirming Solana transactions by polling only")
+        return
+    while _pending:
+        subscriptions: dict = {}  # subscription id -> signature
+        requests: dict = {}  # request id -> signature
+        try:
+            async with websockets.connect(WS_URL, ping_interval=20) as ws:
+                _state["ws_live"] = True
+                for entry in _pending.values():
+                    entry["subscribed"] = False
+                next_id = 1
+                while _pending:
+                    for signature, entry in list(_pending.items()):
+                        if not entry["subscribed"]:
+                            entry["subscribed"] = True
+                            requests[next_id] = signature
+                            await ws.send(json.dumps({"jsonrpc": "2.0", "id": next_id, "method": "signatureSubscribe", "params": [signature, {"commitment": "confirmed"}]}))
+                            next_id += 1
+                    try:
+                        message = json.loads(await asyncio.wait_for(ws.recv(), timeout=TICK_MAX))
+                    except asyncio.TimeoutError:
+                        continue
+                    if "id" in message and message["id"] in requests:
+                        subscriptions[message.get("result")] = requests.pop(message["id"])
+                    elif message.get("method") == "signatureNotification":
+                        params = message.get("params") or {}
+                        signature = subscriptions.pop(params.get("subscription"), None)
+                        value = (params.get("result") or {}).get("value") or {}
+                        if signature:
+                            CONFIRM_STATS["ws_notifications"] += 1
+                            if value.get("err") is not None:
+                                _resolve(signature, {"success": False, "error": f"Tx failed: {value['err']}"})
+                            else:
+                                _resolve(signature, {"success": True, "confirmations": 1, "status": "confirmed"})
+        except Exception as e:
+            CONFIRM_STATS["errors"] += 1
+            log.warning("Solana signature socket dropped: %s", e)
+            await asyncio.sleep(TICK_MAX)
+        finally:
+            _state["ws_live"] = False
+            _wake["event"].set()  # let the poller pick up the slack
+
+
+def pending_count() -> int:
+    return len(_pending)
+
+
+def _metrics() -> list:
+    return stat_lines(CONFIRM_STATS, (
+        ("requests", "sol_confirm_requests_total", "counter", "Batched getSignatureStatuses calls"),
+        ("polled", "sol_confirm_polled_total", "counter", "Signatures carried by those calls"),
+        ("confirmed", "sol_confirm_confirmed_total", "counter", "Transactions confirmed"),
+        ("failed", "sol_confirm_failed_total", "counter", "Transactions that landed with an error"),
+        ("timeouts", "sol_confirm_timeouts_total", "counter", "Signatures that hit their deadline"),
+        ("ws_notifications", "sol_confirm_ws_notifications_total", "counter", "Confirmations delivered by signatureSubscribe"),
+        ("errors", "sol_confirm_errors_total", "counter", "Failed status calls and socket drops"),
+    )) + stat_lines({"pending": pending_count()}, (("pending", "sol_confirm_pending", "gauge", "Signatures awaiting confirmation"),))
+
+
+register_metrics(_metrics)
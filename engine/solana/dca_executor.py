@@ -4,6 +4,7 @@ from datetime import datetime, timedelta, timezone
 
 import db
 from engine.solana.wallet_reader import get_token_price_usd
+from security.limits import reserve_trade
 
 log = logging.getLogger(__name__)
 
@@ -15,6 +16,7 @@ async def _run_once(context):
             cur.execute("SELECT * FROM dca_orders WHERE status='active' AND next_order_at<=NOW() AND orders_placed < num_orders")
             orders = [dict(r) for r in cur.fetchall()]
 
+    wallet = db.get_sol_wallet_address() if orders else None
     for order in orders:
         price = await get_token_price_usd(order.get("token_address"))
         if float(order.get("min_price") or 0) and price < float(order["min_price"]):
@@ -22,16 +24,29 @@ async def _run_once(context):
         if float(order.get("max_price") or 0) and price > float(order["max_price"]):
             continue
 
+        # DCA has its own trade and spend budget so it never eats into the one stop-loss sells need.
+        reservation, failures = reserve_trade(
+            "solana", float(order.get("per_order") or 0), f"solana:dca:{order['id']}", user_id="dca", wallet=wallet, scope="dca"
+        )
+        if reservation is None:
+            db.log_audit(action="dca_blocked", details={"order_id": order["id"], "reasons": failures}, success=False, error="; ".join(failures))
+            continue
+
         placed = int(order.get("orders_placed") or 0) + 1
         status = "completed" if placed >= int(order.get("num_orders") or 1) else "active"
         next_at = now + timedelta(seconds=int(order.get("interval_secs") or 60))
-        with db.get_conn() as conn:
-            with conn.cursor() as cur:
-                cur.execute(
-                    "UPDATE dca_orders SET orders_placed=%s,next_order_at=%s,status=%s WHERE id=%s",
-                    (placed, next_at, status, order["id"]),
-                )
-            conn.commit()
+        try:
+            with db.get_conn() as conn:
+                with conn.cursor() as cur:
+                    cur.execute(
+                        "UPDATE dca_orders SET orders_placed=%s,next_order_at=%s,status=%s WHERE id=%s",
+                        (placed, next_at, status, order["id"]),
+                    )
+                conn.commit()
+        except Exception as exc:
+            reservation.release()
+            log.error("dca order %s update failed: %s", order["id"], exc)
+            continue
         db.log_audit(action="dca_fill", details={"order_id": order["id"], "order": placed, "total": order.get("num_orders")}, success=True)
 
 
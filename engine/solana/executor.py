@@ -42,6 +42,13 @@ async def execute_jupiter_swap(plan: dict) -> dict:
 
     import db
     from config import HELIUS_API_KEY
+    from engine.solana.jupiter_quotes import fresh_raw_quote
+
+    try:
+        # Reuse the preview quote unless it has aged past its slot bound.
+        raw_quote = await fresh_raw_quote(raw_quote)
+    except Exception as e:
+        return {"success": False, "error": f"Jupiter requote failed: {e}"}
     mev_protection = db.get_user_settings().get("mev_protection", True)
     swap_payload = {
         "quoteResponse": raw_quote,
@@ -81,18 +88,9 @@ async def execute_jupiter_swap(plan: dict) -> dict:
             amount_lamports = raw_quote.get("inAmount")
             if input_mint and output_mint and amount_lamports:
                 try:
-                    async with httpx.AsyncClient(timeout=10) as c:
-                        q = await c.get(
-                            "https://quote-api.jup.ag/v6/quote",
-                            params={
-                                "inputMint": input_mint,
-                                "outputMint": output_mint,
-                                "amount": amount_lamports,
-                                "slippageBps": 300,
-                            },
-                        )
-                        q.raise_for_status()
-                        quote = q.json()
+                    from engine.solana.jupiter_quotes import with_slippage, fetch_raw_quote
+
+                    quote = with_slippage(await fetch_raw_quote(input_mint, output_mint, int(amount_lamports), fresh=True), 300)
                     if quote:
                         retry_plan = dict(plan)
                         retry_plan["raw_quote"] = quote
@@ -135,23 +133,9 @@ async def _submit_transaction(signed_bytes: bytes, mev_protection: bool = True)
 
 
 async def _confirm_transaction(signature: str, max_retries: int = 20, interval: float = 2.0) -> dict:
-    from config import SOLANA_RPC_URL
-    for _ in range(max_retries):
-        await asyncio.sleep(interval)
-        try:
-            async with httpx.AsyncClient(timeout=10) as c:
-                r = await c.post(SOLANA_RPC_URL, json={"jsonrpc": "2.0", "id": 1, "method": "getSignatureStatuses", "params": [[signature], {"searchTransactionHistory": True}]})
-                status = (r.json().get("result", {}).get("value", [None]) or [None])[0]
-                if status is None:
-                    continue
-                err = status.get("err", "PENDING")
-                if err is None:
-                    return {"success": True, "confirmations": status.get("confirmations", 1), "status": status.get("confirmationStatus", "confirmed")}
-                if err != "PENDING":
-                    return {"success": False, "error": f"Tx failed: {err}"}
-        except Exception:
-            continue
-    return {"success": None, "error": "Confirmation timeout — check Solscan for tx status"}
+    from engine.solana.confirmations import wait_for_confirmation
+
+    return await wait_for_confirmation(signature, timeout=max_retries * interval)
 
 
 async def execute_sol_sell(plan: dict) -> dict:
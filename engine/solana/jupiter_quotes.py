@@ -1,46 +1,182 @@
-import httpx
+"""Jupiter quotes with a prefetching route cache.
+
+Raw Jupiter routes are cached per (input, output, amount) for at most
+``QUOTE_MAX_AGE`` seconds or ``QUOTE_MAX_SLOTS`` slots past the slot they
+were quoted at, over one shared client. Concurrent requests for the same
+route share one call. Slippage only moves ``otherAmountThreshold``, so one
+cached route serves every slippage setting.
+
+``quote_prefetch_job`` keeps routes warm at the user's buy presets for
+tokens on screen (contract scans, trenches matches), the watchlist and
+pending degen signals, plus partial sells of open positions. Execution
+reuses a preview quote while it is still fresh (``fresh_raw_quote``).
+Priority fees are a rolling median of recent Helius estimates.
+"""
+
+import asyncio
 import logging
+import statistics
+import time
+from collections import deque
+
+import httpx
+
+from config import SOLANA_RPC_URL
+from engine.job_metrics import register_metrics, stat_lines
+from utils.cache import BoundedCache
 
 log = logging.getLogger(__name__)
 
 JUPITER_QUOTE_URL = "https://quote-api.jup.ag/v6/quote"
+# Priority-fee estimates come from Helius, which SOLANA_RPC_URL points at when keyed.
+FEE_RPC_URL = SOLANA_RPC_URL
 USDC_MINT = "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v"
 WSOL_MINT = "So11111111111111111111111111111111111111112"
 
+QUOTE_MAX_AGE = 15
+QUOTE_MAX_SLOTS = 40
+SLOT_SECONDS = 0.4
+DEFAULT_SLIPPAGE_BPS = 100
+QUOTE_PREFETCH_SECONDS = 10
+PREFETCH_TOKENS = 8
+PREFETCH_CONCURRENCY = 3
+SELL_PRESETS = (25, 50, 100)
+ON_SCREEN_SECONDS = 180
+FEE_TTL = 20
+FEE_SAMPLES = 10
+FEE_WINDOW = 300
+DEFAULT_FEES = {"low": 1000, "medium": 5000, "high": 50000, "unit": "microlamports"}
 
-async def get_swap_quote(input_mint: str, output_mint: str, amount_usd: float, input_price: float, slippage_bps: int = 100) -> dict:
+QUOTE_CACHE = BoundedCache("jupiter_quotes", maxsize=500, ttl=QUOTE_MAX_AGE)
+ON_SCREEN = BoundedCache("quote_targets", maxsize=200, ttl=ON_SCREEN_SECONDS)
+QUOTE_STATS = {"requests": 0, "cache_hits": 0, "joined": 0, "prefetched": 0, "reused_at_execution": 0, "requoted_at_execution": 0, "requote_below_min": 0, "fee_requests": 0}
+
+_inflight: dict = {}  # route key -> task fetching it
+_slot = {"slot": 0, "at": 0.0}  # newest contextSlot seen and when
+_fees: deque = deque(maxlen=FEE_SAMPLES)  # (fetched_at, levels)
+_client_state = {"loop": None, "client": None}
+
+
+def _client() -> httpx.AsyncClient:
+    loop = asyncio.get_running_loop()
+    if _client_state["loop"] is not loop or _client_state["client"].is_closed:
+        _client_state.update(loop=loop, client=httpx.AsyncClient(timeout=10))
+    return _client_state["client"]
+
+
+def _amount_in(input_mint: str, amount_usd: float, input_price: float) -> int:
     if input_mint == USDC_MINT:
-        amount_in = int(amount_usd * 1e6)
-    else:
-        if input_price <= 0:
-            return {"error": "Invalid input price"}
-        token_amount = amount_usd / input_price
-        amount_in = int(token_amount * 1e9)
+        return int(amount_usd * 1e6)
+    return int(round(amount_usd / input_price * 1e9))
+
+
+def current_slot() -> float:
+    """Estimated cluster slot, extrapolated from the newest quote seen."""
+    if not _slot["slot"]:
+        return 0.0
+    return _slot["slot"] + (time.monotonic() - _slot["at"]) / SLOT_SECONDS
+
+
+def quote_is_fresh(raw: dict) -> bool:
+    """Whether a raw Jupiter quote is still inside the slot bound."""
+    context = int(raw.get("contextSlot") or 0)
+    if not context or not _slot["slot"]:
+        return True  # nothing to compare against
+    return current_slot() - context <= QUOTE_MAX_SLOTS
 
+
+def with_slippage(raw: dict, slippage_bps: int) -> dict:
+    """Copy of ``raw`` re-thresholded for ``slippage_bps`` (ExactIn)."""
+    out = dict(raw)
+    out["slippageBps"] = slippage_bps
+    if raw.get("swapMode", "ExactIn") == "ExactIn" and raw.get("outAmount") is not None:
+        out["otherAmountThreshold"] = str(int(raw["outAmount"]) * (10000 - slippage_bps) // 10000)
+    return out
+
+
+async def _request_quote(input_mint: str, output_mint: str, amount_in: int) -> dict:
+    QUOTE_STATS["requests"] += 1
     params = {
         "inputMint": input_mint,
         "outputMint": output_mint,
         "amount": amount_in,
-        "slippageBps": slippage_bps,
+        "slippageBps": DEFAULT_SLIPPAGE_BPS,
         "onlyDirectRoutes": False,
         "asLegacyTransaction": False,
     }
+    r = await _client().get(JUPITER_QUOTE_URL, params=params)
+    if r.status_code == 400:
+        raise ValueError(f"Jupiter: {r.json().get('error', '')}")
+    r.raise_for_status()
+    quote = r.json()
+    if not quote:
+        raise ValueError("Empty Jupiter response")
+    slot = int(quote.get("contextSlot") or 0)
+    if slot > _slot["slot"]:
+        _slot.update(slot=slot, at=time.monotonic())
+    return quote
+
+
+async def fetch_raw_quote(input_mint: str, output_mint: str, amount_in: int, fresh: bool = False) -> dict:
+    """Raw Jupiter route for ``amount_in`` base units, from cache unless stale or ``fresh``."""
+    key = (input_mint, output_mint, int(amount_in))
+    if not fresh:
+        cached = QUOTE_CACHE.get(key)
+        if cached is not None and quote_is_fresh(cached):
+            QUOTE_STATS["cache_hits"] += 1
+            return cached
+    task = _inflight.get(key)
+    if task is not None:
+        QUOTE_STATS["joined"] += 1
+    else:
+
+        async def _run():
+            try:
+                quote = await _request_quote(input_mint, output_mint, int(amount_in))
+                QUOTE_CACHE.set(key, quote)
+                return quote
+            finally:
+                _inflight.pop(key, None)
+
+        task = _inflight[key] = asyncio.ensure_future(_run())
+    return await asyncio.shield(task)
+
+
+async def fresh_raw_quote(raw: dict) -> dict:
+    """``raw`` if it is still fresh enough to execute, else a requote of the same route.
+
+    The plan's ``otherAmountThreshold`` stays the floor: a requote that would
+    pay out less raises ``ValueError`` instead of executing at the new price.
+    """
+    if quote_is_fresh(raw):
+        QUOTE_STATS["reused_at_execution"] += 1
+        return raw
+    QUOTE_STATS["requoted_at_execution"] += 1
+    quote = await fetch_raw_quote(raw["inputMint"], raw["outputMint"], int(raw["inAmount"]))
+    out = with_slippage(quote, int(raw.get("slippageBps") or DEFAULT_SLIPPAGE_BPS))
+    if raw.get("swapMode", "ExactIn") != "ExactIn" or raw.get("otherAmountThreshold") is None:
+        return out
+    floor = int(raw["otherAmountThreshold"])
+    if int(quote.get("outAmount") or 0) < floor:
+        QUOTE_STATS["requote_below_min"] += 1
+        raise ValueError(f"output {quote.get('outAmount')} is below the plan's minimum {floor}. Re-generate trade plan.")
+    out["otherAmountThreshold"] = str(max(int(out.get("otherAmountThreshold") or 0), floor))
+    return out
+
+
+async def get_swap_quote(input_mint: str, output_mint: str, amount_usd: float, input_price: float, slippage_bps: int = 100) -> dict:
+    if input_mint != USDC_MINT and input_price <= 0:
+        return {"error": "Invalid input price"}
+    amount_in = _amount_in(input_mint, amount_usd, input_price)
 
     try:
-        async with httpx.AsyncClient(timeout=10) as c:
-            r = await c.get(JUPITER_QUOTE_URL, params=params)
-            if r.status_code == 400:
-                err = r.json().get("error", "")
-                return {"error": f"Jupiter: {err}"}
-            r.raise_for_status()
-            quote = r.json()
+        quote = with_slippage(await fetch_raw_quote(input_mint, output_mint, amount_in), slippage_bps)
+    except ValueError as e:
+        return {"error": str(e)}
     except Exception as e:
         log.error(f"Jupiter quote error: {e}")
         return {"error": str(e)}
 
-    if not quote:
-        return {"error": "Empty Jupiter response"}
-
     out_amount = int(quote.get("outAmount", 0))
     in_amount = int(quote.get("inAmount", 0))
     price_impact = float(quote.get("priceImpactPct", 0) or 0)
@@ -106,31 +242,130 @@ def format_quote(quote: dict, token_symbol: str, action: str = "BUY") -> str:
     return text
 
 
+async def _request_priority_fee() -> dict:
+    QUOTE_STATS["fee_requests"] += 1
+    r = await _client().post(
+        FEE_RPC_URL,
+        json={
+            "jsonrpc": "2.0",
+            "id": "priority-fee",
+            "method": "getPriorityFeeEstimate",
+            "params": [{"accountKeys": ["JUP6LkbZbjS1jKKwapdHNy584ocKhkB1UMTDnzVL7"], "options": {"includeAllPriorityFeeLevels": True}}],
+        },
+    )
+    fees = r.json().get("result", {}).get("priorityFeeLevels", {})
+    return {
+        "low": int(fees.get("low", 1000)),
+        "medium": int(fees.get("medium", 5000)),
+        "high": int(fees.get("high", 50000)),
+        "unit": "microlamports",
+    }
+
+
+async def refresh_priority_fee() -> None:
+    """Add one Helius estimate to the rolling window."""
+    from config import HELIUS_API_KEY
+
+    if not HELIUS_API_KEY:
+        return
+    try:
+        _fees.append((time.monotonic(), await _request_priority_fee()))
+    except Exception as e:
+        log.warning(f"Priority fee fetch: {e}")
+
+
 async def get_priority_fee_estimate() -> dict:
+    """Per-level median of the recent estimates; refreshed when the newest is stale."""
     from config import HELIUS_API_KEY
 
     if not HELIUS_API_KEY:
-        return {"low": 1000, "medium": 5000, "high": 50000, "unit": "microlamports"}
+        return dict(DEFAULT_FEES)
+    if not _fees or time.monotonic() - _fees[-1][0] > FEE_TTL:
+        await refresh_priority_fee()
+    recent = [f for at, f in _fees if time.monotonic() - at <= FEE_WINDOW]
+    if not recent:
+        return dict(DEFAULT_FEES)
+    return {
+        **{level: int(statistics.median(f[level] for f in recent)) for level in ("low", "medium", "high")},
+        "unit": "microlamports",
+    }
+
 
+def mark_on_screen(address: str) -> None:
+    """Keep quotes for ``address`` warm while it is likely to be bought."""
+    if address:
+        ON_SCREEN.add(address)
+
+
+def prefetch_targets(limit: int = PREFETCH_TOKENS) -> list:
+    """Token addresses worth a warm buy route, most recently shown first."""
+    import db
+
+    targets = list(reversed(ON_SCREEN.keys()))
     try:
-        async with httpx.AsyncClient(timeout=8) as c:
-            r = await c.post(
-                f"https://mainnet.helius-rpc.com/?api-key={HELIUS_API_KEY}",
-                json={
-                    "jsonrpc": "2.0",
-                    "id": "priority-fee",
-                    "method": "getPriorityFeeEstimate",
-                    "params": [{"accountKeys": ["JUP6LkbZbjS1jKKwapdHNy584ocKhkB1UMTDnzVL7"], "options": {"includeAllPriorityFeeLevels": True}}],
-                },
-            )
-            data = r.json()
-            fees = data.get("result", {}).get("priorityFeeLevels", {})
-            return {
-                "low": int(fees.get("low", 1000)),
-                "medium": int(fees.get("medium", 5000)),
-                "high": int(fees.get("high", 50000)),
-                "unit": "microlamports",
-            }
+        targets += [w.get("token_address") for w in db.get_solana_watchlist() or []]
     except Exception as e:
-        log.warning(f"Priority fee fetch: {e}")
-        return {"low": 1000, "medium": 5000, "high": 50000, "unit": "microlamports"}
+        log.debug("Quote targets: watchlist unavailable: %s", e)
+    try:
+        for section in ("degen", "solana"):
+            for sig in db.get_pending_signals(section=section, active_only=True) or []:
+                data = sig.get("signal_data") or {}
+                targets.append(data.get("token_address") or data.get("address"))
+    except Exception as e:
+        log.debug("Quote targets: pending signals unavailable: %s", e)
+    return [a for a in dict.fromkeys(targets) if a][:limit]
+
+
+async def prefetch_quotes(buys: list, sells: list) -> int:
+    """Warm routes for (address, usd) buys and (address, base_units) sells; returns routes fetched."""
+    sem = asyncio.Semaphore(PREFETCH_CONCURRENCY)
+    routes = [(USDC_MINT, a, _amount_in(USDC_MINT, usd, 1.0)) for a, usd in buys]
+    routes += [(a, USDC_MINT, int(units)) for a, units in sells if units > 0]
+    missing = [r for r in dict.fromkeys(routes) if QUOTE_CACHE.get(r) is None]
+
+    async def _one(route):
+        async with sem:
+            try:
+                await fetch_raw_quote(*route)
+                return 1
+            except Exception as e:
+                log.debug("Quote prefetch %s failed: %s", route[1][:8], e)
+                return 0
+
+    fetched = sum(await asyncio.gather(*(_one(r) for r in missing)))
+    QUOTE_STATS["prefetched"] += fetched
+    return fetched
+
+
+async def quote_prefetch_job(context) -> None:
+    """Scheduled job: warm quick-buy/quick-sell routes and the priority-fee window."""
+    import db
+    from config import CHAT_ID
+    from engine.job_metrics import record_items
+
+    settings = db.get_user_settings(int(CHAT_ID))
+    sizes = [float(settings.get(f"buy_preset_{i}") or d) for i, d in ((1, 25), (2, 50), (3, 100))]
+    buys = [(a, usd) for a in prefetch_targets() for usd in sizes]
+    sells = []
+    for pos in db.get_all_open_sol_positions() or []:
+        held = float(pos.get("tokens_held") or 0)
+        sells += [(pos.get("token_address"), round(held * pct / 100 * 1e9)) for pct in SELL_PRESETS]
+    record_items(await prefetch_quotes(buys, sells))
+    if not _fees or time.monotonic() - _fees[-1][0] > FEE_TTL / 2:
+        await refresh_priority_fee()
+
+
+def _metrics() -> list:
+    return stat_lines(QUOTE_STATS, (
+        ("requests", "jupiter_quote_requests_total", "counter", "Quote requests sent to Jupiter"),
+        ("cache_hits", "jupiter_quote_cache_hits_total", "counter", "Quotes served from the route cache"),
+        ("joined", "jupiter_quote_joined_total", "counter", "Quotes that joined an in-flight request"),
+        ("prefetched", "jupiter_quote_prefetched_total", "counter", "Routes warmed by the prefetch job"),
+        ("reused_at_execution", "jupiter_quote_reused_total", "counter", "Preview quotes executed as-is"),
+        ("requoted_at_execution", "jupiter_quote_requoted_total", "counter", "Preview quotes refreshed at execution"),
+        ("requote_below_min", "jupiter_quote_below_min_total", "counter", "Requotes refused for paying out below the plan's minimum"),
+        ("fee_requests", "priority_fee_requests_total", "counter", "Priority-fee estimates fetched"),
+    ))
+
+
+register_metrics(_metrics)
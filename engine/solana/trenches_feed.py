@@ -1,43 +1,230 @@
+"""pump.fun launch ingestion for the trenches feed.
+
+Each tick pages the launch listing newest-first until it reaches the
+persisted watermark (every launch at or below it has been processed), so a
+burst of launches between ticks is no longer silently skipped. If the page
+budget runs out first, the cursor remembers how deep the tick got and the
+next one resumes there. Launches only ever prepend to the listing, so the
+depth is stored relative to the newest processed launch and stays valid
+however many arrive in between.
+Launches older than ``MAX_AGE_SECONDS`` can never pass the filter, which
+bounds any backfill, and launches younger than ``MIN_AGE_SECONDS`` are left
+above the cursor until they are old enough to judge.
+
+Mints are de-duplicated through a bounded index backed by the
+``recent_mints`` table, and the market-cap/age filter runs over each batch
+as numpy arrays. ``INGEST_STATS`` tracks launches seen vs. processed.
+"""
+
+import asyncio
 import logging
-from datetime import datetime, timezone
+import time
 
 import httpx
+import numpy as np
 
 import db
+from config import PUMPFUN_API_URL
+from engine.job_metrics import register_metrics, stat_lines
+from utils.cache import BoundedCache
 
 log = logging.getLogger(__name__)
-SEEN_MINTS = set()
+
+API_URL = PUMPFUN_API_URL
+SOURCE = "pumpfun"
+PAGE_SIZE = 50
+MAX_PAGES = 10
+# Rows re-read on resume in case a listing was hidden between ticks.
+RESUME_OVERLAP = 5
+MIN_MCAP, MAX_MCAP = 10_000, 500_000
+MIN_AGE_SECONDS, MAX_AGE_SECONDS = 60, 3600
+RECENT_MINTS_SECONDS = 2 * 3600
+
+# Processed mints. The filter caps age at an hour, so a mint unseen for two
+# hours can never qualify again; the cap covers bursts of ~150 launches/min.
+SEEN_MINTS = BoundedCache("trenches_seen", maxsize=20000, ttl=RECENT_MINTS_SECONDS)
+# Mints seen above the cursor but still too young to judge: mint -> created ts.
+_HELD: dict = {}
+
+INGEST_STATS = {
+    "ticks": 0,
+    "pages": 0,
+    "launches_seen": 0,
+    "launches_processed": 0,
+    "launches_matched": 0,
+    "launches_missed": 0,
+    "duplicates": 0,
+    "truncated_ticks": 0,
+    "backlog_seconds": 0.0,
+    "dropped_seconds": 0.0,
+    "watermark": 0.0,
+}
+_CURSOR: dict = {}
+# The scheduled job and the manual "Run Scan Now" button share one cursor.
+_LOCK = asyncio.Lock()
+
+
+def _created_ts(coin: dict) -> float:
+    return float(coin.get("created_timestamp") or 0) / 1000
+
+
+def _load_cursor(now: float) -> dict:
+    if not _CURSOR:
+        saved = db.get_ingest_cursor(SOURCE) or {}
+        # First run: start an hour back, the oldest a launch can be and still alert.
+        watermark = float(saved.get("watermark") or 0) or now - MAX_AGE_SECONDS
+        _CURSOR.update(
+            watermark=watermark,
+            head_ts=max(float(saved.get("head_ts") or 0), watermark),
+            backfill_offset=saved.get("backfill_offset"),
+        )
+        for mint in db.get_recent_mints(SOURCE, now - RECENT_MINTS_SECONDS):
+            SEEN_MINTS.add(mint)
+    return _CURSOR
+
+
+async def _fetch_page(client: httpx.AsyncClient, offset: int) -> list:
+    r = await client.get(
+        f"{API_URL}/coins",
+        params={"limit": PAGE_SIZE, "offset": offset, "sort": "created_timestamp", "order": "DESC", "includeNsfw": "false"},
+    )
+    r.raise_for_status()
+    INGEST_STATS["pages"] += 1
+    data = r.json()
+    return data if isinstance(data, list) else []
+
+
+async def _page_down(client, offset: int, stop_ts: float, ceiling: float, budget: list, out: list, held: list) -> tuple[int, bool]:
+    """Walk the listing from ``offset`` until a launch at or below ``stop_ts``.
+
+    Launches newer than ``ceiling`` go to ``held`` instead of ``out``. Returns
+    the offset reached and whether ``stop_ts`` (or the end of the listing) was
+    hit before ``budget[0]`` pages ran out.
+    """
+    while budget[0] > 0:
+        budget[0] -= 1
+        page = await _fetch_page(client, offset)
+        for coin in page:
+            ts = _created_ts(coin)
+            if ts <= stop_ts:
+                return offset, True
+            mint = coin.get("mint")
+            if ts > ceiling:
+                held.append(ts)
+                if mint and mint not in _HELD and mint not in SEEN_MINTS:
+                    _HELD[mint] = ts
+                    INGEST_STATS["launches_seen"] += 1
+            else:
+                out.append(coin)
+            offset += 1
+        if len(page) < PAGE_SIZE:
+            return offset, True
+    return offset, False
+
+
+def filter_launches(coins: list, now: float) -> np.ndarray:
+    """Boolean mask of ``coins`` inside the market-cap and age window."""
+    if not coins:
+        return np.zeros(0, dtype=bool)
+    mcap = np.array([float(c.get("usd_market_cap") or c.get("market_cap") or 0) for c in coins])
+    age = now - np.array([_created_ts(c) or now for c in coins])
+    return (mcap >= MIN_MCAP) & (mcap <= MAX_MCAP) & (age >= MIN_AGE_SECONDS) & (age <= MAX_AGE_SECONDS)
+
+
+async def ingest_launches(now: float | None = None) -> list:
+    """Process every launch since the watermark; returns those passing the filter."""
+    async with _LOCK:
+        return await _ingest(time.time() if now is None else now)
+
+
+async def _ingest(now: float) -> list:
+    cursor = _load_cursor(now)
+    floor = now - MAX_AGE_SECONDS
+    if cursor["watermark"] < floor:
+        if cursor["backfill_offset"] is not None:
+            INGEST_STATS["dropped_seconds"] += floor - cursor["watermark"]
+        cursor["watermark"] = floor
+        cursor["head_ts"] = max(cursor["head_ts"], floor)
+    ceiling = now - MIN_AGE_SECONDS
+    budget = [MAX_PAGES]
+    coins: list = []
+    held: list = []
+
+    async with httpx.AsyncClient(timeout=10) as client:
+        pending = cursor["backfill_offset"]
+        stop = cursor["head_ts"] if pending is not None else cursor["watermark"]
+        depth, reached = await _page_down(client, 0, stop, ceiling, budget, coins, held)
+        if pending is not None and reached:
+            # Everything above the previous head is done; pick the backfill up
+            # where the last tick stopped, shifted by the launches since.
+            start = depth + max(0, pending - RESUME_OVERLAP)
+            depth, reached = await _page_down(client, start, cursor["watermark"], ceiling, budget, coins, held)
+
+    head = max([cursor["head_ts"]] + [_created_ts(c) for c in coins])
+    if reached:
+        cursor.update(watermark=head, head_ts=head, backfill_offset=None)
+    else:
+        # Out of pages: everything above ``depth`` is processed, everything
+        # between it and the watermark is still owed. Held launches sit above
+        # the new head, so they are not part of the stored depth.
+        INGEST_STATS["truncated_ticks"] += 1
+        cursor.update(head_ts=head, backfill_offset=depth - sum(1 for ts in held if ts > head))
+    INGEST_STATS["backlog_seconds"] = cursor["head_ts"] - cursor["watermark"]
+    INGEST_STATS["watermark"] = cursor["watermark"]
+
+    fresh = []
+    for coin in coins:
+        mint = coin.get("mint")
+        if not mint:
+            continue
+        if mint in SEEN_MINTS:
+            INGEST_STATS["duplicates"] += 1
+            continue
+        if _HELD.pop(mint, None) is None:
+            INGEST_STATS["launches_seen"] += 1
+        SEEN_MINTS.add(mint)
+        fresh.append(coin)
+    for mint in [m for m, ts in _HELD.items() if ts < floor]:
+        # Seen young, then never reached before it aged out of the filter.
+        del _HELD[mint]
+        INGEST_STATS["launches_missed"] += 1
+
+    mask = filter_launches(fresh, now)
+    matched = [c for c, ok in zip(fresh, mask) if ok]
+    INGEST_STATS["ticks"] += 1
+    INGEST_STATS["launches_processed"] += len(fresh)
+    INGEST_STATS["launches_matched"] += len(matched)
+
+    db.save_recent_mints(SOURCE, [(c["mint"], _created_ts(c)) for c in fresh], RECENT_MINTS_SECONDS)
+    db.save_ingest_cursor(SOURCE, cursor["watermark"], cursor["head_ts"], cursor["backfill_offset"])
+    from engine.job_metrics import record_items
+
+    record_items(len(fresh))
+    return matched
+
+
+def ingest_gap() -> int:
+    """Launches seen on the listing but not processed (yet, or ever)."""
+    return INGEST_STATS["launches_seen"] - INGEST_STATS["launches_processed"]
 
 
 async def run_trenches_scanner(context):
+    from engine.solana.jupiter_quotes import mark_on_screen
+
     settings = db.get_user_settings(int(__import__('config').CHAT_ID))
     found = []
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            r = await client.get(
-                "https://frontend-api.pump.fun/coins",
-                params={"limit": 20, "offset": 0, "sort": "created_timestamp", "order": "DESC", "includeNsfw": "false"},
-            )
-        if r.status_code != 200:
-            return []
-        items = r.json() if isinstance(r.json(), list) else []
-        now = datetime.now(timezone.utc).timestamp()
-        for token in items:
+        now = time.time()
+        for token in await ingest_launches(now):
             mint = token.get("mint")
-            if not mint or mint in SEEN_MINTS:
-                continue
-            SEEN_MINTS.add(mint)
-            age = int(now - (float(token.get("created_timestamp") or now) / 1000))
             mc = float(token.get("usd_market_cap") or token.get("market_cap") or 0)
-            if not (10000 <= mc <= 500000 and 60 <= age <= 3600):
-                continue
-            
             found.append({
                 "address": mint,
                 "symbol": token.get("symbol"),
                 "mcap": mc,
-                "age": age
+                "age": int(now - _created_ts(token))
             })
+            mark_on_screen(mint)
 
             if settings.get("trenches_alerts"):
                 db.log_audit(action="trenches_token", details={"mint": mint, "symbol": token.get("symbol"), "mcap": mc}, success=True)
@@ -45,3 +232,22 @@ async def run_trenches_scanner(context):
     except Exception as exc:
         log.error("trenches scanner failed: %s", exc)
         return []
+
+
+def _metrics() -> list:
+    return stat_lines(INGEST_STATS, (
+        ("launches_seen", "launches_seen_total", "counter", "Launches observed on the listing"),
+        ("launches_processed", "launches_processed_total", "counter", "Launches run through the filter"),
+        ("launches_matched", "launches_matched_total", "counter", "Launches that passed the filter"),
+        ("launches_missed", "launches_missed_total", "counter", "Launches seen but aged out before being processed"),
+        ("duplicates", "launch_duplicates_total", "counter", "Listing rows skipped as already processed"),
+        ("pages", "launch_pages_total", "counter", "Listing pages fetched"),
+        ("truncated_ticks", "launch_truncated_ticks_total", "counter", "Ticks that ran out of pages before the watermark"),
+        ("backlog_seconds", "launch_backlog_seconds", "gauge", "Span of launches still owed by a backfill"),
+        ("dropped_seconds", "launch_dropped_seconds_total", "counter", "Backfill span abandoned past the maximum age"),
+    ), labels='{source="pumpfun"}') + stat_lines(
+        {"gap": ingest_gap()}, (("gap", "launch_gap", "gauge", "Launches seen but not yet processed"),), labels='{source="pumpfun"}'
+    )
+
+
+register_metrics(_metrics)
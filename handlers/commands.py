@@ -101,3 +101,29 @@ async def cmd_help(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         await show_help(update, context)
     except Exception as e:
         await update.message.reply_text(f"Help error: {e}")
+
+
+async def cmd_perf(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    from security.auth import is_authorised
+
+    if not is_authorised(update.effective_user.id):
+        return
+    try:
+        from engine.job_metrics import format_perf
+        from handlers.router import get_route_stats
+
+        text = format_perf()
+        slow = get_route_stats(limit=5)
+        if slow:
+            text += "\n*Slowest screens*\n"
+            for r in slow:
+                text += f"  `{r['route']}`: avg {r['avg_ms']:.0f}ms · max {r['max_ms']:.0f}ms\n"
+        import db
+
+        settings = db.get_settings_cache_stats()
+        text += "\n*Settings cache*\n"
+        for kind, st in settings.items():
+            text += f"  `{kind}`: {st['hit_rate']:.0%} hit · {st['hits']}/{st['hits'] + st['misses']} · {st['invalidations']} inval\n"
+        await update.message.reply_text(text, parse_mode="Markdown")
+    except Exception as e:
+        await update.message.reply_text(f"Perf error: {e}")
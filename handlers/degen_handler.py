@@ -18,12 +18,7 @@ async def _edit(query, text, kb):
 
 
 async def show_degen_home(query, context):
-    from security.key_manager import key_exists
-
-    try:
-        sol_ok = key_exists("sol_hot_wallet")
-    except Exception:
-        sol_ok = False
+    sol_ok = db.get_dashboard_snapshot()["sol_key"]
     await _edit(query, "🔥 *Degen*", _kb([
         [_btn("🔍 Scanner", "degen:scanner"), _btn("🔬 Scan Contract", "degen:scan_contract")],
         [_btn("🧩 Models", "degen:models"), _btn("💼 Live Wallet" + (" ✅" if sol_ok else " 🔴"), "degen:live")],
@@ -764,6 +759,9 @@ async def handle_ca_input(update, context, address: str):
         rows = []
         if not honeypot and score >= 40:
             from config import CHAT_ID
+            from engine.solana.jupiter_quotes import mark_on_screen
+
+            mark_on_screen(address)
             settings = db.get_user_settings(int(CHAT_ID))
             p1 = int(settings.get("buy_preset_1", 25))
             p2 = int(settings.get("buy_preset_2", 50))
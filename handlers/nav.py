@@ -19,54 +19,41 @@ async def _edit_or_reply(query, text, kb):
 async def show_home(update, context):
     from datetime import datetime, timezone
     import db
-    from security.key_manager import key_exists
-    from security.emergency_stop import is_halted
 
     now = datetime.now(timezone.utc)
 
-    try:
-        hl_pnl = db.get_hl_pnl_today()
-    except Exception:
-        hl_pnl = 0.0
-    try:
-        sol_pnl = db.get_sol_pnl_today()
-    except Exception:
-        sol_pnl = 0.0
-    try:
-        poly_cnt = db.count_open_poly_positions()
-    except Exception:
-        poly_cnt = 0
-    try:
-        pending = db.get_pending_signals(active_only=True)
-    except Exception:
-        pending = []
-    try:
-        hl_ok = key_exists("hl_api_wallet")
-        sol_ok = key_exists("sol_hot_wallet")
-        poly_ok = key_exists("poly_hot_wallet")
-    except Exception:
-        hl_ok = sol_ok = poly_ok = False
-
-    halted = is_halted()
+    snap = db.get_dashboard_snapshot()
+    hl_pnl = snap["hl_pnl_today"]
+    sol_pnl = snap["sol_pnl_today"]
+    poly_cnt = snap["poly_open"]
+    hl_ok, sol_ok, poly_ok = snap["hl_key"], snap["sol_key"], snap["poly_key"]
+    halted = snap["halted"]
 
     hl_dot = "🟢" if hl_ok else "🔴"
     sol_dot = "🟢" if sol_ok else "🔴"
     poly_dot = "🟢" if poly_ok else "🔴"
 
-    pending_cnt = len(pending)
+    pending_cnt = snap["pending_total"]
     pending_str = f"  ⏳ {pending_cnt} pending signal{'s' if pending_cnt != 1 else ''}\n" if pending_cnt else ""
 
     halt_str = "\n🛑 *TRADING HALTED — /resume to restart*\n" if halted else ""
 
+    if snap["unavailable"]:
+        perf_str = "  ⚠️ Dashboard data unavailable\n"
+    else:
+        perf_str = (
+            f"  📈 Perps   {hl_dot}  ${hl_pnl:+.2f}\n"
+            f"  🔥 Degen   {sol_dot}  ${sol_pnl:+.2f}\n"
+            f"  🎯 Predict {poly_dot}  {poly_cnt} open\n"
+        )
+
     text = (
         f"🤖 *Trading Intelligence Bot*\n"
         f"━━━━━━━━━━━━━━━━━━━━━━━━\n"
         f"📅 {now.strftime('%a %b %d  %H:%M')} UTC"
         f"{halt_str}\n\n"
         f"*Performance Today*\n"
-        f"  📈 Perps   {hl_dot}  ${hl_pnl:+.2f}\n"
-        f"  🔥 Degen   {sol_dot}  ${sol_pnl:+.2f}\n"
-        f"  🎯 Predict {poly_dot}  {poly_cnt} open\n"
+        f"{perf_str}"
         f"{pending_str}"
     )
 
@@ -142,7 +129,7 @@ async def show_help_topic(query, context, topic):
         "phases": "📊 *Phase System*\n\nSignals move through phase 1→4; alerts fire at phase 4.",
         "models": "🧩 *Models Help*\n\nEach section supports independent model sets.",
         "risk": "💰 *Risk Management*\n\nUse hard limits + configurable risk settings.",
-        "commands": "⌨️ *Commands*\n\n/start, /stop, /resume, /security, /help",
+        "commands": "⌨️ *Commands*\n\n/start, /stop, /resume, /security, /help, /perf",
     }
     kb = _kb([[_btn("← Help", "help")], [_btn("🏠 Home", "home")]])
     await _edit_or_reply(query, mapping.get(topic, "Help topic not found."), kb)
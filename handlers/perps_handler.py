@@ -18,12 +18,7 @@ async def _edit(query, text, kb):
 
 
 async def show_perps_home(query, context):
-    from security.key_manager import key_exists
-
-    try:
-        hl_ok = key_exists("hl_api_wallet")
-    except Exception:
-        hl_ok = False
+    hl_ok = db.get_dashboard_snapshot()["hl_key"]
     await _edit(query, "📈 *Perps*", _kb([
         [_btn("🔍 Scanner", "perps:scanner"), _btn("🧩 Models", "perps:models")],
         [_btn("📓 Journal", "perps:journal"), _btn("🔷 Live Account" + (" ✅" if hl_ok else " 🔴"), "perps:live")],
@@ -820,7 +815,14 @@ async def show_hl_orders(query, context):
 
 
 async def show_hl_performance(query, context):
-    await _edit(query, "📈 *Performance*", _kb([[_btn("← Live", "perps:live")]]))
+    from engine.hyperliquid.analytics import calculate_hl_performance, format_performance
+
+    try:
+        address = db.get_hl_address() or ""
+    except Exception:
+        address = ""
+    perf = await calculate_hl_performance(address) if address else {}
+    await _edit(query, format_performance(perf), _kb([[_btn("← Live", "perps:live")]]))
 
 
 async def show_hl_history(query, context):
@@ -18,12 +18,7 @@ async def _edit(query, text, kb):
 
 
 async def show_predictions_home(query, context):
-    from security.key_manager import key_exists
-
-    try:
-        poly_ok = key_exists("poly_hot_wallet")
-    except Exception:
-        poly_ok = False
+    poly_ok = db.get_dashboard_snapshot()["poly_key"]
     await _edit(query, "🎯 *Predictions*", _kb([
         [_btn("🔍 Scanner", "predictions:scanner"), _btn("⭐ Watchlist", "predictions:watchlist")],
         [_btn("💼 Live Predictions" + (" ✅" if poly_ok else " 🔴"), "predictions:live")],
@@ -1,4 +1,162 @@
+import importlib
 import logging
+import time
+
+from telegram import InlineKeyboardButton as IKB, InlineKeyboardMarkup as IKM
+
+from handlers import degen_handler as d
+from handlers import perps_handler as p
+from handlers import predictions_handler as ph
+
+log = logging.getLogger(__name__)
+
+SLOW_ROUTE_MS = 1500
+
+_ALIASES = {
+    "start": "home", "main": "home", "menu": "home", "dashboard": "home",
+    "home:perps": "perps", "home:degen": "degen", "home:predictions": "predictions", "home:settings": "settings",
+    "menu:perps": "perps", "menu:degen": "degen", "menu:predictions": "predictions", "menu:settings": "settings",
+    "nav:perps": "perps", "nav:degen": "degen", "nav:predictions": "predictions", "nav:settings": "settings",
+}
+
+# Modules imported by screens on first use; loading them at startup keeps the
+# first tap of each button from paying the import cost.
+_WARM_MODULES = (
+    "handlers.nav",
+    "handlers.settings_handler",
+    "security.auth",
+    "security.rate_limiter",
+    "security.confirmation",
+    "security.key_manager",
+    "security.emergency_stop",
+    "security.spending_limits",
+    "engine.hyperliquid.account_reader",
+    "engine.hyperliquid.analytics",
+    "engine.hyperliquid.market_data",
+    "engine.solana.wallet_reader",
+    "engine.polymarket.market_reader",
+)
+
+# Section -> (error text template, back button target or None).
+_SECTION_ERRORS = {
+    "home": ("❌ Error loading home: {e}", "home"),
+    "perps": ("Error: {e}", "home"),
+    "degen": ("Error: {e}", "home"),
+    "predictions": ("Error: {e}", "home"),
+    "settings": ("Error: {e}", "home"),
+    "help": ("Help error: {e}", "home"),
+    "confirm": ("❌ Error: {e}", None),
+    "cancel": ("❌ Cancel error: {e}", None),
+}
+
+_route_stats: dict = {}
+
+
+def _kb(rows):
+    return IKM(rows)
+
+
+def _btn(label: str, cb: str):
+    return IKB(label, callback_data=cb)
+
+
+async def _edit(query, text: str, kb=None):
+    try:
+        await query.message.edit_text(text, parse_mode="Markdown", reply_markup=kb)
+    except Exception:
+        try:
+            await query.message.reply_text(text, parse_mode="Markdown", reply_markup=kb)
+        except Exception as e:
+            log.error("edit/reply failed: %s", e)
+
+
+def _last(data: str) -> str:
+    return data.split(":")[-1]
+
+
+def _last_int(data: str) -> int:
+    return int(data.split(":")[-1])
+
+
+class _PrefixTrie:
+    """Character trie resolving a callback to its longest registered prefix."""
+
+    def __init__(self):
+        self._root = {}
+
+    def insert(self, prefix: str, value) -> None:
+        node = self._root
+        for ch in prefix:
+            node = node.setdefault(ch, {})
+        node[None] = value
+
+    def longest(self, key: str):
+        node = self._root
+        found = node.get(None)
+        for ch in key:
+            node = node.get(ch)
+            if node is None:
+                break
+            if None in node:
+                found = node[None]
+        return found
+
+
+_EXACT: dict = {}
+_PREFIXES = _PrefixTrie()
+
+
+def on(pattern: str, section: str, handler, prefix: bool = False) -> None:
+    """Register ``handler(query, data, update, context)`` for a callback."""
+    entry = (pattern, section, handler)
+    if prefix:
+        _PREFIXES.insert(pattern, entry)
+    else:
+        _EXACT[pattern] = entry
+
+
+def resolve(data: str):
+    """Return ``(pattern, section, handler)`` for callback data, or None."""
+    return _EXACT.get(data) or _PREFIXES.longest(data)
+
+
+def warm_imports() -> None:
+    """Import lazily-loaded screen modules ahead of the first button tap."""
+    for name in _WARM_MODULES:
+        try:
+            importlib.import_module(name)
+        except Exception as e:
+            log.warning("Warm import failed for %s: %s", name, e)
+
+
+def _record_latency(pattern: str, elapsed_ms: float, failed: bool) -> None:
+    stats = _route_stats.get(pattern)
+    if stats is None:
+        stats = _route_stats[pattern] = {"count": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0}
+    stats["count"] += 1
+    stats["total_ms"] += elapsed_ms
+    stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+    if failed:
+        stats["errors"] += 1
+    if elapsed_ms >= SLOW_ROUTE_MS:
+        log.warning("Slow callback '%s': %.0fms", pattern, elapsed_ms)
+
+
+def get_route_stats(limit: int = 10) -> list:
+    """Routes ordered by mean latency, slowest first."""
+    rows = [
+        {
+            "route": pattern,
+            "count": s["count"],
+            "errors": s["errors"],
+            "avg_ms": s["total_ms"] / s["count"],
+            "max_ms": s["max_ms"],
+        }
+        for pattern, s in _route_stats.items()
+        if s["count"]
+    ]
+    rows.sort(key=lambda r: r["avg_ms"], reverse=True)
+    return rows[:limit]
 
 
 async def route_callback(update, context) -> None:
@@ -23,30 +181,20 @@ async def route_callback(update, context) -> None:
     try:
         await _route(query, data, update, context)
     except Exception as e:
-        logging.getLogger(__name__).error("Router crash on '%s': %s", data, e, exc_info=True)
+        log.error("Router crash on '%s': %s", data, e, exc_info=True)
         try:
-            from telegram import InlineKeyboardMarkup, InlineKeyboardButton
             await query.message.edit_text(
                 f"❌ *Error*\n\n`{str(e)[:300]}`\n\nTap Home to continue.",
                 parse_mode="Markdown",
-                reply_markup=InlineKeyboardMarkup([[InlineKeyboardButton("🏠 Home", callback_data="home")]]),
+                reply_markup=_kb([[_btn("🏠 Home", "home")]]),
             )
         except Exception:
             pass
 
 
 async def _route(query, data, update, context):
-    log = logging.getLogger(__name__)
-
     data = (data or "").strip().lower()
-    aliases = {
-        "start": "home", "main": "home", "menu": "home", "dashboard": "home",
-        "home:perps": "perps", "home:degen": "degen", "home:predictions": "predictions", "home:settings": "settings",
-        "menu:perps": "perps", "menu:degen": "degen", "menu:predictions": "predictions", "menu:settings": "settings",
-        "nav:perps": "perps", "nav:degen": "degen", "nav:predictions": "predictions", "nav:settings": "settings",
-    }
-    data = aliases.get(data, data)
-    uid = query.from_user.id
+    data = _ALIASES.get(data, data)
 
     try:
         from security.rate_limiter import check_command_rate
@@ -57,356 +205,349 @@ async def _route(query, data, update, context):
     except Exception as e:
         log.error("rate limiter error: %s", e)
 
-    from telegram import InlineKeyboardMarkup as IKM, InlineKeyboardButton as IKB
+    entry = resolve(data)
+    if entry is None:
+        log.warning("Unhandled callback from user %s: '%s'", query.from_user.id, data)
+        return
 
-    def _kb(rows):
-        return IKM(rows)
+    pattern, section, handler = entry
+    failed = False
+    started = time.perf_counter()
+    try:
+        await handler(query, data, update, context)
+    except Exception as e:
+        failed = True
+        text, back = _SECTION_ERRORS[section]
+        await _edit(query, text.format(e=e), _kb([[_btn("← Home", back)]]) if back else None)
+    finally:
+        _record_latency(pattern, (time.perf_counter() - started) * 1000, failed)
 
-    def _btn(label: str, cb: str):
-        return IKB(label, callback_data=cb)
 
-    async def _edit(text: str, kb=None):
-        try:
-            await query.message.edit_text(text, parse_mode="Markdown", reply_markup=kb)
-        except Exception:
-            try:
-                await query.message.reply_text(text, parse_mode="Markdown", reply_markup=kb)
-            except Exception as e:
-                log.error("edit/reply failed: %s", e)
+# ── Home ────────────────────────────────────────────────
 
-    if data == "home":
-        try:
-            from handlers.nav import show_home
-            await show_home(update, context)
-        except Exception as e:
-            await _edit(f"❌ Error loading home: {e}", _kb([[_btn("← Home", "home")]]))
 
-    elif data.startswith("perps") or data.startswith("hl:") or data.startswith("pending:"):
-        from handlers import perps_handler as p
-        try:
-            if data == "perps":
-                await p.show_perps_home(query, context)
-            elif data == "perps:scanner":
-                await p.show_perps_scanner(query, context)
-            elif data == "perps:scanner:run":
-                await p.handle_perps_scanner_run(query, context)
-            elif data == "perps:models":
-                await p.show_perps_models(query, context)
-            elif data.startswith("perps:models:view:"):
-                await p.show_perps_model_detail(query, context, int(data.split(":")[-1]))
-            elif data.startswith("perps:models:on:"):
-                await p.handle_perps_model_toggle(query, context, int(data.split(":")[-1]), True)
-            elif data.startswith("perps:models:off:"):
-                await p.handle_perps_model_toggle(query, context, int(data.split(":")[-1]), False)
-            elif data == "perps:models:all:on":
-                await p.handle_perps_models_all(query, context, True)
-            elif data == "perps:models:all:off":
-                await p.handle_perps_models_all(query, context, False)
-            elif data == "perps:models:create":
-                await p.show_perps_model_create(query, context)
-            elif data == "perps:models:master":
-                await p.show_perps_master_model(query, context)
-            elif data.startswith("perps:models:preset:"):
-                await p.handle_perps_model_preset(query, context, data.split(":")[-1])
-            elif data.startswith("perps:models:delete:"):
-                await p.handle_perps_model_delete(query, context, int(data.split(":")[-1]))
-            elif data == "perps:journal":
-                await p.show_perps_journal(query, context)
-            elif data in {"perps:live", "hl:refresh"}:
-                await p.show_perps_live(query, context)
-            elif data == "perps:demo":
-                await p.show_perps_demo(query, context)
-            elif data.startswith("perps:demo:deposit:"):
-                await p.handle_perps_demo_deposit(query, context, float(data.split(":")[-1]))
-            elif data == "perps:demo:reset:confirm":
-                await p.handle_perps_demo_reset_confirm(query, context)
-            elif data == "perps:demo:reset:execute":
-                await p.handle_perps_demo_reset(query, context)
-            elif data == "perps:demo:positions":
-                await p.show_perps_demo_positions(query, context)
-            elif data == "perps:demo:history":
-                await p.show_perps_demo_history(query, context)
-            elif data.startswith("perps:demo:close:"):
-                await p.handle_perps_demo_close(query, context, int(data.split(":")[-1]))
-            elif data == "perps:risk":
-                await p.show_perps_risk(query, context)
-            elif data.startswith("perps:risk:edit:"):
-                await p.show_perps_risk_edit(query, context, data.split(":", 3)[-1])
-            elif data.startswith("perps:risk:set:"):
-                parts = data.split(":")
-                await p.handle_perps_risk_set(query, context, parts[3], parts[4])
-            elif data == "perps:risk:reset":
-                await p.handle_perps_risk_reset(query, context)
-            elif data == "perps:pending":
-                await p.show_perps_pending(query, context)
-            elif data == "perps:others":
-                await p.show_perps_others(query, context)
-            elif data == "perps:models:purge_master":
-                await p.handle_purge_master_models(query, context)
-            elif data == "hl:positions":
-                await p.show_hl_positions(query, context)
-            elif data == "hl:orders":
-                await p.show_hl_orders(query, context)
-            elif data == "hl:performance":
-                await p.show_hl_performance(query, context)
-            elif data == "hl:history":
-                await p.show_hl_history(query, context)
-            elif data == "hl:funding":
-                await p.show_hl_funding(query, context)
-            elif data == "hl:markets":
-                await p.show_hl_markets(query, context)
-            elif data.startswith("hl:cancel:"):
-                await p.handle_hl_cancel(query, context, data.split(":")[-1])
-            elif data.startswith("hl:close:"):
-                parts = data.split(":")
-                await p.handle_hl_close(query, context, parts[2], float(parts[3]))
-            elif data.startswith("hl:live:"):
-                await p.handle_hl_live_trade(query, context, data.split(":")[-1])
-            elif data.startswith("hl:demo:"):
-                await p.handle_hl_demo_trade(query, context, data.split(":")[-1])
-            elif data.startswith("hl:exec:live:"):
-                await p.handle_perps_exec_live(query, context, int(data.split(":")[-1]))
-            elif data.startswith("hl:exec:demo:"):
-                await p.handle_perps_exec_demo(query, context, int(data.split(":")[-1]))
-            elif data.startswith("pending:dismiss:"):
-                import db
-                db.dismiss_pending_signal(int(data.split(":")[-1]))
-                await p.show_perps_pending(query, context)
-            elif data.startswith("pending:plan:"):
-                await p.show_pending_plan(query, context, int(data.split(":")[-1]))
-            else:
-                await _edit("Unknown Perps action.", _kb([[_btn("← Perps", "perps")]]))
-        except Exception as e:
-            await _edit(f"Error: {e}", _kb([[_btn("← Home", "home")]]))
+async def _home(query, data, update, context):
+    from handlers.nav import show_home
+    await show_home(update, context)
 
-    elif data.startswith("degen") or data.startswith("sol:"):
-        from handlers import degen_handler as d
-        try:
-            if data == "degen":
-                await d.show_degen_home(query, context)
-            elif data == "degen:scanner":
-                await d.show_degen_scanner(query, context)
-            elif data == "degen:trenches":
-                await _edit("Trenches feed is available in scanner jobs.", _kb([[_btn("← Scanner", "degen:scanner")]]))
-            elif data == "degen:scanner:run":
-                await d.handle_degen_scanner_run(query, context)
-            elif data == "degen:scan_contract":
-                await d.show_scan_contract(query, context)
-            elif data == "degen:models":
-                await d.show_degen_models(query, context)
-            elif data == "degen:models:create":
-                await _edit("Custom model creation flow coming soon.", _kb([[_btn("← Models", "degen:models")]]))
-            elif data.startswith("degen:models:edit:"):
-                await _edit("Model edit flow coming soon.", _kb([[_btn("← Models", "degen:models")]]))
-            elif data.startswith("degen:models:view:"):
-                await d.show_degen_model_detail(query, context, int(data.split(":")[-1]))
-            elif data.startswith("degen:models:on:"):
-                await d.handle_degen_model_toggle(query, context, int(data.split(":")[-1]), True)
-            elif data.startswith("degen:models:off:"):
-                await d.handle_degen_model_toggle(query, context, int(data.split(":")[-1]), False)
-            elif data == "degen:models:all:on":
-                await d.handle_degen_models_all(query, context, True)
-            elif data == "degen:models:all:off":
-                await d.handle_degen_models_all(query, context, False)
-            elif data == "degen:models:presets":
-                await d.show_degen_model_presets(query, context)
-            elif data.startswith("degen:models:preset:"):
-                await d.handle_degen_model_preset(query, context, data.split(":")[-1])
-            elif data.startswith("degen:models:delete:"):
-                await d.handle_degen_model_delete(query, context, int(data.split(":")[-1]))
-            elif data in {"degen:live", "degen:live:refresh"}:
-                await d.show_degen_live(query, context)
-            elif data == "degen:demo":
-                await d.show_degen_demo(query, context)
-            elif data.startswith("degen:demo:deposit:"):
-                await d.handle_degen_demo_deposit(query, context, float(data.split(":")[-1]))
-            elif data == "degen:demo:reset:confirm":
-                await d.handle_degen_demo_reset_confirm(query, context)
-            elif data == "degen:demo:reset:execute":
-                await d.handle_degen_demo_reset(query, context)
-            elif data == "degen:demo:positions":
-                await d.show_degen_demo_positions(query, context)
-            elif data == "degen:demo:history":
-                await d.show_degen_demo_history(query, context)
-            elif data.startswith("degen:demo:close:"):
-                await d.handle_degen_demo_close(query, context, int(data.split(":")[-1]))
-            elif data == "degen:tracking":
-                await d.show_wallet_tracking(query, context)
-            elif data == "degen:tracking:add":
-                await d.show_tracking_add(query, context)
-            elif data == "degen:tracking:history":
-                await _edit("Copy history coming soon.", _kb([[_btn("← Tracking", "degen:tracking")]]))
-            elif data.startswith("degen:tracking:view:"):
-                await _edit("Wallet detail view coming soon.", _kb([[_btn("← Tracking", "degen:tracking")]]))
-            elif data.startswith("degen:tracking:remove:"):
-                import db
-                try:
-                    db.delete_tracked_wallet(int(data.split(":")[-1]))
-                    await query.answer("Wallet removed", show_alert=False)
-                except Exception as e:
-                    await query.answer(str(e), show_alert=True)
-                await d.show_wallet_tracking(query, context)
-            elif data == "degen:watchlist":
-                await d.show_degen_watchlist(query, context)
-            elif data == "degen:others":
-                await d.show_degen_others(query, context)
-            elif data == "degen:live:buy":
-                await d.show_buy_screen(query, context)
-            elif data == "degen:live:sell":
-                await d.show_sell_screen(query, context)
-            elif data == "degen:live:risk":
-                await d.show_live_risk(query, context)
-            elif data == "degen:demo:risk":
-                await d.show_demo_risk(query, context)
-            elif data.startswith("degen:live:risk:"):
-                await d.handle_live_risk_action(query, context, data.split(":", 3)[-1])
-            elif data.startswith("degen:demo:risk:"):
-                await d.handle_demo_risk_action(query, context, data.split(":", 3)[-1])
-            elif data.startswith("degen:watchlist:add:"):
-                import db
-                address = data.split(":")[-1]
-                db.add_to_solana_watchlist(address)
-                await query.answer("Added to watchlist", show_alert=True)
-            elif data.startswith("degen:blacklist:add:"):
-                import db
-                address = data.split(":")[-1]
-                db.add_to_solana_blacklist(address)
-                await query.answer("Added to blacklist", show_alert=True)
-            elif data.startswith("degen:buy:"):
-                parts = data.split(":")
-                await d.handle_quick_buy(query, context, parts[2], float(parts[3]))
-            elif data.startswith("degen:demo_buy:"):
-                parts = data.split(":")
-                await d.handle_demo_buy(query, context, parts[2], float(parts[3]))
-            elif data.startswith("sol:autosell:"):
-                await d.show_autosell_config(query, context, data.split(":", 2)[-1])
-            elif data.startswith("sol:position:"):
-                await d.show_position_detail(query, context, data.split(":", 2)[-1])
-            else:
-                await _edit("Unknown Degen action.", _kb([[_btn("← Degen", "degen")]]))
-        except Exception as e:
-            await _edit(f"Error: {e}", _kb([[_btn("← Home", "home")]]))
 
-    elif data.startswith("predictions") or data.startswith("poly:"):
-        from handlers import predictions_handler as ph
-        try:
-            if data == "predictions":
-                await ph.show_predictions_home(query, context)
-            elif data == "predictions:scanner":
-                await ph.show_predictions_scanner(query, context)
-            elif data == "predictions:watchlist":
-                await ph.show_predictions_watchlist(query, context)
-            elif data in {"predictions:live", "predictions:live:refresh"}:
-                await ph.show_predictions_live(query, context)
-            elif data == "predictions:demo":
-                await ph.show_predictions_demo(query, context)
-            elif data == "predictions:models":
-                await ph.show_predictions_models(query, context)
-            elif data == "predictions:models:create":
-                await _edit("Custom prediction model creation coming soon.", _kb([[_btn("← Models", "predictions:models")]]))
-            elif data.startswith("predictions:models:view:"):
-                await ph.show_prediction_model_detail(query, context, int(data.split(":")[-1]))
-            elif data.startswith("predictions:models:on:"):
-                await ph.handle_prediction_model_toggle(query, context, int(data.split(":")[-1]), True)
-            elif data.startswith("predictions:models:off:"):
-                await ph.handle_prediction_model_toggle(query, context, int(data.split(":")[-1]), False)
-            elif data == "predictions:models:all:on":
-                await ph.handle_prediction_models_all(query, context, True)
-            elif data == "predictions:models:all:off":
-                await ph.handle_prediction_models_all(query, context, False)
-            elif data == "predictions:models:presets":
-                await ph.show_prediction_model_presets(query, context)
-            elif data.startswith("predictions:models:preset:"):
-                await ph.handle_prediction_model_preset(query, context, data.split(":")[-1])
-            elif data.startswith("predictions:models:delete:"):
-                await ph.handle_prediction_model_delete(query, context, int(data.split(":")[-1]))
-            elif data == "predictions:others":
-                await ph.show_predictions_others(query, context)
-            elif data == "predictions:live:positions":
-                await ph.show_live_positions(query, context)
-            elif data == "predictions:live:history":
-                await ph.show_live_history(query, context)
-            elif data.startswith("poly:trade:"):
-                parts = data.split(":")
-                await ph.handle_poly_live_trade(query, context, parts[2], parts[3], float(parts[4]))
-            elif data.startswith("poly:demo:"):
-                await ph.handle_poly_demo_trade(query, context, data.split(":", 2)[-1])
-            elif data.startswith("poly:close:"):
-                await ph.handle_poly_close(query, context, data.split(":", 2)[-1])
-            else:
-                await _edit("Unknown Predictions action.", _kb([[_btn("← Predictions", "predictions")]]))
-        except Exception as e:
-            await _edit(f"Error: {e}", _kb([[_btn("← Home", "home")]]))
+on("home", "home", _home)
 
-    elif data.startswith("settings") or data.startswith("display:"):
-        try:
-            if data == "settings":
-                from handlers.settings_handler import show_settings
-                await show_settings(query, context)
-            elif data == "settings:wallets":
-                from handlers.settings_handler import show_wallet_status
-                await show_wallet_status(query, context)
-            elif data == "settings:limits":
-                from handlers.settings_handler import show_limits
-                await show_limits(query, context)
-            elif data == "settings:security":
-                from handlers.nav import show_security_status
-                await show_security_status(update, context)
-            elif data == "settings:display":
-                from handlers.settings_handler import show_display_settings
-                await show_display_settings(query, context)
-            elif data.startswith("display:set:"):
-                parts = data.split(":")
-                if len(parts) >= 4:
-                    from handlers.settings_handler import handle_display_setting
-                    await handle_display_setting(query, context, parts[2], parts[3])
-            elif data == "settings:alerts":
-                await _edit("🔔 *Alert Settings*\n━━━━━━━━━━━━━━━━━━━━━━━━\n\nConfigure your alert preferences\nin each section's settings.", _kb([[_btn("← Settings", "settings")]]))
-            elif data == "settings:presets":
-                await _edit("⚡ *Buy Presets*\n━━━━━━━━━━━━━━━━━━━━━━━━\n\nConfigure quick-buy amounts\nin Degen → Live → Risk.", _kb([[_btn("← Settings", "settings")]]))
-            elif data == "settings:risk":
-                await _edit("💰 *Risk Settings*\n━━━━━━━━━━━━━━━━━━━━━━━━\n\nManage risk per section:\n📈 Perps → Risk\n🔥 Degen → Risk", _kb([[_btn("📈 Perps Risk", "perps:risk"), _btn("🔥 Degen Risk", "degen:live:risk")], [_btn("← Settings", "settings")]]))
-            elif data == "settings:mev":
-                await _edit("🛡 *MEV Protection*\n━━━━━━━━━━━━━━━━━━━━━━━━\n\nMEV protection is *enabled*\nfor all Solana trades.\n\nThis adds priority fees to help\nyour transactions land faster.", _kb([[_btn("← Settings", "settings")]]))
-            else:
-                await _edit("Unknown Settings action.", _kb([[_btn("← Settings", "settings")]]))
-        except Exception as e:
-            await _edit(f"Error: {e}", _kb([[_btn("← Home", "home")]]))
 
-    elif data == "help" or data.startswith("help:"):
-        try:
-            from handlers.nav import show_help, show_help_topic
-            if data == "help":
-                await show_help(update, context)
-            else:
-                await show_help_topic(query, context, data.split(":", 1)[-1])
-        except Exception as e:
-            await _edit(f"Help error: {e}", _kb([[_btn("← Home", "home")]]))
+# ── Perps ───────────────────────────────────────────────
 
-    elif data.startswith("confirm:execute:"):
-        try:
-            from security.confirmation import execute_confirmation
-            confirm_id = data.split(":")[3] if len(data.split(":")) > 3 else ""
-            await query.message.edit_text("⏳ Executing...", reply_markup=None)
-            success, result = await execute_confirmation(confirm_id)
-            await query.message.edit_text(
-                f"✅ *Executed*\n`{result.get('tx_id', '')}`" if success and isinstance(result, dict) else f"❌ *Failed*\n{result}",
-                parse_mode="Markdown",
-            )
-        except Exception as e:
-            await _edit(f"❌ Error: {e}")
 
-    elif data.startswith("confirm:cancel:"):
-        try:
-            from security.confirmation import cancel_confirmation
-            confirm_id = data.split(":")[3] if len(data.split(":")) > 3 else ""
-            cancel_confirmation(confirm_id)
-            await query.message.edit_text("❌ Trade cancelled.", reply_markup=None)
-        except Exception as e:
-            await _edit(f"❌ Cancel error: {e}")
+async def _perps_unknown(query, data, update, context):
+    await _edit(query, "Unknown Perps action.", _kb([[_btn("← Perps", "perps")]]))
 
-    else:
-        log.warning("Unhandled callback from user %s: '%s'", uid, data)
+
+async def _pending_dismiss(query, data, update, context):
+    import db
+    db.dismiss_pending_signal(_last_int(data))
+    await p.show_perps_pending(query, context)
+
+
+async def _perps_risk_set(query, data, update, context):
+    parts = data.split(":")
+    await p.handle_perps_risk_set(query, context, parts[3], parts[4])
+
+
+async def _hl_close(query, data, update, context):
+    parts = data.split(":")
+    await p.handle_hl_close(query, context, parts[2], float(parts[3]))
+
+
+for _prefix in ("perps", "hl:", "pending:"):
+    on(_prefix, "perps", _perps_unknown, prefix=True)
+
+on("perps", "perps", lambda q, data, u, c: p.show_perps_home(q, c))
+on("perps:scanner", "perps", lambda q, data, u, c: p.show_perps_scanner(q, c))
+on("perps:scanner:run", "perps", lambda q, data, u, c: p.handle_perps_scanner_run(q, c))
+on("perps:models", "perps", lambda q, data, u, c: p.show_perps_models(q, c))
+on("perps:models:view:", "perps", lambda q, data, u, c: p.show_perps_model_detail(q, c, _last_int(data)), prefix=True)
+on("perps:models:on:", "perps", lambda q, data, u, c: p.handle_perps_model_toggle(q, c, _last_int(data), True), prefix=True)
+on("perps:models:off:", "perps", lambda q, data, u, c: p.handle_perps_model_toggle(q, c, _last_int(data), False), prefix=True)
+on("perps:models:all:on", "perps", lambda q, data, u, c: p.handle_perps_models_all(q, c, True))
+on("perps:models:all:off", "perps", lambda q, data, u, c: p.handle_perps_models_all(q, c, False))
+on("perps:models:create", "perps", lambda q, data, u, c: p.show_perps_model_create(q, c))
+on("perps:models:master", "perps", lambda q, data, u, c: p.show_perps_master_model(q, c))
+on("perps:models:preset:", "perps", lambda q, data, u, c: p.handle_perps_model_preset(q, c, _last(data)), prefix=True)
+on("perps:models:delete:", "perps", lambda q, data, u, c: p.handle_perps_model_delete(q, c, _last_int(data)), prefix=True)
+on("perps:models:purge_master", "perps", lambda q, data, u, c: p.handle_purge_master_models(q, c))
+on("perps:journal", "perps", lambda q, data, u, c: p.show_perps_journal(q, c))
+on("perps:live", "perps", lambda q, data, u, c: p.show_perps_live(q, c))
+on("hl:refresh", "perps", lambda q, data, u, c: p.show_perps_live(q, c))
+on("perps:demo", "perps", lambda q, data, u, c: p.show_perps_demo(q, c))
+on("perps:demo:deposit:", "perps", lambda q, data, u, c: p.handle_perps_demo_deposit(q, c, float(_last(data))), prefix=True)
+on("perps:demo:reset:confirm", "perps", lambda q, data, u, c: p.handle_perps_demo_reset_confirm(q, c))
+on("perps:demo:reset:execute", "perps", lambda q, data, u, c: p.handle_perps_demo_reset(q, c))
+on("perps:demo:positions", "perps", lambda q, data, u, c: p.show_perps_demo_positions(q, c))
+on("perps:demo:history", "perps", lambda q, data, u, c: p.show_perps_demo_history(q, c))
+on("perps:demo:close:", "perps", lambda q, data, u, c: p.handle_perps_demo_close(q, c, _last_int(data)), prefix=True)
+on("perps:risk", "perps", lambda q, data, u, c: p.show_perps_risk(q, c))
+on("perps:risk:edit:", "perps", lambda q, data, u, c: p.show_perps_risk_edit(q, c, data.split(":", 3)[-1]), prefix=True)
+on("perps:risk:set:", "perps", _perps_risk_set, prefix=True)
+on("perps:risk:reset", "perps", lambda q, data, u, c: p.handle_perps_risk_reset(q, c))
+on("perps:pending", "perps", lambda q, data, u, c: p.show_perps_pending(q, c))
+on("perps:others", "perps", lambda q, data, u, c: p.show_perps_others(q, c))
+on("hl:positions", "perps", lambda q, data, u, c: p.show_hl_positions(q, c))
+on("hl:orders", "perps", lambda q, data, u, c: p.show_hl_orders(q, c))
+on("hl:performance", "perps", lambda q, data, u, c: p.show_hl_performance(q, c))
+on("hl:history", "perps", lambda q, data, u, c: p.show_hl_history(q, c))
+on("hl:funding", "perps", lambda q, data, u, c: p.show_hl_funding(q, c))
+on("hl:markets", "perps", lambda q, data, u, c: p.show_hl_markets(q, c))
+on("hl:cancel:", "perps", lambda q, data, u, c: p.handle_hl_cancel(q, c, _last(data)), prefix=True)
+on("hl:close:", "perps", _hl_close, prefix=True)
+on("hl:live:", "perps", lambda q, data, u, c: p.handle_hl_live_trade(q, c, _last(data)), prefix=True)
+on("hl:demo:", "perps", lambda q, data, u, c: p.handle_hl_demo_trade(q, c, _last(data)), prefix=True)
+on("hl:exec:live:", "perps", lambda q, data, u, c: p.handle_perps_exec_live(q, c, _last_int(data)), prefix=True)
+on("hl:exec:demo:", "perps", lambda q, data, u, c: p.handle_perps_exec_demo(q, c, _last_int(data)), prefix=True)
+on("pending:dismiss:", "perps", _pending_dismiss, prefix=True)
+on("pending:plan:", "perps", lambda q, data, u, c: p.show_pending_plan(q, c, _last_int(data)), prefix=True)
+
+
+# ── Degen ───────────────────────────────────────────────
+
+
+async def _degen_unknown(query, data, update, context):
+    await _edit(query, "Unknown Degen action.", _kb([[_btn("← Degen", "degen")]]))
+
+
+def _degen_notice(text: str, back_label: str, back_cb: str):
+    async def _notice(query, data, update, context):
+        await _edit(query, text, _kb([[_btn(back_label, back_cb)]]))
+    return _notice
+
+
+async def _degen_tracking_remove(query, data, update, context):
+    import db
+    try:
+        db.delete_tracked_wallet(_last_int(data))
+        await query.answer("Wallet removed", show_alert=False)
+    except Exception as e:
+        await query.answer(str(e), show_alert=True)
+    await d.show_wallet_tracking(query, context)
+
+
+async def _degen_watchlist_add(query, data, update, context):
+    import db
+    db.add_to_solana_watchlist(_last(data))
+    await query.answer("Added to watchlist", show_alert=True)
+
+
+async def _degen_blacklist_add(query, data, update, context):
+    import db
+    db.add_to_solana_blacklist(_last(data))
+    await query.answer("Added to blacklist", show_alert=True)
+
+
+async def _degen_buy(query, data, update, context):
+    parts = data.split(":")
+    await d.handle_quick_buy(query, context, parts[2], float(parts[3]))
+
+
+async def _degen_demo_buy(query, data, update, context):
+    parts = data.split(":")
+    await d.handle_demo_buy(query, context, parts[2], float(parts[3]))
+
+
+for _prefix in ("degen", "sol:"):
+    on(_prefix, "degen", _degen_unknown, prefix=True)
+
+on("degen", "degen", lambda q, data, u, c: d.show_degen_home(q, c))
+on("degen:scanner", "degen", lambda q, data, u, c: d.show_degen_scanner(q, c))
+on("degen:trenches", "degen", _degen_notice("Trenches feed is available in scanner jobs.", "← Scanner", "degen:scanner"))
+on("degen:scanner:run", "degen", lambda q, data, u, c: d.handle_degen_scanner_run(q, c))
+on("degen:scan_contract", "degen", lambda q, data, u, c: d.show_scan_contract(q, c))
+on("degen:models", "degen", lambda q, data, u, c: d.show_degen_models(q, c))
+on("degen:models:create", "degen", _degen_notice("Custom model creation flow coming soon.", "← Models", "degen:models"))
+on("degen:models:edit:", "degen", _degen_notice("Model edit flow coming soon.", "← Models", "degen:models"), prefix=True)
+on("degen:models:view:", "degen", lambda q, data, u, c: d.show_degen_model_detail(q, c, _last_int(data)), prefix=True)
+on("degen:models:on:", "degen", lambda q, data, u, c: d.handle_degen_model_toggle(q, c, _last_int(data), True), prefix=True)
+on("degen:models:off:", "degen", lambda q, data, u, c: d.handle_degen_model_toggle(q, c, _last_int(data), False), prefix=True)
+on("degen:models:all:on", "degen", lambda q, data, u, c: d.handle_degen_models_all(q, c, True))
+on("degen:models:all:off", "degen", lambda q, data, u, c: d.handle_degen_models_all(q, c, False))
+on("degen:models:presets", "degen", lambda q, data, u, c: d.show_degen_model_presets(q, c))
+on("degen:models:preset:", "degen", lambda q, data, u, c: d.handle_degen_model_preset(q, c, _last(data)), prefix=True)
+on("degen:models:delete:", "degen", lambda q, data, u, c: d.handle_degen_model_delete(q, c, _last_int(data)), prefix=True)
+on("degen:live", "degen", lambda q, data, u, c: d.show_degen_live(q, c))
+on("degen:live:refresh", "degen", lambda q, data, u, c: d.show_degen_live(q, c))
+on("degen:demo", "degen", lambda q, data, u, c: d.show_degen_demo(q, c))
+on("degen:demo:deposit:", "degen", lambda q, data, u, c: d.handle_degen_demo_deposit(q, c, float(_last(data))), prefix=True)
+on("degen:demo:reset:confirm", "degen", lambda q, data, u, c: d.handle_degen_demo_reset_confirm(q, c))
+on("degen:demo:reset:execute", "degen", lambda q, data, u, c: d.handle_degen_demo_reset(q, c))
+on("degen:demo:positions", "degen", lambda q, data, u, c: d.show_degen_demo_positions(q, c))
+on("degen:demo:history", "degen", lambda q, data, u, c: d.show_degen_demo_history(q, c))
+on("degen:demo:close:", "degen", lambda q, data, u, c: d.handle_degen_demo_close(q, c, _last_int(data)), prefix=True)
+on("degen:tracking", "degen", lambda q, data, u, c: d.show_wallet_tracking(q, c))
+on("degen:tracking:add", "degen", lambda q, data, u, c: d.show_tracking_add(q, c))
+on("degen:tracking:history", "degen", _degen_notice("Copy history coming soon.", "← Tracking", "degen:tracking"))
+on("degen:tracking:view:", "degen", _degen_notice("Wallet detail view coming soon.", "← Tracking", "degen:tracking"), prefix=True)
+on("degen:tracking:remove:", "degen", _degen_tracking_remove, prefix=True)
+on("degen:watchlist", "degen", lambda q, data, u, c: d.show_degen_watchlist(q, c))
+on("degen:others", "degen", lambda q, data, u, c: d.show_degen_others(q, c))
+on("degen:live:buy", "degen", lambda q, data, u, c: d.show_buy_screen(q, c))
+on("degen:live:sell", "degen", lambda q, data, u, c: d.show_sell_screen(q, c))
+on("degen:live:risk", "degen", lambda q, data, u, c: d.show_live_risk(q, c))
+on("degen:demo:risk", "degen", lambda q, data, u, c: d.show_demo_risk(q, c))
+on("degen:live:risk:", "degen", lambda q, data, u, c: d.handle_live_risk_action(q, c, data.split(":", 3)[-1]), prefix=True)
+on("degen:demo:risk:", "degen", lambda q, data, u, c: d.handle_demo_risk_action(q, c, data.split(":", 3)[-1]), prefix=True)
+on("degen:watchlist:add:", "degen", _degen_watchlist_add, prefix=True)
+on("degen:blacklist:add:", "degen", _degen_blacklist_add, prefix=True)
+on("degen:buy:", "degen", _degen_buy, prefix=True)
+on("degen:demo_buy:", "degen", _degen_demo_buy, prefix=True)
+on("sol:autosell:", "degen", lambda q, data, u, c: d.show_autosell_config(q, c, data.split(":", 2)[-1]), prefix=True)
+on("sol:position:", "degen", lambda q, data, u, c: d.show_position_detail(q, c, data.split(":", 2)[-1]), prefix=True)
+
+
+# ── Predictions ─────────────────────────────────────────
+
+
+async def _predictions_unknown(query, data, update, context):
+    await _edit(query, "Unknown Predictions action.", _kb([[_btn("← Predictions", "predictions")]]))
+
+
+async def _predictions_models_create(query, data, update, context):
+    await _edit(query, "Custom prediction model creation coming soon.", _kb([[_btn("← Models", "predictions:models")]]))
+
+
+async def _poly_trade(query, data, update, context):
+    parts = data.split(":")
+    await ph.handle_poly_live_trade(query, context, parts[2], parts[3], float(parts[4]))
+
+
+for _prefix in ("predictions", "poly:"):
+    on(_prefix, "predictions", _predictions_unknown, prefix=True)
+
+on("predictions", "predictions", lambda q, data, u, c: ph.show_predictions_home(q, c))
+on("predictions:scanner", "predictions", lambda q, data, u, c: ph.show_predictions_scanner(q, c))
+on("predictions:watchlist", "predictions", lambda q, data, u, c: ph.show_predictions_watchlist(q, c))
+on("predictions:live", "predictions", lambda q, data, u, c: ph.show_predictions_live(q, c))
+on("predictions:live:refresh", "predictions", lambda q, data, u, c: ph.show_predictions_live(q, c))
+on("predictions:demo", "predictions", lambda q, data, u, c: ph.show_predictions_demo(q, c))
+on("predictions:models", "predictions", lambda q, data, u, c: ph.show_predictions_models(q, c))
+on("predictions:models:create", "predictions", _predictions_models_create)
+on("predictions:models:view:", "predictions", lambda q, data, u, c: ph.show_prediction_model_detail(q, c, _last_int(data)), prefix=True)
+on("predictions:models:on:", "predictions", lambda q, data, u, c: ph.handle_prediction_model_toggle(q, c, _last_int(data), True), prefix=True)
+on("predictions:models:off:", "predictions", lambda q, data, u, c: ph.handle_prediction_model_toggle(q, c, _last_int(data), False), prefix=True)
+on("predictions:models:all:on", "predictions", lambda q, data, u, c: ph.handle_prediction_models_all(q, c, True))
+on("predictions:models:all:off", "predictions", lambda q, data, u, c: ph.handle_prediction_models_all(q, c, False))
+on("predictions:models:presets", "predictions", lambda q, data, u, c: ph.show_prediction_model_presets(q, c))
+on("predictions:models:preset:", "predictions", lambda q, data, u, c: ph.handle_prediction_model_preset(q, c, _last(data)), prefix=True)
+on("predictions:models:delete:", "predictions", lambda q, data, u, c: ph.handle_prediction_model_delete(q, c, _last_int(data)), prefix=True)
+on("predictions:others", "predictions", lambda q, data, u, c: ph.show_predictions_others(q, c))
+on("predictions:live:positions", "predictions", lambda q, data, u, c: ph.show_live_positions(q, c))
+on("predictions:live:history", "predictions", lambda q, data, u, c: ph.show_live_history(q, c))
+on("poly:trade:", "predictions", _poly_trade, prefix=True)
+on("poly:demo:", "predictions", lambda q, data, u, c: ph.handle_poly_demo_trade(q, c, data.split(":", 2)[-1]), prefix=True)
+on("poly:close:", "predictions", lambda q, data, u, c: ph.handle_poly_close(q, c, data.split(":", 2)[-1]), prefix=True)
+
+
+# ── Settings ────────────────────────────────────────────
+
+
+async def _settings_unknown(query, data, update, context):
+    await _edit(query, "Unknown Settings action.", _kb([[_btn("← Settings", "settings")]]))
+
+
+def _settings_notice(text: str, rows=None):
+    async def _notice(query, data, update, context):
+        await _edit(query, text, _kb(rows or [[_btn("← Settings", "settings")]]))
+    return _notice
+
+
+async def _settings(query, data, update, context):
+    from handlers.settings_handler import show_settings
+    await show_settings(query, context)
+
+
+async def _settings_wallets(query, data, update, context):
+    from handlers.settings_handler import show_wallet_status
+    await show_wallet_status(query, context)
+
+
+async def _settings_limits(query, data, update, context):
+    from handlers.settings_handler import show_limits
+    await show_limits(query, context)
+
+
+async def _settings_security(query, data, update, context):
+    from handlers.nav import show_security_status
+    await show_security_status(update, context)
+
+
+async def _settings_display(query, data, update, context):
+    from handlers.settings_handler import show_display_settings
+    await show_display_settings(query, context)
+
+
+async def _display_set(query, data, update, context):
+    parts = data.split(":")
+    if len(parts) >= 4:
+        from handlers.settings_handler import handle_display_setting
+        await handle_display_setting(query, context, parts[2], parts[3])
+
+
+for _prefix in ("settings", "display:"):
+    on(_prefix, "settings", _settings_unknown, prefix=True)
+
+on("settings", "settings", _settings)
+on("settings:wallets", "settings", _settings_wallets)
+on("settings:limits", "settings", _settings_limits)
+on("settings:security", "settings", _settings_security)
+on("settings:display", "settings", _settings_display)
+on("display:set:", "settings", _display_set, prefix=True)
+on("settings:alerts", "settings", _settings_notice(
+    "🔔 *Alert Settings*\n━━━━━━━━━━━━━━━━━━━━━━━━\n\nConfigure your alert preferences\nin each section's settings."
+))
+on("settings:presets", "settings", _settings_notice(
+    "⚡ *Buy Presets*\n━━━━━━━━━━━━━━━━━━━━━━━━\n\nConfigure quick-buy amounts\nin Degen → Live → Risk."
+))
+on("settings:risk", "settings", _settings_notice(
+    "💰 *Risk Settings*\n━━━━━━━━━━━━━━━━━━━━━━━━\n\nManage risk per section:\n📈 Perps → Risk\n🔥 Degen → Risk",
+    [[_btn("📈 Perps Risk", "perps:risk"), _btn("🔥 Degen Risk", "degen:live:risk")], [_btn("← Settings", "settings")]],
+))
+on("settings:mev", "settings", _settings_notice(
+    "🛡 *MEV Protection*\n━━━━━━━━━━━━━━━━━━━━━━━━\n\nMEV protection is *enabled*\nfor all Solana trades.\n\n"
+    "This adds priority fees to help\nyour transactions land faster."
+))
+
+
+# ── Help / confirmations ────────────────────────────────
+
+
+async def _help(query, data, update, context):
+    from handlers.nav import show_help
+    await show_help(update, context)
+
+
+async def _help_topic(query, data, update, context):
+    from handlers.nav import show_help_topic
+    await show_help_topic(query, context, data.split(":", 1)[-1])
+
+
+async def _confirm_execute(query, data, update, context):
+    from security.confirmation import execute_confirmation
+    confirm_id = data.split(":")[3] if len(data.split(":")) > 3 else ""
+    await query.message.edit_text("⏳ Executing...", reply_markup=None)
+    success, result = await execute_confirmation(confirm_id)
+    await query.message.edit_text(
+        f"✅ *Executed*\n`{result.get('tx_id', '')}`" if success and isinstance(result, dict) else f"❌ *Failed*\n{result}",
+        parse_mode="Markdown",
+    )
+
+
+async def _confirm_cancel(query, data, update, context):
+    from security.confirmation import cancel_confirmation
+    confirm_id = data.split(":")[3] if len(data.split(":")) > 3 else ""
+    cancel_confirmation(confirm_id)
+    await query.message.edit_text("❌ Trade cancelled.", reply_markup=None)
+
+
+on("help", "help", _help)
+on("help:", "help", _help_topic, prefix=True)
+on("confirm:execute:", "confirm", _confirm_execute, prefix=True)
+on("confirm:cancel:", "cancel", _confirm_cancel, prefix=True)
 
 
 async def route_text_message(update, context) -> None:
@@ -3,18 +3,34 @@ Registers handlers in strict order.
 No business logic here.
 """
 
+import asyncio
 import logging
 from datetime import time as dt_time
 
 from telegram import Update
 from telegram.ext import Application, CallbackQueryHandler, CommandHandler, MessageHandler, filters
 
-from config import TOKEN as TELEGRAM_BOT_TOKEN
+from config import CORRELATION_INTERVAL, TRENCHES_INTERVAL, TOKEN as TELEGRAM_BOT_TOKEN
 
+from engine.correlation_guard import update_correlation_job
+from engine.job_metrics import instrument
+from news import CALENDAR_REFRESH_SECONDS, NEWS_POLL_SECONDS, poll_news, refresh_calendar
+from engine.perf_rollups import RECONCILE_TIME, reconcile_rollups_job
 from engine.phase_engine import run_phase_engine
+from engine.hyperliquid.ingest import HL_INGEST_INTERVAL, hl_ingest_job
+from engine.hyperliquid.market_data import UNIVERSE_REFRESH_SECONDS, refresh_universe_job
 from engine.hyperliquid.monitor import run_hl_monitor
 from engine.solana.auto_sell_monitor import run_auto_sell_monitor
+from engine.solana.trenches_feed import run_trenches_scanner
+from degen.rescoring import RESCORE_TICK_SECONDS, rescore_due_job
+from security.limits import LIMITS_FLUSH_SECONDS, flush_limits_job
+from utils.cache import CACHE_SWEEP_SECONDS, sweep_caches_job
 from engine.polymarket.alert_monitor import run_polymarket_monitor
+from engine.polymarket.scanner import run_market_scanner_job
+from engine.solana.jupiter_quotes import QUOTE_PREFETCH_SECONDS, quote_prefetch_job
+# Imported for their /metrics blocks; neither schedules a job here.
+import engine.degen.dexscreener  # noqa: F401
+import engine.solana.confirmations  # noqa: F401
 
 logging.basicConfig(format="%(asctime)s %(name)s %(levelname)s %(message)s", level=logging.INFO)
 log = logging.getLogger(__name__)
@@ -43,9 +59,36 @@ async def post_init(app):
     halted = is_halted()
     log.info("%s Trading: %s", "⏸" if halted else "✅", "HALTED" if halted else "Active")
 
+    from handlers.router import warm_imports
+
+    warm_imports()
+
+    from engine import job_metrics
+
+    await job_metrics.start(app)
+
     import db
     db.setup_db()
     db.verify_connection()
+    try:
+        from security.limits import load_limits
+
+        log.info("✅ Limits: %s buckets restored", load_limits())
+    except Exception as e:
+        log.error("❌ Limits restore failed: %s", e)
+    try:
+        from degen.rescoring import load_rescore_queue
+
+        log.info("✅ Rescore queue: %s tokens pending", load_rescore_queue())
+    except Exception as e:
+        log.error("❌ Rescore queue restore failed: %s", e)
+    # Registered regardless of the first connect: the tick drain keeps
+    # retrying a listener that failed to come up.
+    job_metrics.on_tick(db.drain_settings_notifications)
+    try:
+        db.listen_settings_changes(asyncio.get_running_loop())
+    except Exception as e:
+        log.warning("⚠️ Settings change listener unavailable: %s", e)
     db.log_audit({"action": "bot_started", "details": {}, "success": True})
 
 
@@ -60,13 +103,14 @@ def main():
     app.add_handler(poly_setup_conv)
 
     # Commands.
-    from handlers.commands import cmd_help, cmd_resume, cmd_security, cmd_start, cmd_stop
+    from handlers.commands import cmd_help, cmd_perf, cmd_resume, cmd_security, cmd_start, cmd_stop
 
     app.add_handler(CommandHandler("start", cmd_start))
     app.add_handler(CommandHandler("stop", cmd_stop))
     app.add_handler(CommandHandler("resume", cmd_resume))
     app.add_handler(CommandHandler("security", cmd_security))
     app.add_handler(CommandHandler("help", cmd_help))
+    app.add_handler(CommandHandler("perf", cmd_perf))
 
     # Free text message routing.
     from handlers.router import route_text_message
@@ -79,19 +123,31 @@ def main():
     app.add_handler(CallbackQueryHandler(route_callback))
 
     jq = app.job_queue
-    jq.run_repeating(run_phase_engine, interval=300, first=60, name="phase_engine")
-    jq.run_repeating(run_hl_monitor, interval=300, first=90, name="hl_monitor")
-    jq.run_repeating(run_auto_sell_monitor, interval=60, first=120, name="auto_sell")
-    jq.run_repeating(run_polymarket_monitor, interval=900, first=150, name="poly_monitor")
+    jq.run_repeating(instrument("phase_engine", run_phase_engine), interval=300, first=60, name="phase_engine")
+    jq.run_repeating(instrument("hl_universe", refresh_universe_job), interval=UNIVERSE_REFRESH_SECONDS, first=5, name="hl_universe")
+    jq.run_repeating(instrument("calendar", refresh_calendar), interval=CALENDAR_REFRESH_SECONDS, first=15, name="calendar")
+    jq.run_repeating(instrument("news", poll_news), interval=NEWS_POLL_SECONDS, first=10, name="news")
+    jq.run_repeating(instrument("correlation", update_correlation_job), interval=CORRELATION_INTERVAL, first=20, name="correlation")
+    jq.run_repeating(instrument("limits_flush", flush_limits_job), interval=LIMITS_FLUSH_SECONDS, first=LIMITS_FLUSH_SECONDS, name="limits_flush")
+    jq.run_repeating(instrument("cache_sweep", sweep_caches_job), interval=CACHE_SWEEP_SECONDS, first=CACHE_SWEEP_SECONDS, name="cache_sweep")
+    jq.run_repeating(instrument("hl_monitor", run_hl_monitor), interval=300, first=90, name="hl_monitor")
+    jq.run_repeating(instrument("hl_ingest", hl_ingest_job), interval=HL_INGEST_INTERVAL, first=100, name="hl_ingest")
+    jq.run_repeating(instrument("auto_sell", run_auto_sell_monitor), interval=60, first=120, name="auto_sell")
+    jq.run_repeating(instrument("trenches", run_trenches_scanner), interval=TRENCHES_INTERVAL, first=45, name="trenches")
+    jq.run_repeating(instrument("quote_prefetch", quote_prefetch_job), interval=QUOTE_PREFETCH_SECONDS, first=50, name="quote_prefetch")
+    jq.run_repeating(instrument("rescore", rescore_due_job), interval=RESCORE_TICK_SECONDS, first=RESCORE_TICK_SECONDS, name="rescore")
+    jq.run_repeating(instrument("poly_monitor", run_polymarket_monitor), interval=900, first=150, name="poly_monitor")
+    jq.run_repeating(instrument("poly_scanner", run_market_scanner_job), interval=900, first=210, name="poly_scanner")
 
     from engine.market_alerts import check_session_opens, check_price_changes
 
-    jq.run_repeating(check_session_opens, interval=300, first=30, name="session_alerts")
-    jq.run_repeating(check_price_changes, interval=600, first=180, name="price_alerts")
+    jq.run_repeating(instrument("session_alerts", check_session_opens), interval=300, first=30, name="session_alerts")
+    jq.run_repeating(instrument("price_alerts", check_price_changes), interval=600, first=180, name="price_alerts")
 
     from security.heartbeat import send_heartbeat
 
-    jq.run_daily(send_heartbeat, time=dt_time(8, 0, 0), name="heartbeat")
+    jq.run_daily(instrument("heartbeat", send_heartbeat), time=dt_time(8, 0, 0), name="heartbeat")
+    jq.run_daily(instrument("perf_rollups", reconcile_rollups_job), time=RECONCILE_TIME, name="perf_rollups")
 
     log.info("Starting polling...")
     app.run_polling(allowed_updates=Update.ALL_TYPES)
@@ -1,10 +1,15 @@
+import heapq
+import json
 import logging
 import re
+import time
+from bisect import bisect_left, bisect_right
 from datetime import datetime, timedelta, timezone
+from pathlib import Path
 from typing import Any
 
 import httpx
-from config import CRYPTOPANIC_TOKEN, WAT
+from config import CRYPTOPANIC_FIXTURE, CRYPTOPANIC_TOKEN, WAT
 
 log = logging.getLogger(__name__)
 
@@ -23,6 +28,191 @@ RECURRING_EVENTS = [
 ]
 
 
+# ── CryptoPanic ingestion ─────────────────────────────
+# One poller feeds every news consumer. Posts are parsed once on ingest and
+# kept in time order, globally and per currency code, so window queries are
+# bisects over epoch seconds instead of HTTP calls.
+NEWS_POLL_SECONDS = 180
+NEWS_RETENTION_SECONDS = 48 * 3600
+NEWS_CURRENCY_TTL = 1800
+NEWS_FEEDS = {
+    "important": {"filter": "important", "public": "true"},
+    "hot": {"filter": "hot", "public": "true", "kind": "news"},
+    "news": {"public": "true", "kind": "news"},
+}
+
+
+def _post_epoch(raw: str | None) -> float | None:
+    if not raw:
+        return None
+    try:
+        return datetime.fromisoformat(raw.replace("Z", "+00:00")).timestamp()
+    except Exception:
+        return None
+
+
+class NewsStore:
+    def __init__(self):
+        self._by_id: dict = {}
+        self._times: list[float] = []
+        self._posts: list[dict] = []
+        self._cur_times: dict[str, list[float]] = {}
+        self._cur_posts: dict[str, list[dict]] = {}
+        self.currency_seen: dict[str, float] = {}
+        self.currency_fetched: dict[str, float] = {}
+        self.last_poll = 0.0
+
+    def __len__(self) -> int:
+        return len(self._posts)
+
+    def ingest(self, results: list, feed: str, now: float | None = None) -> int:
+        """Add raw CryptoPanic posts tagged with ``feed``; returns new posts."""
+        now = now or time.time()
+        added = 0
+        for item in results or []:
+            pid = item.get("id") or item.get("url") or item.get("title")
+            if pid is None:
+                continue
+            existing = self._by_id.get(pid)
+            if existing is not None:
+                existing["feeds"].add(feed)
+                continue
+            ts = _post_epoch(item.get("created_at")) or _post_epoch(item.get("published_at"))
+            if ts is None and "age_minutes" in item:
+                ts = now - float(item["age_minutes"]) * 60
+            if ts is None:
+                continue
+            post = {
+                "id": pid,
+                "ts": ts,
+                "title": item.get("title", ""),
+                "url": item.get("url", ""),
+                "domain": item.get("domain") or (item.get("source") or {}).get("domain", ""),
+                "currencies": tuple(c.get("code", "").upper() for c in (item.get("currencies") or []) if c.get("code")),
+                "feeds": {feed},
+            }
+            self._by_id[pid] = post
+            i = bisect_right(self._times, ts)
+            self._times.insert(i, ts)
+            self._posts.insert(i, post)
+            for code in post["currencies"]:
+                times = self._cur_times.setdefault(code, [])
+                j = bisect_right(times, ts)
+                times.insert(j, ts)
+                self._cur_posts.setdefault(code, []).insert(j, post)
+            added += 1
+        return added
+
+    def prune(self, now: float | None = None) -> None:
+        cutoff = (now or time.time()) - NEWS_RETENTION_SECONDS
+        i = bisect_left(self._times, cutoff)
+        if not i:
+            return
+        for post in self._posts[:i]:
+            self._by_id.pop(post["id"], None)
+        del self._times[:i], self._posts[:i]
+        for code, times in list(self._cur_times.items()):
+            j = bisect_left(times, cutoff)
+            if j:
+                del times[:j], self._cur_posts[code][:j]
+
+    def window(self, start: float, end: float | None = None, currency: str | None = None, feed: str | None = None) -> list:
+        """Posts with start <= ts <= end, newest last."""
+        if currency:
+            code = currency.upper()
+            times, posts = self._cur_times.get(code, []), self._cur_posts.get(code, [])
+        else:
+            times, posts = self._times, self._posts
+        lo = bisect_left(times, start)
+        hi = bisect_right(times, end) if end is not None else len(times)
+        found = posts[lo:hi]
+        if feed:
+            found = [p for p in found if feed in p["feeds"]]
+        return found
+
+    def recent(self, minutes: float, currency: str | None = None, feed: str | None = None) -> list:
+        return self.window(time.time() - minutes * 60, None, currency, feed)
+
+    def latest(self, limit: int, feed: str | None = None) -> list:
+        out = []
+        for post in reversed(self._posts):
+            if feed is None or feed in post["feeds"]:
+                out.append(post)
+                if len(out) >= limit:
+                    break
+        return out
+
+    def watch(self, currency: str) -> None:
+        """Mark a currency as in use so the poller keeps its feed warm."""
+        self.currency_seen[currency.upper()] = time.time()
+
+
+NEWS = NewsStore()
+
+
+def _load_fixture() -> dict:
+    with open(CRYPTOPANIC_FIXTURE, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+async def _fetch_cryptopanic(params: dict) -> list:
+    if CRYPTOPANIC_FIXTURE:
+        results = _load_fixture().get("results", [])
+        if "currencies" in params:
+            codes = set(params["currencies"].split(","))
+            results = [p for p in results if codes & {c.get("code") for c in p.get("currencies") or []}]
+        wanted = params.get("filter")
+        return [p for p in results if not wanted or wanted in (p.get("feeds") or [wanted])]
+    async with httpx.AsyncClient(timeout=10) as client:
+        resp = await client.get(CRYPTO_PANIC_URL, params={"auth_token": CRYPTOPANIC_TOKEN, **params})
+        resp.raise_for_status()
+        return resp.json().get("results", [])
+
+
+async def refresh_currency_news(codes: list) -> None:
+    codes = sorted({c.upper() for c in codes if c})
+    if not codes or not (CRYPTOPANIC_TOKEN or CRYPTOPANIC_FIXTURE):
+        return
+    params = {"currencies": ",".join(codes), "public": "true"}
+    NEWS.ingest(await _fetch_cryptopanic(params), "currency")
+    # The global important page only holds the top posts; blackout checks need
+    # each watched currency's own important posts.
+    NEWS.ingest(await _fetch_cryptopanic({**params, "filter": "important"}), "important")
+    now = time.time()
+    for code in codes:
+        NEWS.currency_fetched[code] = now
+
+
+async def ensure_currency_news(code: str) -> None:
+    """Read-through for a currency the poller has not been asked about yet."""
+    code = (code or "").upper()
+    NEWS.watch(code)
+    if time.time() - NEWS.currency_fetched.get(code, 0) > NEWS_POLL_SECONDS:
+        try:
+            await refresh_currency_news([code])
+        except Exception as exc:
+            log.error("CryptoPanic %s fetch failed: %s", code, exc)
+
+
+async def poll_news(context=None) -> None:
+    """Scheduled job: refresh the shared feeds and any watched currencies."""
+    if not (CRYPTOPANIC_TOKEN or CRYPTOPANIC_FIXTURE):
+        return
+    for feed, params in NEWS_FEEDS.items():
+        try:
+            NEWS.ingest(await _fetch_cryptopanic(params), feed)
+        except Exception as exc:
+            log.error("CryptoPanic %s poll failed: %s", feed, exc)
+    now = time.time()
+    watched = [c for c, seen in NEWS.currency_seen.items() if now - seen <= NEWS_CURRENCY_TTL]
+    try:
+        await refresh_currency_news(watched)
+    except Exception as exc:
+        log.error("CryptoPanic currency poll failed: %s", exc)
+    NEWS.prune(now)
+    NEWS.last_poll = now
+
+
 def _normalize_impact(raw: str) -> str:
     value = (raw or "").strip().lower()
     if "high" in value or "red" in value:
@@ -45,45 +235,165 @@ def _safe_float(raw: Any) -> float | None:
 
 
 async def _fetch_cryptopanic_events(pairs: list[str], horizon_end: datetime) -> list[dict]:
-    if not CRYPTOPANIC_TOKEN:
+    if not (CRYPTOPANIC_TOKEN or CRYPTOPANIC_FIXTURE):
         return []
-    try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            resp = await client.get(
-                CRYPTO_PANIC_URL,
-                params={"auth_token": CRYPTOPANIC_TOKEN, "filter": "important", "kind": "news"},
+    events: list[dict] = []
+    for item in NEWS.window(0, horizon_end.timestamp(), feed="important"):
+        event_time = datetime.fromtimestamp(item["ts"], tz=timezone.utc)
+        for pair in pairs:
+            events.append(
+                {
+                    "name": item.get("title") or "Crypto News",
+                    "pair": pair,
+                    "time_utc": event_time,
+                    "time_wat": event_time.astimezone(WAT),
+                    "impact": "high",
+                    "forecast": None,
+                    "previous": None,
+                    "actual": None,
+                    "source": "cryptopanic",
+                    "description": item.get("domain") or "",
+                }
             )
-            resp.raise_for_status()
-            payload = resp.json()
-        now = datetime.now(timezone.utc)
-        events: list[dict] = []
-        for item in payload.get("results", []):
-            published_at = item.get("published_at")
+    return events
+
+
+# ── Economic calendar ─────────────────────────────────
+# The ForexFactory week is fetched by a job, parsed once to epoch seconds and
+# indexed per (currency, impact) in sorted arrays. Alert-path queries are
+# bisects and never touch the network; the parsed week is mirrored to disk so
+# a restart has a calendar before the first refresh lands.
+CALENDAR_REFRESH_SECONDS = 6 * 3600
+CALENDAR_CACHE_PATH = Path(__file__).resolve().parent / ".cache" / "ff_calendar.json"
+
+
+def _calendar_epoch(raw: str) -> int | None:
+    raw = (raw or "").strip()
+    if not raw:
+        return None
+    try:
+        dt = datetime.fromisoformat(raw.replace("Z", "+00:00"))
+    except ValueError:
+        dt = None
+        for fmt in ("%m-%d-%Y %H:%M:%S", "%m-%d-%Y"):
             try:
-                event_time = datetime.fromisoformat(published_at.replace("Z", "+00:00")) if published_at else now
-            except Exception:
-                event_time = now
-            if event_time > horizon_end:
+                dt = datetime.strptime(raw, fmt)
+                break
+            except ValueError:
+                continue
+        if dt is None:
+            return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp())
+
+
+class EconomicCalendar:
+    def __init__(self):
+        self._index: dict[tuple[str, str], tuple[list[int], list[dict]]] = {}
+        self.fetched_at = 0
+        self.loaded = False
+        self.disk_tried = False  # a missing cache file is read once, not on every lookup
+
+    def __len__(self) -> int:
+        return sum(len(times) for times, _ in self._index.values())
+
+    @staticmethod
+    def parse(rows: list) -> list:
+        events = []
+        for row in rows or []:
+            ts = _calendar_epoch(row.get("date", ""))
+            if ts is None:
                 continue
-            for pair in pairs:
-                events.append(
-                    {
-                        "name": item.get("title", "Crypto News"),
-                        "pair": pair,
-                        "time_utc": event_time.astimezone(timezone.utc),
-                        "time_wat": event_time.astimezone(WAT),
-                        "impact": "high",
-                        "forecast": None,
-                        "previous": None,
-                        "actual": None,
-                        "source": "cryptopanic",
-                        "description": item.get("domain") or "",
-                    }
-                )
+            events.append(
+                {
+                    "ts": ts,
+                    "title": row.get("title", ""),
+                    "country": (row.get("country") or "").upper(),
+                    "impact": _normalize_impact(row.get("impact", "")),
+                    "forecast": row.get("forecast") or None,
+                    "previous": row.get("previous") or None,
+                    "actual": row.get("actual") or None,
+                    "date": row.get("date", ""),
+                }
+            )
         return events
+
+    def load(self, events: list, fetched_at: int) -> None:
+        index: dict = {}
+        for ev in sorted(events, key=lambda e: e["ts"]):
+            times, items = index.setdefault((ev["country"], ev["impact"]), ([], []))
+            times.append(ev["ts"])
+            items.append(ev)
+        self._index = index
+        self.fetched_at = int(fetched_at)
+        self.loaded = True
+
+    def save(self, path: Path = CALENDAR_CACHE_PATH) -> None:
+        events = [ev for _, items in self._index.values() for ev in items]
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"fetched_at": self.fetched_at, "events": events}))
+        tmp.replace(path)
+
+    def load_disk(self, path: Path = CALENDAR_CACHE_PATH) -> bool:
+        self.disk_tried = True
+        try:
+            data = json.loads(path.read_text())
+        except (OSError, ValueError):
+            return False
+        self.load(data.get("events", []), data.get("fetched_at", 0))
+        return True
+
+    def between(self, start: int, end: int, currency: str | None = None, impact: str | None = None) -> list:
+        """Events with start <= ts <= end, oldest first."""
+        if not self.loaded and not self.disk_tried:
+            self.load_disk()
+        runs = []
+        for (cur, imp), (times, items) in self._index.items():
+            if (currency and cur != currency.upper()) or (impact and imp != impact):
+                continue
+            lo, hi = bisect_left(times, start), bisect_right(times, end)
+            if lo < hi:
+                runs.append(items[lo:hi])
+        if len(runs) == 1:
+            return runs[0]
+        return list(heapq.merge(*runs, key=lambda e: e["ts"]))
+
+    def near(self, ts: int, minutes: int, currency: str | None = None, impact: str | None = "high") -> list:
+        return self.between(ts - minutes * 60, ts + minutes * 60, currency, impact)
+
+    def next_event(self, ts: int, currency: str | None = None, impact: str | None = "high", horizon_hours: int = 24) -> dict | None:
+        upcoming = self.between(ts, ts + horizon_hours * 3600, currency, impact)
+        return upcoming[0] if upcoming else None
+
+
+CALENDAR = EconomicCalendar()
+
+
+async def refresh_calendar(context=None) -> None:
+    """Scheduled job: fetch this week's ForexFactory calendar and re-index it."""
+    try:
+        async with httpx.AsyncClient(
+            timeout=8,
+            headers={"User-Agent": "Mozilla/5.0 (compatible; bot)"},
+        ) as client:
+            response = await client.get(FOREX_FACTORY_CALENDAR_URL)
+            if response.status_code != 200:
+                log.warning("Economic calendar fetch: HTTP %s", response.status_code)
+                return
+            rows = response.json()
     except Exception as exc:
-        log.error("CryptoPanic fetch failed: %s", exc)
-        return []
+        log.warning(f"Economic calendar fetch failed: {exc}")
+        return
+    events = EconomicCalendar.parse(rows)
+    if not events:
+        return
+    CALENDAR.load(events, int(time.time()))
+    try:
+        CALENDAR.save()
+    except OSError as exc:
+        log.warning("Economic calendar cache write failed: %s", exc)
 
 
 def _parse_calendar_time(raw_time: str, now_utc: datetime) -> datetime | None:
@@ -103,60 +413,25 @@ def _parse_calendar_time(raw_time: str, now_utc: datetime) -> datetime | None:
 
 
 async def fetch_economic_calendar() -> list:
-    """Fetch today's economic events using ForexFactory JSON feed."""
-    from datetime import datetime, timezone
-
-    try:
-        async with httpx.AsyncClient(
-            timeout=8,
-            headers={"User-Agent": "Mozilla/5.0 (compatible; bot)"},
-        ) as client:
-            response = await client.get(FOREX_FACTORY_CALENDAR_URL)
-            if response.status_code != 200:
-                return []
-            events = response.json()
-
-        today = datetime.now(timezone.utc).strftime("%m-%d-%Y")
-        return [
-            {
-                "title": event.get("title", ""),
-                "impact": event.get("impact", ""),
-                "country": event.get("country", ""),
-                "time": event.get("date", ""),
-            }
-            for event in events
-            if event.get("date", "").startswith(today)
-            and event.get("impact") in ("High", "Medium")
-        ][:10]
-    except Exception as exc:
-        log.warning(f"Economic calendar fetch failed: {exc}")
-        return []
+    """Today's high/medium economic events from the indexed calendar."""
+    now = datetime.now(timezone.utc)
+    day_start = int(now.replace(hour=0, minute=0, second=0, microsecond=0).timestamp())
+    events = [e for e in CALENDAR.between(day_start, day_start + 86399) if e["impact"] in ("high", "medium")]
+    return [
+        {
+            "title": e["title"],
+            "impact": e["impact"].title(),
+            "country": e["country"],
+            "time": e["date"],
+            "ts": e["ts"],
+        }
+        for e in events
+    ][:10]
 
 
 async def fetch_crypto_news() -> list:
-    """Fetch crypto headlines from CryptoPanic or CoinGecko trending."""
-    if CRYPTOPANIC_TOKEN:
-        try:
-            async with httpx.AsyncClient(timeout=8) as client:
-                response = await client.get(
-                    CRYPTO_PANIC_URL,
-                    params={
-                        "auth_token": CRYPTOPANIC_TOKEN,
-                        "filter": "hot",
-                        "public": "true",
-                        "kind": "news",
-                    },
-                )
-                if response.status_code == 200:
-                    posts = response.json().get("results", [])
-                    return [
-                        {"title": post.get("title", ""), "url": post.get("url", "")}
-                        for post in posts[:5]
-                    ]
-        except Exception:
-            pass
-
-    return []
+    """Latest hot crypto headlines from the shared CryptoPanic store."""
+    return [{"title": post["title"], "url": post["url"]} for post in NEWS.latest(5, feed="hot")]
 
 
 def _fallback_recurring_events(pairs: list[str], horizon_end: datetime) -> list[dict]:
@@ -194,28 +469,23 @@ async def get_upcoming_events(pairs: list, hours_ahead: int = 8) -> list[dict]:
         return _EVENT_CACHE["data"]
 
     horizon_end = now + timedelta(hours=hours_ahead)
-    cal_rows = await fetch_economic_calendar()
     events = []
-    for row in cal_rows:
-        raw_dt = row.get("time", "")
-        try:
-            event_time = datetime.strptime(raw_dt, "%m-%d-%Y %H:%M:%S").replace(tzinfo=timezone.utc)
-        except Exception:
-            continue
-        if event_time > horizon_end:
+    for row in CALENDAR.between(int(now.timestamp()), int(horizon_end.timestamp())):
+        if row["impact"] not in ("high", "medium"):
             continue
+        event_time = datetime.fromtimestamp(row["ts"], tz=timezone.utc)
         for pair in pairs:
             events.append({
-                "name": row.get("title", "Economic Event"),
+                "name": row["title"] or "Economic Event",
                 "pair": pair,
                 "time_utc": event_time,
                 "time_wat": event_time.astimezone(WAT),
-                "impact": "high" if row.get("impact") == "High" else "medium",
-                "forecast": None,
-                "previous": None,
-                "actual": None,
+                "impact": row["impact"],
+                "forecast": row["forecast"],
+                "previous": row["previous"],
+                "actual": row["actual"],
                 "source": "forexfactory",
-                "description": row.get("country", ""),
+                "description": row["country"],
             })
 
     if not events:
@@ -0,0 +1,151 @@
+"""Solana confirmation service benchmark against a local fake RPC.
+
+Serves ``getSignatureStatuses`` from a local HTTP JSON-RPC fixture. Each
+simulated transaction is "processed" a moment after submission, then either
+lands as confirmed, fails with an instruction error, or is dropped and
+never lands. Buys, sells, auto-sells and DCA fills submit at staggered
+times and each awaits ``wait_for_confirmation`` the way the executor does.
+
+The run fails unless every transaction gets its expected outcome (success,
+failure or timeout). It reports RPC calls made next to the calls the old
+per-signature 2s polling loop would have made, and how long after landing
+each confirmation was noticed.
+
+    python scripts/bench_confirmations.py --txs 120 --seconds 6
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+import threading
+import time
+
+from harness import FixtureHandler, FixtureServer, bootstrap
+
+bootstrap("bench")
+
+from engine.solana import confirmations  # noqa: E402
+
+LEGACY_INTERVAL = 2.0
+
+
+class Chain:
+    """Signature -> (processed_at, landed_at, err); landed_at None means dropped."""
+
+    def __init__(self):
+        self.txs: dict = {}
+        self.lock = threading.Lock()
+
+    def status(self, signature: str, now: float):
+        with self.lock:
+            tx = self.txs.get(signature)
+        if tx is None or now < tx["processed_at"]:
+            return None
+        if tx["landed_at"] is not None and now >= tx["landed_at"]:
+            return {"slot": 1, "confirmations": None, "err": tx["err"], "confirmationStatus": "confirmed"}
+        return {"slot": 1, "confirmations": 0, "err": None, "confirmationStatus": "processed"}
+
+
+def _handler(chain: Chain, counter: dict):
+    class Handler(FixtureHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            if body.get("method") != "getSignatureStatuses":
+                self.send_error(404)
+                return
+            counter["requests"] += 1
+            now = time.monotonic()
+            signatures = body["params"][0]
+            counter["max_batch"] = max(counter["max_batch"], len(signatures))
+            self.send_json({"jsonrpc": "2.0", "id": body.get("id"), "result": {"context": {"slot": 1}, "value": [chain.status(s, now) for s in signatures]}})
+
+    return Handler
+
+
+async def run_bench(txs: int, seconds: float, seed: int, deadline: float) -> dict:
+    rng = random.Random(seed)
+    chain = Chain()
+    counter = {"requests": 0, "max_batch": 0}
+    server = FixtureServer(_handler(chain, counter))
+    saved = confirmations.RPC_URL, confirmations.WS_URL
+    confirmations.RPC_URL, confirmations.WS_URL = server.url, ""
+
+    plans = []
+    for i in range(txs):
+        kind = rng.choices(["landed", "failed", "dropped"], weights=[85, 10, 5])[0]
+        plans.append({
+            "signature": f"sig{i:05d}",
+            "submit_in": rng.uniform(0, seconds),
+            "latency": rng.uniform(0.4, 4.0),
+            "kind": kind,
+        })
+    outcomes, lags = [], []
+    legacy_calls = 0
+
+    async def executor(plan):
+        nonlocal legacy_calls
+        await asyncio.sleep(plan["submit_in"])
+        now = time.monotonic()
+        landed = now + plan["latency"] if plan["kind"] != "dropped" else None
+        with chain.lock:
+            chain.txs[plan["signature"]] = {
+                "processed_at": now + 0.2,
+                "landed_at": landed,
+                "err": {"InstructionError": [0, "Custom"]} if plan["kind"] == "failed" else None,
+            }
+        result = await confirmations.wait_for_confirmation(plan["signature"], timeout=deadline)
+        want = {"landed": True, "failed": False, "dropped": None}[plan["kind"]]
+        outcomes.append(result.get("success") is want)
+        if landed is not None:
+            lags.append(time.monotonic() - landed)
+            legacy_calls += min(math.ceil(plan["latency"] / LEGACY_INTERVAL), int(deadline / LEGACY_INTERVAL))
+        else:
+            legacy_calls += int(deadline / LEGACY_INTERVAL)
+
+    started = time.monotonic()
+    try:
+        await asyncio.gather(*(executor(p) for p in plans))
+    finally:
+        server.shutdown()
+        confirmations.RPC_URL, confirmations.WS_URL = saved
+    lags.sort()
+    wrong = outcomes.count(False)
+    return {
+        "txs": txs,
+        "rpc_requests": counter["requests"],
+        "legacy_requests": legacy_calls,
+        "max_batch": counter["max_batch"],
+        "lag_p50_s": round(lags[len(lags) // 2], 3) if lags else 0.0,
+        "lag_max_s": round(lags[-1], 3) if lags else 0.0,
+        "legacy_lag_avg_s": round(LEGACY_INTERVAL / 2, 3),
+        "elapsed_s": round(time.monotonic() - started, 2),
+        "wrong_outcomes": wrong,
+        "pending_left": confirmations.pending_count(),
+        "ok": wrong == 0 and confirmations.pending_count() == 0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batched Solana confirmations against a fake RPC.")
+    parser.add_argument("--txs", type=int, default=120)
+    parser.add_argument("--seconds", type=float, default=6.0, help="window over which transactions are submitted")
+    parser.add_argument("--deadline", type=float, default=6.0, help="per-signature confirmation deadline")
+    parser.add_argument("--seed", type=int, default=17)
+    parser.add_argument("--json", action="store_true", help="print the raw result as JSON")
+    args = parser.parse_args()
+
+    result = asyncio.run(run_bench(args.txs, args.seconds, args.seed, args.deadline))
+    if args.json:
+        print(json.dumps(result))
+    else:
+        for key, value in result.items():
+            print(f"{key.ljust(18)} {value}")
+    if not result["ok"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
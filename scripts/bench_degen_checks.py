@@ -0,0 +1,205 @@
+"""Degen model-evaluation benchmark.
+
+Scores synthetic tokens against a set of synthetic degen models twice: once
+the per-model way (every model runs every check through the async wrappers)
+and once through a compiled model set, which runs each distinct check once
+per token. Reports tokens × models per second for both paths and fails if any
+verdict differs. No network or database access is needed.
+
+    python scripts/bench_degen_checks.py --tokens 2000 --models 12
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+
+from harness import bootstrap
+
+bootstrap("bench")
+
+from engine.degen import checks  # noqa: E402
+from engine.degen.model_evaluator import compile_models, evaluate_compiled  # noqa: E402
+
+NARRATIVES = ["ai", "meme", "gaming", "rwa", "defi", "dog", "cat"]
+
+
+def build_tokens(n: int, rng: random.Random) -> list:
+    tokens = []
+    for _ in range(n):
+        mcap = 10 ** rng.uniform(4, 8)
+        tokens.append({
+            "honeypot": rng.random() < 0.1,
+            "blacklisted": rng.random() < 0.03,
+            "verified": rng.random() < 0.8,
+            "mint_disabled": rng.random() < 0.85,
+            "freeze_disabled": rng.random() < 0.85,
+            "rug_score": rng.uniform(0, 100),
+            "dev_activity": {"sold_pct_30m": rng.uniform(0, 30)},
+            "holder_distribution": {"top10_pct": rng.uniform(10, 90)},
+            "liquidity_usd": mcap * rng.uniform(0.02, 0.3),
+            "lp_locked": rng.random() < 0.6,
+            "market_cap_usd": mcap,
+            "volume_24h": mcap * rng.uniform(0, 2),
+            "buys_1h": rng.randint(0, 500),
+            "sells_1h": rng.randint(0, 500),
+            "narrative": rng.choice(NARRATIVES),
+            "social": {"trend": rng.choice(["rising", "flat", "falling", "surging"])},
+            "holder_growth_1h_pct": rng.uniform(-10, 30),
+            "token_age_minutes": rng.uniform(1, 2000),
+            "early_score": rng.uniform(0, 100),
+            "price_change_1h_pct": rng.uniform(-40, 60),
+            "holder_count": rng.randint(5, 5000),
+            "dev_supply_pct": rng.uniform(0, 15),
+            "known_scam_symbol": rng.random() < 0.02,
+        })
+    return tokens
+
+
+def build_models(n: int, rng: random.Random) -> list:
+    names = sorted(checks.CHECKS)
+    models = []
+    for i in range(n):
+        picked = rng.sample(names, rng.randint(8, 14))
+        split = rng.randint(2, 5)
+        models.append({
+            "name": f"bench_{i}",
+            "mandatory_checks": picked[:split],
+            "weighted_checks": [{"check": c, "weight": rng.choice([1, 1.5, 2, 3])} for c in picked[split:]],
+            "min_score": rng.choice([50, 60, 70]),
+            "max_rug_score": rng.choice([30, 40, 50]),
+            "min_liquidity_usd": rng.choice([5000, 10000, 25000]),
+            "min_mcap_usd": 50_000,
+            "max_mcap_usd": rng.choice([5_000_000, 20_000_000]),
+            "narrative_filter": rng.choice([[], ["ai", "meme"], ["gaming"]]),
+            "min_age_minutes": 5,
+            "max_age_minutes": rng.choice([240, 1440]),
+            "min_holder_count": rng.choice([50, 200]),
+        })
+    return models
+
+
+async def per_model_evaluate(token_data: dict, model: dict) -> dict:
+    """The pre-batching evaluator: one async call per check per model."""
+    mandatory_fails, passed_checks, failed_checks = [], [], []
+    for name in model.get("mandatory_checks", []):
+        fn = checks.get_check_function(name)
+        if fn is None:
+            continue
+        (passed_checks if await fn(token_data, model) else mandatory_fails).append(name)
+    if mandatory_fails:
+        return {
+            "passed": False,
+            "score": 0.0,
+            "grade": "F",
+            "passed_checks": passed_checks,
+            "failed_checks": mandatory_fails,
+            "mandatory_fails": mandatory_fails,
+            "weighted_score": 0.0,
+            "recommendation": f"Failed mandatory: {', '.join(mandatory_fails)}",
+        }
+    weighted_score = total_weight = 0.0
+    for wc in model.get("weighted_checks", []):
+        name = wc.get("check", "")
+        fn = checks.get_check_function(name)
+        if fn is None:
+            continue
+        weight = float(wc.get("weight", 1) or 1)
+        total_weight += weight
+        if await fn(token_data, model):
+            weighted_score += weight
+            passed_checks.append(name)
+        else:
+            failed_checks.append(name)
+    score = weighted_score / total_weight * 100 if total_weight > 0 else 0
+    return {
+        "passed": score >= float(model.get("min_score", 60) or 60),
+        "score": round(score, 1),
+        "grade": "A" if score >= 85 else "B" if score >= 70 else "C" if score >= 55 else "D" if score >= 40 else "F",
+        "passed_checks": passed_checks,
+        "failed_checks": failed_checks,
+        "mandatory_fails": [],
+        "weighted_score": round(weighted_score, 1),
+        "recommendation": "Strong buy — A/B" if score >= 80 else "Potential — verify manually" if score >= 60 else "Weak — skip or watch",
+    }
+
+
+def _count_calls():
+    calls = {"n": 0}
+    original = checks.run_check
+
+    def counted(name, token_data, model):
+        calls["n"] += 1
+        return original(name, token_data, model)
+
+    return calls, original, counted
+
+
+async def run_benchmark(n_tokens: int, n_models: int, seed: int) -> dict:
+    from engine.degen import model_evaluator
+
+    rng = random.Random(seed)
+    tokens = build_tokens(n_tokens, rng)
+    models = build_models(n_models, rng)
+    pairs = n_tokens * n_models
+
+    started = time.perf_counter()
+    baseline = []
+    for token in tokens:
+        baseline.append([await per_model_evaluate(token, model) for model in models])
+    per_model_s = time.perf_counter() - started
+    requested = sum(
+        len(model["mandatory_checks"]) + (0 if v["mandatory_fails"] else len(model["weighted_checks"]))
+        for row in baseline for model, v in zip(models, row)
+    )
+
+    calls, original, counted = _count_calls()
+    model_evaluator.run_check = counted
+    try:
+        started = time.perf_counter()
+        compiled = compile_models(models)
+        batched = [evaluate_compiled(token, compiled) for token in tokens]
+        batched_s = time.perf_counter() - started
+    finally:
+        model_evaluator.run_check = original
+
+    mismatches = sum(a != b for row_a, row_b in zip(baseline, batched) for a, b in zip(row_a, row_b))
+    return {
+        "tokens": n_tokens,
+        "models": n_models,
+        "evaluations": pairs,
+        "per_model_s": round(per_model_s, 3),
+        "per_model_evals_per_sec": round(pairs / per_model_s) if per_model_s else 0,
+        "batched_s": round(batched_s, 3),
+        "batched_evals_per_sec": round(pairs / batched_s) if batched_s else 0,
+        "speedup": round(per_model_s / batched_s, 2) if batched_s else 0.0,
+        "checks_requested": requested,
+        "checks_run": calls["n"],
+        "passing_verdicts": sum(v["passed"] for row in batched for v in row),
+        "verdict_mismatches": mismatches,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batched degen model evaluation.")
+    parser.add_argument("--tokens", type=int, default=2000)
+    parser.add_argument("--models", type=int, default=12)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", action="store_true", help="print the raw result as JSON")
+    args = parser.parse_args()
+
+    result = asyncio.run(run_benchmark(args.tokens, args.models, args.seed))
+    if args.json:
+        print(json.dumps(result))
+    else:
+        width = max(len(k) for k in result)
+        for key, value in result.items():
+            print(f"{key.ljust(width)}  {value}")
+    if result["verdict_mismatches"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
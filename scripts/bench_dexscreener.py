@@ -0,0 +1,165 @@
+"""DexScreener batching benchmark.
+
+Serves ``/dex/tokens/<a,b,...>`` from a local HTTP fixture server and runs a
+simulated degen cycle through the real lookup paths:
+
+- auto-scanner candidates scanned three at a time (contract_scanner),
+- a degen scan over recent tokens six at a time,
+- whale-buy market lookups (wallet_tracker),
+- exit-trigger price checks.
+
+The paths overlap on tokens the way the live jobs do. The script counts
+lookups against HTTP requests actually made, and checks that every lookup
+got exactly the pairs the fixture holds for that token.
+
+Like the live API, the fixture cuts a response off at 30 pairs. A few popular
+tokens carry many pairs, so some batches come back full with tokens left out
+or cut short.
+
+    python scripts/bench_dexscreener.py --cycles 5
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+
+from harness import FixtureHandler, FixtureServer, bootstrap
+
+bootstrap("bench")
+
+from degen import wallet_tracker  # noqa: E402
+from engine.degen import contract_scanner, dexscreener  # noqa: E402
+
+SOL = "So11111111111111111111111111111111111111112"
+
+
+def _universe(rng: random.Random, n: int) -> dict:
+    tokens = {}
+    for i in range(n):
+        addr = f"Tok{i:04d}" + "x" * 36
+        tokens[addr] = [
+            {
+                "pairAddress": f"{addr[:8]}pair{j}",
+                "baseToken": {"address": addr, "symbol": f"T{i}"},
+                "quoteToken": {"address": SOL, "symbol": "SOL"},
+                "priceUsd": str(round(rng.random(), 8)),
+                "liquidity": {"usd": round(rng.random() * 1e6, 2)},
+                "volume": {"h24": round(rng.random() * 1e6, 2)},
+                "marketCap": round(rng.random() * 1e7, 2),
+                "pairCreatedAt": 1_700_000_000_000 + i,
+            }
+            for j in range(rng.randint(12, 20) if i % 40 == 0 else rng.randint(0, 3))
+        ]
+    return tokens
+
+
+def _handler(tokens: dict, counter: dict):
+    class Handler(FixtureHandler):
+        def do_GET(self):
+            prefix = "/dex/tokens/"
+            if not self.path.startswith(prefix):
+                self.send_error(404)
+                return
+            counter["requests"] += 1
+            addresses = self.path[len(prefix):].split(",")
+            pairs = [p for a in addresses for p in tokens.get(a, [])]
+            self.send_json({"pairs": pairs[:dexscreener.RESPONSE_PAIR_CAP]})
+
+    return Handler
+
+
+async def _cycle(rng: random.Random, addrs: list, tokens: dict, check: list) -> int:
+    candidates = rng.sample(addrs, 30)
+    recent = rng.sample(addrs, 100)
+    whale_buys = rng.sample(addrs, 12)
+    open_trades = rng.sample(recent, 8)
+    lookups = 0
+
+    async def scan(addr, sem):
+        async with sem:
+            dex = await contract_scanner.fetch_dexscreener_data(addr)
+            best = max(tokens[addr], key=lambda p: p["liquidity"]["usd"], default=None)
+            check.append(dex.get("pair_address", "") == (best["pairAddress"] if best else ""))
+
+    async def rescan(addr, sem):
+        async with sem:
+            pairs = await dexscreener.get_token_pairs(addr)
+            check.append([p["pairAddress"] for p in pairs] == [p["pairAddress"] for p in tokens[addr]])
+
+    async def whale(addr):
+        intel = await wallet_tracker.get_token_market_data(addr)
+        check.append(bool(intel) == bool(tokens[addr]))
+
+    # Auto scanner: prefetch, then scan behind its semaphore.
+    await dexscreener.prefetch(candidates)
+    sem = asyncio.Semaphore(3)
+    await asyncio.gather(*(scan(a, sem) for a in candidates))
+    lookups += len(candidates)
+    # Degen scan job (prefetched) alongside whale alerts, which only have
+    # the in-flight batching to lean on.
+    sem = asyncio.Semaphore(6)
+    await dexscreener.prefetch(recent)
+    await asyncio.gather(*(rescan(a, sem) for a in recent), *(whale(a) for a in whale_buys))
+    lookups += len(recent) + len(whale_buys)
+    # Exit triggers, sequential after a prefetch.
+    await dexscreener.prefetch(open_trades)
+    for addr in open_trades:
+        await rescan(addr, asyncio.Semaphore(1))
+    lookups += len(open_trades)
+    return lookups
+
+
+async def run_bench(cycles: int, seed: int, universe: int) -> dict:
+    rng = random.Random(seed)
+    tokens = _universe(rng, universe)
+    addrs = list(tokens)
+    counter = {"requests": 0}
+    server = FixtureServer(_handler(tokens, counter))
+    saved = dexscreener.API_BASE
+    dexscreener.API_BASE = server.url
+    check: list = []
+    lookups = 0
+    try:
+        for _ in range(cycles):
+            dexscreener.PAIRS_CACHE.clear()  # cycles are minutes apart; TTL has lapsed
+            lookups += await _cycle(rng, addrs, tokens, check)
+    finally:
+        server.shutdown()
+        dexscreener.API_BASE = saved
+    mismatches = check.count(False)
+    return {
+        "cycles": cycles,
+        "lookups": lookups,
+        "http_requests": counter["requests"],
+        "requests_per_cycle": round(counter["requests"] / cycles, 1),
+        "reduction": round(lookups / counter["requests"], 1) if counter["requests"] else 0.0,
+        "cache_hits": dexscreener.DEX_STATS["cache_hits"],
+        "joined": dexscreener.DEX_STATS["joined"],
+        "retried": dexscreener.DEX_STATS["retried"],
+        "mismatches": mismatches,
+        "ok": mismatches == 0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Count DexScreener requests for a simulated degen cycle.")
+    parser.add_argument("--cycles", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=3)
+    parser.add_argument("--universe", type=int, default=400, help="distinct tokens in the fixture")
+    parser.add_argument("--json", action="store_true", help="print the raw result as JSON")
+    args = parser.parse_args()
+
+    result = asyncio.run(run_bench(args.cycles, args.seed, args.universe))
+    if args.json:
+        print(json.dumps(result))
+    else:
+        for key, value in result.items():
+            print(f"{key.ljust(20)} {value}")
+    if not result["ok"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
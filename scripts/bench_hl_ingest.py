@@ -0,0 +1,295 @@
+"""Hyperliquid fill/funding ingestion benchmark against a local fake info API.
+
+Serves ``userFillsByTime`` (2000 per page, oldest first), ``userFunding``
+(500 per page) and ``userFills`` (the 2000 most recent) from a local HTTP
+fixture. An account with a long backlog of fills keeps trading hour by hour:
+partial fills share an order id, several fills land on the same millisecond,
+and every open coin pays funding each hour. The ingest job runs every hour
+and the performance view is opened every few hours. The db fill/funding
+functions are swapped for an in-memory table that keeps the same per-coin,
+per-day aggregates as ``hl_perf_daily``.
+
+The run fails unless every performance view matches a recomputation over the
+fixture's full history. It reports Hyperliquid requests and rows transferred
+next to the old view, which refetched fills and funding on every open and
+only looked at the last 200 fills.
+
+    python scripts/bench_hl_ingest.py --backlog 6000 --days 3
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+from harness import FixtureHandler, FixtureServer, bootstrap
+
+bootstrap("bench")
+
+import db  # noqa: E402
+from engine.hyperliquid import analytics, client, ingest  # noqa: E402
+from engine.hyperliquid.account_reader import parse_fill  # noqa: E402
+
+ADDRESS = "0xbench"
+COINS = ("BTC", "ETH", "SOL", "HYPE", "DOGE", "ARB")
+LEGACY_LIMIT = 200
+HOUR_MS = 3_600_000
+
+
+class Account:
+    def __init__(self, rng: random.Random, start_ms: int):
+        self.rng = rng
+        self.now_ms = start_ms
+        self.fills: list = []
+        self.funding: list = []
+        self.lock = threading.Lock()
+        self.tid = self.oid = 0
+
+    def trade(self, count: int, span_ms: int) -> None:
+        with self.lock:
+            for _ in range(count):
+                self.oid += 1
+                t = self.now_ms + self.rng.randrange(span_ms)
+                coin = self.rng.choice(COINS)
+                closing = self.rng.random() < 0.45
+                for _ in range(self.rng.choice((1, 1, 2, 3))):  # partial fills, same order and millisecond
+                    self.tid += 1
+                    self.fills.append({
+                        "coin": coin, "side": self.rng.choice("AB"), "px": f"{self.rng.uniform(1, 100):.2f}",
+                        "sz": f"{self.rng.uniform(0.1, 5):.3f}", "time": t, "oid": self.oid, "tid": self.tid,
+                        "closedPnl": f"{self.rng.uniform(-40, 50):.2f}" if closing else "0.0",
+                        "fee": f"{self.rng.uniform(0.01, 0.5):.4f}",
+                    })
+            self.fills.sort(key=lambda f: (f["time"], f["tid"]))
+
+    def pay_funding(self) -> None:
+        with self.lock:
+            for coin in self.rng.sample(COINS, 3):
+                self.funding.append({
+                    "time": self.now_ms, "hash": "0x0",
+                    "delta": {"type": "funding", "coin": coin, "usdc": f"{self.rng.uniform(-2, 2):.6f}", "szi": "1.0", "fundingRate": "0.0000125"},
+                })
+
+    def page(self, rows: list, start: int, limit: int) -> list:
+        with self.lock:
+            return [r for r in rows if r["time"] >= start][:limit]
+
+
+def _handler(account: Account, counter: dict):
+    class Handler(FixtureHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            kind = body.get("type")
+            if kind == "userFillsByTime":
+                rows = account.page(account.fills, int(body["startTime"]), ingest.FILLS_PAGE)
+            elif kind == "userFunding":
+                rows = account.page(account.funding, int(body["startTime"]), ingest.FUNDING_PAGE)
+            elif kind == "userFills":
+                with account.lock:
+                    rows = list(reversed(account.fills[-2000:]))
+            else:
+                self.send_error(422)
+                return
+            counter["requests"] += 1
+            counter["rows"] += len(rows)
+            self.send_json(rows)
+
+    return Handler
+
+
+class MemoryStore:
+    """In-memory stand-in for the hl_trade_history / hl_funding_history / hl_perf_daily writes."""
+
+    def __init__(self):
+        self.fill_keys: set = set()
+        self.funding_keys: set = set()
+        self.daily: dict = {}
+        self.cursor = {"fills_ms": 0, "funding_ms": 0}
+
+    def _row(self, address, ts, coin):
+        key = (address, ts.astimezone(timezone.utc).date(), coin)
+        return self.daily.setdefault(key, {
+            "fills": 0, "closes": 0, "wins": 0, "losses": 0, "net_pnl": 0.0, "gross_profit": 0.0, "gross_loss": 0.0,
+            "fees": 0.0, "funding": 0.0, "best_pnl": None, "worst_pnl": None,
+        })
+
+    def save_hl_fills(self, address, fills):
+        for f in fills:
+            if (address, f["tid"]) in self.fill_keys:
+                continue
+            self.fill_keys.add((address, f["tid"]))
+            row = self._row(address, f["timestamp"], f["coin"])
+            row["fills"] += 1
+            row["fees"] += f["fee"]
+            if f["closed_pnl"] != 0:
+                net = f["closed_pnl"] - f["fee"]
+                row["closes"] += 1
+                row["net_pnl"] += net
+                row["wins"] += net > 0
+                row["losses"] += net < 0
+                row["gross_profit"] += max(net, 0)
+                row["gross_loss"] += max(-net, 0)
+                row["best_pnl"] = net if row["best_pnl"] is None else max(row["best_pnl"], net)
+                row["worst_pnl"] = net if row["worst_pnl"] is None else min(row["worst_pnl"], net)
+        if fills:
+            self.cursor["fills_ms"] = max(self.cursor["fills_ms"], max(f["time_ms"] for f in fills))
+
+    def save_hl_funding(self, address, entries):
+        for e in entries:
+            if (address, e["coin"], e["time"]) in self.funding_keys:
+                continue
+            self.funding_keys.add((address, e["coin"], e["time"]))
+            self._row(address, e["timestamp"], e["coin"])["funding"] += e["payment"]
+        if entries:
+            self.cursor["funding_ms"] = max(self.cursor["funding_ms"], max(e["time"] for e in entries))
+
+    def get_hl_ingest_cursor(self, address):
+        return dict(self.cursor)
+
+    def get_hl_performance(self, address):
+        def fold(agg, row):
+            for key, value in row.items():
+                if key in ("best_pnl", "worst_pnl"):
+                    pick = max if key == "best_pnl" else min
+                    present = [v for v in (agg.get(key), value) if v is not None]
+                    agg[key] = pick(present) if present else None
+                elif key != "coin":
+                    agg[key] = agg.get(key, 0) + value
+
+        by_coin: dict = {}
+        for (_, _, coin), row in self.daily.items():
+            fold(by_coin.setdefault(coin, {"coin": coin}), row)
+        total = {"coin": None}
+        for agg in by_coin.values():
+            fold(total, agg)
+        return list(by_coin.values()) + [total]
+
+
+def _reference(fills: list, funding_total: float) -> dict:
+    trades = [parse_fill(f) for f in fills]
+    closes = [t for t in trades if t["is_close"]]
+    nets = [t["closed_pnl"] - t["fee"] for t in closes]
+    wins, losses = [n for n in nets if n > 0], [n for n in nets if n < 0]
+    win_rate = len(wins) / len(closes) * 100
+    avg_win = sum(wins) / len(wins) if wins else 0
+    avg_loss = sum(losses) / len(losses) if losses else 0
+    total_pnl = sum(nets)
+    return {
+        "total_trades": len(trades),
+        "closes": len(closes),
+        "wins": len(wins),
+        "losses": len(losses),
+        "win_rate": round(win_rate, 1),
+        "total_pnl": round(total_pnl, 2),
+        "total_fees": round(sum(t["fee"] for t in trades), 4),
+        "expectancy": round(win_rate / 100 * avg_win + (1 - win_rate / 100) * avg_loss, 2),
+        "profit_factor": round(sum(wins) / abs(sum(losses)), 2) if losses else 0,
+        "best": round(max(nets), 2),
+        "worst": round(min(nets), 2),
+        "net_with_funding": round(total_pnl + funding_total, 2),
+    }
+
+
+def _matches(perf: dict, want: dict) -> bool:
+    got = dict(perf, best=perf["best_trade"]["net_pnl"], worst=perf["worst_trade"]["net_pnl"])
+    return all(abs(float(got[k]) - float(v)) <= 0.011 for k, v in want.items())
+
+
+async def run_bench(backlog: int, days: int, per_hour: int, view_every: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    start_ms = int(datetime(2026, 1, 1, tzinfo=timezone.utc).timestamp() * 1000)
+    account = Account(rng, start_ms)
+    account.trade(backlog // 2, 30 * 24 * HOUR_MS)
+    account.now_ms += 30 * 24 * HOUR_MS
+    counter = {"requests": 0, "rows": 0}
+    server = FixtureServer(_handler(account, counter))
+
+    store = MemoryStore()
+    names = ("save_hl_fills", "save_hl_funding", "get_hl_ingest_cursor", "get_hl_performance")
+    saved = {name: getattr(db, name) for name in names + ("get_hl_address",)}
+    for name in names:
+        setattr(db, name, getattr(store, name))
+    db.get_hl_address = lambda: ADDRESS
+    saved_url, saved_ttl = client.HL_INFO_URL, ingest.SYNC_TTL
+    client.HL_INFO_URL = server.url
+    ingest.SYNC_TTL = 0
+
+    views = mismatches = legacy_requests = legacy_rows = legacy_missed = 0
+    started = time.perf_counter()
+    try:
+        for hour in range(days * 24):
+            account.trade(per_hour, HOUR_MS)
+            account.now_ms += HOUR_MS
+            account.pay_funding()
+            await ingest.hl_ingest_job(None)
+            if hour % view_every:
+                continue
+            views += 1
+            perf = await analytics.calculate_hl_performance(ADDRESS)
+            with account.lock:
+                fills = list(account.fills)
+                funding_total = sum(float(e["delta"]["usdc"]) for e in account.funding)
+            want = _reference(fills, funding_total)
+            mismatches += not _matches(perf, want)
+            # The old view: userFills (capped at 2000) + a week of funding per open, last 200 fills only.
+            legacy_requests += 2
+            week = [e for e in account.funding if e["time"] >= account.now_ms - 7 * 24 * HOUR_MS]
+            legacy_rows += min(len(fills), 2000) + len(week)
+            legacy_missed += want["closes"] - sum(1 for f in fills[-LEGACY_LIMIT:] if float(f["closedPnl"]) != 0)
+        # Backlog twice the initial size arriving at once still pages through.
+        account.trade(backlog, HOUR_MS)
+        account.now_ms += HOUR_MS
+        await ingest.sync_account(ADDRESS)
+        views += 1
+        perf = await analytics.calculate_hl_performance(ADDRESS)
+        with account.lock:
+            fills = list(account.fills)
+            funding_total = sum(float(e["delta"]["usdc"]) for e in account.funding)
+        mismatches += not _matches(perf, _reference(fills, funding_total))
+    finally:
+        server.shutdown()
+        for name, fn in saved.items():
+            setattr(db, name, fn)
+        client.HL_INFO_URL, ingest.SYNC_TTL = saved_url, saved_ttl
+
+    return {
+        "fills": len(account.fills),
+        "funding_events": len(account.funding),
+        "views": views,
+        "hl_requests": counter["requests"],
+        "rows_fetched": counter["rows"],
+        "legacy_requests": legacy_requests,
+        "legacy_rows": legacy_rows,
+        "legacy_missed_closes": legacy_missed // max(views - 1, 1),
+        "elapsed_s": round(time.perf_counter() - started, 2),
+        "mismatches": mismatches,
+        "ok": mismatches == 0 and len(store.fill_keys) == len(account.fills),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark incremental Hyperliquid fill/funding ingestion offline.")
+    parser.add_argument("--backlog", type=int, default=6000, help="orders already on the account before the first sync")
+    parser.add_argument("--days", type=int, default=3)
+    parser.add_argument("--per-hour", type=int, default=12, help="orders placed per simulated hour")
+    parser.add_argument("--view-every", type=int, default=4, help="hours between performance views")
+    parser.add_argument("--seed", type=int, default=23)
+    parser.add_argument("--json", action="store_true", help="print the raw result as JSON")
+    args = parser.parse_args()
+
+    result = asyncio.run(run_bench(args.backlog, args.days, args.per_hour, args.view_every, args.seed))
+    if args.json:
+        print(json.dumps(result))
+    else:
+        for key, value in result.items():
+            print(f"{key.ljust(20)} {value}")
+    if not result["ok"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
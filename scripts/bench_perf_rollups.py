@@ -0,0 +1,269 @@
+"""Performance rollup benchmark: incremental hourly rollups vs full scans.
+
+Replays a stream of trade_log events in memory: trades open, close as TP/SL/BE,
+some closed trades get their result edited later and a few are deleted by
+hand. The rollup is maintained the way ``db.update_trade_result`` does it
+(retract the row's old contribution, apply the new one, keyed by the hour it
+was logged), deletes are left to drift until the nightly reconcile rebuilds
+it, and after every simulated day the 30-day, tier and session stats are read
+from the rollup window plus the open trades and checked against a full scan
+of the trade log.
+
+It also runs the real ``model_grading_job`` against stubbed db reads and
+counts round trips next to the old per-model update/read loop.
+
+The run fails unless every read matches the full scan once reconciled and the
+reconcile reports exactly the rows the deletes knocked out of line.
+
+    python scripts/bench_perf_rollups.py --days 60 --per-day 400 --models 40
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from collections import defaultdict
+
+from harness import bootstrap
+
+bootstrap("bench")
+
+import db  # noqa: E402
+from engine import phase_engine  # noqa: E402
+
+HOUR = 3600
+TIERS = ("A+", "A", "B", "")
+SESSIONS = ("asia", "london", "ny", "")
+
+
+def _contribution(row: dict):
+    """Key and measures of one trade_log row, as in ``db._ROLLUP_ROWS["trade"]``."""
+    if row["result"] is None:
+        return None, None
+    key = (row["logged_at"] // HOUR * HOUR, row["tier"], row["session"])
+    rr = row["rr"]
+    return key, (1, int(row["result"] == "TP"), int(row["result"] == "SL"), int(rr is not None), rr or 0.0)
+
+
+class Rollup:
+    def __init__(self):
+        self.cells: dict = defaultdict(lambda: [0, 0, 0, 0, 0.0])
+
+    def apply(self, row: dict, sign: int = 1) -> None:
+        key, values = _contribution(row)
+        if key is None:
+            return
+        cell = self.cells[key]
+        for i, v in enumerate(values):
+            cell[i] += sign * v
+
+    def rebuild(self, trades: dict) -> int:
+        fresh = Rollup()
+        for row in trades.values():
+            fresh.apply(row)
+        live = {k: v for k, v in self.cells.items() if v[0] != 0}
+        keys = set(fresh.cells) | set(live)
+        drift = sum(1 for k in keys if _rounded(fresh.cells.get(k)) != _rounded(live.get(k)))
+        self.cells = fresh.cells
+        return drift
+
+
+def _rounded(cell):
+    return None if cell is None else tuple(round(v, 6) for v in cell)
+
+
+def _window_stats(rows) -> dict:
+    """Total/tier/session summaries over (tier, session, measures) tuples."""
+    total = [0, 0, 0, 0, 0.0]
+    tiers: dict = defaultdict(lambda: [0, 0, 0.0])
+    sessions: dict = defaultdict(lambda: [0, 0])
+    for tier, session, values in rows:
+        for i, v in enumerate(values):
+            total[i] += v
+        tiers[tier][0] += values[0]
+        tiers[tier][1] += values[1]
+        tiers[tier][2] += values[4]
+        sessions[session][0] += values[0]
+        sessions[session][1] += values[1]
+    return {
+        "total": total[:4] + [round(total[4], 6)],
+        "tiers": {k: [v[0], v[1], round(v[2], 6)] for k, v in tiers.items() if v[0]},
+        "sessions": {k: v for k, v in sessions.items() if v[0]},
+    }
+
+
+def _open_values(row: dict):
+    return row["tier"], row["session"], (1, 0, 0, int(row["rr"] is not None), row["rr"] or 0.0)
+
+
+def read_rollup(rollup: Rollup, trades: dict, since: int):
+    """``_TRADE_WINDOW_ROWS``: rollup cells from the window's hour plus open trades."""
+    cells = [(k[1], k[2], v) for k, v in rollup.cells.items() if k[0] >= since // HOUR * HOUR]
+    open_rows = [_open_values(r) for r in trades.values() if r["result"] is None and r["logged_at"] >= since]
+    return _window_stats(cells + open_rows), len(cells) + len(open_rows)
+
+
+def read_full_scan(trades: dict, since: int):
+    rows = []
+    for row in trades.values():
+        if row["result"] is None:
+            if row["logged_at"] >= since:
+                rows.append(_open_values(row))
+        elif row["logged_at"] // HOUR * HOUR >= since // HOUR * HOUR:
+            rows.append((row["tier"], row["session"], _contribution(row)[1]))
+    return _window_stats(rows), len(trades)
+
+
+def bench_rollups(days: int, per_day: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    trades: dict = {}
+    rollup = Rollup()
+    next_id = 0
+    now = 1_700_000_000
+    reads = mismatches = rollup_rows = scan_rows = drift_total = expected_drift = 0
+    read_s = scan_s = 0.0
+
+    for _ in range(days):
+        dirty = set()
+        for _ in range(per_day):
+            now += rng.randrange(1, 2 * 86400 // per_day)
+            next_id += 1
+            trades[next_id] = {
+                "logged_at": now, "tier": rng.choice(TIERS), "session": rng.choice(SESSIONS),
+                "rr": rng.choice((None, round(rng.uniform(0.5, 4), 2))), "result": None,
+            }
+            open_ids = [i for i in rng.sample(sorted(trades), min(8, len(trades))) if trades[i]["result"] is None]
+            for tid in open_ids[:2]:
+                # update_trade_result: retract (no-op while open), update, apply.
+                rollup.apply(trades[tid], -1)
+                trades[tid]["result"] = rng.choice(("TP", "SL", "SL", "BE"))
+                rollup.apply(trades[tid])
+            if rng.random() < 0.02:
+                tid = rng.choice(list(trades))
+                if trades[tid]["result"] is not None:
+                    # An edited result on a closed trade moves it between wins and losses.
+                    rollup.apply(trades[tid], -1)
+                    trades[tid]["result"] = rng.choice(("TP", "SL"))
+                    rollup.apply(trades[tid])
+            if rng.random() < 0.01:
+                # A manual delete bypasses the hooks and leaves the rollup stale until reconcile.
+                tid = rng.choice(list(trades))
+                key, _ = _contribution(trades.pop(tid))
+                if key is not None:
+                    dirty.add(key)
+        expected_drift += len(dirty)
+        drift_total += rollup.rebuild(trades)
+
+        since = now - 30 * 86400
+        started = time.perf_counter()
+        got, scanned = read_rollup(rollup, trades, since)
+        read_s += time.perf_counter() - started
+        started = time.perf_counter()
+        want, full = read_full_scan(trades, since)
+        scan_s += time.perf_counter() - started
+        reads += 1
+        rollup_rows += scanned
+        scan_rows += full
+        mismatches += got != want
+
+    return {
+        "trades": len(trades),
+        "reads": reads,
+        "rows_per_read": rollup_rows // max(reads, 1),
+        "legacy_rows_per_read": scan_rows // max(reads, 1),
+        "read_ms": round(read_s * 1000 / max(reads, 1), 2),
+        "legacy_read_ms": round(scan_s * 1000 / max(reads, 1), 2),
+        "drift_rows": drift_total,
+        "expected_drift": expected_drift,
+        "mismatches": mismatches,
+    }
+
+
+async def bench_grading(models: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    active = [{"id": f"m{i}", "name": f"Model {i}"} for i in range(models)]
+    perfs = {
+        m["id"]: {"model_id": m["id"], "total_alerts": rng.randrange(0, 80), "phase4_confirms": rng.randrange(0, 40),
+                  "demo_win_rate": rng.random(), "avg_r": rng.uniform(0, 3)}
+        for m in active
+    }
+    calls = {"n": 0}
+
+    def counted(fn):
+        def wrapper(*args, **kwargs):
+            calls["n"] += 1
+            return fn(*args, **kwargs)
+        return wrapper
+
+    class Bot:
+        sent = 0
+
+        async def send_message(self, **kwargs):
+            Bot.sent += 1
+
+    class Context:
+        bot = Bot()
+
+    stubs = {
+        "get_active_models": counted(lambda: active),
+        "refresh_model_performance": counted(lambda ids=None: len(ids or [])),
+        "get_model_performances": counted(lambda ids: {i: perfs[i] for i in ids}),
+        "get_model_performance": counted(lambda model_id: perfs[model_id]),
+    }
+    saved = {name: getattr(db, name) for name in stubs}
+    try:
+        for name, fn in stubs.items():
+            setattr(db, name, fn)
+        await phase_engine.model_grading_job(Context())
+    finally:
+        for name, fn in saved.items():
+            setattr(db, name, fn)
+
+    expected_alerts = sum(1 for p in perfs.values() if phase_engine.calculate_model_grade(p) in ("D", "F"))
+    return {
+        "models": models,
+        "grading_queries": calls["n"],
+        # Old loop: one aggregate + upsert and one read per model, after listing them.
+        "legacy_grading_queries": 1 + 2 * models,
+        "grade_alerts": Bot.sent,
+        "grade_alerts_ok": Bot.sent == expected_alerts,
+    }
+
+
+def run_bench(days: int, per_day: int, models: int, seed: int) -> dict:
+    started = time.perf_counter()
+    result = bench_rollups(days, per_day, seed)
+    result.update(asyncio.run(bench_grading(models, seed)))
+    result["elapsed_s"] = round(time.perf_counter() - started, 2)
+    result["ok"] = (
+        result["mismatches"] == 0
+        and result["drift_rows"] == result["expected_drift"]
+        and result["grade_alerts_ok"]
+        and result["grading_queries"] == 3
+    )
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark incremental performance rollups offline.")
+    parser.add_argument("--days", type=int, default=60)
+    parser.add_argument("--per-day", type=int, default=400, help="trades logged per simulated day")
+    parser.add_argument("--models", type=int, default=40, help="active models graded in one job run")
+    parser.add_argument("--seed", type=int, default=31)
+    parser.add_argument("--json", action="store_true", help="print the raw result as JSON")
+    args = parser.parse_args()
+
+    result = run_bench(args.days, args.per_day, args.models, args.seed)
+    if args.json:
+        print(json.dumps(result))
+    else:
+        for key, value in result.items():
+            print(f"{key.ljust(22)} {value}")
+    if not result["ok"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
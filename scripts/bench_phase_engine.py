@@ -0,0 +1,414 @@
+"""Offline phase-engine benchmark.
+
+Replays the recorded klines in .cache/cryptocompare through
+engine.rules.get_candles, swaps the db functions the phase engine touches for
+an in-memory store and records bot messages instead of sending them. No
+Binance, Postgres or Telegram access is needed and every run with the same
+arguments produces the same alerts.
+
+    python scripts/bench_phase_engine.py --models 6 --pairs 5 --cycles 20
+"""
+
+import argparse
+import asyncio
+import copy
+import glob
+import json
+import os
+import random
+import sys
+import time
+import zlib
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from harness import ROOT, bootstrap
+
+bootstrap("bench")
+
+import db
+import engine.phase_engine as phase_engine
+import engine.regime_detector as regime_detector
+import engine.rules as rules
+
+FIXTURE_DIR = os.path.join(ROOT, ".cache", "cryptocompare")
+CYCLE_SECONDS = 300
+REPLAY_START = datetime(2026, 2, 16, 9, 0, tzinfo=timezone.utc).timestamp()
+BENCH_PAIRS = ["BTCUSDT", "ETHUSDT", "SOLUSDT", "BNBUSDT", "XRPUSDT", "ADAUSDT", "AVAXUSDT", "DOGEUSDT", "LINKUSDT", "DOTUSDT"]
+INTERVAL_SECONDS = {
+    "1m": 60, "3m": 180, "5m": 300, "15m": 900, "30m": 1800,
+    "1h": 3600, "2h": 7200, "4h": 14400, "6h": 21600, "12h": 43200,
+    "1d": 86400, "3d": 259200, "1w": 604800,
+}
+RULE_TAGS = [
+    ("ltf_bullish", 1), ("ob_respected", 1), ("pin_bar_bull", 1),
+    ("htf_bullish", 2), ("mss", 2), ("ltf_bullish", 2), ("order_block", 2),
+    ("order_block", 3), ("bos", 3), ("breaker", 3), ("ob_respected", 3),
+    ("order_block", 4), ("breaker", 4),
+]
+
+
+class FixtureKlines:
+    """Serves recorded histo rows as Binance klines, advancing one bar-step per cycle."""
+
+    def __init__(self, fixture_dir: str = FIXTURE_DIR):
+        self.series = {}
+        for path in sorted(glob.glob(os.path.join(fixture_dir, "hist_*.json"))):
+            with open(path) as fh:
+                rows = json.load(fh)
+            if not isinstance(rows, list) or len(rows) < 2:
+                continue
+            step = int(rows[1]["time"] - rows[0]["time"])
+            self.series.setdefault(step, []).append(rows)
+        self.cycle = 0
+        self.calls = 0
+
+    def _rows_for(self, symbol: str, seconds: int) -> list:
+        if seconds in self.series:
+            pool = self.series[seconds]
+            return pool[zlib.crc32(symbol.encode()) % len(pool)]
+        finer = max((s for s in self.series if seconds % s == 0), default=None)
+        if finer is None:
+            return []
+        return _resample(self._rows_for(symbol, finer), seconds // finer)
+
+    async def __call__(self, symbol: str, interval: str, limit: int) -> list:
+        self.calls += 1
+        seconds = INTERVAL_SECONDS.get(interval, 3600)
+        rows = self._rows_for(symbol, seconds)
+        if not rows:
+            return []
+        end = min(len(rows), max(limit, len(rows) // 2) + (self.cycle * CYCLE_SECONDS) // seconds)
+        window = rows[max(0, end - limit):end]
+        return [
+            [int(r["time"]) * 1000, r["open"], r["high"], r["low"], r["close"], r.get("volumefrom", r.get("volume", 0))]
+            for r in window
+        ]
+
+
+def _resample(rows: list, factor: int) -> list:
+    out = []
+    for i in range(0, len(rows) - factor + 1, factor):
+        chunk = rows[i:i + factor]
+        out.append({
+            "time": chunk[0]["time"],
+            "open": chunk[0]["open"],
+            "high": max(r["high"] for r in chunk),
+            "low": min(r["low"] for r in chunk),
+            "close": chunk[-1]["close"],
+            "volumefrom": sum(r.get("volumefrom", 0) for r in chunk),
+        })
+    return out
+
+
+class ReplayClock(datetime):
+    """datetime stand-in whose now()/utcnow() follow the replay cycle."""
+
+    ts = REPLAY_START
+
+    @classmethod
+    def now(cls, tz=None):
+        return datetime.fromtimestamp(cls.ts, tz)
+
+    @classmethod
+    def utcnow(cls):
+        return datetime.fromtimestamp(cls.ts, timezone.utc).replace(tzinfo=None)
+
+
+class FakeDB:
+    """In-memory replacement for the db functions reached from run_phase_engine."""
+
+    def __init__(self, models: list):
+        self.models = models
+        self.phases = {}
+        self.pending = []
+        self.lifecycles = []
+        self.queries = 0
+
+    def _count(self, fn):
+        def wrapped(*args, **kwargs):
+            self.queries += 1
+            return fn(*args, **kwargs)
+        return wrapped
+
+    def functions(self) -> dict:
+        fns = {
+            "get_active_models": lambda: copy.deepcopy(self.models),
+            "get_user_preferences": lambda chat_id=None: {},
+            "expire_old_pending_signals": lambda: None,
+            "get_setup_phases_for_models": self.get_setup_phases_for_models,
+            "create_setup_phases": self.create_setup_phases,
+            "apply_setup_phase_writes": self.apply_setup_phase_writes,
+            "get_setup_phase": self.get_setup_phase,
+            "save_setup_phase": self.save_setup_phase,
+            "update_phase_status": lambda id, n, status, data: self.apply_setup_phase_writes([("status", db.phase_status_write(id, n, status, data))]),
+            "save_pending_signal": self.save_pending_signal,
+            "get_risk_settings": lambda: {"enabled": True, "account_size": 1000.0, "risk_per_trade_pct": 1.0, "min_quality_grade": "D"},
+            "get_daily_tracker": lambda: {},
+            "update_daily_tracker": lambda data: None,
+            "get_open_demo_trades_all": lambda: [],
+            "get_notification_pattern": lambda key: None,
+            "increment_pattern_alert": lambda key: None,
+            "save_alert_lifecycle": self.save_alert_lifecycle,
+            "get_alert_lifecycle": lambda setup_phase_id: None,
+            "update_alert_lifecycle": lambda id, fields: None,
+            "update_model_performance": lambda model_id: None,
+            "get_latest_regime": lambda: None,
+            "get_latest_pair_regimes": lambda: {},
+            "update_model_regime_performance": lambda *a, **k: None,
+        }
+        return {name: self._count(fn) for name, fn in fns.items()}
+
+    def get_setup_phases_for_models(self, model_ids):
+        wanted = {str(m) for m in model_ids}
+        return {k: v for k, v in self.phases.items() if k[0] in wanted}
+
+    def _new_row(self, phase: dict) -> dict:
+        row = {
+            "id": len(self.phases) + 1,
+            "model_id": str(phase["model_id"]),
+            "model_name": phase.get("model_name"),
+            "pair": phase["pair"],
+            "direction": phase.get("direction"),
+            "overall_status": phase.get("overall_status") or "phase1",
+            "check_count": phase.get("check_count", 0) or 0,
+        }
+        self.phases[(row["model_id"], row["pair"], row["direction"])] = row
+        return row
+
+    def create_setup_phases(self, phases):
+        out = {}
+        for phase in phases:
+            key = (str(phase["model_id"]), phase["pair"], phase.get("direction"))
+            out[key] = dict(self.phases.get(key) or self._new_row(phase))
+        return out
+
+    def get_setup_phase(self, model_id, pair, direction):
+        row = self.phases.get((str(model_id), pair, direction))
+        return dict(row) if row else None
+
+    def _by_id(self, id):
+        return next((r for r in self.phases.values() if r["id"] == id), None)
+
+    def save_setup_phase(self, phase):
+        if phase.get("id"):
+            row = self._by_id(phase["id"])
+            if row is not None:
+                row.update({k: v for k, v in phase.items() if k != "id" and k in db._SETUP_PHASE_UPDATABLE_FIELDS})
+            return int(phase["id"])
+        key = (str(phase["model_id"]), phase["pair"], phase.get("direction"))
+        return (self.phases.get(key) or self._new_row(phase))["id"]
+
+    def apply_setup_phase_writes(self, writes):
+        for kind, payload in writes:
+            if kind == "save":
+                self.save_setup_phase(payload)
+                continue
+            row = self._by_id(payload["id"])
+            if row is None:
+                continue
+            n = payload["phase_num"]
+            row.update({
+                f"phase{n}_status": payload["status"],
+                f"phase{n}_score": payload["score"],
+                f"phase{n}_max_score": payload["max_score"],
+                f"phase{n}_completed_at": payload["completed_at"],
+                "overall_status": payload["next_status"],
+                "check_count": (row.get("check_count") or 0) + 1,
+            })
+            if payload["expires_at"] is not None:
+                row[f"phase{n}_expires_at"] = payload["expires_at"]
+        return []
+
+    def save_pending_signal(self, data):
+        self.pending.append(data)
+        return len(self.pending)
+
+    def save_alert_lifecycle(self, data):
+        self.lifecycles.append(data)
+        return len(self.lifecycles)
+
+
+class FakeBot:
+    def __init__(self):
+        self.sent = []
+
+    async def send_message(self, chat_id=None, text="", **kwargs):
+        self.sent.append(text)
+        return SimpleNamespace(message_id=len(self.sent))
+
+
+class FakeJobQueue:
+    def __init__(self):
+        self.scheduled = []
+
+    def run_once(self, callback, when=None, data=None, **kwargs):
+        self.scheduled.append((getattr(callback, "__name__", "job"), when, data))
+
+
+def build_models(n_models: int) -> list:
+    """Models scanning every pair, each dropping a different rule from RULE_TAGS."""
+    models = []
+    for i in range(n_models):
+        dropped = i % len(RULE_TAGS)
+        chosen = [t for j, t in enumerate(RULE_TAGS) if j != dropped]
+        models.append({
+            "id": f"BENCH_{i + 1}",
+            "name": f"Bench Model {i + 1}",
+            "pair": "ALL",
+            "timeframe": "15m",
+            "bias": ["Both", "Bullish", "Bearish"][i % 3],
+            "status": "active",
+            "rules": [
+                {"id": f"r{j}", "tag": tag, "name": tag, "phase": phase, "weight": 1 + (j % 3), "mandatory": j == 0 and i % 2 == 0}
+                for j, (tag, phase) in enumerate(chosen)
+            ],
+        })
+    return models
+
+
+def _percentile(values: list, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def run_benchmark(n_models: int, n_pairs: int, cycles: int) -> dict:
+    pairs = BENCH_PAIRS[:max(1, n_pairs)]
+    models = build_models(n_models)
+    fake = FakeDB(models)
+    klines = FixtureKlines()
+    bot, jobs = FakeBot(), FakeJobQueue()
+    context = SimpleNamespace(bot=bot, job_queue=jobs, job=None)
+    latencies = []
+
+    originals = {name: getattr(db, name) for name in fake.functions()}
+    patched_modules = [db, rules, phase_engine]
+    saved = {
+        "datetime": {m: m.datetime for m in patched_modules},
+        "supported_pairs": phase_engine.SUPPORTED_PAIRS,
+        "evaluate": phase_engine.evaluate_model_phases,
+        "enrich": None,
+        "ensure_pool": db._ensure_pool,
+    }
+
+    async def timed_evaluate(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await saved["evaluate"](*args, **kwargs)
+        finally:
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    async def no_hl_plan(signal):
+        return signal
+
+    def no_pool():
+        raise RuntimeError("benchmark must not touch Postgres")
+
+    from engine.hyperliquid import signal_bridge
+
+    saved["enrich"] = signal_bridge.enrich_signal_with_hl_plan
+    for name, fn in fake.functions().items():
+        setattr(db, name, fn)
+    for module in patched_modules:
+        module.datetime = ReplayClock
+    db._ensure_pool = no_pool
+    phase_engine.SUPPORTED_PAIRS = pairs
+    phase_engine.evaluate_model_phases = timed_evaluate
+    signal_bridge.enrich_signal_with_hl_plan = no_hl_plan
+    rules.set_kline_source(klines)
+    stats_before = dict(rules.CANDLE_STATS)
+
+    started = time.perf_counter()
+    try:
+        for cycle in range(cycles):
+            klines.cycle = cycle
+            ReplayClock.ts = REPLAY_START + cycle * CYCLE_SECONDS
+            rules._GLOBAL_CACHE.clear()
+            await phase_engine._run_phase_engine_inner(context)
+    finally:
+        elapsed = time.perf_counter() - started
+        rules.set_kline_source(None)
+        for name, fn in originals.items():
+            setattr(db, name, fn)
+        for module, value in saved["datetime"].items():
+            module.datetime = value
+        db._ensure_pool = saved["ensure_pool"]
+        phase_engine.SUPPORTED_PAIRS = saved["supported_pairs"]
+        phase_engine.evaluate_model_phases = saved["evaluate"]
+        signal_bridge.enrich_signal_with_hl_plan = saved["enrich"]
+
+    requests = rules.CANDLE_STATS["requests"] - stats_before["requests"]
+    fetches = rules.CANDLE_STATS["fetches"] - stats_before["fetches"]
+    return {
+        "models": n_models,
+        "pairs": len(pairs),
+        "cycles": cycles,
+        "combinations": len(latencies),
+        "elapsed_s": round(elapsed, 3),
+        "cycles_per_sec": round(cycles / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(_percentile(latencies, 50), 3),
+        "p99_ms": round(_percentile(latencies, 99), 3),
+        "candle_requests": requests,
+        "http_calls": fetches,
+        "http_calls_avoided": requests - fetches,
+        "db_calls": fake.queries,
+        "alerts": len(bot.sent),
+        "pending_signals": len(fake.pending),
+        "phase4_jobs": len(jobs.scheduled),
+        "alert_digest": f"{zlib.crc32(chr(0).join(bot.sent).encode()):08x}",
+    }
+
+
+def _random_candles(rng: random.Random, count: int) -> list:
+    price, out = rng.uniform(1, 1000), []
+    for _ in range(count):
+        price *= 1 + rng.gauss(0, 0.02)
+        spread = price * rng.uniform(0.002, 0.04)
+        out.append({"high": price + spread, "low": max(price - spread, 0.01), "close": price + rng.uniform(-spread, spread)})
+    return out
+
+
+def regime_parity(trials: int, seed: int = 7) -> int:
+    """Pairs of mixed history length classified together vs each alone; returns mismatches."""
+    rng = random.Random(seed)
+    mismatches = 0
+    for _ in range(trials):
+        d1, h4 = {}, {}
+        for pair in BENCH_PAIRS[:6]:
+            d1[pair] = _random_candles(rng, rng.choice((regime_detector.D1_LIMIT, regime_detector.D1_LIMIT, 17, 22)))
+            h4[pair] = _random_candles(rng, rng.choice((regime_detector.H4_LIMIT, regime_detector.H4_LIMIT, 31, 40)))
+        stacked = regime_detector.classify_pairs(d1, h4)
+        for pair in d1:
+            alone = regime_detector.classify_pairs({pair: d1[pair]}, {pair: h4[pair]})[pair]
+            mismatches += stacked[pair] != alone
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded klines through the phase engine.")
+    parser.add_argument("--models", type=int, default=6)
+    parser.add_argument("--pairs", type=int, default=5)
+    parser.add_argument("--cycles", type=int, default=20)
+    parser.add_argument("--regime-trials", type=int, default=200, help="stacked vs per-pair regime parity trials")
+    parser.add_argument("--json", action="store_true", help="print the raw result as JSON")
+    args = parser.parse_args()
+
+    import logging
+
+    logging.basicConfig(level=logging.ERROR)
+    result = asyncio.run(run_benchmark(args.models, args.pairs, args.cycles))
+    result["regime_mismatches"] = regime_parity(args.regime_trials)
+    if args.json:
+        print(json.dumps(result))
+    else:
+        width = max(len(k) for k in result)
+        for key, value in result.items():
+            print(f"{key.ljust(width)}  {value}")
+    if result["regime_mismatches"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
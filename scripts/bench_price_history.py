@@ -0,0 +1,210 @@
+"""Polymarket price-history store benchmark.
+
+Serves ``/prices-history`` (``startTs``/``endTs``/``fidelity``) for a set of
+random-walk tokens from a local HTTP fixture server. A fake clock advances
+one 5-minute tick at a time, each tick with new points for every token.
+Every tick, the scanner, model checks and ``fetch_price_history`` callers
+read a sample of tokens the way the live paths do. Halfway through the bot
+"restarts": the in-memory series are dropped and reloaded from the store.
+The db price functions are swapped for an in-memory table.
+
+The run fails unless every momentum read matches a full recomputation from
+the fixture's own series and every ``fetch_price_history`` result matches
+the fixture bucketed the same way. It reports CLOB requests and points
+transferred next to what the old fetch-48-points-per-call reader would have
+cost.
+
+    python scripts/bench_price_history.py --tokens 200 --hours 12
+"""
+
+import argparse
+import asyncio
+import bisect
+import json
+import random
+import sys
+import threading
+import time
+from urllib.parse import parse_qs, urlparse
+
+from harness import FixtureHandler, FixtureServer, SimClock, bootstrap
+
+bootstrap("bench")
+
+import db  # noqa: E402
+from engine.polymarket import market_reader, price_history  # noqa: E402
+
+TICK_SECONDS = 300
+LEGACY_POINTS = 48
+
+
+class Fixture:
+    def __init__(self, rng: random.Random, tokens: int):
+        self.rng = rng
+        self.series = {f"tok{i:04d}": ([], []) for i in range(tokens)}
+        self.lock = threading.Lock()
+
+    def tick(self, now: float) -> None:
+        with self.lock:
+            for ts, price in self.series.values():
+                p = price[-1] if price else self.rng.uniform(0.1, 0.9)
+                ts.append(int(now))
+                price.append(round(min(0.99, max(0.01, p + self.rng.gauss(0, 0.01))), 4))
+
+    def history(self, token: str, start: int, end: int) -> list:
+        with self.lock:
+            ts, price = self.series.get(token, ([], []))
+            lo, hi = bisect.bisect_left(ts, start), bisect.bisect_right(ts, end)
+            return [{"t": t, "p": p} for t, p in zip(ts[lo:hi], price[lo:hi])]
+
+
+def _handler(fixture: Fixture, counter: dict):
+    class Handler(FixtureHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path != "/prices-history":
+                self.send_error(404)
+                return
+            q = {k: v[0] for k, v in parse_qs(url.query).items()}
+            history = fixture.history(q["market"], int(q.get("startTs", 0)), int(q.get("endTs", 2**40)))
+            counter["requests"] += 1
+            counter["points"] += len(history)
+            self.send_json({"history": history})
+
+    return Handler
+
+
+class MemoryStore:
+    def __init__(self):
+        self.rows: dict = {}
+
+    def save_poly_prices(self, token_id, market_id, points):
+        series = self.rows.setdefault(token_id, {})
+        for ts, price in points:
+            series.setdefault(int(ts), float(price))
+
+    def get_poly_prices(self, token_id, since_ts):
+        return sorted((t, p) for t, p in self.rows.get(token_id, {}).items() if t >= since_ts)
+
+    def prune_poly_prices(self, before_ts):
+        return 0
+
+
+def _expected_momentum(ts: list, price: list) -> dict:
+    last_ts, last = ts[-1], price[-1]
+    out = {"price": round(last * 100, 2), "last_ts": last_ts}
+    for key, span in (("change_1h", 3600), ("change_24h", 86400)):
+        i = bisect.bisect_right(ts, last_ts - span) - 1
+        out[key] = round((last - price[i]) * 100, 2) if i >= 0 else None
+    moves = [(t, p - q) for t, p, q in zip(ts[1:], price[1:], price[:-1]) if t > last_ts - price_history.VOL_WINDOW]
+    if len(moves) >= 2:
+        mean = sum(m for _, m in moves) / len(moves)
+        out["volatility_24h"] = round((sum((m - mean) ** 2 for _, m in moves) / len(moves)) ** 0.5 * 100, 3)
+    else:
+        out["volatility_24h"] = None
+    return out
+
+
+def _expected_history(fixture: Fixture, token: str, resolution: str, limit: int) -> list:
+    ts, price = fixture.series[token]
+    step = price_history.TF_SECONDS[resolution]
+    buckets: dict = {}
+    for t, p in zip(ts, price):
+        if t >= ts[-1] - step * limit:
+            buckets[t // step] = {"t": t, "p": p}
+    return list(buckets.values())[-limit:]
+
+
+def _close(a: dict, b: dict) -> bool:
+    for key, want in b.items():
+        got = a.get(key)
+        if (got is None) != (want is None) or (want is not None and abs(got - want) > 1e-6 + 1e-3 * (key == "volatility_24h")):
+            return False
+    return True
+
+
+async def run_bench(tokens: int, hours: int, reads: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    fixture = Fixture(rng, tokens)
+    counter = {"requests": 0, "points": 0}
+    server = FixtureServer(_handler(fixture, counter))
+    store = MemoryStore()
+    saved = {name: getattr(db, name) for name in ("save_poly_prices", "get_poly_prices", "prune_poly_prices")}
+    for name in saved:
+        setattr(db, name, getattr(store, name))
+    saved_url, saved_time, saved_clock = price_history.CLOB_URL, price_history.time, price_history.SERIES._clock
+    price_history.CLOB_URL = server.url
+    price_history.time = SimClock
+    price_history.SERIES._clock = SimClock.monotonic
+    price_history.SERIES.clear()
+
+    names = list(fixture.series)
+    ticks = hours * 3600 // TICK_SECONDS
+    # Seed a day of history so 24h windows are full from the first read.
+    for _ in range(86400 // TICK_SECONDS):
+        fixture.tick(SimClock.now)
+        SimClock.now += TICK_SECONDS
+    calls = mismatches = 0
+    started = time.perf_counter()
+    try:
+        for tick in range(ticks):
+            fixture.tick(SimClock.now)
+            SimClock.now += TICK_SECONDS
+            if tick == ticks // 2:
+                price_history.SERIES.clear()  # restart: only the table survives
+            sample = rng.sample(names, min(reads, len(names)))
+            # Scanner and model checks: momentum after a sync, several reads per token.
+            await price_history.sync_many((t, t) for t in sample)
+            for token in sample:
+                expected = _expected_momentum(*fixture.series[token])
+                for _ in range(3):
+                    calls += 1
+                    mismatches += not _close(price_history.momentum(token), expected)
+            # Handler-style history reads.
+            for token in sample[: max(1, reads // 4)]:
+                calls += 1
+                got = await market_reader.fetch_price_history(token, "1h", LEGACY_POINTS)
+                mismatches += got != _expected_history(fixture, token, "1h", LEGACY_POINTS)
+    finally:
+        server.shutdown()
+        for name, fn in saved.items():
+            setattr(db, name, fn)
+        price_history.CLOB_URL, price_history.time = saved_url, saved_time
+        price_history.SERIES._clock = saved_clock
+    elapsed = time.perf_counter() - started
+
+    return {
+        "tokens": tokens,
+        "ticks": ticks,
+        "reads": calls,
+        "clob_requests": counter["requests"],
+        "legacy_requests": calls,
+        "points_fetched": counter["points"],
+        "legacy_points": calls * LEGACY_POINTS,
+        "elapsed_s": round(elapsed, 2),
+        "mismatches": mismatches,
+        "ok": mismatches == 0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the local Polymarket price-history store offline.")
+    parser.add_argument("--tokens", type=int, default=200)
+    parser.add_argument("--hours", type=int, default=12, help="simulated hours after the seeded first day")
+    parser.add_argument("--reads", type=int, default=20, help="tokens read per tick")
+    parser.add_argument("--seed", type=int, default=13)
+    parser.add_argument("--json", action="store_true", help="print the raw result as JSON")
+    args = parser.parse_args()
+
+    result = asyncio.run(run_bench(args.tokens, args.hours, args.reads, args.seed))
+    if args.json:
+        print(json.dumps(result))
+    else:
+        for key, value in result.items():
+            print(f"{key.ljust(16)} {value}")
+    if not result["ok"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""Jupiter quote cache benchmark: click-to-submit latency for quick buys.
+
+Serves ``/quote`` (Jupiter v6 shape, ``contextSlot`` advancing every 400ms)
+and a ``getPriorityFeeEstimate`` RPC from a local HTTP fixture server with
+fixed latency. Simulated users open contract scans (``mark_on_screen``),
+think for a few seconds, click a buy preset, which previews a quote and
+fee, then confirm, which executes. Each run is made twice:
+
+- legacy: fresh client and fresh quote at preview and again at execution,
+  plus a fee request per preview;
+- cached: the same flow through ``jupiter_quotes`` with
+  ``quote_prefetch_job`` running in the background.
+
+The run fails if any quote used at execution was past the slot bound, or if
+a re-thresholded route disagrees with the fixture's own quote at that
+slippage.
+
+    python scripts/bench_quotes.py --clicks 40
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from urllib.parse import parse_qs, urlparse
+
+import httpx
+
+from harness import FixtureHandler, FixtureServer, bootstrap
+
+bootstrap("bench")
+
+import config  # noqa: E402
+import db  # noqa: E402
+from engine.solana import jupiter_quotes as jq  # noqa: E402
+
+PRESETS = (25.0, 50.0, 100.0)
+START = time.monotonic()
+
+
+def _slot() -> int:
+    return 300_000_000 + int((time.monotonic() - START) / jq.SLOT_SECONDS)
+
+
+def _handler(rates: dict, latency: float, counter: dict):
+    class Handler(FixtureHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path != "/quote":
+                self.send_error(404)
+                return
+            q = {k: v[0] for k, v in parse_qs(url.query).items()}
+            counter["quotes"] += 1
+            time.sleep(latency)
+            amount, bps = int(q["amount"]), int(q.get("slippageBps", 50))
+            out = int(amount * rates.get(q["outputMint"], 1.0))
+            self.send_json({
+                "inputMint": q["inputMint"], "outputMint": q["outputMint"], "inAmount": str(amount), "outAmount": str(out),
+                "otherAmountThreshold": str(out * (10000 - bps) // 10000), "swapMode": "ExactIn", "slippageBps": bps,
+                "priceImpactPct": "0.1", "routePlan": [{"swapInfo": {"label": "Raydium"}}], "contextSlot": _slot(),
+            })
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            counter["fees"] += 1
+            time.sleep(latency / 2)
+            self.send_json({"jsonrpc": "2.0", "id": "priority-fee", "result": {"priorityFeeLevels": {"low": 1000, "medium": 5000 + counter["fees"] % 7, "high": 50000}}})
+
+    return Handler
+
+
+async def _legacy_click(base: str, token: str, usd: float, confirm_after: float) -> float:
+    params = {"inputMint": jq.USDC_MINT, "outputMint": token, "amount": int(usd * 1e6), "slippageBps": 100}
+    started = time.monotonic()
+    async with httpx.AsyncClient(timeout=10) as c:
+        (await c.get(f"{base}/quote", params=params)).raise_for_status()
+    async with httpx.AsyncClient(timeout=10) as c:
+        await c.post(f"{base}/rpc", json={"method": "getPriorityFeeEstimate"})
+    preview = time.monotonic() - started
+    await asyncio.sleep(confirm_after)
+    started = time.monotonic()
+    async with httpx.AsyncClient(timeout=10) as c:
+        (await c.get(f"{base}/quote", params=params)).raise_for_status()
+    return preview + time.monotonic() - started
+
+
+async def _cached_click(token: str, usd: float, confirm_after: float, checks: list) -> float:
+    started = time.monotonic()
+    quote, _ = await asyncio.gather(jq.get_swap_quote(jq.USDC_MINT, token, usd, 1.0, 300), jq.get_priority_fee_estimate())
+    preview = time.monotonic() - started
+    await asyncio.sleep(confirm_after)
+    started = time.monotonic()
+    raw = await jq.fresh_raw_quote(quote["raw_quote"])
+    execute = time.monotonic() - started
+    checks.append(_slot() - int(raw["contextSlot"]) <= jq.QUOTE_MAX_SLOTS + 1)
+    checks.append(raw["otherAmountThreshold"] == str(int(raw["outAmount"]) * (10000 - 300) // 10000))
+    return preview + execute
+
+
+async def _prefetch_loop(stop: asyncio.Event, interval: float) -> None:
+    while not stop.is_set():
+        await jq.quote_prefetch_job(None)
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def run_bench(clicks: int, seed: int, latency: float, window: float) -> dict:
+    rng = random.Random(seed)
+    tokens = [f"Tok{i:03d}" + "x" * 38 for i in range(30)]
+    rates = {t: rng.uniform(1e3, 1e6) for t in tokens}
+    counter = {"quotes": 0, "fees": 0}
+    server = FixtureServer(_handler(rates, latency, counter))
+    base = server.url
+
+    saved_db = {name: getattr(db, name) for name in ("get_user_settings", "get_all_open_sol_positions", "get_solana_watchlist", "get_pending_signals")}
+    db.get_user_settings = lambda *a, **k: {f"buy_preset_{i + 1}": p for i, p in enumerate(PRESETS)}
+    db.get_all_open_sol_positions = db.get_solana_watchlist = lambda *a, **k: []
+    db.get_pending_signals = lambda *a, **k: []
+    saved = jq.JUPITER_QUOTE_URL, jq.FEE_RPC_URL, config.HELIUS_API_KEY
+    jq.JUPITER_QUOTE_URL, jq.FEE_RPC_URL, config.HELIUS_API_KEY = f"{base}/quote", f"{base}/rpc", "bench"
+
+    sessions = [(rng.choice(tokens), rng.choice(PRESETS), rng.uniform(0, window), rng.uniform(1.5, 4.0), rng.uniform(0.5, 3.0)) for _ in range(clicks)]
+    checks: list = []
+
+    async def legacy(token, usd, at, think, confirm):
+        await asyncio.sleep(at + think)
+        return await _legacy_click(base, token, usd, confirm)
+
+    async def cached(token, usd, at, think, confirm):
+        await asyncio.sleep(at)
+        jq.mark_on_screen(token)
+        await asyncio.sleep(think)
+        return await _cached_click(token, usd, confirm, checks)
+
+    try:
+        legacy_lat = sorted(await asyncio.gather(*(legacy(*s) for s in sessions)))
+        legacy_requests = counter["quotes"] + counter["fees"]
+        counter["quotes"] = counter["fees"] = 0
+        jq.QUOTE_CACHE.clear()
+        jq.ON_SCREEN.clear()
+        stop = asyncio.Event()
+        prefetcher = asyncio.ensure_future(_prefetch_loop(stop, 1.0))
+        cached_lat = sorted(await asyncio.gather(*(cached(*s) for s in sessions)))
+        stop.set()
+        await prefetcher
+    finally:
+        server.shutdown()
+        for name, fn in saved_db.items():
+            setattr(db, name, fn)
+        jq.JUPITER_QUOTE_URL, jq.FEE_RPC_URL, config.HELIUS_API_KEY = saved
+
+    bad = checks.count(False)
+    return {
+        "clicks": clicks,
+        "legacy_p50_ms": round(legacy_lat[len(legacy_lat) // 2] * 1000, 1),
+        "legacy_max_ms": round(legacy_lat[-1] * 1000, 1),
+        "cached_p50_ms": round(cached_lat[len(cached_lat) // 2] * 1000, 1),
+        "cached_max_ms": round(cached_lat[-1] * 1000, 1),
+        "legacy_requests": legacy_requests,
+        "cached_requests": counter["quotes"] + counter["fees"],
+        "reused_at_exec": jq.QUOTE_STATS["reused_at_execution"],
+        "requoted_at_exec": jq.QUOTE_STATS["requoted_at_execution"],
+        "bad_checks": bad,
+        "ok": bad == 0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare quick-buy click-to-submit latency with and without the quote cache.")
+    parser.add_argument("--clicks", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=19)
+    parser.add_argument("--latency-ms", type=float, default=150.0, help="fixture latency per quote request")
+    parser.add_argument("--window", type=float, default=8.0, help="seconds over which users open scans")
+    parser.add_argument("--json", action="store_true", help="print the raw result as JSON")
+    args = parser.parse_args()
+
+    result = asyncio.run(run_bench(args.clicks, args.seed, args.latency_ms / 1000, args.window))
+    if args.json:
+        print(json.dumps(result))
+    else:
+        for key, value in result.items():
+            print(f"{key.ljust(18)} {value}")
+    if not result["ok"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""Offline degen risk-scoring benchmark.
+
+Builds a deterministic set of fixture tokens and serves their LP providers
+(DexScreener ``/dex/pairs``) and holder first transactions (Solscan) from a
+local HTTP server with a fixed per-request latency. Then it times the two
+stages separately:
+
+- ``prefetch_risk_inputs``: every input fetched concurrently over one client,
+- ``score_prefetched``: pure scoring, inline and in a process pool.
+
+Inline and pooled scores must match; the digest changes only when scoring
+does.
+
+    python scripts/bench_risk_scoring.py --tokens 500 --workers 4
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qs, urlparse
+
+from harness import FixtureHandler, FixtureServer, bootstrap
+
+bootstrap("bench")
+
+from degen import risk_engine  # noqa: E402
+
+WORDS = ["utility", "moon", "guaranteed", "game", "staking", "diamond hands", "hodl", "1000x", "community", "BUY NOW"]
+
+
+def _tokens(rng: random.Random, n: int) -> tuple[list, dict, dict]:
+    tokens, providers, wallets = [], {}, {}
+    for i in range(n):
+        chain = "SOL" if i % 3 else "eth"
+        token = {
+            "address": f"Tok{i:05d}",
+            "name": f"Token {i}",
+            "chain": chain,
+            "liquidity_usd": rng.lognormvariate(9, 1.5),
+            "mcap": rng.lognormvariate(12, 1.5),
+            "url": "https://pump.fun/x" if i % 4 == 0 else "",
+            "description": " ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 40))),
+            "recent_candles": [{"volume": rng.random() * 1e4} for _ in range(rng.randint(0, 48))],
+            "early_txs": [{"buyer": f"w{rng.randrange(400)}", "timestamp": 1_700_000_000 + rng.randrange(300)} for _ in range(rng.randint(0, 12))],
+            "dev_connections": {f"w{k}": True for k in rng.sample(range(400), 20)},
+        }
+        if i % 2 == 0:
+            token["pairAddress"] = f"pair{i}"
+            providers[f"{chain}/pair{i}"] = [{"usd": rng.random() * 5e4} for _ in range(rng.randint(1, 8))]
+        if chain == "SOL":
+            token["top_holders"] = [f"holder{rng.randrange(n * 4)}" for _ in range(15)]
+            for w in token["top_holders"]:
+                wallets.setdefault(w, 1_690_000_000 + rng.randrange(10_000_000))
+        tokens.append(token)
+    return tokens, providers, wallets
+
+
+def _handler(providers: dict, wallets: dict, latency: float, counter: dict):
+    class Handler(FixtureHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            counter["requests"] += 1
+            time.sleep(latency)
+            if url.path.startswith("/dex/pairs/"):
+                body = {"pair": {"liquidityProviders": providers.get(url.path[len("/dex/pairs/"):], [])}}
+            elif url.path == "/account/transactions":
+                ts = wallets.get(parse_qs(url.query).get("account", [""])[0])
+                body = [{"blockTime": ts}] if ts else []
+            else:
+                self.send_error(404)
+                return
+            self.send_json(body)
+
+    return Handler
+
+
+def _digest(results: list) -> str:
+    rows = [(r["risk"]["risk_score"], r["risk"]["risk_level"], r["moon"].get("moon_score")) for r in results]
+    return f"{zlib.crc32(json.dumps(rows).encode()):08x}"
+
+
+def run_bench(n: int, seed: int, workers: int, latency: float, repeat: int) -> dict:
+    rng = random.Random(seed)
+    tokens, providers, wallets = _tokens(rng, n)
+    counter = {"requests": 0}
+    server = FixtureServer(_handler(providers, wallets, latency, counter))
+    base = server.url
+    saved = risk_engine.DEXSCREENER_BASE, risk_engine.SOLSCAN_URL
+    risk_engine.DEXSCREENER_BASE = risk_engine.SOLSCAN_URL = base
+    risk_engine._SOLSCAN_CREATION_CACHE.clear()
+    try:
+        started = time.perf_counter()
+        prepared = asyncio.run(risk_engine.prefetch_risk_inputs(tokens))
+        prefetch_s = time.perf_counter() - started
+    finally:
+        server.shutdown()
+        risk_engine.DEXSCREENER_BASE, risk_engine.SOLSCAN_URL = saved
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        inline = [risk_engine.score_prefetched(t) for t in prepared]
+    inline_s = (time.perf_counter() - started) / repeat
+
+    pooled_s, pooled_digest = None, None
+    if workers > 0:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(risk_engine.score_prefetched, prepared[:workers]))  # warm the workers
+            started = time.perf_counter()
+            for _ in range(repeat):
+                pooled = list(pool.map(risk_engine.score_prefetched, prepared, chunksize=max(1, n // (workers * 4))))
+            pooled_s = (time.perf_counter() - started) / repeat
+        pooled_digest = _digest(pooled)
+
+    digest = _digest(inline)
+    return {
+        "tokens": n,
+        "http_requests": counter["requests"],
+        "prefetch_s": round(prefetch_s, 3),
+        "serial_fetch_s": round(counter["requests"] * latency, 3),
+        "inline_tokens_per_s": round(n / inline_s) if inline_s else 0,
+        "pool_workers": workers,
+        "pool_tokens_per_s": round(n / pooled_s) if pooled_s else None,
+        "digest": digest,
+        "ok": pooled_digest in (None, digest),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the two-stage degen risk scoring offline.")
+    parser.add_argument("--tokens", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--workers", type=int, default=2, help="process-pool workers (0 skips the pool)")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="fixture server latency per request")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="print the raw result as JSON")
+    args = parser.parse_args()
+
+    result = run_bench(args.tokens, args.seed, args.workers, args.latency_ms / 1000, max(1, args.repeat))
+    if args.json:
+        print(json.dumps(result))
+    else:
+        for key, value in result.items():
+            print(f"{key.ljust(20)} {value}")
+    if not result["ok"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Shared plumbing for the offline benches and replays in this directory.
+
+Importing it puts the repo root on ``sys.path``; ``bootstrap()`` then fills
+in the env vars ``config`` requires so app modules import without a live
+bot or database. ``FixtureServer`` serves a handler class on an ephemeral
+localhost port in a background thread, and ``SimClock`` stands in for
+``time`` in modules that take a clock.
+
+    from harness import FixtureHandler, FixtureServer, bootstrap
+"""
+
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def bootstrap(name: str) -> None:
+    """Default BOT_TOKEN, CHAT_ID and DB_URL to throwaway values tagged ``name``."""
+    for key, value in (("BOT_TOKEN", name), ("CHAT_ID", "0"), ("DB_URL", f"postgresql://{name}@localhost/{name}")):
+        os.environ.setdefault(key, value)
+
+
+class SimClock:
+    """Simulated wall and monotonic time; scripts advance ``now`` themselves."""
+
+    now = 1_700_000_000.0
+
+    @classmethod
+    def time(cls) -> float:
+        return cls.now
+
+    @classmethod
+    def monotonic(cls) -> float:
+        return cls.now
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """Request handler base with a JSON reply helper and no access log."""
+
+    def send_json(self, body) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+class FixtureServer:
+    """``handler`` served from a background thread until ``shutdown()``."""
+
+    def __init__(self, handler):
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def shutdown(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
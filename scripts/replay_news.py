@@ -0,0 +1,84 @@
+"""Replay the CryptoPanic fixture feed through the news store and rule_news_clear.
+
+Points ``CRYPTOPANIC_FIXTURE`` at ``scripts/fixtures/cryptopanic.json`` (ages
+are relative to now) with no API token set. ``rule_news_clear`` is asked
+about each pair on a cold store first, so a pair is only blocked if the rule's
+own read-through of its currency's important posts finds one. The shared
+feeds are then polled and the rule is asked again. The economic calendar is
+left empty so only news decides.
+
+The run fails unless every pair with an important post in the last 30
+minutes is blocked, every other pair is clear, and every asked pair ends up
+on the poller's watch list.
+
+    python scripts/replay_news.py
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+from harness import ROOT, bootstrap
+
+bootstrap("replay")
+os.environ.setdefault("CRYPTOPANIC_FIXTURE", os.path.join(ROOT, "scripts", "fixtures", "cryptopanic.json"))
+os.environ["CRYPTOPANIC_TOKEN"] = ""
+
+import news  # noqa: E402
+from engine import rules  # noqa: E402
+
+PAIRS = ["BTCUSDT", "ETHUSDT", "SOLUSDT", "FETUSDT", "BONKUSDT", "DOGEUSDT"]
+
+
+def expected_blocked(window_min: int = 30) -> set:
+    """Pairs with an important fixture post younger than ``window_min`` minutes."""
+    data = news._load_fixture()
+    blocked = set()
+    for post in data.get("results", []):
+        if "important" in (post.get("feeds") or []) and float(post.get("age_minutes", 1e9)) < window_min:
+            blocked |= {f"{c['code']}USDT" for c in post.get("currencies") or []}
+    return blocked & set(PAIRS)
+
+
+async def _check(pairs: list) -> set:
+    return {p for p in pairs if not await rules.rule_news_clear(p, "1h", "bullish", {})}
+
+
+async def replay() -> dict:
+    news.CALENDAR.load([], int(time.time()))
+    want = expected_blocked()
+    cold = await _check(PAIRS)
+    await news.poll_news()
+    warm = await _check(PAIRS)
+    watched = {f"{c}USDT" for c in news.NEWS.currency_seen}
+    return {
+        "fixture": os.path.relpath(news.CRYPTOPANIC_FIXTURE, ROOT),
+        "posts": len(news.NEWS),
+        "expected": sorted(want),
+        "blocked_cold": sorted(cold),
+        "blocked_polled": sorted(warm),
+        "watched": sorted(watched & set(PAIRS)),
+        "ok": cold == want and warm == want and set(PAIRS) <= watched,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay the CryptoPanic fixture through rule_news_clear offline.")
+    parser.add_argument("--json", action="store_true", help="print the raw result as JSON")
+    args = parser.parse_args()
+
+    result = asyncio.run(replay())
+    if args.json:
+        print(json.dumps(result))
+    else:
+        for key, value in result.items():
+            print(f"{key.ljust(16)} {value}")
+    if not result["ok"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+"""Replay Polymarket universe scans against the incremental scanner.
+
+Serves a synthetic Gamma ``/markets`` listing (``limit``/``offset`` paging,
+``liquidity_min``/``volume_num_min`` floors) from a local HTTP fixture
+server. Between scans a fraction of markets drift in price, volume and
+liquidity, a few close and a few list. ``run_market_scanner`` runs once per
+cycle against it, with ``db`` swapped for an in-memory signal store whose
+rows expire ``EXPIRE_CYCLES`` scans after their last save or refresh (one is
+also deleted by hand every cycle).
+
+The run fails unless, every cycle, the compiled predicates pick the same
+first model as a plain per-model loop over the evaluated markets, every
+upserted key is the market's own id (one row per market, ever), and every
+market that still matches has its signal. It also
+reports how many markets the scanner actually evaluated and how many rows
+the old save-every-match loop would have inserted.
+
+    python scripts/replay_poly_scan.py --markets 6000 --cycles 8
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import threading
+import time
+from urllib.parse import parse_qs, urlparse
+
+from harness import FixtureHandler, FixtureServer, bootstrap
+
+bootstrap("replay")
+
+import db  # noqa: E402
+from engine.polymarket import scanner  # noqa: E402
+
+EXPIRE_CYCLES = 2  # pending_signals expiry, in scans
+MODELS = [
+    {"id": 1, "min_yes_pct": 40, "max_yes_pct": 60, "min_volume_24h": 100000, "min_liquidity": 50000},
+    {"id": 2, "min_yes_pct": 20, "max_yes_pct": 45, "min_volume_24h": 20000, "min_liquidity": 10000},
+    {"id": 3, "min_yes_pct": 70, "max_yes_pct": 95, "min_volume_24h": 50000, "min_liquidity": 20000},
+]
+
+
+class Listing:
+    def __init__(self, rng: random.Random, n: int):
+        self.rng = rng
+        self.next_id = 1
+        self.markets: dict = {}
+        self.lock = threading.Lock()
+        for _ in range(n):
+            self.list_one()
+
+    def list_one(self) -> None:
+        mid = self.next_id
+        self.next_id += 1
+        self.markets[mid] = {
+            "id": str(mid),
+            "question": f"Will event {mid} happen?",
+            "bestAsk": round(self.rng.random(), 3),
+            "volume24hr": round(self.rng.lognormvariate(10, 1.5), 2),
+            "volumeNum": 0.0,
+            "liquidity": round(self.rng.lognormvariate(9.5, 1.2), 2),
+            "endDate": "2030-01-01T00:00:00Z",
+        }
+        self.markets[mid]["volumeNum"] = self.markets[mid]["volume24hr"] * 3
+
+    def drift(self, share: float, churn: int) -> None:
+        with self.lock:
+            for m in self.rng.sample(list(self.markets.values()), int(len(self.markets) * share)):
+                m["bestAsk"] = round(min(0.999, max(0.001, m["bestAsk"] + self.rng.gauss(0, 0.03))), 3)
+                m["volume24hr"] = round(m["volume24hr"] * self.rng.uniform(0.8, 1.25), 2)
+                m["liquidity"] = round(m["liquidity"] * self.rng.uniform(0.85, 1.2), 2)
+                m["volumeNum"] += m["volume24hr"] / 10
+            for mid in self.rng.sample(list(self.markets), churn):
+                del self.markets[mid]
+            for _ in range(churn):
+                self.list_one()
+
+    def page(self, limit: int, offset: int, min_liq: float, min_vol: float) -> list:
+        with self.lock:
+            rows = [dict(m) for _, m in sorted(self.markets.items()) if m["liquidity"] >= min_liq and m["volumeNum"] >= min_vol]
+        return rows[offset : offset + limit]
+
+
+def _handler(listing: Listing, counter: dict, latency: float):
+    class Handler(FixtureHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path != "/markets":
+                self.send_error(404)
+                return
+            q = {k: v[0] for k, v in parse_qs(url.query).items()}
+            counter["requests"] += 1
+            time.sleep(latency)
+            rows = listing.page(int(q.get("limit", 20)), int(q.get("offset", 0)), float(q.get("liquidity_min", 0)), float(q.get("volume_num_min", 0)))
+            self.send_json(rows)
+
+    return Handler
+
+
+class MemoryStore:
+    """Keyed pending signals that expire ``EXPIRE_CYCLES`` scans after their last save or touch."""
+
+    def __init__(self):
+        self.signals: dict = {}
+        self.expires: dict = {}
+        self.statements = 0
+        self.cycle = 0
+
+    def get_active_prediction_models(self):
+        return [dict(m) for m in MODELS]
+
+    def save_pending_signals(self, rows):
+        self.statements += 1
+        for r in rows:
+            key = (r["section"], r["signal_key"])
+            self.signals[key] = r
+            self.expires[key] = self.cycle + EXPIRE_CYCLES
+        return len(rows)
+
+    def touch_pending_signals(self, section, keys, phase=4):
+        self.statements += 1
+        found = {k for k in keys if (section, k) in self.signals}
+        for k in found:
+            self.expires[(section, k)] = self.cycle + EXPIRE_CYCLES
+        return found
+
+    def expire(self) -> None:
+        """expire_old_pending_signals, plus the odd signal deleted by hand."""
+        for key in [k for k, at in self.expires.items() if at < self.cycle]:
+            del self.signals[key], self.expires[key]
+        if self.signals:
+            key = sorted(self.signals)[self.cycle % len(self.signals)]
+            del self.signals[key], self.expires[key]
+
+
+def universe_by_id(universe: list) -> dict:
+    return {str(m["id"]): m for m in universe}
+
+
+def _first_model(values: tuple) -> int:
+    yes, vol, liq = values
+    for i, m in enumerate(MODELS):
+        if m["min_yes_pct"] <= yes * 100 <= m["max_yes_pct"] and vol >= m["min_volume_24h"] and liq >= m["min_liquidity"]:
+            return i
+    return -1
+
+
+async def replay(markets: int, cycles: int, seed: int, share: float, latency: float) -> dict:
+    rng = random.Random(seed)
+    listing = Listing(rng, markets)
+    counter = {"requests": 0}
+    server = FixtureServer(_handler(listing, counter, latency))
+    store = MemoryStore()
+    saved = {name: getattr(db, name) for name in ("get_active_prediction_models", "save_pending_signals", "touch_pending_signals")}
+    for name in saved:
+        setattr(db, name, getattr(store, name))
+    saved_url = scanner.GAMMA_URL
+    scanner.GAMMA_URL = server.url
+    scanner._SNAPSHOT.clear()
+    scanner._MATCHED.clear()
+    scanner._MODELS_KEY["key"] = None
+
+    real_match = scanner.match_markets
+    mismatches = []
+
+    def checked_match(values, compiled):
+        first = real_match(values, compiled)
+        mismatches.extend(i for i, row in enumerate(values.tolist()) if _first_model(tuple(row)) != first[i])
+        return first
+
+    scanner.match_markets = checked_match
+    evaluated = legacy_rows = upserts = 0
+    bad_keys = lost = 0
+    started = time.perf_counter()
+    try:
+        for cycle in range(cycles):
+            store.cycle = cycle
+            if cycle:
+                listing.drift(share, max(1, markets // 200))
+                store.expire()
+            universe = await scanner.run_market_scanner()
+            stats = scanner.SCAN_STATS
+            evaluated += stats["evaluated"]
+            upserts += stats["written"]
+            legacy_rows += sum(_first_model(scanner._market_values(m)) >= 0 for m in universe)
+            bad_keys += sum(1 for (_, key), r in store.signals.items() if key != str(r["signal_data"]["id"]))
+            # Every market that still matches must still have its signal.
+            lost += sum(
+                1 for mid, m in universe_by_id(universe).items()
+                if _first_model(scanner._SNAPSHOT.get(mid, scanner._market_values(m))) >= 0 and ("predictions", mid) not in store.signals
+            )
+    finally:
+        server.shutdown()
+        for name, fn in saved.items():
+            setattr(db, name, fn)
+        scanner.GAMMA_URL = saved_url
+        scanner.match_markets = real_match
+    elapsed = time.perf_counter() - started
+
+    return {
+        "markets": len(listing.markets),
+        "cycles": cycles,
+        "pages": counter["requests"],
+        "evaluated": evaluated,
+        "evaluated_share": round(evaluated / (markets * cycles), 3),
+        "signal_rows": len(store.signals),
+        "upserts": upserts,
+        "legacy_inserts": legacy_rows,
+        "statements": store.statements,
+        "scan_s": round(elapsed / cycles, 3),
+        "mismatches": len(mismatches),
+        "lost_signals": lost,
+        "ok": not mismatches and not bad_keys and not lost and scanner.SCAN_STATS["complete"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay incremental Polymarket universe scans offline.")
+    parser.add_argument("--markets", type=int, default=6000)
+    parser.add_argument("--cycles", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=11)
+    parser.add_argument("--drift", type=float, default=0.15, help="share of markets that move between scans")
+    parser.add_argument("--latency-ms", type=float, default=40.0, help="fixture server latency per page")
+    parser.add_argument("--json", action="store_true", help="print the raw result as JSON")
+    args = parser.parse_args()
+
+    result = asyncio.run(replay(args.markets, args.cycles, args.seed, args.drift, args.latency_ms / 1000))
+    if args.json:
+        print(json.dumps(result))
+    else:
+        for key, value in result.items():
+            print(f"{key.ljust(16)} {value}")
+    if not result["ok"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""Replay a pump.fun launch stream against the trenches ingestion.
+
+Serves a synthetic launch listing from a local HTTP fixture server (same
+``/coins?limit=&offset=`` paging as frontend-api.pump.fun), advances a fake
+clock one scanner tick at a time and runs ``trenches_feed.ingest_launches``
+against it. Launch rates come in bursts well above one tick's page budget,
+the bot is "restarted" halfway (in-memory cursor and mint index dropped and
+reloaded from the store) and a few quiet ticks at the end let backfills
+drain. The db cursor/mint functions are swapped for an in-memory store.
+
+The run fails unless every launch inside the ingest window was processed
+exactly once and the ingest's own seen-vs-processed gap ends at zero. For comparison it also reports how many launches the old
+single-page poll (newest 20 per tick) would have seen.
+
+    python scripts/replay_pumpfun.py --minutes 180
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import threading
+from urllib.parse import parse_qs, urlparse
+
+from harness import FixtureHandler, FixtureServer, SimClock, bootstrap
+
+bootstrap("replay")
+
+import db  # noqa: E402
+from engine.solana import trenches_feed  # noqa: E402
+
+TICK_SECONDS = 60
+LEGACY_PAGE = 20
+
+
+class Listing:
+    """Launches ordered newest-first, visible once their creation time has passed."""
+
+    def __init__(self):
+        self.coins: list = []  # oldest first
+        self.lock = threading.Lock()
+
+    def add(self, coin: dict) -> None:
+        with self.lock:
+            self.coins.append(coin)
+
+    def page(self, limit: int, offset: int) -> list:
+        cutoff = SimClock.now * 1000
+        with self.lock:
+            visible = [c for c in self.coins if c["created_timestamp"] <= cutoff]
+        visible.reverse()
+        return visible[offset : offset + limit]
+
+
+def _handler(listing: Listing, counter: dict):
+    class Handler(FixtureHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path != "/coins":
+                self.send_error(404)
+                return
+            q = parse_qs(url.query)
+            counter["requests"] += 1
+            self.send_json(listing.page(int(q.get("limit", ["50"])[0]), int(q.get("offset", ["0"])[0])))
+
+    return Handler
+
+
+class MemoryStore:
+    def __init__(self):
+        self.cursors: dict = {}
+        self.mints: dict = {}
+
+    def get_ingest_cursor(self, source):
+        return dict(self.cursors[source]) if source in self.cursors else None
+
+    def save_ingest_cursor(self, source, watermark, head_ts, backfill_offset):
+        self.cursors[source] = {"watermark": watermark, "head_ts": head_ts, "backfill_offset": backfill_offset}
+
+    def save_recent_mints(self, source, mints, horizon_seconds):
+        for mint, _ in mints:
+            self.mints[mint] = SimClock.now
+        for mint in [m for m, seen in self.mints.items() if seen < SimClock.now - horizon_seconds]:
+            del self.mints[mint]
+
+    def get_recent_mints(self, source, since_ts):
+        return [m for m, seen in self.mints.items() if seen >= since_ts]
+
+
+def _rate(rng: random.Random, minute: int) -> int:
+    """Launches per minute: a steady trickle with bursts past the page budget."""
+    if minute % 45 in range(20, 26):
+        return rng.randint(700, 1100)
+    return rng.randint(40, 220)
+
+
+def _restart() -> None:
+    """Drop everything a process restart would lose."""
+    trenches_feed._CURSOR.clear()
+    trenches_feed._HELD.clear()
+    trenches_feed.SEEN_MINTS.clear()
+    for key in trenches_feed.INGEST_STATS:
+        trenches_feed.INGEST_STATS[key] = 0
+
+
+async def replay(minutes: int, seed: int, drain_ticks: int) -> dict:
+    rng = random.Random(seed)
+    listing = Listing()
+    counter = {"requests": 0}
+    server = FixtureServer(_handler(listing, counter))
+
+    store = MemoryStore()
+    saved = {name: getattr(db, name) for name in ("get_ingest_cursor", "save_ingest_cursor", "save_recent_mints", "get_recent_mints")}
+    for name in saved:
+        setattr(db, name, getattr(store, name))
+    saved_url = trenches_feed.API_URL
+    trenches_feed.API_URL = server.url
+    seen_clock = trenches_feed.SEEN_MINTS._clock
+    trenches_feed.SEEN_MINTS._clock = SimClock.monotonic
+    trenches_feed.SEEN_MINTS.clear()
+    _restart()
+    # Every batch the ingest evaluates passes through the filter.
+    batches: list = []
+    real_filter = trenches_feed.filter_launches
+
+    def recording_filter(coins, now):
+        batches.append([c["mint"] for c in coins])
+        return real_filter(coins, now)
+
+    trenches_feed.filter_launches = recording_filter
+
+    start = SimClock.now
+    processed: dict = {}
+    legacy_seen: set = set()
+    seq = pages = truncated = 0
+    try:
+        for tick in range(minutes + drain_ticks):
+            if tick < minutes:
+                n = _rate(rng, tick)
+                for i in range(n):
+                    seq += 1
+                    listing.add({
+                        "mint": f"mint{seq:07d}",
+                        "symbol": f"T{seq}",
+                        "created_timestamp": int((SimClock.now + TICK_SECONDS * (i + 1) / (n + 1)) * 1000),
+                        "usd_market_cap": rng.lognormvariate(10, 1.5),
+                    })
+            SimClock.now += TICK_SECONDS
+            if tick == minutes // 2:
+                # Restart: only the persisted cursor and mint index survive.
+                pages += trenches_feed.INGEST_STATS["pages"]
+                truncated += trenches_feed.INGEST_STATS["truncated_ticks"]
+                _restart()
+            legacy_seen.update(c["mint"] for c in listing.page(LEGACY_PAGE, 0))
+            batches.clear()
+            await trenches_feed.ingest_launches(SimClock.now)
+            for mint in (m for batch in batches for m in batch):
+                processed[mint] = processed.get(mint, 0) + 1
+    finally:
+        server.shutdown()
+        for name, fn in saved.items():
+            setattr(db, name, fn)
+        trenches_feed.API_URL = saved_url
+        trenches_feed.SEEN_MINTS._clock = seen_clock
+        trenches_feed.filter_launches = real_filter
+
+    # Launches the ingest owes: everything after the initial watermark that
+    # was at least MIN_AGE old by the last tick.
+    due = [
+        c["mint"] for c in listing.coins
+        if start - trenches_feed.MAX_AGE_SECONDS < c["created_timestamp"] / 1000 <= SimClock.now - trenches_feed.MIN_AGE_SECONDS
+    ]
+    missed = [m for m in due if m not in processed]
+    twice = [m for m, n in processed.items() if n > 1]
+    stats = trenches_feed.INGEST_STATS
+    return {
+        "launches": len(listing.coins),
+        "due": len(due),
+        "processed": len(processed),
+        "missed": len(missed),
+        "processed_twice": len(twice),
+        "legacy_seen": len(legacy_seen & set(due)),
+        "truncated_ticks": truncated + stats["truncated_ticks"],
+        "pages": pages + stats["pages"],
+        "http_requests": counter["requests"],
+        "gap": trenches_feed.ingest_gap(),
+        "ok": not missed and not twice and trenches_feed.ingest_gap() == 0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a bursty pump.fun launch stream against the trenches ingestion.")
+    parser.add_argument("--minutes", type=int, default=180)
+    parser.add_argument("--seed", type=int, default=5)
+    parser.add_argument("--drain-ticks", type=int, default=10, help="quiet ticks at the end for backfills to finish")
+    parser.add_argument("--json", action="store_true", help="print the raw result as JSON")
+    args = parser.parse_args()
+
+    result = asyncio.run(replay(args.minutes, args.seed, args.drain_ticks))
+    if args.json:
+        print(json.dumps(result))
+    else:
+        for key, value in result.items():
+            print(f"{key.ljust(16)} {value}")
+    if not result["ok"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
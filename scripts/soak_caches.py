@@ -0,0 +1,161 @@
+"""Soak test for the bounded module caches.
+
+Drives the real module-level caches (candles, trenches mints, Solscan wallet
+ages, price-alert levels), the rescore queue and the rate-limit windows with a simulated
+scanning workload on a fake clock, sweeping them the way the cache_sweep job
+does. RSS and entry counts are sampled at the end of every simulated day; the
+run fails if any cache exceeds its cap or RSS keeps growing once the caches
+have filled (after the warm-up days).
+
+    python scripts/soak_caches.py --days 7
+"""
+
+import argparse
+import gc
+import json
+import os
+import random
+import resource
+import sys
+
+from harness import SimClock, bootstrap
+
+bootstrap("soak")
+
+from utils import cache as cache_lib  # noqa: E402
+
+TICK_SECONDS = 60
+SWEEP_EVERY = cache_lib.CACHE_SWEEP_SECONDS // TICK_SECONDS
+
+
+def _rss_kb() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * (os.sysconf("SC_PAGE_SIZE") // 1024)
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _candles(rng: random.Random, n: int = 30) -> list:
+    return [{"time": SimClock.now - i * 60, "open": rng.random(), "high": rng.random(), "low": rng.random(), "close": rng.random(), "volume": rng.random()} for i in range(n)]
+
+
+def run_soak(days: int, seed: int, growth_limit_pct: float, warmup_days: int = 3) -> dict:
+    from degen import rescoring, risk_engine
+    from engine import market_alerts, rules
+    from engine.solana import trenches_feed
+    from security import limits, rate_limiter
+
+    for c in cache_lib._REGISTRY.values():
+        c._clock = SimClock.monotonic
+        c.clear()
+    saved_time = limits.time
+    limits.time = rescoring.time = SimClock
+
+    rng = random.Random(seed)
+    majors = [f"PAIR{i}USDT" for i in range(20)]
+    recurring_wallets = [f"wallet{i}" for i in range(500)]
+    mint_seq = wallet_seq = 0
+    samples = []
+    over_cap = set()
+    try:
+        for day in range(days):
+            for tick in range(86400 // TICK_SECONDS):
+                SimClock.now += TICK_SECONDS
+                # Phase engine / regime / correlation candle reads, plus long-tail symbols.
+                for pair in rng.sample(majors, 8):
+                    rules._GLOBAL_CACHE[f"{pair}_{rng.choice(['15m', '1h', '4h', '1d'])}_100"] = _candles(rng)
+                rules._GLOBAL_CACHE[f"ALT{rng.randrange(5000)}USDT_1h_100"] = _candles(rng)
+                # Trenches feed: newest pump.fun launches.
+                for _ in range(20):
+                    mint_seq += 1
+                    mint = f"mint{mint_seq}"
+                    if mint not in trenches_feed.SEEN_MINTS:
+                        trenches_feed.SEEN_MINTS.add(mint)
+                # Holder clustering: recurring wallets and one-off holders.
+                for _ in range(15):
+                    if rng.random() < 0.6:
+                        wallet = rng.choice(recurring_wallets)
+                    else:
+                        wallet_seq += 1
+                        wallet = f"holder{wallet_seq}"
+                    if risk_engine._SOLSCAN_CREATION_CACHE.get(wallet) is None:
+                        risk_engine._SOLSCAN_CREATION_CACHE[wallet] = SimClock.now - rng.random() * 1e7
+                # Degen scan queues fresh tokens; the rescore job drains what is due.
+                if tick % 5 == 0:
+                    for _ in range(10):
+                        rescoring.schedule_rescore(f"mint{mint_seq - rng.randrange(200)}", "SOL")
+                if tick % (rescoring.RESCORE_TICK_SECONDS // TICK_SECONDS or 1) == 0:
+                    rescoring.pop_due()
+                # Price alerts and session notices.
+                if tick % 10 == 0:
+                    market_alerts._last_prices[f"{rng.choice(majors)}_{rng.randint(-20, 20)}"] = rng.random()
+                    market_alerts._session_notified[f"london_{int(SimClock.now // 86400)}"] = "x"
+                # Commands from a rotating set of users.
+                rate_limiter.check_command_rate(rng.randrange(50))
+                if tick % 30 == 0:
+                    rate_limiter.record_trade(rng.randrange(10))
+
+                if tick % SWEEP_EVERY == 0:
+                    cache_lib.sweep_caches()
+                    limits._dirty.clear()  # stands in for the Postgres write-behind
+                    rescoring._dirty.clear()
+                    limits.prune_limits()
+                for name, info in cache_lib.cache_stats().items():
+                    if info["entries"] > info["maxsize"]:
+                        over_cap.add(name)
+            gc.collect()
+            stats = cache_lib.cache_stats()
+            samples.append({
+                "day": day + 1,
+                "rss_kb": _rss_kb(),
+                "entries": sum(s["entries"] for s in stats.values()) + len(limits._windows) + len(rescoring._heap),
+                "cache_kb": sum(s["bytes"] for s in stats.values()) // 1024,
+            })
+    finally:
+        limits.time = rescoring.time = saved_time
+        limits._windows.clear()
+        rescoring._heap.clear()
+        rescoring._pending.clear()
+        for c in cache_lib._REGISTRY.values():
+            c._clock = cache_lib.time.monotonic
+            c.clear()
+
+    base = samples[warmup_days - 1]["rss_kb"]
+    peak_after = max(s["rss_kb"] for s in samples[warmup_days - 1 :])
+    growth = (peak_after - base) / base * 100 if base else 0.0
+    return {
+        "days": days,
+        "samples": samples,
+        "rss_growth_pct": round(growth, 2),
+        "over_cap": sorted(over_cap),
+        "caches": {name: {k: info[k] for k in ("entries", "maxsize", "evictions", "expirations")} for name, info in stats.items()},
+        "ok": growth <= growth_limit_pct and not over_cap,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Soak the bounded module caches over simulated days.")
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--seed", type=int, default=11)
+    parser.add_argument("--warmup-days", type=int, default=3, help="days allowed for the caches to fill")
+    parser.add_argument("--max-growth-pct", type=float, default=2.0, help="allowed RSS growth after warm-up")
+    parser.add_argument("--json", action="store_true", help="print the raw result as JSON")
+    args = parser.parse_args()
+
+    warmup = max(1, args.warmup_days)
+    result = run_soak(max(warmup + 1, args.days), args.seed, args.max_growth_pct, warmup)
+    if args.json:
+        print(json.dumps(result))
+    else:
+        for s in result["samples"]:
+            print(f"day {s['day']:>3}  rss {s['rss_kb'] / 1024:8.1f} MB  entries {s['entries']:>6}  cached ~{s['cache_kb']:>6} KB")
+        for name, info in result["caches"].items():
+            print(f"  {name.ljust(20)} {info['entries']:>6}/{info['maxsize']:<6} evicted {info['evictions']:>7}  expired {info['expirations']:>7}")
+        print(f"rss growth after warm-up: {result['rss_growth_pct']}%  {'OK' if result['ok'] else 'FAIL'}")
+    if not result["ok"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
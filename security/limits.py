@@ -0,0 +1,281 @@
+"""Sliding-window rate and spending limits.
+
+Every limit is a window split into fixed-width buckets (an hour of 1-minute
+buckets, a day of 15-minute buckets, ...). A window keeps its live buckets in
+a deque plus a running total, so checking and recording are O(1) amortised
+regardless of how many trades fall inside the window.
+
+Windows are keyed ``"<spec>:<scope>"`` (``"spend_day:chain:solana"``,
+``"trades_hour:user:42"``, ``"spend_day:dca:solana"``). Persistent specs are written behind to the
+``limit_buckets`` table by ``flush_limits_job`` and reloaded by
+``load_limits()`` at startup, so a restart does not reset the counters.
+
+``reserve_trade()`` is the single entry point for executors: under one lock
+it checks every limit a trade touches and, if all pass, records it, returning
+a ``Reservation`` that can be released when the trade does not go through.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+
+log = logging.getLogger(__name__)
+
+LIMITS_FLUSH_SECONDS = 5
+
+# spec -> window seconds, bucket seconds, persisted
+SPECS = {
+    "commands": (60, 5, False),
+    "market_cooldown": (30, 1, False),
+    "trades_hour": (3600, 60, True),
+    "trades_day": (86400, 900, True),
+    "spend_day": (86400, 900, True),
+    "fills_day": (86400, 900, True),
+}
+
+_lock = threading.RLock()
+_windows: dict[str, "Window"] = {}
+_dirty: set = set()
+
+
+class Window:
+    def __init__(self, spec: str, span: int, bucket: int):
+        self.spec = spec
+        self.span = span
+        self.bucket = bucket
+        self.slots = span // bucket
+        self.buckets: deque = deque()  # [bucket_index, amount], oldest first
+        self.total = 0.0
+
+    def _advance(self, now: float) -> int:
+        current = int(now // self.bucket)
+        floor = current - self.slots
+        while self.buckets and self.buckets[0][0] <= floor:
+            self.total -= self.buckets.popleft()[1]
+        if not self.buckets:
+            self.total = 0.0
+        return current
+
+    def used(self, now: float) -> float:
+        self._advance(now)
+        return self.total
+
+    def add(self, amount: float, now: float) -> int:
+        current = self._advance(now)
+        if self.buckets and self.buckets[-1][0] == current:
+            self.buckets[-1][1] += amount
+        else:
+            self.buckets.append([current, amount])
+        self.total += amount
+        return current
+
+    def remove(self, index: int, amount: float) -> bool:
+        for entry in reversed(self.buckets):
+            if entry[0] == index:
+                entry[1] -= amount
+                self.total -= amount
+                return True
+            if entry[0] < index:
+                break
+        return False
+
+    def oldest_expiry(self, now: float) -> float:
+        """Seconds until the oldest live bucket leaves the window."""
+        self._advance(now)
+        if not self.buckets:
+            return 0.0
+        return max(0.0, (self.buckets[0][0] + self.slots) * self.bucket - now)
+
+
+def _window(key: str) -> Window:
+    window = _windows.get(key)
+    if window is None:
+        spec = key.split(":", 1)[0]
+        span, bucket, _ = SPECS[spec]
+        window = _windows[key] = Window(spec, span, bucket)
+    return window
+
+
+def used(key: str, now: float | None = None) -> float:
+    with _lock:
+        return _window(key).used(time.time() if now is None else now)
+
+
+def retry_after(key: str, now: float | None = None) -> int:
+    with _lock:
+        return int(_window(key).oldest_expiry(time.time() if now is None else now))
+
+
+def _record(key: str, amount: float, now: float) -> tuple:
+    window = _window(key)
+    index = window.add(amount, now)
+    if SPECS[window.spec][2]:
+        _dirty.add((key, index))
+    return key, index, amount
+
+
+def hit(key: str, limit: float | None, amount: float = 1.0, now: float | None = None) -> tuple[bool, float]:
+    """Record ``amount`` against ``key`` if it stays within ``limit``; returns (ok, used)."""
+    now = time.time() if now is None else now
+    with _lock:
+        current = _window(key).used(now)
+        if limit is not None and current + amount > limit:
+            return False, current
+        _record(key, amount, now)
+        return True, current + amount
+
+
+class Reservation:
+    """Capacity taken by ``reserve_trade``; ``release()`` hands it back."""
+
+    def __init__(self, entries: list):
+        self.entries = entries
+
+    def release(self) -> None:
+        with _lock:
+            for key, index, amount in self.entries:
+                window = _windows.get(key)
+                if window is not None and window.remove(index, amount) and SPECS[window.spec][2]:
+                    _dirty.add((key, index))
+            self.entries = []
+
+
+def _trade_limits(section: str, amount_usd: float, market_key: str, user_id: int | str | None, wallet: str | None, scope: str) -> list:
+    """(key, limit, amount, message) for every window a trade counts against."""
+    from security.rate_limiter import TRADES_PER_DAY, TRADES_PER_HOUR
+    from security.spending_limits import MAX_DAILY_SPEND_USD, MAX_WALLET_DAILY_SPEND_USD
+
+    chain_limit = MAX_DAILY_SPEND_USD.get(section, 1000.0)
+    wallet_scope = "wallet" if scope == "chain" else f"{scope}:wallet"
+    out = []
+    if user_id is not None:
+        out.append((f"trades_hour:user:{user_id}", TRADES_PER_HOUR, 1, "Trade rate limit: {limit:.0f}/hour. Wait {wait_min}min."))
+        out.append((f"trades_day:user:{user_id}", TRADES_PER_DAY, 1, "Daily trade limit reached: {limit:.0f}/day."))
+    out.append((f"market_cooldown:{market_key}", 1, 1, "Trade on {market_key} placed recently. Wait {wait}s to prevent double-execution."))
+    out.append((f"spend_day:{scope}:{section}", chain_limit, amount_usd, "Daily limit ${limit:.2f} for {section}. Spent: ${used:.2f}. Remaining: ${remaining:.2f}."))
+    if wallet:
+        wallet_limit = MAX_WALLET_DAILY_SPEND_USD.get(section, chain_limit)
+        out.append((f"spend_day:{wallet_scope}:{wallet}", wallet_limit, amount_usd, "Daily limit ${limit:.2f} for wallet {wallet_short}. Spent: ${used:.2f}. Remaining: ${remaining:.2f}."))
+    out.append((f"fills_day:{scope}:{section}", None, 1, ""))
+    return out
+
+
+def reserve_trade(
+    section: str,
+    amount_usd: float,
+    market_key: str,
+    user_id: int | str | None = None,
+    wallet: str | None = None,
+    dry_run: bool = False,
+    scope: str = "chain",
+) -> tuple[Reservation | None, list]:
+    """Check every trade limit and, unless ``dry_run``, reserve them together.
+
+    ``scope`` keys the spend windows: ``"chain"`` is the budget manual and
+    automated exits share; background strategies (``"dca"``) pass their own
+    so they cannot exhaust it.
+
+    Returns (reservation, []) when allowed and (None, reasons) when any limit
+    would be exceeded; nothing is recorded in that case.
+    """
+    now = time.time()
+    limits = _trade_limits(section, float(amount_usd or 0), market_key, user_id, wallet, scope)
+    with _lock:
+        failures = []
+        for key, limit, amount, message in limits:
+            if limit is None:
+                continue
+            current = _window(key).used(now)
+            if current + amount > limit:
+                wait = retry_after(key, now)
+                failures.append(message.format(
+                    limit=limit, used=current, remaining=max(0.0, limit - current), section=section,
+                    market_key=market_key, wait=wait, wait_min=wait // 60, wallet_short=str(wallet)[:6],
+                ))
+        if failures:
+            return None, failures
+        if dry_run:
+            return Reservation([]), []
+        return Reservation([_record(key, amount, now) for key, _, amount, _ in limits]), []
+
+
+def _bucket_rows(keys) -> list:
+    rows = []
+    for key, index in keys:
+        window = _windows.get(key)
+        if window is None:
+            continue
+        amount = next((a for i, a in window.buckets if i == index), 0.0)
+        rows.append((key, index * window.bucket, amount))
+    return rows
+
+
+def flush_limits() -> int:
+    """Write changed buckets to Postgres; returns rows written."""
+    import db
+
+    with _lock:
+        if not _dirty:
+            return 0
+        pending = set(_dirty)
+        _dirty.clear()
+        rows = _bucket_rows(pending)
+    try:
+        db.save_limit_buckets(rows, max(span for span, _, persisted in SPECS.values() if persisted))
+    except Exception:
+        with _lock:
+            _dirty.update(pending)
+        raise
+    return len(rows)
+
+
+def prune_limits(now: float | None = None) -> int:
+    """Forget windows with nothing left in them; returns how many were dropped."""
+    now = time.time() if now is None else now
+    with _lock:
+        dirty = {key for key, _ in _dirty}
+        idle = []
+        for key, window in _windows.items():
+            window.used(now)
+            if not window.buckets and key not in dirty:
+                idle.append(key)
+        for key in idle:
+            del _windows[key]
+    return len(idle)
+
+
+async def flush_limits_job(context) -> None:
+    """Scheduled job: write-behind for persistent limit buckets."""
+    from engine.job_metrics import record_items
+
+    try:
+        record_items(flush_limits())
+    except Exception as e:
+        log.error("Limit flush failed: %s", e)
+    prune_limits()
+
+
+def load_limits(now: float | None = None) -> int:
+    """Rebuild persistent windows from Postgres; returns buckets loaded."""
+    import db
+
+    now = time.time() if now is None else now
+    horizon = max(span for span, _, persisted in SPECS.values() if persisted)
+    loaded = 0
+    rows = db.get_limit_buckets(int(now - horizon))
+    with _lock:
+        for key in [k for k in _windows if SPECS[k.split(":", 1)[0]][2]]:
+            del _windows[key]
+        for row in rows:
+            key = row["limit_key"]
+            spec = key.split(":", 1)[0]
+            if spec not in SPECS or not SPECS[spec][2]:
+                continue
+            window = _window(key)
+            start = int(row["bucket_start"])
+            if start // window.bucket <= int(now // window.bucket) - window.slots:
+                continue
+            window.add(float(row["amount"] or 0), start)
+            loaded += 1
+    return loaded
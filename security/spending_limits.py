@@ -1,15 +1,15 @@
 import logging
-import time
-from collections import defaultdict
+
+from security import limits
 
 log = logging.getLogger(__name__)
 MAX_SINGLE_TRADE_USD = {"hyperliquid": 1000.0, "solana": 500.0, "polymarket": 200.0}
+# Rolling 24h spend, per chain and per wallet (wallets default to their chain's cap).
 MAX_DAILY_SPEND_USD = {"hyperliquid": 3000.0, "solana": 1500.0, "polymarket": 500.0}
+MAX_WALLET_DAILY_SPEND_USD: dict = {}
 MAX_OPEN_POSITIONS = {"hyperliquid": 5, "solana": 10, "polymarket": 10}
 MAX_LEVERAGE = {"hyperliquid": 10}
-MIN_TRADE_INTERVAL_SECONDS = 30
-_daily_spend: dict = defaultdict(list)
-_last_trade: dict = {}
+MIN_TRADE_INTERVAL_SECONDS = limits.SPECS["market_cooldown"][0]
 
 def check_trade_size(section: str, amount_usd: float) -> tuple[bool, str]:
     limit = MAX_SINGLE_TRADE_USD.get(section, 500.0)
@@ -19,17 +19,15 @@ def check_trade_size(section: str, amount_usd: float) -> tuple[bool, str]:
 
 def check_daily_spend(section: str, amount_usd: float) -> tuple[bool, str]:
     limit = MAX_DAILY_SPEND_USD.get(section, 1000.0)
-    now = time.time()
-    today = time.strftime("%Y-%m-%d")
-    _daily_spend[section] = [e for e in _daily_spend[section] if time.strftime("%Y-%m-%d", time.gmtime(e["ts"])) == today]
-    spent = sum(e["amount"] for e in _daily_spend[section])
+    spent = limits.used(f"spend_day:chain:{section}")
     if spent + amount_usd > limit:
         remaining = max(0, limit - spent)
         return False, f"Daily limit ${limit:.2f} for {section}. Spent: ${spent:.2f}. Remaining: ${remaining:.2f}."
     return True, ""
 
 def record_spend(section: str, amount_usd: float) -> None:
-    _daily_spend[section].append({"amount": amount_usd, "ts": time.time()})
+    limits.hit(f"spend_day:chain:{section}", None, amount_usd)
+    limits.hit(f"fills_day:chain:{section}", None)
     log.info(f"Spend recorded: ${amount_usd:.2f} on {section}")
 
 def check_position_count(section: str, current_count: int) -> tuple[bool, str]:
@@ -45,36 +43,34 @@ def check_leverage(section: str, leverage: float) -> tuple[bool, str]:
     return True, ""
 
 def check_duplicate_trade(market_key: str) -> tuple[bool, str]:
-    last = _last_trade.get(market_key)
-    if last:
-        elapsed = time.time() - last
-        if elapsed < MIN_TRADE_INTERVAL_SECONDS:
-            wait = int(MIN_TRADE_INTERVAL_SECONDS - elapsed)
-            return False, f"Trade on {market_key} placed {int(elapsed)}s ago. Wait {wait}s to prevent double-execution."
+    if limits.used(f"market_cooldown:{market_key}") >= 1:
+        wait = limits.retry_after(f"market_cooldown:{market_key}")
+        return False, f"Trade on {market_key} placed recently. Wait {wait}s to prevent double-execution."
     return True, ""
 
 def record_trade_time(market_key: str) -> None:
-    _last_trade[market_key] = time.time()
+    limits.hit(f"market_cooldown:{market_key}", None)
 
-def run_all_checks(section: str, amount_usd: float, market_key: str, leverage: float = 1.0, current_positions: int = 0) -> tuple[bool, list]:
+def run_all_checks(section: str, amount_usd: float, market_key: str, leverage: float = 1.0, current_positions: int = 0, windows: bool = True) -> tuple[bool, list]:
+    """Static checks, plus the sliding-window spend/cooldown checks unless ``windows`` is False
+    (callers that reserve through limits.reserve_trade check those atomically there)."""
     failures = []
-    for allowed, reason in [
+    checks = [
         check_trade_size(section, amount_usd),
-        check_daily_spend(section, amount_usd),
         check_position_count(section, current_positions),
         check_leverage(section, leverage),
-        check_duplicate_trade(market_key),
-    ]:
+    ]
+    if windows:
+        checks += [check_daily_spend(section, amount_usd), check_duplicate_trade(market_key)]
+    for allowed, reason in checks:
         if not allowed:
             failures.append(reason)
     return len(failures) == 0, failures
 
 def get_daily_summary() -> dict:
-    today = time.strftime("%Y-%m-%d")
     summary = {}
     for section in ["hyperliquid", "solana", "polymarket"]:
-        entries = [e for e in _daily_spend.get(section, []) if time.strftime("%Y-%m-%d", time.gmtime(e["ts"])) == today]
-        spent = sum(e["amount"] for e in entries)
+        spent = limits.used(f"spend_day:chain:{section}")
         limit = MAX_DAILY_SPEND_USD.get(section, 1000.0)
-        summary[section] = {"spent": round(spent, 2), "limit": limit, "remaining": round(max(0, limit - spent), 2), "trades": len(entries)}
+        summary[section] = {"spent": round(spent, 2), "limit": limit, "remaining": round(max(0, limit - spent), 2), "trades": int(limits.used(f"fills_day:chain:{section}"))}
     return summary
@@ -266,6 +266,12 @@ CREATE TABLE IF NOT EXISTS degen_tokens (
     created_at TIMESTAMP DEFAULT NOW()
 );
 
+CREATE TABLE IF NOT EXISTS rescore_queue (
+    address VARCHAR(100) PRIMARY KEY,
+    chain VARCHAR(20),
+    due_at DOUBLE PRECISION NOT NULL
+);
+
 CREATE TABLE IF NOT EXISTS degen_trades (
     id SERIAL PRIMARY KEY,
     token_id INT REFERENCES degen_tokens(id),
@@ -673,6 +679,38 @@ CREATE TABLE IF NOT EXISTS model_performance (
     graded_at TIMESTAMP,
     updated_at TIMESTAMP DEFAULT NOW()
 );
+
+CREATE INDEX IF NOT EXISTS idx_trade_log_open ON trade_log (logged_at) WHERE result IS NULL;
+CREATE INDEX IF NOT EXISTS idx_alert_lifecycle_open ON alert_lifecycle (model_id) WHERE outcome IS NULL;
+
+CREATE TABLE IF NOT EXISTS perf_rollup_hourly (
+    source VARCHAR(10) NOT NULL,
+    bucket TIMESTAMP NOT NULL,
+    section VARCHAR(20) NOT NULL DEFAULT '',
+    model_id VARCHAR(100) NOT NULL DEFAULT '',
+    tier VARCHAR(10) NOT NULL DEFAULT '',
+    pair VARCHAR(50) NOT NULL DEFAULT '',
+    session VARCHAR(20) NOT NULL DEFAULT '',
+    total INT DEFAULT 0,
+    wins INT DEFAULT 0,
+    losses INT DEFAULT 0,
+    r_count INT DEFAULT 0,
+    total_r FLOAT DEFAULT 0,
+    pnl_usd FLOAT DEFAULT 0,
+    entries_touched INT DEFAULT 0,
+    phase4_confirms INT DEFAULT 0,
+    phase4_fails INT DEFAULT 0,
+    PRIMARY KEY (source, bucket, section, model_id, tier, pair, session)
+);
+CREATE INDEX IF NOT EXISTS idx_perf_rollup_model ON perf_rollup_hourly (source, model_id);
+
+CREATE OR REPLACE VIEW perf_rollup_daily AS
+    SELECT source, bucket::date AS day, section, model_id, tier, pair, session,
+           SUM(total) AS total, SUM(wins) AS wins, SUM(losses) AS losses,
+           SUM(r_count) AS r_count, SUM(total_r) AS total_r, SUM(pnl_usd) AS pnl_usd,
+           SUM(entries_touched) AS entries_touched, SUM(phase4_confirms) AS phase4_confirms, SUM(phase4_fails) AS phase4_fails
+    FROM perf_rollup_hourly
+    GROUP BY source, bucket::date, section, model_id, tier, pair, session;
 ALTER TABLE models ADD COLUMN IF NOT EXISTS phase_timeframes JSONB DEFAULT '{"1":"4h","2":"1h","3":"15m","4":"5m"}';
 
 -- Security hardening: enable RLS on all public application tables exposed by PostgREST.
@@ -726,6 +764,14 @@ CREATE TABLE IF NOT EXISTS risk_settings (
 );
 INSERT INTO risk_settings (id) VALUES (1) ON CONFLICT (id) DO NOTHING;
 
+CREATE TABLE IF NOT EXISTS limit_buckets (
+    limit_key    VARCHAR(160) NOT NULL,
+    bucket_start BIGINT NOT NULL,
+    amount       FLOAT NOT NULL DEFAULT 0,
+    updated_at   TIMESTAMP DEFAULT NOW(),
+    PRIMARY KEY (limit_key, bucket_start)
+);
+
 CREATE TABLE IF NOT EXISTS daily_risk_tracker (
     id               SERIAL PRIMARY KEY,
     track_date       DATE NOT NULL UNIQUE,
@@ -772,6 +818,21 @@ CREATE TABLE IF NOT EXISTS market_regimes (
     detected_at  TIMESTAMP DEFAULT NOW()
 );
 
+CREATE TABLE IF NOT EXISTS pair_regimes (
+    regime_date  DATE NOT NULL,
+    pair         VARCHAR(20) NOT NULL,
+    regime       VARCHAR(30) NOT NULL,
+    confidence   FLOAT DEFAULT 0,
+    atr_pct      FLOAT,
+    range_pct    FLOAT,
+    trend        VARCHAR(20),
+    details      JSONB DEFAULT '{}',
+    detected_at  TIMESTAMP DEFAULT NOW(),
+    PRIMARY KEY (regime_date, pair)
+);
+
+CREATE INDEX IF NOT EXISTS idx_pair_regimes_pair_date ON pair_regimes (pair, regime_date DESC);
+
 CREATE TABLE IF NOT EXISTS model_regime_performance (
     id           SERIAL PRIMARY KEY,
     model_id     VARCHAR(100) NOT NULL,
@@ -927,6 +988,22 @@ CREATE TABLE IF NOT EXISTS exit_reminders (
     created_at       TIMESTAMP DEFAULT NOW()
 );
 
+CREATE TABLE IF NOT EXISTS ingest_cursors (
+    source          VARCHAR(40) PRIMARY KEY,
+    watermark       DOUBLE PRECISION NOT NULL DEFAULT 0,
+    head_ts         DOUBLE PRECISION NOT NULL DEFAULT 0,
+    backfill_offset INT,
+    updated_at      TIMESTAMP DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS recent_mints (
+    mint       VARCHAR(100) PRIMARY KEY,
+    source     VARCHAR(40) NOT NULL,
+    created_ts DOUBLE PRECISION,
+    seen_at    DOUBLE PRECISION NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_recent_mints_seen ON recent_mints(source, seen_at);
+
 INSERT INTO narrative_tracking (narrative)
 VALUES
   ('AI'), ('DeFi'), ('Gaming'), ('Meme'),
@@ -1074,6 +1151,14 @@ CREATE TABLE IF NOT EXISTS poly_watchlist (
     added_at         TIMESTAMP DEFAULT NOW()
 );
 
+CREATE TABLE IF NOT EXISTS poly_price_history (
+    token_id   VARCHAR(100) NOT NULL,
+    ts         BIGINT NOT NULL,
+    price      DOUBLE PRECISION NOT NULL,
+    market_id  VARCHAR(100),
+    PRIMARY KEY (token_id, ts)
+);
+
 CREATE TABLE IF NOT EXISTS poly_alerts_sent (
     id               SERIAL PRIMARY KEY,
     market_id        VARCHAR(100) NOT NULL,
@@ -1146,9 +1231,13 @@ CREATE TABLE IF NOT EXISTS hl_trade_history (
     closed_pnl       FLOAT DEFAULT 0,
     timestamp        TIMESTAMP,
     hl_order_id      VARCHAR(50),
+    tid              BIGINT,
+    time_ms          BIGINT,
     created_at       TIMESTAMP DEFAULT NOW()
 );
 
+CREATE UNIQUE INDEX IF NOT EXISTS idx_hl_trade_history_tid ON hl_trade_history (address, tid);
+
 CREATE TABLE IF NOT EXISTS hl_trade_plans (
     id               SERIAL PRIMARY KEY,
     address          VARCHAR(100),
@@ -1197,9 +1286,37 @@ CREATE TABLE IF NOT EXISTS hl_funding_history (
     payment          FLOAT,
     rate             FLOAT,
     timestamp        TIMESTAMP,
+    time_ms          BIGINT,
     created_at       TIMESTAMP DEFAULT NOW()
 );
 
+CREATE UNIQUE INDEX IF NOT EXISTS idx_hl_funding_history_event ON hl_funding_history (address, coin, time_ms);
+
+CREATE TABLE IF NOT EXISTS hl_ingest_cursors (
+    address          VARCHAR(100) PRIMARY KEY,
+    fills_ms         BIGINT DEFAULT 0,
+    funding_ms       BIGINT DEFAULT 0,
+    updated_at       TIMESTAMP DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS hl_perf_daily (
+    address          VARCHAR(100) NOT NULL,
+    day              DATE NOT NULL,
+    coin             VARCHAR(20) NOT NULL,
+    fills            INT DEFAULT 0,
+    closes           INT DEFAULT 0,
+    wins             INT DEFAULT 0,
+    losses           INT DEFAULT 0,
+    net_pnl          FLOAT DEFAULT 0,
+    gross_profit     FLOAT DEFAULT 0,
+    gross_loss       FLOAT DEFAULT 0,
+    fees             FLOAT DEFAULT 0,
+    funding          FLOAT DEFAULT 0,
+    best_pnl         FLOAT,
+    worst_pnl        FLOAT,
+    PRIMARY KEY (address, day, coin)
+);
+
 CREATE TABLE IF NOT EXISTS encrypted_keys (
     id         SERIAL PRIMARY KEY,
     key_name   VARCHAR(100) NOT NULL UNIQUE,
@@ -1423,7 +1540,8 @@ ALTER TABLE hl_positions
 CREATE TABLE IF NOT EXISTS pending_signals (
     id              SERIAL PRIMARY KEY,
     section         VARCHAR(20) DEFAULT 'perps',
-    pair            VARCHAR(20),
+    signal_key      VARCHAR(120),
+    pair            VARCHAR(100),
     direction       VARCHAR(20),
     phase           INT DEFAULT 1,
     timeframe       VARCHAR(10),
@@ -1436,6 +1554,7 @@ CREATE TABLE IF NOT EXISTS pending_signals (
     expires_at      TIMESTAMP,
     dismissed_at    TIMESTAMP
 );
+CREATE UNIQUE INDEX IF NOT EXISTS idx_pending_signals_key ON pending_signals(section, signal_key);
 
 -- Prediction models for Polymarket
 CREATE TABLE IF NOT EXISTS prediction_models (
@@ -0,0 +1,172 @@
+"""Bounded in-memory caches for long-lived module state.
+
+``BoundedCache`` caps the number of entries, expires them after ``ttl``
+seconds and, when full, evicts by LRU or (sampled) LFU. Every cache registers
+under its name so the ``sweep_caches_job`` can drop expired entries on a
+schedule and /metrics can report size, approximate memory and hit rates.
+"""
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+CACHE_SWEEP_SECONDS = 300
+# LFU evicts the least-used of this many least-recently-used entries, which
+# keeps eviction O(1) while still protecting hot keys.
+LFU_SAMPLE = 16
+SIZE_SAMPLE = 64
+
+_REGISTRY: dict[str, "BoundedCache"] = {}
+_MISSING = object()
+
+
+class BoundedCache:
+    """Size- and TTL-bounded mapping; also usable as a set via ``add``."""
+
+    def __init__(self, name: str, maxsize: int = 1024, ttl: float | None = None, policy: str = "lru", clock=time.monotonic):
+        if policy not in ("lru", "lfu"):
+            raise ValueError(f"unknown eviction policy: {policy}")
+        self.name = name
+        self.maxsize = max(1, int(maxsize))
+        self.ttl = ttl
+        self.policy = policy
+        self._clock = clock
+        self._data: OrderedDict = OrderedDict()  # key -> [value, expires_at, uses]
+        self._lock = threading.RLock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+        _REGISTRY[name] = self
+
+    def _live(self, key, now: float):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= now:
+            del self._data[key]
+            self.stats["expirations"] += 1
+            return None
+        return entry
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._live(key, self._clock())
+            if entry is None:
+                self.stats["misses"] += 1
+                return default
+            self.stats["hits"] += 1
+            entry[2] += 1
+            self._data.move_to_end(key)
+            return entry[0]
+
+    def __getitem__(self, key):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def set(self, key, value, ttl: float | None = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            now = self._clock()
+            expires = now + ttl if ttl else float("inf")
+            entry = self._data.get(key)
+            if entry is not None:
+                entry[0], entry[1] = value, expires
+                self._data.move_to_end(key)
+                return
+            while len(self._data) >= self.maxsize:
+                self._evict(now)
+            self._data[key] = [value, expires, 0]
+
+    __setitem__ = set
+
+    def add(self, key) -> None:
+        self.set(key, True)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._live(key, self._clock())
+            if entry is None:
+                return default
+            del self._data[key]
+            return entry[0]
+
+    def _evict(self, now: float) -> None:
+        oldest = next(iter(self._data))
+        if self._data[oldest][1] <= now:
+            del self._data[oldest]
+            self.stats["expirations"] += 1
+            return
+        if self.policy == "lfu":
+            victim, fewest = oldest, None
+            for i, (key, entry) in enumerate(self._data.items()):
+                if i >= LFU_SAMPLE:
+                    break
+                if fewest is None or entry[2] < fewest:
+                    victim, fewest = key, entry[2]
+            oldest = victim
+        del self._data[oldest]
+        self.stats["evictions"] += 1
+
+    def sweep(self) -> int:
+        """Drop every expired entry; returns how many were removed."""
+        with self._lock:
+            now = self._clock()
+            expired = [k for k, e in self._data.items() if e[1] <= now]
+            for key in expired:
+                del self._data[key]
+            self.stats["expirations"] += len(expired)
+            return len(expired)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def keys(self) -> list:
+        with self._lock:
+            now = self._clock()
+            return [k for k, e in self._data.items() if e[1] > now]
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def approx_bytes(self) -> int:
+        """Shallow size of keys and values, extrapolated from a sample."""
+        with self._lock:
+            n = len(self._data)
+            if not n:
+                return sys.getsizeof(self._data)
+            sample = 0
+            for i, (key, entry) in enumerate(self._data.items()):
+                if i >= SIZE_SAMPLE:
+                    break
+                sample += sys.getsizeof(key) + sys.getsizeof(entry) + sys.getsizeof(entry[0])
+            return sys.getsizeof(self._data) + sample * n // min(n, SIZE_SAMPLE)
+
+    def info(self) -> dict:
+        reads = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "entries": len(self._data),
+            "maxsize": self.maxsize,
+            "bytes": self.approx_bytes(),
+            "hit_rate": self.stats["hits"] / reads if reads else 0.0,
+        }
+
+
+def sweep_caches() -> int:
+    return sum(cache.sweep() for cache in list(_REGISTRY.values()))
+
+
+async def sweep_caches_job(context) -> None:
+    """Scheduled job: expire stale entries in every registered cache."""
+    from engine.job_metrics import record_items
+
+    record_items(sweep_caches())
+
+
+def cache_stats() -> dict:
+    return {name: cache.info() for name, cache in sorted(_REGISTRY.items())}